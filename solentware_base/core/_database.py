@@ -10,21 +10,36 @@ justify making _dpt.Database a subclass of _database.Database.
 
 """
 
+from itertools import islice
+
 from .segmentsize import SegmentSize
 from .find import Find
 from .where import Where
 from .findvalues import FindValues
 from .wherevalues import WhereValues
+from .recordlistcache import RecordListCache
+from .querycache import QueryCache
+from .positioncheckpoints import PositionCheckpoints
+from . import recordcodec
 from .constants import (
     SECONDARY,
+    TUNING_PROFILES,
+    RECORD_CODEC,
+    REPR_CODEC,
 )
 from .recordset import (
+    RecordListComplement,
     RecordsetSegmentBitarray,
     RecordsetSegmentInt,
     RecordsetSegmentList,
+    RecordsetSegmentRun,
 )
 
 
+# Default number of records read together by Database.iter_records().
+ITER_RECORDS_BATCH_SIZE = 500
+
+
 class DatabaseError(Exception):
     """Exception for Database class."""
 
@@ -52,6 +67,37 @@ class Database:
 
     _file_per_database = False
 
+    # The optional cache of RecordLists created by the recordlist_key,
+    # recordlist_key_startswith, and recordlist_key_range, methods.
+    # See set_recordlist_cache_size() method.
+    recordlist_cache = None
+
+    # The RecordLists of existing records created by the recordlist_ebm
+    # method, by file, held until the transaction is committed or backed
+    # out.  None means no transaction and nothing is cached.
+    # See start_existence_cache() method.
+    existence_cache = None
+
+    # The optional cache of parsed record and values selectors.
+    # See set_query_cache_size() method.
+    query_cache = None
+
+    # The optional position checkpoint summaries used by the positional
+    # access methods of secondary cursors.
+    # See set_position_checkpoint_interval() method.
+    position_checkpoints = None
+
+    # Existence bitmap segments changed in a transaction are held, decoded,
+    # in the ExistenceBitmapControl instances and written when the
+    # transaction is committed if True.  The engine modules which support
+    # this call start_ebm_caches(), flush_ebm_caches(), and
+    # discard_ebm_caches(), in their transaction methods.
+    ebm_write_back = True
+
+    # The tuning profile set by set_tuning_profile(), or None if the engine
+    # defaults are in use.
+    tuning_profile = None
+
     @property
     def file_per_database(self):
         """Return True if each database is in a separate file.
@@ -77,6 +123,17 @@ class Database:
         del name
         return self.database_file
 
+    def get_record_codec(self, dbset):
+        """Return codec for values of records put on dbset.
+
+        The codec is named by the RECORD_CODEC item of the specification
+        for dbset, or is the repr codec if not named.
+
+        """
+        return recordcodec.CODECS[
+            self.specification[dbset].get(RECORD_CODEC, REPR_CODEC)
+        ]
+
     def delete_instance(self, dbset, instance):
         """Delete an existing instance on databases in dbset.
 
@@ -84,7 +141,25 @@ class Database:
         and non-standard inverted indexes.
 
         """
+        self._delete_instance(dbset, instance, self)
+
+    def delete_instances(self, dbset, instances):
+        """Delete existing instances on databases in dbset.
+
+        The effect is the same as delete_instance() for each instance but
+        the index changes are applied, grouped by field, value, and segment,
+        after all the records have been deleted.
+
+        """
+        changes = IndexChanges()
+        for instance in instances:
+            self._delete_instance(dbset, instance, changes)
+        changes.apply(self, dbset)
+
+    def _delete_instance(self, dbset, instance, index):
+        """Delete instance on dbset and pass index changes to index."""
         deletekey = instance.key.pack()
+        instance.value.set_codec(self.get_record_codec(dbset))
         instance.set_packed_value_and_indexes()
         high_record = self.get_high_record_number(dbset)
         self.delete(dbset, deletekey, instance.srvalue)
@@ -98,7 +173,7 @@ class Database:
                     dcb[secondary](instance, srindex[secondary])
                 continue
             for value in srindex[secondary]:
-                self.remove_record_from_field_value(
+                index.remove_record_from_field_value(
                     dbset, secondary, value, segment, record_number
                 )
         self.note_freed_record_number_segment(
@@ -112,8 +187,28 @@ class Database:
         and non-standard inverted indexes.
 
         """
+        self._edit_instance(dbset, instance, self)
+
+    def edit_instances(self, dbset, instances):
+        """Edit existing instances on databases in dbset.
+
+        The effect is the same as edit_instance() for each instance but
+        the index changes are applied, grouped by field, value, and segment,
+        after all the records have been edited.
+
+        """
+        changes = IndexChanges()
+        for instance in instances:
+            self._edit_instance(dbset, instance, changes)
+        changes.apply(self, dbset)
+
+    def _edit_instance(self, dbset, instance, index):
+        """Edit instance on dbset and pass index changes to index."""
         oldkey = instance.key.pack()
         newkey = instance.newrecord.key.pack()
+        codec = self.get_record_codec(dbset)
+        instance.value.set_codec(codec)
+        instance.newrecord.value.set_codec(codec)
         instance.set_packed_value_and_indexes()
         instance.newrecord.set_packed_value_and_indexes()
         srindex = instance.srindex
@@ -175,7 +270,7 @@ class Database:
                     dcb[secondary](instance, srindex[secondary])
                 continue
             for value in srindex[secondary]:
-                self.remove_record_from_field_value(
+                index.remove_record_from_field_value(
                     dbset, secondary, value, old_segment, old_record_number
                 )
 
@@ -185,7 +280,7 @@ class Database:
                     npcb[secondary](instance.newrecord, nsrindex[secondary])
                 continue
             for value in nsrindex[secondary]:
-                self.add_record_to_field_value(
+                index.add_record_to_field_value(
                     dbset, secondary, value, new_segment, new_record_number
                 )
 
@@ -203,20 +298,20 @@ class Database:
             nsrset = set(nsrindex[secondary])
             if oldkey == newkey:
                 for value in sorted(srset - nsrset):
-                    self.remove_record_from_field_value(
+                    index.remove_record_from_field_value(
                         dbset, secondary, value, old_segment, old_record_number
                     )
                 for value in sorted(nsrset - srset):
-                    self.add_record_to_field_value(
+                    index.add_record_to_field_value(
                         dbset, secondary, value, new_segment, new_record_number
                     )
             else:
                 for value in srset:
-                    self.remove_record_from_field_value(
+                    index.remove_record_from_field_value(
                         dbset, secondary, value, old_segment, old_record_number
                     )
                 for value in nsrset:
-                    self.add_record_to_field_value(
+                    index.add_record_to_field_value(
                         dbset, secondary, value, new_segment, new_record_number
                     )
 
@@ -226,7 +321,25 @@ class Database:
         This method assumes all primary databases are integer primary key.
 
         """
+        self._put_instance(dbset, instance, self)
+
+    def put_instances(self, dbset, instances):
+        """Put new instances on database dbset.
+
+        The effect is the same as put_instance() for each instance but
+        the index changes are applied, grouped by field, value, and segment,
+        after all the records have been put.
+
+        """
+        changes = IndexChanges()
+        for instance in instances:
+            self._put_instance(dbset, instance, changes)
+        changes.apply(self, dbset)
+
+    def _put_instance(self, dbset, instance, index):
+        """Put instance on dbset and pass index changes to index."""
         putkey = instance.key.pack()
+        instance.value.set_codec(self.get_record_codec(dbset))
         instance.set_packed_value_and_indexes()
         if putkey is None:
             # reuse record number if possible
@@ -254,17 +367,327 @@ class Database:
                     pcb[secondary](instance, srindex[secondary])
                 continue
             for value in srindex[secondary]:
-                self.add_record_to_field_value(
+                index.add_record_to_field_value(
                     dbset, secondary, value, segment, record_number
                 )
 
+    def update_records_for_field_value(
+        self, file, field, key, segment, records
+    ):
+        """Add and remove records in segment for key in field of file.
+
+        records maps record numbers within segment to True, for records to
+        be added, or False, for records to be removed.
+
+        Subclasses may override this method to read and write the segment
+        once rather than once per record.
+
+        """
+        for record_number, add in records.items():
+            if add:
+                self.add_record_to_field_value(
+                    file, field, key, segment, record_number
+                )
+            else:
+                self.remove_record_from_field_value(
+                    file, field, key, segment, record_number
+                )
+
+    def set_recordlist_cache_size(self, maxsize):
+        """Enable, resize, or disable (maxsize 0 or None), RecordList cache.
+
+        When enabled the recordlist_key, recordlist_key_startswith, and
+        recordlist_key_range, methods return copies of RecordLists cached
+        by (file, field, key specification) if possible.
+
+        The cache assumes this Database instance is the only updater of
+        the database.
+
+        """
+        if not maxsize:
+            self.recordlist_cache = None
+        elif self.recordlist_cache is None:
+            self.recordlist_cache = RecordListCache(maxsize)
+        else:
+            self.recordlist_cache.maxsize = maxsize
+            self.recordlist_cache.clear()
+
+    def get_recordlist_cache_statistics(self):
+        """Return (hits, misses, entries) for RecordList cache or None."""
+        cache = self.recordlist_cache
+        if cache is None:
+            return None
+        return (cache.hits, cache.misses, len(cache))
+
+    def get_cached_recordlist(self, file, field, keyspec, cache_size=1):
+        """Return copy of cached RecordList for keyspec or None."""
+        if self.recordlist_cache is None:
+            return None
+        return self.recordlist_cache.get(
+            file, field, keyspec, cache_size=cache_size
+        )
+
+    def cache_recordlist(self, file, field, keyspec, recordlist, cache_size=1):
+        """Return recordlist, or a copy if recordlist is put in cache."""
+        if self.recordlist_cache is None:
+            return recordlist
+        return self.recordlist_cache.put(
+            file, field, keyspec, recordlist, cache_size=cache_size
+        )
+
+    def invalidate_recordlist_cache(self, file, field, key):
+        """Remove cached RecordLists which may include records for key."""
+        if self.recordlist_cache is not None:
+            self.recordlist_cache.invalidate(file, field, key)
+
+    def clear_recordlist_cache(self):
+        """Remove all cached RecordLists."""
+        if self.recordlist_cache is not None:
+            self.recordlist_cache.clear()
+
+    def start_existence_cache(self):
+        """Start an empty cache of RecordLists of records on files.
+
+        The cache is started when a transaction is started, and discarded
+        when the transaction is committed or backed out, so RecordLists of
+        records committed by other connections are not kept.
+
+        """
+        self.existence_cache = {}
+
+    def get_cached_existence(self, file, cache_size=1):
+        """Return copy of cached RecordList of records on file or None.
+
+        The recordlist_ebm method of each database engine returns a copy of
+        the cached RecordList if possible, so the existence bitmap is read
+        once per transaction rather than once per query.  The entry for a
+        file is removed when a record is added to, or removed from, the
+        file's existence bitmap.
+
+        """
+        if not self.existence_cache:
+            return None
+        recordlist = self.existence_cache.get(file)
+        if recordlist is None:
+            return None
+        return recordlist.copy_on_write(cache_size=cache_size)
+
+    def cache_existence(self, file, recordlist, cache_size=1):
+        """Return recordlist, or a copy if recordlist is put in cache."""
+        if self.existence_cache is None:
+            return recordlist
+        self.existence_cache[file] = recordlist
+        return recordlist.copy_on_write(cache_size=cache_size)
+
+    def invalidate_existence_cache(self, file):
+        """Remove cached RecordList of records on file."""
+        if self.existence_cache:
+            self.existence_cache.pop(file, None)
+
+    def discard_existence_cache(self):
+        """Discard the cache of RecordLists of records on files."""
+        self.existence_cache = None
+
+    def recordlist_complement(self, file, recordlist):
+        """Return RecordList of records on file which are not in recordlist.
+
+        The existence bitmap is not read unless the records in the answer
+        are needed: see RecordListComplement class.
+
+        """
+        del file
+        if (
+            isinstance(recordlist, RecordListComplement)
+            and recordlist.complemented is not None
+        ):
+            return recordlist.complemented
+        return RecordListComplement(recordlist)
+
+    def estimate_recordlist_key(self, file, field, key=None):
+        """Return estimate of records recordlist_key would find, or None.
+
+        None means the database engine does not provide estimates.
+
+        """
+        del file, field, key
+        return None
+
+    def estimate_recordlist_key_range(
+        self, file, field, ge=None, gt=None, le=None, lt=None
+    ):
+        """Return estimate of records recordlist_key_range would find.
+
+        None means the database engine does not provide estimates.
+
+        """
+        del file, field, ge, gt, le, lt
+        return None
+
+    def set_tuning_profile(self, profile):
+        """Apply tuning profile and return the profile it replaces.
+
+        profile is one of BULK_LOAD, INTERACTIVE, and READ_MOSTLY, or None
+        for the engine defaults.  The profile returned can be given to a
+        later call to restore the earlier settings, typically:
+
+        previous = database.set_tuning_profile(BULK_LOAD)
+        database.set_defer_update()
+        ...
+        database.unset_defer_update()
+        database.set_tuning_profile(previous)
+
+        Call when no transaction is active.  Settings which the engine can
+        change while the database is open are applied immediately, and the
+        rest when the database is next opened.
+
+        """
+        if profile is not None and profile not in TUNING_PROFILES:
+            raise DatabaseError(
+                "".join(("Tuning profile '", str(profile), "' not known"))
+            )
+        previous = self.tuning_profile
+        self.tuning_profile = profile
+        self.apply_tuning_profile()
+        return previous
+
+    def apply_tuning_profile(self):
+        """Do nothing.  Subclasses should override this method as required.
+
+        Settings are specific to a database engine.
+
+        """
+
+    def set_position_checkpoint_interval(self, interval):
+        """Enable, or disable (interval 0 or None), position checkpoints.
+
+        When enabled the get_position_of_record and get_record_at_position
+        methods of secondary cursors, in engines which support checkpoints,
+        scan at most about 2 * interval keys of an index from a checkpoint
+        found by bisecting a summary of the index.
+
+        The summaries assume this Database instance is the only updater of
+        the database.  Cursors created before the interval is changed keep
+        the summaries they were given, which are no longer maintained, so
+        the interval should be set before creating cursors.
+
+        """
+        if not interval:
+            self.position_checkpoints = None
+        else:
+            self.position_checkpoints = PositionCheckpoints(interval)
+
+    def get_position_checkpoints(self, file, field):
+        """Return position checkpoint summary for field in file or None."""
+        if self.position_checkpoints is None:
+            return None
+        return self.position_checkpoints.get(file, field)
+
+    def invalidate_position_checkpoints(self, file, field, key):
+        """Mark position checkpoints for recount of records for key."""
+        if self.position_checkpoints is not None:
+            self.position_checkpoints.invalidate(file, field, key)
+
+    def clear_position_checkpoints(self):
+        """Discard all position checkpoint summaries."""
+        if self.position_checkpoints is not None:
+            self.position_checkpoints.clear()
+
+    def iter_records(self, recordlist, batch_size=ITER_RECORDS_BATCH_SIZE):
+        """Yield (record number, value) for records in recordlist.
+
+        The record numbers are taken from recordlist in ascending order and
+        the records are read batch_size at a time by get_primary_records().
+        Record numbers in recordlist without a record are ignored.
+
+        """
+        file = recordlist.dbset
+        record_numbers = recordlist.iter_record_numbers()
+        while True:
+            batch = list(islice(record_numbers, max(1, batch_size)))
+            if not batch:
+                break
+            yield from self.get_primary_records(file, batch)
+
+    def get_primary_records(self, file, keys):
+        """Return list of (key, value) for records in file with keys.
+
+        keys is a list of record numbers in ascending order.  Keys without
+        a record are ignored.
+
+        Subclasses override this method if the database engine can read
+        the records together faster than one get_primary_record() call per
+        record.
+
+        """
+        records = []
+        for key in keys:
+            record = self.get_primary_record(file, key)
+            if record is not None:
+                records.append(record)
+        return records
+
+    def start_ebm_caches(self):
+        """Hold existence bitmap changes until flush_ebm_caches() is called.
+
+        Nothing is done if ebm_write_back is False.
+
+        """
+        if self.ebm_write_back:
+            for ebmc in self.ebm_control.values():
+                ebmc.start_ebm_cache()
+
+    def flush_ebm_caches(self, dbenv):
+        """Write existence bitmap changes held for all files to dbenv.
+
+        dbenv is the argument given to the read_exists_segment() method of
+        the ExistenceBitmapControl instances.
+
+        """
+        for ebmc in self.ebm_control.values():
+            ebmc.flush_ebm_cache(dbenv)
+
+    def discard_ebm_caches(self):
+        """Forget existence bitmap changes held for all files.
+
+        Later changes are written immediately until start_ebm_caches() is
+        called.
+
+        """
+        for ebmc in self.ebm_control.values():
+            ebmc.discard_ebm_cache()
+
     def record_finder(self, dbset, recordclass=None):
         """Return a solentware_base.core.find.Find instance."""
         return Find(self, dbset, recordclass=recordclass)
 
+    def set_query_cache_size(self, maxsize):
+        """Enable, resize, or disable (maxsize 0 or None), query cache.
+
+        When enabled the record_selector and values_selector methods
+        return copies of lexed and parsed instances cached by statement,
+        whose lex() and parse() methods do nothing.
+
+        """
+        if not maxsize:
+            self.query_cache = None
+        elif self.query_cache is None:
+            self.query_cache = QueryCache(maxsize)
+        else:
+            self.query_cache.maxsize = maxsize
+            self.query_cache.clear()
+
+    def get_query_cache_statistics(self):
+        """Return (hits, misses, entries) for query cache or None."""
+        cache = self.query_cache
+        if cache is None:
+            return None
+        return (cache.hits, cache.misses, len(cache))
+
     def record_selector(self, statement):
         """Return a solentware_base.core.where.Where instance."""
-        return Where(statement)
+        if self.query_cache is None:
+            return Where(statement)
+        return self.query_cache.get(Where, statement)
 
     def values_finder(self, dbset):
         """Return a solentware_base.core.findvalues.FindValues instance."""
@@ -272,7 +695,9 @@ class Database:
 
     def values_selector(self, statement):
         """Return a solentware_base.core.wherevalues.WhereValues instance."""
-        return WhereValues(statement)
+        if self.query_cache is None:
+            return WhereValues(statement)
+        return self.query_cache.get(WhereValues, statement)
 
     def make_segment(self, key, segment_number, record_count, records):
         """Return a Segment subclass instance created from arguments."""
@@ -287,6 +712,8 @@ class Database:
             return RecordsetSegmentBitarray(
                 segment_number, None, records=records
             )
+        if len(records) % 2:
+            return RecordsetSegmentRun(segment_number, None, records=records)
         return RecordsetSegmentList(segment_number, None, records=records)
 
     def set_segment_size(self):
@@ -374,10 +801,21 @@ class Database:
         self.open_database(files=files)
 
     def start_read_only_transaction(self):
-        """Do nothing, present for compatibility with Symas LMMD."""
+        """Discard existence cache.
+
+        Present for compatibility with Symas LMMD.  Reads are not isolated
+        from other connections so nothing is cached.
+
+        """
+        self.discard_existence_cache()
 
     def end_read_only_transaction(self):
-        """Do nothing, present for compatibility with Symas LMMD."""
+        """Discard existence cache.
+
+        Present for compatibility with Symas LMMD.
+
+        """
+        self.discard_existence_cache()
 
     def increase_database_record_capacity(self, **kwargs):
         """Do nothing, present for compatibility with DPT."""
@@ -450,6 +888,50 @@ class Database:
         return cursor
 
 
+class IndexChanges:
+    """Collect changes to the index values of several records.
+
+    The changes are grouped by field, value, and segment, and the final
+    change for each record number in a group replaces earlier ones.
+
+    Instances are given to the Database methods which do the work of
+    put_instance(), edit_instance(), and delete_instance(), in place of
+    the Database instance so the index changes are collected rather than
+    applied.
+
+    """
+
+    def __init__(self):
+        """Initialize with no changes."""
+        self.changes = {}
+
+    def add_record_to_field_value(
+        self, file, field, key, segment, record_number
+    ):
+        """Note record_number to be added to records in segment for key."""
+        del file
+        self.changes.setdefault((field, key, segment), {})[
+            record_number
+        ] = True
+
+    def remove_record_from_field_value(
+        self, file, field, key, segment, record_number
+    ):
+        """Note record_number to be removed from records in segment for key."""
+        del file
+        self.changes.setdefault((field, key, segment), {})[
+            record_number
+        ] = False
+
+    def apply(self, database, file):
+        """Apply the changes to the indexes of file in database."""
+        for (field, key, segment), records in self.changes.items():
+            database.update_records_for_field_value(
+                file, field, key, segment, records
+            )
+        self.changes.clear()
+
+
 class ExistenceBitmapControl:
     """Base class for managing existence bitmap of file in database.
 
@@ -467,6 +949,11 @@ class ExistenceBitmapControl:
         self._file = file
         self.ebmkey = database.encode_record_selector("E" + file)
 
+        # Existence bitmap segments, as Bitarray instances, changed but not
+        # yet written to the database.  None means changes are written
+        # immediately.
+        self.ebm_cache = None
+
     @property
     def segment_count(self):
         """Return number of segments."""
@@ -477,3 +964,49 @@ class ExistenceBitmapControl:
         """Set segment count from 0-based segment_number if greater."""
         if segment_number > self._segment_count:
             self._segment_count = segment_number + 1
+
+    def start_ebm_cache(self):
+        """Hold existence bitmap changes until flush_ebm_cache() is called."""
+        if self.ebm_cache is None:
+            self.ebm_cache = {}
+
+    def discard_ebm_cache(self):
+        """Forget existence bitmap changes and write later ones immediately."""
+        self.ebm_cache = None
+
+    def get_cached_ebm(self, segment_number):
+        """Return changed existence bitmap for segment_number or None."""
+        if self.ebm_cache is None:
+            return None
+        return self.ebm_cache.get(segment_number)
+
+    def cache_ebm(self, segment_number, ebm):
+        """Return True if ebm is held for segment_number, or False if not.
+
+        The caller must write ebm to the database if False is returned.
+
+        """
+        if self.ebm_cache is None:
+            return False
+        self.ebm_cache[segment_number] = ebm
+        return True
+
+    def flush_ebm_cache(self, dbenv):
+        """Write the changed existence bitmap segments to database dbenv."""
+        if self.ebm_cache:
+            for segment_number in sorted(self.ebm_cache):
+                self.write_ebm_segment(
+                    segment_number, self.ebm_cache[segment_number], dbenv
+                )
+            self.ebm_cache.clear()
+
+    def write_ebm_segment(self, segment_number, ebm, dbenv):
+        """Write existence bitmap ebm for segment_number to database dbenv.
+
+        Subclasses which are used with an existence bitmap cache must
+        override this method.
+
+        """
+        raise DatabaseError(
+            "Existence bitmap cache not supported for this database engine"
+        )
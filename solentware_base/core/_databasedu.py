@@ -10,12 +10,19 @@ DPT.
 
 """
 
+import concurrent.futures
+import multiprocessing
+
 from . import _database
 from .segmentsize import SegmentSize
 from .constants import SECONDARY
 from .bytebit import Bitarray
 from . import merge
 
+# Maximum number of lists of sorted items held on each queue by
+# merge_import_parallel.
+_MERGED_ITEMS_QUEUE_SIZE = 4
+
 
 class DatabaseduError(_database.DatabaseError):
     """Exception for Database class."""
@@ -24,6 +31,9 @@ class DatabaseduError(_database.DatabaseError):
 class Database(_database.Database):
     """Provide deferred update versions of the record update methods."""
 
+    # The deferred update methods keep their own existence bitmaps.
+    ebm_write_back = False
+
     def put_instance(self, dbset, instance):
         """Put new instance on database dbset.
 
@@ -32,6 +42,7 @@ class Database(_database.Database):
 
         """
         putkey = instance.key.pack()
+        instance.value.set_codec(self.get_record_codec(dbset))
         instance.set_packed_value_and_indexes()
         if putkey is not None:
             # reuse record number is not allowed
@@ -71,6 +82,16 @@ class Database(_database.Database):
                 self.first_chunk[dbset] = False
                 self.high_segment[dbset] = segment
 
+    def put_instances(self, dbset, instances):
+        """Put new instances on database dbset by put_instance().
+
+        The deferred update put_instance() method already collects index
+        changes for a segment at a time.
+
+        """
+        for instance in instances:
+            self.put_instance(dbset, instance)
+
     def index_instance(self, dbset, instance):
         """Apply instance index values on database dbset.
 
@@ -112,6 +133,7 @@ class Database(_database.Database):
     def _defer_add_record_to_ebm(self, file, segment, record_number):
         """Add bit to existence bit map for new record and defer update."""
         assert file in self.specification
+        self.invalidate_existence_cache(file)
         try:
             # Assume cached segment existence bit map exists
             self.existence_bit_maps[file][segment][record_number] = True
@@ -246,33 +268,127 @@ class Database(_database.Database):
         field in file, and the count of items added is yielded every
         commit_limit items.
 
+        The files in index_directory may be in text or binary format: the
+        format of each file is decided from it's header by merge.Merge.
+
+        Cached RecordLists and position checkpoint summaries are discarded
+        whenever the index may have changed, to be rebuilt when next used,
+        because the merge writers do not maintain them.
+
         """
-        writer = self.merge_writer(file, field)
         merger = merge.Merge(index_directory)
-        commit_count = None
         try:
-            for commit_count, item in enumerate(merger.sorter()):
-                if not commit_count % commit_limit:
-                    if commit_count:
-                        writer.close_cursor()
-                        self.commit()
-                        self.deferred_update_housekeeping()
-                        yield commit_count
-                        self.start_transaction()
-                        writer.make_new_cursor()
-                writer.write(item)
-            writer.close_cursor()
+            yield from self._merge_import_items(
+                merger.sorter(), file, field, commit_limit
+            )
         finally:
             # An exception may leave some reader files open.
             # A 'ResourceWarning: unclosed file <io.TextIOWrapper ...>'
             # message in *_merge_import tests revealed this.
             for reader in merger.readers.values():
                 reader.file.close()
+
+    def _merge_import_items(self, items, file, field, commit_limit):
+        """Yield count of sorted items written to an index at intervals.
+
+        The sorted items are written to index field in file, and the count
+        of items added is yielded every commit_limit items.
+
+        """
+        self.clear_recordlist_cache()
+        self.clear_position_checkpoints()
+        writer = self.merge_writer(file, field)
+        commit_count = None
+        for commit_count, item in enumerate(items):
+            if not commit_count % commit_limit:
+                if commit_count:
+                    writer.close_cursor()
+                    self.commit()
+                    self.deferred_update_housekeeping()
+                    self.clear_recordlist_cache()
+                    self.clear_position_checkpoints()
+                    yield commit_count
+                    self.start_transaction()
+                    writer.make_new_cursor()
+            writer.write(item)
+        writer.close_cursor()
         if commit_count is not None:
             self.commit()
             self.deferred_update_housekeeping()
+            self.clear_recordlist_cache()
+            self.clear_position_checkpoints()
             self.start_transaction()
 
+    def merge_import_parallel(
+        self, index_directories, file, commit_limit, max_workers=None
+    ):
+        """Yield count of sorted items written to indicies at intervals.
+
+        index_directories maps field names in file to the index_directory
+        argument for merge_import.
+
+        The files in each index_directory are merged by merge.put_merged_items
+        in a pool of worker processes, so several indicies are merged at
+        once.  The workers put the sorted items on bounded queues, one per
+        index_directory, and this process is the only writer: the items are
+        written to the database, in the order given by index_directories, as
+        they are taken from the queues.  Nothing is written to disk by the
+        workers.
+
+        The counts yielded are those yielded by merge_import for each field.
+
+        """
+        queues = {
+            directory: multiprocessing.Queue(maxsize=_MERGED_ITEMS_QUEUE_SIZE)
+            for directory in index_directories.values()
+        }
+        stop = multiprocessing.Event()
+
+        # Directories whose queue may have items, or the final None, not
+        # yet taken by merged_items.
+        unfinished = set(index_directories.values())
+
+        def merged_items(directory, future):
+            queue = queues[directory]
+            while True:
+                batch = queue.get()
+                if batch is None:
+                    break
+                yield from batch
+            unfinished.discard(directory)
+
+            # Raise any exception from put_merged_items.
+            future.result()
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=merge.set_merged_item_queues,
+            initargs=(queues, stop),
+        ) as executor:
+            futures = {
+                field: executor.submit(merge.put_merged_items, directory)
+                for field, directory in index_directories.items()
+            }
+            try:
+                for field, directory in index_directories.items():
+                    yield from self._merge_import_items(
+                        merged_items(directory, futures[field]),
+                        file,
+                        field,
+                        commit_limit,
+                    )
+            finally:
+                # Workers blocked on a full queue must be allowed to put the
+                # final None, and exit, before the pool can shut down.
+                stop.set()
+                for field, directory in index_directories.items():
+                    if futures[field].cancel():
+                        continue
+                    if directory in unfinished:
+                        queue = queues[directory]
+                        while queue.get() is not None:
+                            pass
+
     def get_merge_import_sort_area(self):
         """Return database directory.
 
@@ -38,13 +38,19 @@ from .constants import (
     APPLICATION_CONTROL_KEY,
     SEGMENT_SIZE_BYTES_KEY,
     SEGMENT_HEADER_LENGTH,
+    INDEX_RECORD_COUNT_PREFIX,
+    INDEX_KEY_COUNT_SUFFIX,
     FIELDS,
     ACCESS_METHOD,
     HASH,
+    BULK_LOAD,
+    INTERACTIVE,
+    READ_MOSTLY,
 )
 from . import _database
 from .bytebit import Bitarray, SINGLEBIT
 from .segmentsize import SegmentSize
+from .recordlistcache import KEY_EQ, KEY_STARTSWITH, KEY_RANGE
 
 # Some names are imported '* as _*' to avoid confusion with sensible
 # object names within the _db module.
@@ -56,6 +62,7 @@ from .recordset import (
     RecordsetSegmentBitarray,
     RecordsetSegmentInt,
     RecordsetSegmentList,
+    RecordsetSegmentRun,
     RecordList,
     FoundSet,
 )
@@ -64,6 +71,32 @@ from .recordset import (
 _openbsd_platform = sys.platform.startswith("openbsd")
 del sys
 
+# The cache size and log buffer size, in bytes, set for each tuning profile,
+# with None and 0 for the Berkeley DB defaults.  The sizes take effect when
+# the environment is opened.  The 'gbytes' and 'bytes' items in the
+# environment argument of Database take precedence over the cache size.
+TUNING_CACHE_SIZES = {
+    None: 0,
+    BULK_LOAD: 268435456,
+    INTERACTIVE: 33554432,
+    READ_MOSTLY: 134217728,
+}
+TUNING_LOG_BUFFER_SIZES = {
+    None: 0,
+    BULK_LOAD: 8388608,
+    INTERACTIVE: 0,
+    READ_MOSTLY: 0,
+}
+
+# The name of the environment flag which relaxes synchronization of the log
+# on transaction commit for each tuning profile, or None.
+TUNING_TXN_NOSYNC_FLAGS = {
+    None: None,
+    BULK_LOAD: "DB_TXN_NOSYNC",
+    INTERACTIVE: "DB_TXN_WRITE_NOSYNC",
+    READ_MOSTLY: None,
+}
+
 
 class DatabaseError(_database.DatabaseError):
     """Exception for Database class."""
@@ -127,6 +160,9 @@ class Database(_database.Database):
         self.segment_table = {}
         self.ebm_control = {}
 
+        # IndexRecordCount instances for each (file, field).
+        self.index_record_count = {}
+
         # Set to value read from database on attempting to open database if
         # different from segment_size_bytes.
         self._real_segment_size_bytes = False
@@ -154,11 +190,21 @@ class Database(_database.Database):
 
     def start_transaction(self):
         """Start transaction if none and bind txn object to self._dbtxn."""
+        self.start_existence_cache()
         if self.dbtxn is None:
             self.dbtxn = self.dbenv.txn_begin()
+        self.start_ebm_caches()
+        for irc in self.index_record_count.values():
+            irc.start_cache()
 
     def backout(self):
         """Abort the active transaction and remove binding to txn object."""
+        self.clear_recordlist_cache()
+        self.discard_existence_cache()
+        self.clear_position_checkpoints()
+        self.discard_ebm_caches()
+        for irc in self.index_record_count.values():
+            irc.discard_cache()
         if self.dbtxn is not None:
             self.dbtxn.abort()
             self.dbtxn = None
@@ -166,7 +212,13 @@ class Database(_database.Database):
 
     def commit(self):
         """Commit the active transaction and remove binding to txn object."""
+        self.discard_existence_cache()
         if self.dbtxn is not None:
+            self.flush_ebm_caches(self.dbtxn)
+            self.discard_ebm_caches()
+            for irc in self.index_record_count.values():
+                irc.flush_cache()
+                irc.discard_cache()
             self.dbtxn.commit()
             self.dbtxn = None
             self.dbenv.txn_checkpoint(self._MINIMUM_CHECKPOINT_INTERVAL)
@@ -318,6 +370,14 @@ class Database(_database.Database):
                 raise
         if gbytes or bytes_:
             self.dbenv.set_cachesize(gbytes, bytes_)
+        elif TUNING_CACHE_SIZES[self.tuning_profile]:
+            self.dbenv.set_cachesize(
+                *divmod(TUNING_CACHE_SIZES[self.tuning_profile], 1024**3)
+            )
+        if TUNING_LOG_BUFFER_SIZES[self.tuning_profile]:
+            self.dbenv.set_lg_bsize(
+                TUNING_LOG_BUFFER_SIZES[self.tuning_profile]
+            )
         if self.home_directory is not None:
             logdir = os.path.join(
                 self.home_directory,
@@ -496,6 +556,13 @@ class Database(_database.Database):
                     self.table[secondary] = None
                     self.dbenv.close()
                     raise
+                try:
+                    self.index_record_count[file, field] = IndexRecordCount(
+                        file, field, self, dbe
+                    )
+                except:
+                    self.dbenv.close()
+                    raise
         if db_create:  # and files:
             self.table[CONTROL_FILE].put(
                 SPECIFICATION_KEY,
@@ -510,8 +577,33 @@ class Database(_database.Database):
             self.table[CONTROL_FILE].put(
                 APPLICATION_CONTROL_KEY, repr({}).encode(), txn=self.dbtxn
             )
+
+        # Databases created before record counts were kept get them from the
+        # index when opened.
+        for irc in self.index_record_count.values():
+            if not irc.counts_exist():
+                irc.create_counts()
         self.commit()
         self._dbe = dbe
+        if self.tuning_profile is not None:
+            self.apply_tuning_profile()
+
+    def apply_tuning_profile(self):
+        """Override, set log synchronization if environment is open.
+
+        The cache and log buffer sizes for the tuning profile are set when
+        the environment is next opened.
+
+        The log is flushed, so restoring a profile which synchronizes the
+        log on commit after one which does not is safe.
+
+        """
+        if self.dbenv is None or self._dbe is None:
+            return
+        nosync = TUNING_TXN_NOSYNC_FLAGS[self.tuning_profile]
+        for flag in ("DB_TXN_NOSYNC", "DB_TXN_WRITE_NOSYNC"):
+            self.dbenv.set_flags(getattr(self._dbe, flag), flag == nosync)
+        self.dbenv.log_flush()
 
     def environment_flags(self, dbe):
         """Return environment flags for transaction update."""
@@ -544,6 +636,9 @@ class Database(_database.Database):
         all the DB objects were created in the context of the DBEnv object.
 
         """
+        self.clear_recordlist_cache()
+        self.discard_existence_cache()
+        self.clear_position_checkpoints()
         del files
         self._dbe = None
         for file, specification in self.specification.items():
@@ -568,6 +663,9 @@ class Database(_database.Database):
                     except AttributeError:
                         pass
                     self.table[secondary] = None
+                if (file, field) in self.index_record_count:
+                    self.index_record_count[file, field].close()
+                    del self.index_record_count[file, field]
         for k, dbo in self.table.items():
             if dbo is not None:
                 dbo.close()
@@ -579,6 +677,7 @@ class Database(_database.Database):
             self.table = {}
             self.segment_table = {}
             self.ebm_control = {}
+            self.index_record_count = {}
         self.segment_size_bytes = self._initial_segment_size_bytes
 
     def close_database(self):
@@ -630,6 +729,25 @@ class Database(_database.Database):
             return None
         return key, record.decode()
 
+    def get_primary_records(self, file, keys):
+        """Return list of (key, value) for records in file with keys.
+
+        One cursor walks the table in ascending key order, keys is in
+        ascending order, rather than a get() per record.
+
+        """
+        assert file in self.specification
+        records = []
+        cursor = self.table[file].cursor(txn=self.dbtxn)
+        try:
+            for key in keys:
+                record = cursor.set(key)
+                if record is not None:
+                    records.append((key, record[1].decode()))
+        finally:
+            cursor.close()
+        return records
+
     def encode_record_number(self, key):
         """Return repr(key).encode() because this is bsddb(3) version.
 
@@ -682,7 +800,9 @@ class Database(_database.Database):
             if segment_number == ebmc.segment_count - 1:
                 return None
 
-            lfrns = ebmc.read_exists_segment(segment_number, self.dbtxn)
+            lfrns = ebmc.get_cached_ebm(segment_number)
+            if lfrns is None:
+                lfrns = ebmc.read_exists_segment(segment_number, self.dbtxn)
             if lfrns is None:
                 # Segment does not exist now.
                 ebmc.freed_record_number_pages.remove(segment_number)
@@ -771,18 +891,21 @@ class Database(_database.Database):
         deletekey is split into segment number and record number within
         segment to form the returned value.
         """
+        self.invalidate_existence_cache(file)
         segment, record_number = divmod(deletekey, SegmentSize.db_segment_size)
-        ebmb = self.ebm_control[file].ebm_table.get(
-            segment + 1, txn=self.dbtxn
-        )
-        if ebmb is None:
-            raise DatabaseError("Existence bit map for segment does not exist")
-        ebm = Bitarray()
-        ebm.frombytes(ebmb)
+        ebmc = self.ebm_control[file]
+        ebm = ebmc.get_cached_ebm(segment)
+        if ebm is None:
+            ebmb = ebmc.ebm_table.get(segment + 1, txn=self.dbtxn)
+            if ebmb is None:
+                raise DatabaseError(
+                    "Existence bit map for segment does not exist"
+                )
+            ebm = Bitarray()
+            ebm.frombytes(ebmb)
         ebm[record_number] = False
-        self.ebm_control[file].ebm_table.put(
-            segment + 1, ebm.tobytes(), txn=self.dbtxn
-        )
+        if not ebmc.cache_ebm(segment, ebm):
+            ebmc.write_ebm_segment(segment, ebm, self.dbtxn)
         return segment, record_number
 
     def add_record_to_ebm(self, file, putkey):
@@ -791,19 +914,22 @@ class Database(_database.Database):
         putkey is split into segment number and record number within
         segment to form the returned value.
         """
+        self.invalidate_existence_cache(file)
         segment, record_number = divmod(putkey, SegmentSize.db_segment_size)
-        ebmb = self.ebm_control[file].ebm_table.get(
-            segment + 1, txn=self.dbtxn
-        )
-        if ebmb is None:
-            ebm = SegmentSize.empty_bitarray.copy()
-        else:
+        ebmc = self.ebm_control[file]
+        ebm = ebmc.get_cached_ebm(segment)
+        if ebm is None:
+            ebmb = ebmc.ebm_table.get(segment + 1, txn=self.dbtxn)
+            if ebmb is None:
+                ebm = SegmentSize.empty_bitarray.copy()
+                ebm[record_number] = True
+                ebmc.write_ebm_segment(segment, ebm, self.dbtxn)
+                return segment, record_number
             ebm = Bitarray()
             ebm.frombytes(ebmb)
         ebm[record_number] = True
-        self.ebm_control[file].ebm_table.put(
-            segment + 1, ebm.tobytes(), txn=self.dbtxn
-        )
+        if not ebmc.cache_ebm(segment, ebm):
+            ebmc.write_ebm_segment(segment, ebm, self.dbtxn)
         return segment, record_number
 
     def get_high_record_number(self, file):
@@ -821,6 +947,10 @@ class Database(_database.Database):
         segment_record = self.segment_table[file].get(
             reference, txn=self.dbtxn
         )
+        if len(segment_record) % 2:
+            return RecordsetSegmentRun(
+                0, None, records=segment_record
+            ).promote().bitarray
         if len(segment_record) < SegmentSize.db_segment_size_bytes:
             return [
                 int.from_bytes(segment_record[i : i + 2], byteorder="big")
@@ -843,6 +973,9 @@ class Database(_database.Database):
         limit.
         """
         key = self.encode_record_selector(key)
+        self.invalidate_recordlist_cache(file, field, key)
+        self.invalidate_position_checkpoints(file, field, key)
+        index_record_count = self.index_record_count[file, field]
         secondary = SUBFILE_DELIMITER.join((file, field))
         cursor = self.table[secondary].cursor(txn=self.dbtxn)
         try:
@@ -861,6 +994,7 @@ class Database(_database.Database):
                         ),
                         self._dbe.DB_KEYLAST,
                     )
+                    index_record_count.change_count(key, 1)
                     return
 
                 segment_number = int.from_bytes(value[:4], byteorder="big")
@@ -879,6 +1013,7 @@ class Database(_database.Database):
                         ),
                         self._dbe.DB_KEYLAST,
                     )
+                    index_record_count.change_count(key, 1)
                     return
 
                 if len(value) == SEGMENT_HEADER_LENGTH:
@@ -886,6 +1021,7 @@ class Database(_database.Database):
                         value[4:], byteorder="big"
                     )
                     if existing_record_number != record_number:
+                        index_record_count.change_count(key, 1)
                         segment_key = self.segment_table[file].append(
                             b"".join(
                                 sorted(
@@ -919,12 +1055,14 @@ class Database(_database.Database):
                 )
                 recnums = self._get_segment_record_numbers(file, segment_key)
                 if isinstance(recnums, list):
+                    count = len(recnums)
                     i = bisect.bisect_left(recnums, record_number)
                     if i < len(recnums):
                         if recnums[i] != record_number:
                             recnums.insert(i, record_number)
                     else:
                         recnums.append(record_number)
+                    index_record_count.change_count(key, len(recnums) - count)
                     count = len(recnums)
                     if count > SegmentSize.db_upper_conversion_limit:
                         seg = SegmentSize.empty_bitarray.copy()
@@ -970,7 +1108,8 @@ class Database(_database.Database):
                         )
                     return
 
-                # ignore possibility record_number already present
+                if not recnums[record_number]:
+                    index_record_count.change_count(key, 1)
                 recnums[record_number] = True
                 self.segment_table[file].put(
                     segment_key, recnums.tobytes(), txn=self.dbtxn
@@ -1000,6 +1139,7 @@ class Database(_database.Database):
                 ),
                 self._dbe.DB_KEYLAST,
             )
+            index_record_count.change_count(key, 1)
 
         finally:
             cursor.close()
@@ -1016,6 +1156,9 @@ class Database(_database.Database):
         the number of records in the set below the relevant limit.
         """
         key = self.encode_record_selector(key)
+        self.invalidate_recordlist_cache(file, field, key)
+        self.invalidate_position_checkpoints(file, field, key)
+        index_record_count = self.index_record_count[file, field]
         secondary = SUBFILE_DELIMITER.join((file, field))
         cursor = self.table[secondary].cursor(txn=self.dbtxn)
         try:
@@ -1041,6 +1184,7 @@ class Database(_database.Database):
                         value[4:], byteorder="big"
                     ):
                         cursor.delete()
+                        index_record_count.change_count(key, -1)
                     return
                 segment_key = int.from_bytes(
                     value[SEGMENT_HEADER_LENGTH:], byteorder="big"
@@ -1053,6 +1197,7 @@ class Database(_database.Database):
                         and recnums[discard] == record_number
                     ):
                         del recnums[discard]
+                        index_record_count.change_count(key, -1)
                     count = len(recnums)
                     if count < 2:
                         for i in recnums:
@@ -1093,7 +1238,8 @@ class Database(_database.Database):
                         )
                     return
 
-                # ignore possibility record_number already absent
+                if recnums[record_number]:
+                    index_record_count.change_count(key, -1)
                 recnums[record_number] = False
 
                 count = recnums.count()
@@ -1170,6 +1316,12 @@ class Database(_database.Database):
                 None,
                 records=segment_record,
             )
+        if len(segment_record) % 2:
+            return RecordsetSegmentRun(
+                int.from_bytes(segment_reference[:4], byteorder="big"),
+                None,
+                records=segment_record,
+            )
         return RecordsetSegmentList(
             int.from_bytes(segment_reference[:4], byteorder="big"),
             None,
@@ -1384,6 +1536,7 @@ class Database(_database.Database):
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         if key is None:
             return recordlist
+        self.ebm_control[file].flush_ebm_cache(self.dbtxn)
         segment_number, record_number = divmod(
             key, SegmentSize.db_segment_size
         )
@@ -1410,6 +1563,7 @@ class Database(_database.Database):
         """
         # The keys in self.ebm_control[file].ebm_table are always
         # 'segment + 1', see note in recordlist_ebm method.
+        self.ebm_control[file].flush_ebm_cache(self.dbtxn)
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         if keystart is None:
             segment_start, recnum_start = 0, 1
@@ -1479,6 +1633,10 @@ class Database(_database.Database):
 
     def recordlist_ebm(self, file, cache_size=1):
         """Return RecordList containing records on file."""
+        recordlist = self.get_cached_existence(file, cache_size=cache_size)
+        if recordlist is not None:
+            return recordlist
+        self.ebm_control[file].flush_ebm_cache(self.dbtxn)
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         cursor = self.ebm_control[file].ebm_table.cursor(txn=self.dbtxn)
         try:
@@ -1496,16 +1654,20 @@ class Database(_database.Database):
 
         finally:
             cursor.close()
-        return recordlist
+        return self.cache_existence(file, recordlist, cache_size=cache_size)
 
-    def populate_recordset_segment(self, recordset, reference):
+    def populate_recordset_segment(self, recordset, reference, within=None):
         """Populate recordset with segment in reference.
 
         The segement from reference is added to an existing segment in
         recordset if there is one, or becomes recordset's segment for
         that segment number if not.
+
+        The segment is ignored if it has no records in within, if given.
         """
         segment_number = int.from_bytes(reference[:4], byteorder="big")
+        if within is not None and segment_number not in within:
+            return
         if len(reference) == SEGMENT_HEADER_LENGTH:
             segment = RecordsetSegmentInt(
                 segment_number, None, records=reference[4:]
@@ -1521,6 +1683,10 @@ class Database(_database.Database):
                 segment = RecordsetSegmentBitarray(
                     segment_number, None, records=segment_record
                 )
+            elif len(segment_record) % 2:
+                segment = RecordsetSegmentRun(
+                    segment_number, None, records=segment_record
+                )
             else:
                 segment = RecordsetSegmentList(
                     segment_number, None, records=segment_record
@@ -1553,8 +1719,18 @@ class Database(_database.Database):
             cursor.close()
         return recordlist
 
-    def recordlist_key(self, file, field, key=None, cache_size=1):
-        """Return RecordList on file containing records for field with key."""
+    def recordlist_key(self, file, field, key=None, cache_size=1, within=None):
+        """Return RecordList on file containing records for field with key.
+
+        Records in segments with no records in within, if given, may be
+        omitted.
+
+        """
+        recordlist = self.get_cached_recordlist(
+            file, field, (KEY_EQ, key), cache_size=cache_size
+        )
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         cursor = self.table[SUBFILE_DELIMITER.join((file, field))].cursor(
             txn=self.dbtxn
@@ -1565,11 +1741,17 @@ class Database(_database.Database):
                 record_key, value = record
                 if record_key != key:
                     break
-                self.populate_recordset_segment(recordlist, value)
+                self.populate_recordset_segment(
+                    recordlist, value, within=within
+                )
                 record = cursor.next()
         finally:
             cursor.close()
-        return recordlist
+        if within is not None:
+            return recordlist
+        return self.cache_recordlist(
+            file, field, (KEY_EQ, key), recordlist, cache_size=cache_size
+        )
 
     def recordlist_key_startswith(
         self, file, field, keystart=None, cache_size=1
@@ -1578,6 +1760,11 @@ class Database(_database.Database):
 
         The records are indexed by keys starting keystart.
         """
+        recordlist = self.get_cached_recordlist(
+            file, field, (KEY_STARTSWITH, keystart), cache_size=cache_size
+        )
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         if keystart is None:
             return recordlist
@@ -1593,19 +1780,42 @@ class Database(_database.Database):
                 record = cursor.next()
         finally:
             cursor.close()
-        return recordlist
+        return self.cache_recordlist(
+            file,
+            field,
+            (KEY_STARTSWITH, keystart),
+            recordlist,
+            cache_size=cache_size,
+        )
 
     def recordlist_key_range(
-        self, file, field, ge=None, gt=None, le=None, lt=None, cache_size=1
+        self,
+        file,
+        field,
+        ge=None,
+        gt=None,
+        le=None,
+        lt=None,
+        cache_size=1,
+        within=None,
     ):
         """Return RecordList containing records for field on file.
 
         Keys are in range set by combinations of ge, gt, le, and lt.
+
+        Records in segments with no records in within, if given, may be
+        omitted.
+
         """
         if isinstance(ge, bytes) and isinstance(gt, bytes):
             raise DatabaseError("Both 'ge' and 'gt' given in key range")
         if isinstance(le, bytes) and isinstance(lt, bytes):
             raise DatabaseError("Both 'le' and 'lt' given in key range")
+        recordlist = self.get_cached_recordlist(
+            file, field, (KEY_RANGE, ge, gt, le, lt), cache_size=cache_size
+        )
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         cursor = self.table[SUBFILE_DELIMITER.join((file, field))].cursor(
             txn=self.dbtxn
@@ -1622,23 +1832,85 @@ class Database(_database.Database):
                     record = cursor.next()
             if le is None and lt is None:
                 while record:
-                    self.populate_recordset_segment(recordlist, record[1])
+                    self.populate_recordset_segment(
+                        recordlist, record[1], within=within
+                    )
                     record = cursor.next()
             elif lt is None:
                 while record:
                     if record[0] > le:
                         break
-                    self.populate_recordset_segment(recordlist, record[1])
+                    self.populate_recordset_segment(
+                        recordlist, record[1], within=within
+                    )
                     record = cursor.next()
             else:
                 while record:
                     if record[0] >= lt:
                         break
-                    self.populate_recordset_segment(recordlist, record[1])
+                    self.populate_recordset_segment(
+                        recordlist, record[1], within=within
+                    )
                     record = cursor.next()
         finally:
             cursor.close()
-        return recordlist
+        if within is not None:
+            return recordlist
+        return self.cache_recordlist(
+            file,
+            field,
+            (KEY_RANGE, ge, gt, le, lt),
+            recordlist,
+            cache_size=cache_size,
+        )
+
+    def estimate_recordlist_key(self, file, field, key=None):
+        """Return number of records recordlist_key would find for key.
+
+        The record counts in the segment references are summed: segments
+        are not read.
+
+        """
+        if key is None:
+            return 0
+        return self.estimate_recordlist_key_range(file, field, ge=key, le=key)
+
+    def estimate_recordlist_key_range(
+        self, file, field, ge=None, gt=None, le=None, lt=None
+    ):
+        """Return upper bound of records recordlist_key_range would find.
+
+        The record counts in the segment references for keys in range are
+        summed, so records with more than one key in range are counted for
+        each key.  Segments are not read.
+
+        """
+        count = 0
+        cursor = self.table[SUBFILE_DELIMITER.join((file, field))].cursor(
+            txn=self.dbtxn
+        )
+        try:
+            if ge is None and gt is None:
+                record = cursor.first()
+            else:
+                record = cursor.set_range(ge or gt or b"")
+            while record:
+                key, reference = record
+                if le is not None and key > le:
+                    break
+                if lt is not None and key >= lt:
+                    break
+                if gt is None or key > gt:
+                    if len(reference) > SEGMENT_HEADER_LENGTH:
+                        count += int.from_bytes(
+                            reference[4:SEGMENT_HEADER_LENGTH], byteorder="big"
+                        )
+                    else:
+                        count += 1
+                record = cursor.next()
+        finally:
+            cursor.close()
+        return count
 
     def recordlist_all(self, file, field, cache_size=1):
         """Return RecordList on file containing records for field."""
@@ -1666,6 +1938,9 @@ class Database(_database.Database):
         is deleted.
 
         """
+        self.invalidate_recordlist_cache(file, field, key)
+        self.invalidate_position_checkpoints(file, field, key)
+        count = 0
         cursor = self.table[SUBFILE_DELIMITER.join((file, field))].cursor(
             txn=self.dbtxn
         )
@@ -1683,6 +1958,11 @@ class Database(_database.Database):
                         ),
                         txn=self.dbtxn,
                     )
+                    count += int.from_bytes(
+                        value[4:SEGMENT_HEADER_LENGTH], byteorder="big"
+                    )
+                else:
+                    count += 1
 
                 # Delete segment references.
                 # cursor.delete()
@@ -1698,6 +1978,7 @@ class Database(_database.Database):
 
         finally:
             cursor.close()
+        self.index_record_count[file, field].change_count(key, -count)
 
         # Delete segment references.
         # The commented delete methods, cursor and database, within preceding
@@ -1723,17 +2004,23 @@ class Database(_database.Database):
 
     def file_records_under(self, file, field, recordset, key):
         """Replace records for index field[key] with recordset records."""
+        self.invalidate_recordlist_cache(file, field, key)
+        self.invalidate_position_checkpoints(file, field, key)
         assert recordset.dbset == file
         assert file in self.table
 
         # Delete existing segments for key
         self.unfile_records_under(file, field, key)
 
+        recordset.normalize()
+        self.index_record_count[file, field].change_count(
+            key, recordset.count_records()
+        )
+
         cursor = self.table[SUBFILE_DELIMITER.join((file, field))].cursor(
             txn=self.dbtxn
         )
         try:
-            recordset.normalize()
             for segment_number in recordset.sorted_segnums:
                 if isinstance(
                     recordset.rs_segments[segment_number], RecordsetSegmentInt
@@ -1789,6 +2076,7 @@ class Database(_database.Database):
                 keyrange=keyrange,
                 transaction=self.dbtxn,
                 ebm=self.ebm_control[file].ebm_table,
+                ebm_control=self.ebm_control[file],
                 engine=self._dbe,
             )
         return CursorSecondary(
@@ -1796,6 +2084,8 @@ class Database(_database.Database):
             keyrange=keyrange,
             transaction=self.dbtxn,
             segment=self.segment_table[file],
+            checkpoints=self.get_position_checkpoints(file, field),
+            index_record_count=self.index_record_count[file, field],
         )
 
     def create_recordset_cursor(self, recordset):
@@ -1968,11 +2258,19 @@ class CursorPrimary(Cursor):
 
     """
 
-    def __init__(self, dbset, ebm=None, engine=None, **kargs):
+    def __init__(
+        self, dbset, ebm=None, engine=None, *, ebm_control=None, **kargs
+    ):
         """Extend, note existence bitmap table and engine."""
         super().__init__(dbset, **kargs)
         self._ebm = ebm
         self._engine = engine
+        self._ebm_control = ebm_control
+
+    def _flush_ebm_cache(self):
+        """Write changed existence bitmap segments before reading them."""
+        if self._ebm_control is not None:
+            self._ebm_control.flush_ebm_cache(self._transaction)
 
     def count_records(self):
         """Return record count."""
@@ -1989,6 +2287,7 @@ class CursorPrimary(Cursor):
         # record keys are 1-based but segment_numbers are 0-based.
         if record is None:
             return 0
+        self._flush_ebm_cache()
         segment_number, record_number = divmod(
             record[0], SegmentSize.db_segment_size
         )
@@ -2017,6 +2316,7 @@ class CursorPrimary(Cursor):
         """Return record for positionth record in file or None."""
         if not position:  # Include position 0 in this case.
             return None
+        self._flush_ebm_cache()
         count = 0
         abspos = abs(position)
         ebm_cursor = self._ebm.cursor(txn=self._transaction)
@@ -2113,18 +2413,37 @@ class CursorSecondary(Cursor):
 
     dbset - bsddb3 DB() object.
     segment - bsddb3 DB() object for segment, list of record numbers or bitmap.
+    checkpoints - positioncheckpoints.IndexCheckpoints instance or None.
+    index_record_count - IndexRecordCount instance or None.
     kargs - superclass arguments and absorb arguments for other engines.
 
     """
 
-    def __init__(self, dbset, segment=None, **kargs):
+    def __init__(
+        self,
+        dbset,
+        segment=None,
+        *,
+        checkpoints=None,
+        index_record_count=None,
+        **kargs
+    ):
         """Extend, note segment table name."""
         super().__init__(dbset, **kargs)
         self._segment = segment
+        self._checkpoints = checkpoints
+        self._index_record_count = index_record_count
 
     def count_records(self):
-        """Return record count."""
+        """Return record count.
+
+        The record counts maintained by index_record_count are used if
+        given, otherwise the record counts in the index are summed.
+
+        """
         if self.get_partial() in (None, False):
+            if self._index_record_count is not None:
+                return self._index_record_count.count_records()
             count = 0
             record = self._cursor.first()
             while record:
@@ -2134,6 +2453,10 @@ class CursorSecondary(Cursor):
                     count += 1
                 record = self._cursor.next()
             return count
+        if self._index_record_count is not None:
+            return self._index_record_count.count_records(
+                self.get_converted_partial()
+            )
         count = 0
         record = self._cursor.set_range(
             self.get_converted_partial_with_wildcard()
@@ -2176,6 +2499,8 @@ class CursorSecondary(Cursor):
             int.from_bytes(reference[SEGMENT_HEADER_LENGTH:], byteorder="big"),
             txn=self._transaction,
         )
+        if len(records) % 2:
+            return RecordsetSegmentRun(segment_number, key, records=records)
         if len(records) < SegmentSize.db_segment_size_bytes:
             return RecordsetSegmentList(segment_number, key, records=records)
         return RecordsetSegmentBitarray(segment_number, key, records=records)
@@ -2204,10 +2529,21 @@ class CursorSecondary(Cursor):
             def high(jkey, partial):
                 return not jkey.startswith(partial)
 
-        # Get position of record relative to start point.
+        # Get position of record relative to start point, which is the
+        # nearest checkpoint before key if there are checkpoints.
         position = 0
         if not self.get_partial():
-            j = self._cursor.first()
+            if self._checkpoints is None:
+                checkpoint = None
+            else:
+                self._checkpoints.refresh(self._key_counts)
+                checkpoint, position = self._checkpoints.locate_key(
+                    key.encode()
+                )
+            if checkpoint is None:
+                j = self._cursor.first()
+            else:
+                j = self._cursor.set_range(checkpoint)
         else:
             j = self._cursor.set_range(
                 self.get_converted_partial_with_wildcard()
@@ -2241,6 +2577,8 @@ class CursorSecondary(Cursor):
         """Return record for positionth record in file or None."""
         if position is None:
             return None
+        if not self.get_partial() and self._checkpoints is not None:
+            return self._get_record_at_position_from_checkpoint(position)
 
         # Start at first or last record whichever is likely closer to position
         # and define functions to handle presence or absence of partial key.
@@ -2315,6 +2653,70 @@ class CursorSecondary(Cursor):
                 break
         return None
 
+    def _get_record_at_position_from_checkpoint(self, position):
+        """Return record for positionth record in file or None.
+
+        The index is scanned from the nearest checkpoint before position.
+
+        """
+        checkpoints = self._checkpoints
+        checkpoints.refresh(self._key_counts)
+        if position < 0:
+            position += checkpoints.record_count()
+            if position < 0:
+                return None
+        checkpoint, count = checkpoints.locate_position(position)
+        if checkpoint is None:
+            record = self._cursor.first()
+        else:
+            record = self._cursor.set_range(checkpoint)
+        while record:
+            if len(record[1]) > SEGMENT_HEADER_LENGTH:
+                offset = int.from_bytes(record[1][4:6], byteorder="big")
+            else:
+                offset = 1
+            count += offset
+            if count <= position:
+                record = self._cursor.next()
+                continue
+            record_number = self._get_segment(
+                record[0],
+                int.from_bytes(record[1][:4], byteorder="big"),
+                record[1],
+            ).get_record_number_at_position(position - count + offset)
+            if record_number is not None:
+                return record[0].decode(), record_number
+            break
+        return None
+
+    def _key_counts(self, low, high):
+        """Yield (key, record count) for keys from low up to high.
+
+        low and high are not applied if None, and high is excluded.
+
+        """
+        if low is None:
+            record = self._cursor.first()
+        else:
+            record = self._cursor.set_range(low)
+        key = None
+        count = 0
+        while record:
+            if high is not None and record[0] >= high:
+                break
+            if record[0] != key:
+                if key is not None:
+                    yield key, count
+                key = record[0]
+                count = 0
+            if len(record[1]) > SEGMENT_HEADER_LENGTH:
+                count += int.from_bytes(record[1][4:6], byteorder="big")
+            else:
+                count += 1
+            record = self._cursor.next()
+        if key is not None:
+            yield key, count
+
     def last(self):
         """Return last record taking partial key into account."""
         if self.get_partial() is None:
@@ -2642,8 +3044,206 @@ class ExistenceBitmapControl(_database.ExistenceBitmapControl):
         ebm.frombytes(self.ebm_table.get(segment_number + 1, txn=dbtxn))
         return ebm
 
+    def write_ebm_segment(self, segment_number, ebm, dbtxn):
+        """Write existence bitmap ebm for segment_number in database dbtxn."""
+        # record keys are 1-based but segment_numbers are 0-based.
+        self.ebm_table.put(segment_number + 1, ebm.tobytes(), txn=dbtxn)
+
     def close(self):
         """Close the table."""
         if self.ebm_table is not None:
             self.ebm_table.close()
             self.ebm_table = None
+
+
+class IndexRecordCount:
+    """Maintain record counts for field index of file in database.
+
+    The record count for the index is kept in the control database, and
+    the record count for each key in the index is kept in a database with
+    one record per key.  Partial key counts are the sum of the counts for
+    the keys which start with the partial key.
+
+    Changes to the counts are held until flush_cache() is called once
+    start_cache() has been called, so a transaction writes each count once.
+    Otherwise changes are written immediately.
+
+    The dbe argument is needed to open the Berkeley DB database which holds
+    the record counts for each key.
+    """
+
+    def __init__(self, file, field, database, dbe):
+        """Open database for maintaining record counts for field in file."""
+        secondary = SUBFILE_DELIMITER.join((file, field))
+        self._database = database
+        self._dbe = dbe
+        self._index = database.table[secondary]
+        self._count_key = (INDEX_RECORD_COUNT_PREFIX + secondary).encode()
+
+        # The database is created if absent because databases created
+        # before record counts were kept do not have it.
+        self.key_count_table = dbe.DB(database.dbenv)
+        try:
+            dbname = SUBFILE_DELIMITER.join(
+                (secondary, INDEX_KEY_COUNT_SUFFIX)
+            )
+            self.key_count_table.open(
+                database.file_name_for_database(dbname),
+                dbname=dbname,
+                dbtype=dbe.DB_BTREE,
+                flags=dbe.DB_CREATE,
+                txn=database.dbtxn,
+            )
+        except:
+            self.key_count_table = None
+            raise
+
+        # Record count changes by key not yet written to the database.  None
+        # means changes are written immediately.
+        self.changes = None
+
+    def start_cache(self):
+        """Hold record count changes until flush_cache() is called."""
+        if self.changes is None:
+            self.changes = {}
+
+    def discard_cache(self):
+        """Forget record count changes and write later ones immediately."""
+        self.changes = None
+
+    def flush_cache(self):
+        """Write record count changes held to database."""
+        if self.changes:
+            changes = self.changes
+            self.changes = {}
+            self.write_changes(changes)
+
+    def change_count(self, key, change):
+        """Change record count for key by change."""
+        if not change:
+            return
+        changes = self.changes
+        if changes is None:
+            self.write_changes({key: change})
+        else:
+            changes[key] = changes.get(key, 0) + change
+
+    def write_changes(self, changes):
+        """Apply changes, a dict of record count changes by key, to database.
+
+        The record count for a key is deleted when it becomes zero.
+
+        """
+        changes = sorted(
+            (key, change) for key, change in changes.items() if change
+        )
+        if not changes:
+            return
+        dbtxn = self._database.dbtxn
+        for key, change in changes:
+            value = self.key_count_table.get(key, txn=dbtxn)
+            if value is not None:
+                change += int.from_bytes(value, byteorder="big")
+            if change > 0:
+                self.key_count_table.put(
+                    key,
+                    change.to_bytes(
+                        1 + change.bit_length() // 8, byteorder="big"
+                    ),
+                    txn=dbtxn,
+                )
+            elif value is not None:
+                self.key_count_table.delete(key, txn=dbtxn)
+        self._put_record_count(
+            self._get_record_count(dbtxn)
+            + sum(change for key, change in changes),
+            dbtxn,
+        )
+
+    def _get_record_count(self, dbtxn):
+        """Return record count for index, or None if there is no count."""
+        value = self._database.table[CONTROL_FILE].get(
+            self._count_key, txn=dbtxn
+        )
+        if value is None:
+            return None
+        return int.from_bytes(value, byteorder="big")
+
+    def _put_record_count(self, count, dbtxn):
+        """Replace the record count for index by count."""
+        control = self._database.table[CONTROL_FILE]
+        try:
+            control.delete(self._count_key, txn=dbtxn)
+        except self._dbe.DBNotFoundError:
+            pass
+        control.put(
+            self._count_key,
+            count.to_bytes(1 + count.bit_length() // 8, byteorder="big"),
+            txn=dbtxn,
+        )
+
+    def count_records(self, partial=None):
+        """Return record count for index or keys starting with partial."""
+        self.flush_cache()
+        dbtxn = self._database.dbtxn
+        if partial is None:
+            return self._get_record_count(dbtxn)
+        count = 0
+        cursor = self.key_count_table.cursor(txn=dbtxn)
+        try:
+            record = cursor.set_range(partial)
+            while record:
+                key, value = record
+                if not key.startswith(partial):
+                    break
+                count += int.from_bytes(value, byteorder="big")
+                record = cursor.next()
+        finally:
+            cursor.close()
+        return count
+
+    def counts_exist(self):
+        """Return True if the record count for the index exists."""
+        return self._get_record_count(self._database.dbtxn) is not None
+
+    def create_counts(self):
+        """Replace the record counts by those calculated from the index.
+
+        Record count changes held are discarded.
+
+        """
+        if self.changes is not None:
+            self.changes = {}
+        dbtxn = self._database.dbtxn
+        self.key_count_table.truncate(txn=dbtxn)
+        total = 0
+        counts = {}
+        cursor = self._index.cursor(txn=dbtxn)
+        try:
+            record = cursor.first()
+            while record:
+                key, value = record
+                if len(value) > SEGMENT_HEADER_LENGTH:
+                    count = int.from_bytes(
+                        value[4:SEGMENT_HEADER_LENGTH], byteorder="big"
+                    )
+                else:
+                    count = 1
+                counts[key] = counts.get(key, 0) + count
+                total += count
+                record = cursor.next()
+        finally:
+            cursor.close()
+        for key, count in counts.items():
+            self.key_count_table.put(
+                key,
+                count.to_bytes(1 + count.bit_length() // 8, byteorder="big"),
+                txn=dbtxn,
+            )
+        self._put_record_count(total, dbtxn)
+
+    def close(self):
+        """Close the table."""
+        if self.key_count_table is not None:
+            self.key_count_table.close()
+            self.key_count_table = None
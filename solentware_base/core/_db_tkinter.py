@@ -37,6 +37,8 @@ from .constants import (
     APPLICATION_CONTROL_KEY,
     SEGMENT_SIZE_BYTES_KEY,
     SEGMENT_HEADER_LENGTH,
+    INDEX_RECORD_COUNT_PREFIX,
+    INDEX_KEY_COUNT_SUFFIX,
     FIELDS,
     ACCESS_METHOD,
     HASH,
@@ -44,6 +46,7 @@ from .constants import (
 from . import _database
 from .bytebit import Bitarray, SINGLEBIT
 from .segmentsize import SegmentSize
+from .recordlistcache import KEY_EQ, KEY_STARTSWITH, KEY_RANGE
 
 # Some names are imported '* as _*' to avoid confusion with sensible
 # object names within the _db_tkinter module.
@@ -55,6 +58,7 @@ from .recordset import (
     RecordsetSegmentBitarray,
     RecordsetSegmentInt,
     RecordsetSegmentList,
+    RecordsetSegmentRun,
     RecordList,
     FoundSet,
 )
@@ -126,6 +130,9 @@ class Database(_database.Database):
         self.segment_table = {}
         self.ebm_control = {}
 
+        # IndexRecordCount instances for each (file, field).
+        self.index_record_count = {}
+
         # Set to value read from database on attempting to open database if
         # different from segment_size_bytes.
         self._real_segment_size_bytes = False
@@ -153,6 +160,7 @@ class Database(_database.Database):
 
     def start_transaction(self):
         """Start transaction if none and bind txn object to self._dbtxn."""
+        self.start_existence_cache()
         if self.dbtxn is None:
             # Raise an exception because the emulated _db module method does
             # this (AttributeError).  The _sqlite and _nosql module methods
@@ -161,9 +169,15 @@ class Database(_database.Database):
             if self.dbenv is None:
                 raise DatabaseError("No environment for start transaction")
             self.dbtxn = tcl_tk_call((self.dbenv, "txn"))
+        for irc in self.index_record_count.values():
+            irc.start_cache()
 
     def backout(self):
         """Abort the active transaction and remove binding to txn object."""
+        self.clear_recordlist_cache()
+        self.discard_existence_cache()
+        for irc in self.index_record_count.values():
+            irc.discard_cache()
         if self.dbtxn is not None:
             tcl_tk_call((self.dbtxn, "abort"))
             self.dbtxn = None
@@ -178,7 +192,11 @@ class Database(_database.Database):
 
     def commit(self):
         """Commit the active transaction and remove binding to txn object."""
+        self.discard_existence_cache()
         if self.dbtxn is not None:
+            for irc in self.index_record_count.values():
+                irc.flush_cache()
+                irc.discard_cache()
             tcl_tk_call((self.dbtxn, "commit"))
             self.dbtxn = None
             tcl_tk_call(
@@ -635,6 +653,13 @@ class Database(_database.Database):
                     self.table[secondary] = None
                     tcl_tk_call((self.dbenv, "close"))
                     raise
+                try:
+                    self.index_record_count[file, field] = IndexRecordCount(
+                        file, field, self
+                    )
+                except TclError:
+                    tcl_tk_call((self.dbenv, "close"))
+                    raise
         if db_create:  # and files:
             command = [self.table[CONTROL_FILE], "put"]
             if self.dbtxn:
@@ -658,6 +683,12 @@ class Database(_database.Database):
                 command.extend(["-txn", self.dbtxn])
             command.extend([APPLICATION_CONTROL_KEY, repr({}).encode()])
             tcl_tk_call(tuple(command))
+
+        # Databases created before record counts were kept get them from the
+        # index when opened.
+        for irc in self.index_record_count.values():
+            if not irc.counts_exist():
+                irc.create_counts()
         self.commit()
 
     def _run_db_archive(self):
@@ -712,6 +743,8 @@ class Database(_database.Database):
         all the DB objects were created in the context of the DBEnv object.
 
         """
+        self.clear_recordlist_cache()
+        self.discard_existence_cache()
         del files
         for file, specification in self.specification.items():
             if file in self.table:
@@ -738,6 +771,9 @@ class Database(_database.Database):
                     except AttributeError:
                         pass
                     self.table[secondary] = None
+                if (file, field) in self.index_record_count:
+                    self.index_record_count[file, field].close()
+                    del self.index_record_count[file, field]
         for k, dbo in self.table.items():
             if dbo is not None:
                 tcl_tk_call((dbo, "close"))
@@ -754,6 +790,7 @@ class Database(_database.Database):
             self.table = {}
             self.segment_table = {}
             self.ebm_control = {}
+            self.index_record_count = {}
         self.segment_size_bytes = self._initial_segment_size_bytes
 
     def close_database(self):
@@ -990,6 +1027,7 @@ class Database(_database.Database):
         deletekey is split into segment number and record number within
         segment to form the returned value.
         """
+        self.invalidate_existence_cache(file)
         segment, record_number = divmod(deletekey, SegmentSize.db_segment_size)
         command = [self.ebm_control[file].ebm_table, "get"]
         if self.dbtxn:
@@ -1014,6 +1052,7 @@ class Database(_database.Database):
         putkey is split into segment number and record number within
         segment to form the returned value.
         """
+        self.invalidate_existence_cache(file)
         segment, record_number = divmod(putkey, SegmentSize.db_segment_size)
         command = [self.ebm_control[file].ebm_table, "get"]
         if self.dbtxn:
@@ -1057,6 +1096,10 @@ class Database(_database.Database):
             segment_record = None
         else:
             segment_record = segment_record[0][1]
+        if len(segment_record) % 2:
+            return RecordsetSegmentRun(
+                0, None, records=segment_record
+            ).promote().bitarray
         if len(segment_record) < SegmentSize.db_segment_size_bytes:
             return [
                 int.from_bytes(segment_record[i : i + 2], byteorder="big")
@@ -1079,6 +1122,8 @@ class Database(_database.Database):
         limit.
         """
         key = self.encode_record_selector(key)
+        self.invalidate_recordlist_cache(file, field, key)
+        index_record_count = self.index_record_count[file, field]
         secondary = SUBFILE_DELIMITER.join((file, field))
         command = [self.table[secondary], "cursor"]
         if self.dbtxn:
@@ -1103,6 +1148,7 @@ class Database(_database.Database):
                         ),
                     )
                     tcl_tk_call(command)
+                    index_record_count.change_count(key, 1)
                     return
 
                 segment_number = int.from_bytes(value[:4], byteorder="big")
@@ -1124,6 +1170,7 @@ class Database(_database.Database):
                         ),
                     )
                     tcl_tk_call(command)
+                    index_record_count.change_count(key, 1)
                     return
 
                 if len(value) == SEGMENT_HEADER_LENGTH:
@@ -1131,6 +1178,7 @@ class Database(_database.Database):
                         value[4:], byteorder="big"
                     )
                     if existing_record_number != record_number:
+                        index_record_count.change_count(key, 1)
                         command = [self.segment_table[file], "put", "-append"]
                         if self.dbtxn:
                             command.extend(["-txn", self.dbtxn])
@@ -1170,12 +1218,14 @@ class Database(_database.Database):
                 )
                 recnums = self._get_segment_record_numbers(file, segment_key)
                 if isinstance(recnums, list):
+                    count = len(recnums)
                     i = bisect.bisect_left(recnums, record_number)
                     if i < len(recnums):
                         if recnums[i] != record_number:
                             recnums.insert(i, record_number)
                     else:
                         recnums.append(record_number)
+                    index_record_count.change_count(key, len(recnums) - count)
                     count = len(recnums)
                     if count > SegmentSize.db_upper_conversion_limit:
                         seg = SegmentSize.empty_bitarray.copy()
@@ -1240,7 +1290,8 @@ class Database(_database.Database):
                         tcl_tk_call(command)
                     return
 
-                # ignore possibility record_number already present
+                if not recnums[record_number]:
+                    index_record_count.change_count(key, 1)
                 recnums[record_number] = True
                 command = [
                     self.segment_table[file],
@@ -1286,6 +1337,7 @@ class Database(_database.Database):
                 ),
             )
             tcl_tk_call(command)
+            index_record_count.change_count(key, 1)
 
         finally:
             tcl_tk_call((cursor, "close"))
@@ -1302,6 +1354,8 @@ class Database(_database.Database):
         the number of records in the set below the relevant limit.
         """
         key = self.encode_record_selector(key)
+        self.invalidate_recordlist_cache(file, field, key)
+        index_record_count = self.index_record_count[file, field]
         secondary = SUBFILE_DELIMITER.join((file, field))
         command = [self.table[secondary], "cursor"]
         if self.dbtxn:
@@ -1330,6 +1384,7 @@ class Database(_database.Database):
                         value[4:], byteorder="big"
                     ):
                         tcl_tk_call((cursor, "del"))
+                        index_record_count.change_count(key, -1)
                     return
                 segment_key = int.from_bytes(
                     value[SEGMENT_HEADER_LENGTH:], byteorder="big"
@@ -1342,6 +1397,7 @@ class Database(_database.Database):
                         and recnums[discard] == record_number
                     ):
                         del recnums[discard]
+                        index_record_count.change_count(key, -1)
                     count = len(recnums)
                     if count < 2:
                         for i in recnums:
@@ -1392,7 +1448,8 @@ class Database(_database.Database):
                         tcl_tk_call(command)
                     return
 
-                # ignore possibility record_number already absent
+                if recnums[record_number]:
+                    index_record_count.change_count(key, -1)
                 recnums[record_number] = False
 
                 count = recnums.count()
@@ -1488,6 +1545,12 @@ class Database(_database.Database):
                 None,
                 records=segment_record,
             )
+        if len(segment_record) % 2:
+            return RecordsetSegmentRun(
+                int.from_bytes(segment_reference[:4], byteorder="big"),
+                None,
+                records=segment_record,
+            )
         return RecordsetSegmentList(
             int.from_bytes(segment_reference[:4], byteorder="big"),
             None,
@@ -1899,6 +1962,9 @@ class Database(_database.Database):
 
     def recordlist_ebm(self, file, cache_size=1):
         """Return RecordList containing records on file."""
+        recordlist = self.get_cached_existence(file, cache_size=cache_size)
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         command = [self.ebm_control[file].ebm_table, "cursor"]
         if self.dbtxn:
@@ -1921,16 +1987,20 @@ class Database(_database.Database):
 
         finally:
             tcl_tk_call((cursor, "close"))
-        return recordlist
+        return self.cache_existence(file, recordlist, cache_size=cache_size)
 
-    def populate_recordset_segment(self, recordset, reference):
+    def populate_recordset_segment(self, recordset, reference, within=None):
         """Populate recordset with segment in reference.
 
         The segement from reference is added to an existing segment in
         recordset if there is one, or becomes recordset's segment for
         that segment number if not.
+
+        The segment is ignored if it has no records in within, if given.
         """
         segment_number = int.from_bytes(reference[:4], byteorder="big")
+        if within is not None and segment_number not in within:
+            return
         if len(reference) == SEGMENT_HEADER_LENGTH:
             segment = RecordsetSegmentInt(
                 segment_number, None, records=reference[4:]
@@ -1952,6 +2022,10 @@ class Database(_database.Database):
                 segment = RecordsetSegmentBitarray(
                     segment_number, None, records=segment_record
                 )
+            elif len(segment_record) % 2:
+                segment = RecordsetSegmentRun(
+                    segment_number, None, records=segment_record
+                )
             else:
                 segment = RecordsetSegmentList(
                     segment_number, None, records=segment_record
@@ -1988,8 +2062,18 @@ class Database(_database.Database):
             tcl_tk_call((cursor, "close"))
         return recordlist
 
-    def recordlist_key(self, file, field, key=None, cache_size=1):
-        """Return RecordList on file containing records for field with key."""
+    def recordlist_key(self, file, field, key=None, cache_size=1, within=None):
+        """Return RecordList on file containing records for field with key.
+
+        Records in segments with no records in within, if given, may be
+        omitted.
+
+        """
+        recordlist = self.get_cached_recordlist(
+            file, field, (KEY_EQ, key), cache_size=cache_size
+        )
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         if key is None:
             return recordlist
@@ -2006,11 +2090,17 @@ class Database(_database.Database):
                 record_key, value = record[0]
                 if record_key != key:
                     break
-                self.populate_recordset_segment(recordlist, value)
+                self.populate_recordset_segment(
+                    recordlist, value, within=within
+                )
                 record = tcl_tk_call((cursor, "get", "-next"))
         finally:
             tcl_tk_call((cursor, "close"))
-        return recordlist
+        if within is not None:
+            return recordlist
+        return self.cache_recordlist(
+            file, field, (KEY_EQ, key), recordlist, cache_size=cache_size
+        )
 
     def recordlist_key_startswith(
         self, file, field, keystart=None, cache_size=1
@@ -2019,6 +2109,11 @@ class Database(_database.Database):
 
         The records are indexed by keys starting keystart.
         """
+        recordlist = self.get_cached_recordlist(
+            file, field, (KEY_STARTSWITH, keystart), cache_size=cache_size
+        )
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         if keystart is None:
             return recordlist
@@ -2039,19 +2134,42 @@ class Database(_database.Database):
                 record = tcl_tk_call((cursor, "get", "-next"))
         finally:
             tcl_tk_call((cursor, "close"))
-        return recordlist
+        return self.cache_recordlist(
+            file,
+            field,
+            (KEY_STARTSWITH, keystart),
+            recordlist,
+            cache_size=cache_size,
+        )
 
     def recordlist_key_range(
-        self, file, field, ge=None, gt=None, le=None, lt=None, cache_size=1
+        self,
+        file,
+        field,
+        ge=None,
+        gt=None,
+        le=None,
+        lt=None,
+        cache_size=1,
+        within=None,
     ):
         """Return RecordList containing records for field on file.
 
         Keys are in range set by combinations of ge, gt, le, and lt.
+
+        Records in segments with no records in within, if given, may be
+        omitted.
+
         """
         if isinstance(ge, str) and isinstance(gt, str):
             raise DatabaseError("Both 'ge' and 'gt' given in key range")
         if isinstance(le, str) and isinstance(lt, str):
             raise DatabaseError("Both 'le' and 'lt' given in key range")
+        recordlist = self.get_cached_recordlist(
+            file, field, (KEY_RANGE, ge, gt, le, lt), cache_size=cache_size
+        )
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         command = [
             self.table[SUBFILE_DELIMITER.join((file, field))],
@@ -2076,25 +2194,93 @@ class Database(_database.Database):
             if le is None and lt is None:
                 while record:
                     record0 = record[0]
-                    self.populate_recordset_segment(recordlist, record0[1])
+                    self.populate_recordset_segment(
+                        recordlist, record0[1], within=within
+                    )
                     record = tcl_tk_call((cursor, "get", "-next"))
             elif lt is None:
                 while record:
                     record0 = record[0]
                     if record0[0] > le:
                         break
-                    self.populate_recordset_segment(recordlist, record0[1])
+                    self.populate_recordset_segment(
+                        recordlist, record0[1], within=within
+                    )
                     record = tcl_tk_call((cursor, "get", "-next"))
             else:
                 while record:
                     record0 = record[0]
                     if record0[0] >= lt:
                         break
-                    self.populate_recordset_segment(recordlist, record0[1])
+                    self.populate_recordset_segment(
+                        recordlist, record0[1], within=within
+                    )
                     record = tcl_tk_call((cursor, "get", "-next"))
         finally:
             tcl_tk_call((cursor, "close"))
-        return recordlist
+        if within is not None:
+            return recordlist
+        return self.cache_recordlist(
+            file,
+            field,
+            (KEY_RANGE, ge, gt, le, lt),
+            recordlist,
+            cache_size=cache_size,
+        )
+
+    def estimate_recordlist_key(self, file, field, key=None):
+        """Return number of records recordlist_key would find for key.
+
+        The record counts in the segment references are summed: segments
+        are not read.
+
+        """
+        if key is None:
+            return 0
+        return self.estimate_recordlist_key_range(file, field, ge=key, le=key)
+
+    def estimate_recordlist_key_range(
+        self, file, field, ge=None, gt=None, le=None, lt=None
+    ):
+        """Return upper bound of records recordlist_key_range would find.
+
+        The record counts in the segment references for keys in range are
+        summed, so records with more than one key in range are counted for
+        each key.  Segments are not read.
+
+        """
+        count = 0
+        command = [
+            self.table[SUBFILE_DELIMITER.join((file, field))],
+            "cursor",
+        ]
+        if self.dbtxn:
+            command.extend(["-txn", self.dbtxn])
+        cursor = tcl_tk_call(tuple(command))
+        try:
+            if ge is None and gt is None:
+                record = tcl_tk_call((cursor, "get", "-first"))
+            else:
+                record = tcl_tk_call(
+                    (cursor, "get", "-set_range", ge or gt or "")
+                )
+            while record:
+                key, reference = record[0]
+                if le is not None and key > le:
+                    break
+                if lt is not None and key >= lt:
+                    break
+                if gt is None or key > gt:
+                    if len(reference) > SEGMENT_HEADER_LENGTH:
+                        count += int.from_bytes(
+                            reference[4:SEGMENT_HEADER_LENGTH], byteorder="big"
+                        )
+                    else:
+                        count += 1
+                record = tcl_tk_call((cursor, "get", "-next"))
+        finally:
+            tcl_tk_call((cursor, "close"))
+        return count
 
     def recordlist_all(self, file, field, cache_size=1):
         """Return RecordList on file containing records for field."""
@@ -2127,6 +2313,8 @@ class Database(_database.Database):
         is deleted.
 
         """
+        self.invalidate_recordlist_cache(file, field, key)
+        count = 0
         command = [
             self.table[SUBFILE_DELIMITER.join((file, field))],
             "cursor",
@@ -2152,6 +2340,11 @@ class Database(_database.Database):
                         )
                     )
                     tcl_tk_call(tuple(command))
+                    count += int.from_bytes(
+                        value[4:SEGMENT_HEADER_LENGTH], byteorder="big"
+                    )
+                else:
+                    count += 1
 
                 # Kept so block comment after finally clause makes sense.
                 # Not converted to Tcl API.
@@ -2171,6 +2364,7 @@ class Database(_database.Database):
 
         finally:
             tcl_tk_call((cursor, "close"))
+        self.index_record_count[file, field].change_count(key, -count)
 
         # Delete segment references.
         # The commented delete methods, cursor and database, within preceding
@@ -2195,12 +2389,18 @@ class Database(_database.Database):
 
     def file_records_under(self, file, field, recordset, key):
         """Replace records for index field[key] with recordset records."""
+        self.invalidate_recordlist_cache(file, field, key)
         assert recordset.dbset == file
         assert file in self.table
 
         # Delete existing segments for key
         self.unfile_records_under(file, field, key)
 
+        recordset.normalize()
+        self.index_record_count[file, field].change_count(
+            key, recordset.count_records()
+        )
+
         command = [
             self.table[SUBFILE_DELIMITER.join((file, field))],
             "cursor",
@@ -2209,7 +2409,6 @@ class Database(_database.Database):
             command.extend(["-txn", self.dbtxn])
         cursor = tcl_tk_call(tuple(command))
         try:
-            recordset.normalize()
             for segment_number in recordset.sorted_segnums:
                 if isinstance(
                     recordset.rs_segments[segment_number], RecordsetSegmentInt
@@ -2282,6 +2481,7 @@ class Database(_database.Database):
             transaction=self.dbtxn,
             segment=self.segment_table[file],
             engine=self._dbe,
+            index_record_count=self.index_record_count[file, field],
         )
 
     def create_recordset_cursor(self, recordset):
@@ -2656,18 +2856,29 @@ class CursorSecondary(Cursor):
 
     dbset - bsddb3 DB() object.
     segment - bsddb3 DB() object for segment, list of record numbers or bitmap.
+    index_record_count - IndexRecordCount instance or None.
     kargs - superclass arguments and absorb arguments for other engines.
 
     """
 
-    def __init__(self, dbset, segment=None, **kargs):
+    def __init__(
+        self, dbset, segment=None, *, index_record_count=None, **kargs
+    ):
         """Extend, note segment table name."""
         super().__init__(dbset, **kargs)
         self._segment = segment
+        self._index_record_count = index_record_count
 
     def count_records(self):
-        """Return record count."""
+        """Return record count.
+
+        The record counts maintained by index_record_count are used if
+        given, otherwise the record counts in the index are summed.
+
+        """
         if self.get_partial() in (None, False):
+            if self._index_record_count is not None:
+                return self._index_record_count.count_records()
             count = 0
             record = tcl_tk_call((self._cursor, "get", "-first"))
             while record:
@@ -2678,6 +2889,10 @@ class CursorSecondary(Cursor):
                     count += 1
                 record = tcl_tk_call((self._cursor, "get", "-next"))
             return count
+        if self._index_record_count is not None:
+            return self._index_record_count.count_records(
+                self.get_converted_partial()
+            )
         count = 0
         record = tcl_tk_call(
             (
@@ -2729,6 +2944,8 @@ class CursorSecondary(Cursor):
             int.from_bytes(reference[SEGMENT_HEADER_LENGTH:], byteorder="big")
         )
         records = tcl_tk_call(tuple(command))[0][1]
+        if len(records) % 2:
+            return RecordsetSegmentRun(segment_number, key, records=records)
         if len(records) < SegmentSize.db_segment_size_bytes:
             return RecordsetSegmentList(segment_number, key, records=records)
         return RecordsetSegmentBitarray(segment_number, key, records=records)
@@ -3222,6 +3439,230 @@ class ExistenceBitmapControl(_database.ExistenceBitmapControl):
             self.ebm_table = None
 
 
+class IndexRecordCount:
+    """Maintain record counts for field index of file in database.
+
+    The record count for the index is kept in the control database, and
+    the record count for each key in the index is kept in a database with
+    one record per key.  Partial key counts are the sum of the counts for
+    the keys which start with the partial key.
+
+    Changes to the counts are held until flush_cache() is called once
+    start_cache() has been called, so a transaction writes each count once.
+    Otherwise changes are written immediately.
+    """
+
+    def __init__(self, file, field, database):
+        """Open database for maintaining record counts for field in file."""
+        secondary = SUBFILE_DELIMITER.join((file, field))
+        self._database = database
+        self._index = database.table[secondary]
+        self._count_key = (INDEX_RECORD_COUNT_PREFIX + secondary).encode()
+
+        # The database is created if absent because databases created
+        # before record counts were kept do not have it.
+        self.key_count_table = None
+        dbname = SUBFILE_DELIMITER.join((secondary, INDEX_KEY_COUNT_SUFFIX))
+        command = [
+            "berkdb",
+            "open",
+            "-env",
+            database.dbenv,
+            "-btree",
+            "-create",
+        ]
+        if database.dbtxn:
+            command.extend(["-txn", database.dbtxn])
+        command.extend(
+            [
+                "--",
+                database.file_name_for_database(dbname),
+                dbname,
+            ]
+        )
+        self.key_count_table = tcl_tk_call(tuple(command))
+
+        # Record count changes by key not yet written to the database.  None
+        # means changes are written immediately.
+        self.changes = None
+
+    def start_cache(self):
+        """Hold record count changes until flush_cache() is called."""
+        if self.changes is None:
+            self.changes = {}
+
+    def discard_cache(self):
+        """Forget record count changes and write later ones immediately."""
+        self.changes = None
+
+    def flush_cache(self):
+        """Write record count changes held to database."""
+        if self.changes:
+            changes = self.changes
+            self.changes = {}
+            self.write_changes(changes)
+
+    def change_count(self, key, change):
+        """Change record count for key by change."""
+        if not change:
+            return
+        changes = self.changes
+        if changes is None:
+            self.write_changes({key: change})
+        else:
+            changes[key] = changes.get(key, 0) + change
+
+    def write_changes(self, changes):
+        """Apply changes, a dict of record count changes by key, to database.
+
+        The record count for a key is deleted when it becomes zero.
+
+        """
+        changes = sorted(
+            (key, change) for key, change in changes.items() if change
+        )
+        if not changes:
+            return
+        for key, change in changes:
+            value = self._get(self.key_count_table, key)
+            if value is not None:
+                change += int.from_bytes(value, byteorder="big")
+            if change > 0:
+                self._put(
+                    self.key_count_table,
+                    key,
+                    change.to_bytes(
+                        1 + change.bit_length() // 8, byteorder="big"
+                    ),
+                )
+            elif value is not None:
+                self._delete(self.key_count_table, key)
+        self._put_record_count(
+            self._get_record_count() + sum(change for key, change in changes)
+        )
+
+    def _get(self, table, key):
+        """Return value for key in table, or None if key is absent."""
+        command = [table, "get"]
+        if self._database.dbtxn:
+            command.extend(["-txn", self._database.dbtxn])
+        command.append(key)
+        record = tcl_tk_call(tuple(command))
+        if not record:
+            return None
+        return record[0][1]
+
+    def _put(self, table, key, value):
+        """Put value for key in table."""
+        command = [table, "put"]
+        if self._database.dbtxn:
+            command.extend(["-txn", self._database.dbtxn])
+        command.extend([key, value])
+        tcl_tk_call(tuple(command))
+
+    def _delete(self, table, key):
+        """Delete key from table if present."""
+        command = [table, "del"]
+        if self._database.dbtxn:
+            command.extend(["-txn", self._database.dbtxn])
+        command.append(key)
+        try:
+            tcl_tk_call(tuple(command))
+        except TclError:
+            pass
+
+    def _get_record_count(self):
+        """Return record count for index, or None if there is no count."""
+        value = self._get(self._database.table[CONTROL_FILE], self._count_key)
+        if value is None:
+            return None
+        return int.from_bytes(value, byteorder="big")
+
+    def _put_record_count(self, count):
+        """Replace the record count for index by count."""
+        control = self._database.table[CONTROL_FILE]
+        self._delete(control, self._count_key)
+        self._put(
+            control,
+            self._count_key,
+            count.to_bytes(1 + count.bit_length() // 8, byteorder="big"),
+        )
+
+    def _cursor(self, table):
+        """Return a cursor on table."""
+        command = [table, "cursor"]
+        if self._database.dbtxn:
+            command.extend(["-txn", self._database.dbtxn])
+        return tcl_tk_call(tuple(command))
+
+    def count_records(self, partial=None):
+        """Return record count for index or keys starting with partial."""
+        self.flush_cache()
+        if partial is None:
+            return self._get_record_count()
+        count = 0
+        cursor = self._cursor(self.key_count_table)
+        try:
+            record = tcl_tk_call((cursor, "get", "-set_range", partial))
+            while record:
+                key, value = record[0]
+                if not key.startswith(partial):
+                    break
+                count += int.from_bytes(value, byteorder="big")
+                record = tcl_tk_call((cursor, "get", "-next"))
+        finally:
+            tcl_tk_call((cursor, "close"))
+        return count
+
+    def counts_exist(self):
+        """Return True if the record count for the index exists."""
+        return self._get_record_count() is not None
+
+    def create_counts(self):
+        """Replace the record counts by those calculated from the index.
+
+        Record count changes held are discarded.
+
+        """
+        if self.changes is not None:
+            self.changes = {}
+        command = [self.key_count_table, "truncate"]
+        if self._database.dbtxn:
+            command.extend(["-txn", self._database.dbtxn])
+        tcl_tk_call(tuple(command))
+        total = 0
+        counts = {}
+        cursor = self._cursor(self._index)
+        try:
+            record = tcl_tk_call((cursor, "get", "-first"))
+            while record:
+                key, value = record[0]
+                if len(value) > SEGMENT_HEADER_LENGTH:
+                    count = int.from_bytes(
+                        value[4:SEGMENT_HEADER_LENGTH], byteorder="big"
+                    )
+                else:
+                    count = 1
+                counts[key] = counts.get(key, 0) + count
+                total += count
+                record = tcl_tk_call((cursor, "get", "-next"))
+        finally:
+            tcl_tk_call((cursor, "close"))
+        for key, count in counts.items():
+            self._put(
+                self.key_count_table,
+                key,
+                count.to_bytes(1 + count.bit_length() // 8, byteorder="big"),
+            )
+        self._put_record_count(total)
+
+    def close(self):
+        """Close the table."""
+        if self.key_count_table is not None:
+            tcl_tk_call((self.key_count_table, "close"))
+            self.key_count_table = None
+
+
 def ndata(faststat_str):
     """Return the number of records."""
     return dict(faststat_str)[b"Number of records"]
@@ -562,6 +562,33 @@ class Database(_database.Database):
         """
         self.table[dbset].put_instance(instance)
 
+    def delete_instances(self, dbset, instances):
+        """Override, delete instances from dbset by delete_instance().
+
+        DPT maintains its own indexes so there is nothing to group.
+
+        """
+        for instance in instances:
+            self.delete_instance(dbset, instance)
+
+    def edit_instances(self, dbset, instances):
+        """Override, edit existing instances on dbset by edit_instance().
+
+        DPT maintains its own indexes so there is nothing to group.
+
+        """
+        for instance in instances:
+            self.edit_instance(dbset, instance)
+
+    def put_instances(self, dbset, instances):
+        """Override, add new instances to dbset by put_instance().
+
+        DPT maintains its own indexes so there is nothing to group.
+
+        """
+        for instance in instances:
+            self.put_instance(dbset, instance)
+
     # def find_values(self, valuespec, file):
     #    yield self.table[file].find_values(valuespec)
 
@@ -1052,6 +1079,10 @@ class Database(_database.Database):
         foundset.close()
         return recordlist
 
+    def recordlist_complement(self, file, recordlist):
+        """Return _DPTRecordList on file for records not in recordlist."""
+        return self.recordlist_ebm(file) ^ recordlist
+
     def recordlist_key_like(self, file, field, keylike=None, cache_size=1):
         """Return _DPTRecordList on file containing database records for field.
 
@@ -1095,12 +1126,12 @@ class Database(_database.Database):
         dptfile.table_connection.DestroyRecordSet(foundset)
         return recordlist
 
-    def recordlist_key(self, file, field, key=None, cache_size=1):
+    def recordlist_key(self, file, field, key=None, cache_size=1, within=None):
         """Return _DPTRecordList on file containing records for field with key.
 
-        cache_size is not relevant to DPT.
+        cache_size and within are not relevant to DPT.
         """
-        del cache_size
+        del cache_size, within
         dptfile = self.table[file]
         recordlist = new_dptrecordlist(dptfile)
         if key is None:
@@ -1166,14 +1197,23 @@ class Database(_database.Database):
         return recordlist
 
     def recordlist_key_range(
-        self, file, field, ge=None, gt=None, le=None, lt=None, cache_size=1
+        self,
+        file,
+        field,
+        ge=None,
+        gt=None,
+        le=None,
+        lt=None,
+        cache_size=1,
+        within=None,
     ):
         """Return _DPTRecordList on file containing records for field.
 
         The keys in range are set by combinations of ge, gt, le, and lt.
 
-        cache_size is not relevant to DPT.
+        cache_size and within are not relevant to DPT.
         """
+        del within
         if isinstance(ge, str) and isinstance(gt, str):
             raise DatabaseError("Both 'ge' and 'gt' given in key range")
         if isinstance(le, str) and isinstance(lt, str):
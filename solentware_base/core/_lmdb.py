@@ -22,23 +22,53 @@ from .constants import (
     APPLICATION_CONTROL_KEY,
     SEGMENT_SIZE_BYTES_KEY,
     SEGMENT_HEADER_LENGTH,
+    INDEX_RECORD_COUNT_PREFIX,
+    INDEX_KEY_COUNT_SUFFIX,
     DEFAULT_MAP_SIZE,
     DEFAULT_MAP_BLOCKS,
     DEFAULT_MAP_PAGES,
+    BULK_LOAD,
+    INTERACTIVE,
+    READ_MOSTLY,
 )
 from . import _database
 from .bytebit import Bitarray, SINGLEBIT
 from .segmentsize import SegmentSize
+from .recordlistcache import KEY_EQ, KEY_STARTSWITH, KEY_RANGE
 from . import cursor as _cursor
 from . import recordsetcursor
 from .recordset import (
     RecordsetSegmentBitarray,
     RecordsetSegmentInt,
     RecordsetSegmentList,
+    RecordsetSegmentRun,
     RecordList,
     FoundSet,
 )
 
+# The environment flags set for each tuning profile, with None for the Symas
+# LMMD defaults.  The flags take effect when the environment is opened.
+TUNING_ENVIRONMENT_FLAGS = {
+    None: {},
+    BULK_LOAD: {
+        "writemap": True,
+        "map_async": True,
+        "sync": False,
+        "metasync": False,
+    },
+    INTERACTIVE: {"metasync": False},
+    READ_MOSTLY: {},
+}
+
+# The number of DEFAULT_MAP_SIZE blocks of free space given to the map when
+# each tuning profile is applied to an open environment.
+TUNING_MAP_INCREMENTS = {
+    None: 0,
+    BULK_LOAD: 100,
+    INTERACTIVE: 1,
+    READ_MOSTLY: 0,
+}
+
 
 class DatabaseError(_database.DatabaseError):
     """Exception for Database class."""
@@ -105,6 +135,9 @@ class Database(_database.Database):
         self.segment_table = {}
         self.ebm_control = {}
 
+        # IndexRecordCount instances for each (file, field).
+        self.index_record_count = {}
+
         # Set to value read from database on attempting to open database if
         # different from segment_size_bytes.
         self._real_segment_size_bytes = False
@@ -136,7 +169,11 @@ class Database(_database.Database):
         buffers
 
         """
+        self.start_existence_cache()
         self.dbtxn.start_transaction(self.dbenv, True)
+        self.start_ebm_caches()
+        for irc in self.index_record_count.values():
+            irc.start_cache()
 
     def start_read_only_transaction(self):
         """Start transaction if none and bind txn object to self._dbtxn.
@@ -147,6 +184,7 @@ class Database(_database.Database):
         'do nothing' version to exist for those engines.
 
         """
+        self.start_existence_cache()
         self.dbtxn.start_transaction(self.dbenv, False)
 
     def end_read_only_transaction(self):
@@ -160,6 +198,12 @@ class Database(_database.Database):
 
     def backout(self):
         """Abort the active transaction and remove binding to txn object."""
+        self.clear_recordlist_cache()
+        self.discard_existence_cache()
+        self.clear_position_checkpoints()
+        self.discard_ebm_caches()
+        for irc in self.index_record_count.values():
+            irc.discard_cache()
         txn = self.dbtxn
         # Some optimizations seem possible for read-only transactions which
         # do not involve destroying the self.dbtxn._transaction instance.
@@ -171,8 +215,14 @@ class Database(_database.Database):
 
     def commit(self):
         """Commit the active transaction and remove binding to txn object."""
+        self.discard_existence_cache()
         txn = self.dbtxn
         if txn.transaction is not None:
+            self.flush_ebm_caches(txn)
+            self.discard_ebm_caches()
+            for irc in self.index_record_count.values():
+                irc.flush_cache()
+                irc.discard_cache()
             txn.transaction.commit()
             txn.end_transaction()
 
@@ -324,6 +374,9 @@ class Database(_database.Database):
                     dupsort=True,
                     create=db_create,
                 )
+                self.index_record_count[file, field] = IndexRecordCount(
+                    file, field, self
+                )
         # If db_create==True there is no database version of the specification
         # to check the supplied specification against, so write it to the
         # database.
@@ -409,6 +462,21 @@ class Database(_database.Database):
             )
         self.set_segment_size()
         self.open_database_contexts()
+
+        # Databases created before record counts were kept get them from the
+        # index when opened.
+        self.start_read_only_transaction()
+        missing = [
+            irc
+            for irc in self.index_record_count.values()
+            if not irc.counts_exist()
+        ]
+        self.end_read_only_transaction()
+        if missing:
+            self.start_transaction()
+            for irc in missing:
+                irc.create_counts()
+            self.commit()
         self._dbe = dbe
 
     def _calculate_max_dbs(self, files=None):
@@ -422,8 +490,8 @@ class Database(_database.Database):
                 continue
             # Data, existence bitmap, and index bitmap or list, databases.
             db_count += 3
-            # Index databases.
-            db_count += len(specification[SECONDARY])
+            # Index and index key record count databases.
+            db_count += 2 * len(specification[SECONDARY])
         return db_count
 
     def environment_flags(self, dbe):
@@ -488,7 +556,31 @@ class Database(_database.Database):
         # openldap.org/lists/openldap-devel/201409/... thread for informed
         # comment.
         del dbe
-        return {"subdir": False, "readahead": False}
+        return {
+            "subdir": False,
+            "readahead": False,
+            **TUNING_ENVIRONMENT_FLAGS[self.tuning_profile],
+        }
+
+    def apply_tuning_profile(self):
+        """Override, flush writes and grow map if environment is open.
+
+        The environment flags for the tuning profile are set by the
+        environment_flags() method when the environment is next opened.
+
+        Writes not yet synchronized to disk are flushed, so restoring a
+        profile which synchronizes commits after one which does not is
+        safe.
+
+        """
+        if self.dbenv is None:
+            return
+        self.dbenv.sync(True)
+        increment = TUNING_MAP_INCREMENTS[self.tuning_profile]
+        if increment and self.dbtxn.transaction is None:
+            self._set_map_size_above_used_pages_between_transactions(
+                increment
+            )
 
     def checkpoint_before_close_dbenv(self):
         """Do nothing.  Present for compatibility with _db module."""
@@ -538,6 +630,10 @@ class Database(_database.Database):
                 secondary = SUBFILE_DELIMITER.join((file, field))
                 if secondary in self.table:
                     self.table[secondary].open_datastore(dbenv, txn=txn)
+                if (file, field) in self.index_record_count:
+                    self.index_record_count[
+                        file, field
+                    ].key_count_table.open_datastore(dbenv, txn=txn)
 
     def close_database_context_files(self, files=None):
         """Close datastores implementing files in database.
@@ -571,6 +667,10 @@ class Database(_database.Database):
                 secondary = SUBFILE_DELIMITER.join((file, field))
                 if secondary in self.table:
                     self.table[secondary].close_datastore()
+                if (file, field) in self.index_record_count:
+                    self.index_record_count[
+                        file, field
+                    ].key_count_table.close_datastore()
 
     def close_database_contexts(self, files=None):
         """Commit or backout transaction then delete the database handles.
@@ -587,6 +687,9 @@ class Database(_database.Database):
         the environment.
 
         """
+        self.clear_recordlist_cache()
+        self.discard_existence_cache()
+        self.clear_position_checkpoints()
         self._dbe = None
         self.close_database_context_files(files=files)
         if self.dbenv is not None:
@@ -596,6 +699,7 @@ class Database(_database.Database):
             self.table = {}
             self.segment_table = {}
             self.ebm_control = {}
+            self.index_record_count = {}
         self.segment_size_bytes = self._initial_segment_size_bytes
 
     def close_database(self):
@@ -674,6 +778,23 @@ class Database(_database.Database):
             return None
         return key, record.decode()
 
+    def get_primary_records(self, file, keys):
+        """Return list of (key, value) for records in file with keys.
+
+        One cursor walks the datastore in ascending key order, keys is in
+        ascending order, rather than a get() per record.
+
+        """
+        assert file in self.specification
+        records = []
+        with self.dbtxn.transaction.cursor(
+            self.table[file].datastore
+        ) as cursor:
+            for key in keys:
+                if cursor.set_key(key.to_bytes(4, byteorder="big")):
+                    records.append((key, cursor.value().decode()))
+        return records
+
     def encode_record_number(self, key):
         """Return repr(key).encode() because this is Symas LMMB version.
 
@@ -726,7 +847,9 @@ class Database(_database.Database):
             if segment_number == ebmc.segment_count - 1:
                 return None
 
-            lfrns = ebmc.read_exists_segment(segment_number, self.dbtxn)
+            lfrns = ebmc.get_cached_ebm(segment_number)
+            if lfrns is None:
+                lfrns = ebmc.read_exists_segment(segment_number, self.dbtxn)
             if lfrns is None:
                 # Segment does not exist now.
                 ebmc.freed_record_number_pages.remove(segment_number)
@@ -813,22 +936,24 @@ class Database(_database.Database):
         deletekey is split into segment number and record number within
         segment to form the returned value.
         """
+        self.invalidate_existence_cache(file)
         segment, record_number = divmod(deletekey, SegmentSize.db_segment_size)
-        key = segment.to_bytes(4, byteorder="big")
-        ebmb = self.dbtxn.transaction.get(
-            key,
-            db=self.ebm_control[file].ebm_table.datastore,
-        )
-        if ebmb is None:
-            raise DatabaseError("Existence bit map for segment does not exist")
-        ebm = Bitarray()
-        ebm.frombytes(ebmb)
+        ebmc = self.ebm_control[file]
+        ebm = ebmc.get_cached_ebm(segment)
+        if ebm is None:
+            ebmb = self.dbtxn.transaction.get(
+                segment.to_bytes(4, byteorder="big"),
+                db=ebmc.ebm_table.datastore,
+            )
+            if ebmb is None:
+                raise DatabaseError(
+                    "Existence bit map for segment does not exist"
+                )
+            ebm = Bitarray()
+            ebm.frombytes(ebmb)
         ebm[record_number] = False
-        self.dbtxn.transaction.put(
-            key,
-            ebm.tobytes(),
-            db=self.ebm_control[file].ebm_table.datastore,
-        )
+        if not ebmc.cache_ebm(segment, ebm):
+            ebmc.write_ebm_segment(segment, ebm, self.dbtxn)
         return segment, record_number
 
     def add_record_to_ebm(self, file, putkey):
@@ -837,23 +962,25 @@ class Database(_database.Database):
         putkey is split into segment number and record number within
         segment to form the returned value.
         """
+        self.invalidate_existence_cache(file)
         segment, record_number = divmod(putkey, SegmentSize.db_segment_size)
-        key = segment.to_bytes(4, byteorder="big")
-        ebmb = self.dbtxn.transaction.get(
-            key,
-            db=self.ebm_control[file].ebm_table.datastore,
-        )
-        if ebmb is None:
-            ebm = SegmentSize.empty_bitarray.copy()
-        else:
+        ebmc = self.ebm_control[file]
+        ebm = ebmc.get_cached_ebm(segment)
+        if ebm is None:
+            ebmb = self.dbtxn.transaction.get(
+                segment.to_bytes(4, byteorder="big"),
+                db=ebmc.ebm_table.datastore,
+            )
+            if ebmb is None:
+                ebm = SegmentSize.empty_bitarray.copy()
+                ebm[record_number] = True
+                ebmc.write_ebm_segment(segment, ebm, self.dbtxn)
+                return segment, record_number
             ebm = Bitarray()
             ebm.frombytes(ebmb)
         ebm[record_number] = True
-        self.dbtxn.transaction.put(
-            key,
-            ebm.tobytes(),
-            db=self.ebm_control[file].ebm_table.datastore,
-        )
+        if not ebmc.cache_ebm(segment, ebm):
+            ebmc.write_ebm_segment(segment, ebm, self.dbtxn)
         return segment, record_number
 
     def get_high_record_number(self, file):
@@ -870,6 +997,10 @@ class Database(_database.Database):
             reference.to_bytes(4, byteorder="big"),
             db=self.segment_table[file].datastore,
         )
+        if len(segment_record) % 2:
+            return RecordsetSegmentRun(
+                0, None, records=segment_record
+            ).promote().bitarray
         if len(segment_record) < SegmentSize.db_segment_size_bytes:
             return [
                 int.from_bytes(segment_record[i : i + 2], byteorder="big")
@@ -892,6 +1023,9 @@ class Database(_database.Database):
         limit.
         """
         key = self.encode_record_selector(key)
+        self.invalidate_recordlist_cache(file, field, key)
+        self.invalidate_position_checkpoints(file, field, key)
+        index_record_count = self.index_record_count[file, field]
         secondary = SUBFILE_DELIMITER.join((file, field))
         with self.dbtxn.transaction.cursor(
             self.table[secondary].datastore
@@ -913,6 +1047,7 @@ class Database(_database.Database):
                             )
                         ),
                     )
+                    index_record_count.change_count(key, 1)
                     return
 
                 segment_number = int.from_bytes(value[:4], byteorder="big")
@@ -929,6 +1064,7 @@ class Database(_database.Database):
                             )
                         ),
                     )
+                    index_record_count.change_count(key, 1)
                     return
 
                 if len(value) == SEGMENT_HEADER_LENGTH:
@@ -936,6 +1072,7 @@ class Database(_database.Database):
                         value[4:], byteorder="big"
                     )
                     if existing_record_number != record_number:
+                        index_record_count.change_count(key, 1)
                         with self.dbtxn.transaction.cursor(
                             self.segment_table[file].datastore
                         ) as seg_cursor:
@@ -988,12 +1125,14 @@ class Database(_database.Database):
                 )
                 recnums = self._get_segment_record_numbers(file, segment_key)
                 if isinstance(recnums, list):
+                    count = len(recnums)
                     i = bisect.bisect_left(recnums, record_number)
                     if i < len(recnums):
                         if recnums[i] != record_number:
                             recnums.insert(i, record_number)
                     else:
                         recnums.append(record_number)
+                    index_record_count.change_count(key, len(recnums) - count)
                     count = len(recnums)
                     if count > SegmentSize.db_upper_conversion_limit:
                         seg = SegmentSize.empty_bitarray.copy()
@@ -1039,7 +1178,8 @@ class Database(_database.Database):
                         )
                     return
 
-                # ignore possibility record_number already present
+                if not recnums[record_number]:
+                    index_record_count.change_count(key, 1)
                 recnums[record_number] = True
                 self.dbtxn.transaction.put(
                     value[SEGMENT_HEADER_LENGTH:],
@@ -1069,6 +1209,7 @@ class Database(_database.Database):
                     )
                 ),
             )
+            index_record_count.change_count(key, 1)
 
     def remove_record_from_field_value(
         self, file, field, key, segment, record_number
@@ -1082,6 +1223,9 @@ class Database(_database.Database):
         the number of records in the set below the relevant limit.
         """
         key = self.encode_record_selector(key)
+        self.invalidate_recordlist_cache(file, field, key)
+        self.invalidate_position_checkpoints(file, field, key)
+        index_record_count = self.index_record_count[file, field]
         secondary = SUBFILE_DELIMITER.join((file, field))
         with self.dbtxn.transaction.cursor(
             self.table[secondary].datastore
@@ -1109,6 +1253,7 @@ class Database(_database.Database):
                         value[4:], byteorder="big"
                     ):
                         cursor.delete()
+                        index_record_count.change_count(key, -1)
                     return
                 segment_key = int.from_bytes(
                     value[SEGMENT_HEADER_LENGTH:], byteorder="big"
@@ -1121,6 +1266,7 @@ class Database(_database.Database):
                         and recnums[discard] == record_number
                     ):
                         del recnums[discard]
+                        index_record_count.change_count(key, -1)
                     count = len(recnums)
                     if count < 2:
                         for i in recnums:
@@ -1161,7 +1307,8 @@ class Database(_database.Database):
                         )
                     return
 
-                # ignore possibility record_number already absent
+                if recnums[record_number]:
+                    index_record_count.change_count(key, -1)
                 recnums[record_number] = False
 
                 count = recnums.count()
@@ -1234,6 +1381,12 @@ class Database(_database.Database):
                 None,
                 records=segment_record,
             )
+        if len(segment_record) % 2:
+            return RecordsetSegmentRun(
+                int.from_bytes(segment_reference[:4], byteorder="big"),
+                None,
+                records=segment_record,
+            )
         return RecordsetSegmentList(
             int.from_bytes(segment_reference[:4], byteorder="big"),
             None,
@@ -1446,6 +1599,7 @@ class Database(_database.Database):
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         if key is None:
             return recordlist
+        self.ebm_control[file].flush_ebm_cache(self.dbtxn)
         segment_number, record_number = divmod(
             key, SegmentSize.db_segment_size
         )
@@ -1471,6 +1625,7 @@ class Database(_database.Database):
         The records have record number between keystart and keyend.  Both
         default to include all records to the respective edge of segment.
         """
+        self.ebm_control[file].flush_ebm_cache(self.dbtxn)
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         if keystart is None:
             segment_start, recnum_start = 0, 1
@@ -1541,6 +1696,10 @@ class Database(_database.Database):
 
     def recordlist_ebm(self, file, cache_size=1):
         """Return RecordList containing records on file."""
+        recordlist = self.get_cached_existence(file, cache_size=cache_size)
+        if recordlist is not None:
+            return recordlist
+        self.ebm_control[file].flush_ebm_cache(self.dbtxn)
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         with self.dbtxn.transaction.cursor(
             self.ebm_control[file].ebm_table.datastore
@@ -1555,16 +1714,20 @@ class Database(_database.Database):
                     segment_number, None, records=segment_record
                 )
                 record = cursor.next()
-        return recordlist
+        return self.cache_existence(file, recordlist, cache_size=cache_size)
 
-    def populate_recordset_segment(self, recordset, reference):
+    def populate_recordset_segment(self, recordset, reference, within=None):
         """Populate recordset with segment in reference.
 
         The segment from reference is added to an existing segment in
         recordset if there is one, or becomes recordset's segment for
         that segment number if not.
+
+        The segment is ignored if it has no records in within, if given.
         """
         segment_number = int.from_bytes(reference[:4], byteorder="big")
+        if within is not None and segment_number not in within:
+            return
         if len(reference) == SEGMENT_HEADER_LENGTH:
             segment = RecordsetSegmentInt(
                 segment_number, None, records=reference[4:]
@@ -1582,6 +1745,10 @@ class Database(_database.Database):
                 segment = RecordsetSegmentBitarray(
                     segment_number, None, records=segment_record
                 )
+            elif len(segment_record) % 2:
+                segment = RecordsetSegmentRun(
+                    segment_number, None, records=segment_record
+                )
             else:
                 segment = RecordsetSegmentList(
                     segment_number, None, records=segment_record
@@ -1611,8 +1778,18 @@ class Database(_database.Database):
                 record = cursor.next()
         return recordlist
 
-    def recordlist_key(self, file, field, key=None, cache_size=1):
-        """Return RecordList on file containing records for field with key."""
+    def recordlist_key(self, file, field, key=None, cache_size=1, within=None):
+        """Return RecordList on file containing records for field with key.
+
+        Records in segments with no records in within, if given, may be
+        omitted.
+
+        """
+        recordlist = self.get_cached_recordlist(
+            file, field, (KEY_EQ, key), cache_size=cache_size
+        )
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         if key is None:
             return recordlist
@@ -1624,9 +1801,15 @@ class Database(_database.Database):
                 record_key, value = cursor.item()
                 if record_key != key:
                     break
-                self.populate_recordset_segment(recordlist, value)
+                self.populate_recordset_segment(
+                    recordlist, value, within=within
+                )
                 record = cursor.next()
-        return recordlist
+        if within is not None:
+            return recordlist
+        return self.cache_recordlist(
+            file, field, (KEY_EQ, key), recordlist, cache_size=cache_size
+        )
 
     def recordlist_key_startswith(
         self, file, field, keystart=None, cache_size=1
@@ -1635,6 +1818,11 @@ class Database(_database.Database):
 
         The records are indexed by keys starting keystart.
         """
+        recordlist = self.get_cached_recordlist(
+            file, field, (KEY_STARTSWITH, keystart), cache_size=cache_size
+        )
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         if keystart is None:
             return recordlist
@@ -1648,19 +1836,42 @@ class Database(_database.Database):
                     break
                 self.populate_recordset_segment(recordlist, record[1])
                 record = cursor.next()
-        return recordlist
+        return self.cache_recordlist(
+            file,
+            field,
+            (KEY_STARTSWITH, keystart),
+            recordlist,
+            cache_size=cache_size,
+        )
 
     def recordlist_key_range(
-        self, file, field, ge=None, gt=None, le=None, lt=None, cache_size=1
+        self,
+        file,
+        field,
+        ge=None,
+        gt=None,
+        le=None,
+        lt=None,
+        cache_size=1,
+        within=None,
     ):
         """Return RecordList containing records for field on file.
 
         Keys are in range set by combinations of ge, gt, le, and lt.
+
+        Records in segments with no records in within, if given, may be
+        omitted.
+
         """
         if isinstance(ge, bytes) and isinstance(gt, bytes):
             raise DatabaseError("Both 'ge' and 'gt' given in key range")
         if isinstance(le, bytes) and isinstance(lt, bytes):
             raise DatabaseError("Both 'le' and 'lt' given in key range")
+        recordlist = self.get_cached_recordlist(
+            file, field, (KEY_RANGE, ge, gt, le, lt), cache_size=cache_size
+        )
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         with self.dbtxn.transaction.cursor(
             self.table[SUBFILE_DELIMITER.join((file, field))].datastore
@@ -1678,23 +1889,82 @@ class Database(_database.Database):
             if le is None and lt is None:
                 while record:
                     record = cursor.item()
-                    self.populate_recordset_segment(recordlist, record[1])
+                    self.populate_recordset_segment(
+                        recordlist, record[1], within=within
+                    )
                     record = cursor.next()
             elif lt is None:
                 while record:
                     record = cursor.item()
                     if record[0] > le:
                         break
-                    self.populate_recordset_segment(recordlist, record[1])
+                    self.populate_recordset_segment(
+                        recordlist, record[1], within=within
+                    )
                     record = cursor.next()
             else:
                 while record:
                     record = cursor.item()
                     if record[0] >= lt:
                         break
-                    self.populate_recordset_segment(recordlist, record[1])
+                    self.populate_recordset_segment(
+                        recordlist, record[1], within=within
+                    )
                     record = cursor.next()
-        return recordlist
+        if within is not None:
+            return recordlist
+        return self.cache_recordlist(
+            file,
+            field,
+            (KEY_RANGE, ge, gt, le, lt),
+            recordlist,
+            cache_size=cache_size,
+        )
+
+    def estimate_recordlist_key(self, file, field, key=None):
+        """Return number of records recordlist_key would find for key.
+
+        The record counts in the segment references are summed: segments
+        are not read.
+
+        """
+        if key is None:
+            return 0
+        return self.estimate_recordlist_key_range(file, field, ge=key, le=key)
+
+    def estimate_recordlist_key_range(
+        self, file, field, ge=None, gt=None, le=None, lt=None
+    ):
+        """Return upper bound of records recordlist_key_range would find.
+
+        The record counts in the segment references for keys in range are
+        summed, so records with more than one key in range are counted for
+        each key.  Segments are not read.
+
+        """
+        count = 0
+        with self.dbtxn.transaction.cursor(
+            self.table[SUBFILE_DELIMITER.join((file, field))].datastore
+        ) as cursor:
+            if ge is None and gt is None:
+                record = cursor.first()
+            else:
+                record = cursor.set_range(ge or gt or b"")
+            while record:
+                key, reference = cursor.item()
+                if le is not None and key > le:
+                    break
+                if lt is not None and key >= lt:
+                    break
+                if gt is None or key > gt:
+                    if len(reference) > SEGMENT_HEADER_LENGTH:
+                        count += int.from_bytes(
+                            reference[4:SEGMENT_HEADER_LENGTH], byteorder="big"
+                        )
+                    else:
+                        count += 1
+                record = cursor.next()
+        return count
 
     def recordlist_all(self, file, field, cache_size=1):
         """Return RecordList on file containing records for field."""
@@ -1720,6 +1990,9 @@ class Database(_database.Database):
         is deleted.
 
         """
+        self.invalidate_recordlist_cache(file, field, key)
+        self.invalidate_position_checkpoints(file, field, key)
+        count = 0
         with self.dbtxn.transaction.cursor(
             self.table[SUBFILE_DELIMITER.join((file, field))].datastore
         ) as cursor:
@@ -1735,7 +2008,13 @@ class Database(_database.Database):
                         value[SEGMENT_HEADER_LENGTH:],
                         db=self.segment_table[file].datastore,
                     )
+                    count += int.from_bytes(
+                        value[4:SEGMENT_HEADER_LENGTH], byteorder="big"
+                    )
+                else:
+                    count += 1
                 record = cursor.next()
+        self.index_record_count[file, field].change_count(key, -count)
 
         self.dbtxn.transaction.delete(
             key,
@@ -1744,16 +2023,22 @@ class Database(_database.Database):
 
     def file_records_under(self, file, field, recordset, key):
         """Replace records for index field[key] with recordset records."""
+        self.invalidate_recordlist_cache(file, field, key)
+        self.invalidate_position_checkpoints(file, field, key)
         assert recordset.dbset == file
         assert file in self.table
 
         # Delete existing segments for key
         self.unfile_records_under(file, field, key)
 
+        recordset.normalize()
+        self.index_record_count[file, field].change_count(
+            key, recordset.count_records()
+        )
+
         with self.dbtxn.transaction.cursor(
             self.table[SUBFILE_DELIMITER.join((file, field))].datastore
         ) as cursor:
-            recordset.normalize()
             for segment_number in recordset.sorted_segnums:
                 rs_segment = recordset.rs_segments[segment_number]
                 if isinstance(rs_segment, RecordsetSegmentInt):
@@ -1822,6 +2107,7 @@ class Database(_database.Database):
                 keyrange=keyrange,
                 transaction=self.dbtxn,
                 ebm=self.ebm_control[file].ebm_table,
+                ebm_control=self.ebm_control[file],
                 engine=self._dbe,
             )
         return CursorSecondary(
@@ -1829,6 +2115,8 @@ class Database(_database.Database):
             keyrange=keyrange,
             transaction=self.dbtxn,
             segment=self.segment_table[file],
+            checkpoints=self.get_position_checkpoints(file, field),
+            index_record_count=self.index_record_count[file, field],
         )
 
     def create_recordset_cursor(self, recordset):
@@ -2173,11 +2461,19 @@ class CursorPrimary(Cursor):
 
     """
 
-    def __init__(self, dbset, ebm=None, engine=None, **kargs):
+    def __init__(
+        self, dbset, ebm=None, engine=None, *, ebm_control=None, **kargs
+    ):
         """Extend, note existence bitmap table and engine."""
         super().__init__(dbset, **kargs)
         self._ebm = ebm
         self._engine = engine
+        self._ebm_control = ebm_control
+
+    def _flush_ebm_cache(self):
+        """Write changed existence bitmap segments before reading them."""
+        if self._ebm_control is not None:
+            self._ebm_control.flush_ebm_cache(self._transaction)
 
     def count_records(self):
         """Return record count."""
@@ -2197,6 +2493,7 @@ class CursorPrimary(Cursor):
         # segment_numbers are 0-based.
         if record is None:
             return 0
+        self._flush_ebm_cache()
         segment_number, record_number = divmod(
             record[0], SegmentSize.db_segment_size
         )
@@ -2232,6 +2529,7 @@ class CursorPrimary(Cursor):
         """Return record for positionth record in file or None."""
         if not position:  # Include position 0 in this case.
             return None
+        self._flush_ebm_cache()
         count = 0
         abspos = abs(position)
         ebm_cursor = self._transaction.transaction.cursor(
@@ -2346,18 +2644,37 @@ class CursorSecondary(Cursor):
     dbset - Symas LMMD sub-database object.
     segment - Symas LMMD sub-database object for segment, list of record
             numbers or bitmap.
+    checkpoints - positioncheckpoints.IndexCheckpoints instance or None.
+    index_record_count - IndexRecordCount instance or None.
     kargs - superclass arguments and absorb arguments for other engines.
 
     """
 
-    def __init__(self, dbset, segment=None, **kargs):
+    def __init__(
+        self,
+        dbset,
+        segment=None,
+        *,
+        checkpoints=None,
+        index_record_count=None,
+        **kargs
+    ):
         """Extend, note segment table name."""
         super().__init__(dbset, **kargs)
         self._segment = segment
+        self._checkpoints = checkpoints
+        self._index_record_count = index_record_count
 
     def count_records(self):
-        """Return record count."""
+        """Return record count.
+
+        The record counts maintained by index_record_count are used if
+        given, otherwise the record counts in the index are summed.
+
+        """
         if self.get_partial() in (None, False):
+            if self._index_record_count is not None:
+                return self._index_record_count.count_records()
             count = 0
             record = self._cursor.first()
             while record:
@@ -2368,6 +2685,10 @@ class CursorSecondary(Cursor):
                     count += 1
                 record = self._cursor.next()
             return count
+        if self._index_record_count is not None:
+            return self._index_record_count.count_records(
+                self.get_converted_partial()
+            )
         count = 0
         record = self._cursor.set_range(
             self.get_converted_partial_with_wildcard()
@@ -2411,6 +2732,8 @@ class CursorSecondary(Cursor):
             reference[SEGMENT_HEADER_LENGTH:],
             db=self._segment.datastore,
         )
+        if len(records) % 2:
+            return RecordsetSegmentRun(segment_number, key, records=records)
         if len(records) < SegmentSize.db_segment_size_bytes:
             return RecordsetSegmentList(segment_number, key, records=records)
         return RecordsetSegmentBitarray(segment_number, key, records=records)
@@ -2439,10 +2762,21 @@ class CursorSecondary(Cursor):
             def high(jkey, partial):
                 return not jkey.startswith(partial)
 
-        # Get position of record relative to start point.
+        # Get position of record relative to start point, which is the
+        # nearest checkpoint before key if there are checkpoints.
         position = 0
         if not self.get_partial():
-            j = self._cursor.first()
+            if self._checkpoints is None:
+                checkpoint = None
+            else:
+                self._checkpoints.refresh(self._key_counts)
+                checkpoint, position = self._checkpoints.locate_key(
+                    key.encode()
+                )
+            if checkpoint is None:
+                j = self._cursor.first()
+            else:
+                j = self._cursor.set_range(checkpoint)
         else:
             j = self._cursor.set_range(
                 self.get_converted_partial_with_wildcard()
@@ -2477,6 +2811,8 @@ class CursorSecondary(Cursor):
         """Return record for positionth record in file or None."""
         if position is None:
             return None
+        if not self.get_partial() and self._checkpoints is not None:
+            return self._get_record_at_position_from_checkpoint(position)
 
         # Start at first or last record whichever is likely closer to position
         # and define functions to handle presence or absence of partial key.
@@ -2553,6 +2889,72 @@ class CursorSecondary(Cursor):
                 break
         return None
 
+    def _get_record_at_position_from_checkpoint(self, position):
+        """Return record for positionth record in file or None.
+
+        The index is scanned from the nearest checkpoint before position.
+
+        """
+        checkpoints = self._checkpoints
+        checkpoints.refresh(self._key_counts)
+        if position < 0:
+            position += checkpoints.record_count()
+            if position < 0:
+                return None
+        checkpoint, count = checkpoints.locate_position(position)
+        if checkpoint is None:
+            record = self._cursor.first()
+        else:
+            record = self._cursor.set_range(checkpoint)
+        while record:
+            record = self._cursor.item()
+            if len(record[1]) > SEGMENT_HEADER_LENGTH:
+                offset = int.from_bytes(record[1][4:6], byteorder="big")
+            else:
+                offset = 1
+            count += offset
+            if count <= position:
+                record = self._cursor.next()
+                continue
+            record_number = self._get_segment(
+                record[0],
+                int.from_bytes(record[1][:4], byteorder="big"),
+                record[1],
+            ).get_record_number_at_position(position - count + offset)
+            if record_number is not None:
+                return record[0].decode(), record_number
+            break
+        return None
+
+    def _key_counts(self, low, high):
+        """Yield (key, record count) for keys from low up to high.
+
+        low and high are not applied if None, and high is excluded.
+
+        """
+        if low is None:
+            record = self._cursor.first()
+        else:
+            record = self._cursor.set_range(low)
+        key = None
+        count = 0
+        while record:
+            record = self._cursor.item()
+            if high is not None and record[0] >= high:
+                break
+            if record[0] != key:
+                if key is not None:
+                    yield key, count
+                key = record[0]
+                count = 0
+            if len(record[1]) > SEGMENT_HEADER_LENGTH:
+                count += int.from_bytes(record[1][4:6], byteorder="big")
+            else:
+                count += 1
+            record = self._cursor.next()
+        if key is not None:
+            yield key, count
+
     def last(self):
         """Return last record taking partial key into account."""
         if self.get_partial() is None:
@@ -2882,7 +3284,198 @@ class ExistenceBitmapControl(_database.ExistenceBitmapControl):
         )
         return ebm
 
+    def write_ebm_segment(self, segment_number, ebm, dbtxn):
+        """Write existence bitmap ebm for segment_number in database dbtxn."""
+        # record keys are 0-based converted to bytes.
+        # segment_numbers are 0-based.
+        dbtxn.transaction.put(
+            segment_number.to_bytes(4, byteorder="big"),
+            ebm.tobytes(),
+            db=self.ebm_table.datastore,
+        )
+
     def close(self):
         """Close the table."""
         if self.ebm_table is not None:
             self.ebm_table.close_datastore()
+
+
+class IndexRecordCount:
+    """Maintain record counts for field index of file in database.
+
+    The record count for the index is kept in the control datastore, and
+    the record count for each key in the index is kept in a datastore with
+    one record per key.  Partial key counts are the sum of the counts for
+    the keys which start with the partial key.
+
+    Changes to the counts are held until flush_cache() is called once
+    start_cache() has been called, so a transaction writes each count once.
+    Otherwise changes are written immediately.
+
+    """
+
+    def __init__(self, file, field, database):
+        """Note datastores for maintaining record counts for field in file."""
+        secondary = SUBFILE_DELIMITER.join((file, field))
+        self._dbtxn = database.dbtxn
+        self._control = database.table[CONTROL_FILE]
+        self._index = database.table[secondary]
+        self._count_key = (INDEX_RECORD_COUNT_PREFIX + secondary).encode()
+
+        # The datastore is created if absent because databases created
+        # before record counts were kept do not have it.
+        self.key_count_table = _Datastore(
+            database._encoded_database_name(
+                SUBFILE_DELIMITER.join((secondary, INDEX_KEY_COUNT_SUFFIX))
+            ),
+            create=True,
+        )
+
+        # Record count changes by key not yet written to the database.  None
+        # means changes are written immediately.
+        self.changes = None
+
+    def start_cache(self):
+        """Hold record count changes until flush_cache() is called."""
+        if self.changes is None:
+            self.changes = {}
+
+    def discard_cache(self):
+        """Forget record count changes and write later ones immediately."""
+        self.changes = None
+
+    def flush_cache(self):
+        """Write record count changes held to database."""
+        if self.changes:
+            changes = self.changes
+            self.changes = {}
+            self.write_changes(changes)
+
+    def change_count(self, key, change):
+        """Change record count for key by change."""
+        if not change:
+            return
+        changes = self.changes
+        if changes is None:
+            self.write_changes({key: change})
+        else:
+            changes[key] = changes.get(key, 0) + change
+
+    def write_changes(self, changes):
+        """Apply changes, a dict of record count changes by key, to database.
+
+        The record count for a key is deleted when it becomes zero.
+
+        """
+        changes = sorted(
+            (key, change) for key, change in changes.items() if change
+        )
+        if not changes:
+            return
+        transaction = self._dbtxn.transaction
+        with transaction.cursor(self.key_count_table.datastore) as cursor:
+            for key, change in changes:
+                value = cursor.get(key)
+                if value is not None:
+                    change += int.from_bytes(value, byteorder="big")
+                if change > 0:
+                    cursor.put(
+                        key,
+                        change.to_bytes(
+                            1 + change.bit_length() // 8, byteorder="big"
+                        ),
+                    )
+                elif value is not None:
+                    cursor.delete()
+        self._put_record_count(
+            self._get_record_count() + sum(change for key, change in changes)
+        )
+
+    def _get_record_count(self):
+        """Return record count for index, or None if there is no count."""
+        value = self._dbtxn.transaction.get(
+            self._count_key, db=self._control.datastore
+        )
+        if value is None:
+            return None
+        return int.from_bytes(value, byteorder="big")
+
+    def _put_record_count(self, count):
+        """Replace the record count for index by count."""
+        transaction = self._dbtxn.transaction
+        transaction.delete(self._count_key, db=self._control.datastore)
+        transaction.put(
+            self._count_key,
+            count.to_bytes(1 + count.bit_length() // 8, byteorder="big"),
+            db=self._control.datastore,
+        )
+
+    def count_records(self, partial=None):
+        """Return record count for index or keys starting with partial."""
+        self.flush_cache()
+        if partial is None:
+            return self._get_record_count()
+        count = 0
+        with self._dbtxn.transaction.cursor(
+            self.key_count_table.datastore
+        ) as cursor:
+            record = cursor.set_range(partial)
+            while record:
+                key, value = cursor.item()
+                if not key.startswith(partial):
+                    break
+                count += int.from_bytes(value, byteorder="big")
+                record = cursor.next()
+        return count
+
+    def counts_exist(self):
+        """Return True if the record count for the index exists."""
+        return self._get_record_count() is not None
+
+    def create_counts(self):
+        """Replace the record counts by those calculated from the index.
+
+        Record count changes held are discarded.
+
+        """
+        if self.changes is not None:
+            self.changes = {}
+        transaction = self._dbtxn.transaction
+        transaction.drop(self.key_count_table.datastore, delete=False)
+        total = 0
+        with transaction.cursor(
+            self._index.datastore
+        ) as cursor, transaction.cursor(
+            self.key_count_table.datastore
+        ) as count_cursor:
+
+            def put_count():
+                count_cursor.put(
+                    key,
+                    count.to_bytes(
+                        1 + count.bit_length() // 8, byteorder="big"
+                    ),
+                )
+
+            key = None
+            count = 0
+            record = cursor.first()
+            while record:
+                record_key, value = cursor.item()
+                if record_key != key:
+                    if key is not None:
+                        put_count()
+                        total += count
+                    key = record_key
+                    count = 0
+                if len(value) > SEGMENT_HEADER_LENGTH:
+                    count += int.from_bytes(
+                        value[4:SEGMENT_HEADER_LENGTH], byteorder="big"
+                    )
+                else:
+                    count += 1
+                record = cursor.next()
+            if key is not None:
+                put_count()
+                total += count
+        self._put_record_count(total)
@@ -16,6 +16,7 @@ from .recordset import (
     RecordsetSegmentBitarray,
     RecordsetSegmentInt,
     RecordsetSegmentList,
+    RecordsetSegmentRun,
 )
 from . import _databasedu
 
@@ -115,6 +116,11 @@ class Database(_databasedu.Database):
     def unset_defer_update(self):
         """Unset deferred update for db DBs. Default all."""
         self.set_int_to_bytes_lookup(lookup=False)
+
+        # The deferred update writers do not maintain cached RecordLists or
+        # position checkpoint summaries.
+        self.clear_recordlist_cache()
+        self.clear_position_checkpoints()
         for file in self.specification:
             self.high_segment[file] = None
             self.first_chunk[file] = None
@@ -188,7 +194,9 @@ class Database(_databasedu.Database):
                     )
                 new_count = segvalues[skey][0] + current_count
 
-                if isinstance(seg, RecordsetSegmentBitarray):
+                if isinstance(
+                    seg, (RecordsetSegmentBitarray, RecordsetSegmentRun)
+                ):
                     # self._path_marker.add('p5a')
                     if isinstance(current_segment, RecordsetSegmentList):
                         # self._path_marker.add('p5a-a')
@@ -326,10 +334,18 @@ class Database(_databasedu.Database):
         if field not in self.value_segments[file]:
             return
 
+        # Cached RecordLists may not include the records written here.
+        self.clear_recordlist_cache()
+
         # Prepare to wrap the record numbers in an appropriate Segment class.
         self._prepare_segment_record_list(file, field)
         segvalues = self.value_segments[file][field]
 
+        # The records are new so each count is an increase.
+        self.index_record_count[file, field].write_changes(
+            {k.encode(): svk[0] for k, svk in segvalues.items()}
+        )
+
         # New records go into temporary databases, one for each segment, except
         # when filling the segment which was high when this update started.
         if (
@@ -471,10 +487,13 @@ class Database(_databasedu.Database):
 
     def delete_index(self, file, field):
         """Remove all records from database for field in file."""
+        self.clear_recordlist_cache()
+        self.clear_position_checkpoints()
         self.dbtxn.transaction.drop(
             self.table[SUBFILE_DELIMITER.join((file, field))].datastore,
             delete=False,
         )
+        self.index_record_count[file, field].create_counts()
 
     def merge_writer(self, file, field):
         """Return a Writer instance for the field index on table file.
@@ -497,6 +516,12 @@ class Database(_databasedu.Database):
                     None,
                     records=bytestring_records,
                 )
+            if len(bytestring_records) % 2:
+                return RecordsetSegmentRun(
+                    int.from_bytes(high[1], byteorder="big"),
+                    None,
+                    records=bytestring_records,
+                )
             return RecordsetSegmentList(
                 int.from_bytes(high[1], byteorder="big"),
                 None,
@@ -516,6 +541,12 @@ class Database(_databasedu.Database):
                     None,
                     records=item[3],
                 )
+            if len(item[3]) % 2:
+                return RecordsetSegmentRun(
+                    int.from_bytes(item[1], byteorder="big"),
+                    None,
+                    records=item[3],
+                )
             return RecordsetSegmentList(
                 int.from_bytes(item[1], byteorder="big"),
                 None,
@@ -561,6 +592,9 @@ class Database(_databasedu.Database):
                 self.prev_segment = None
                 self.prev_key = None
                 self.database = database
+                self.index_record_count = database.index_record_count[
+                    file, field
+                ]
                 self.cursor = self.database.dbtxn.transaction.cursor(table)
                 self.segment_cursor = self.database.dbtxn.transaction.cursor(
                     db=datastore
@@ -586,6 +620,9 @@ class Database(_databasedu.Database):
                     self.prev_segment = segment
                     self.prev_key = item[0]
                     item_type = item.pop(2)
+                    self.index_record_count.change_count(
+                        item[0], int.from_bytes(item[2], byteorder="big")
+                    )
                     if item_type == EXISTING_SEGMENT_REFERENCE:
                         assert len(item) == 4
                         if item[-2] == b"\x00\x01":
@@ -616,6 +653,11 @@ class Database(_databasedu.Database):
                         high, self.database.dbtxn.transaction
                     )
                     new_segment.normalize()
+                    self.index_record_count.change_count(
+                        item[0],
+                        new_segment.count_records()
+                        - int.from_bytes(high[2], byteorder="big"),
+                    )
                     item[-2] = (
                         self.database.encode_number_for_sequential_file_dump(
                             new_segment.count_records(), 2
@@ -641,6 +683,9 @@ class Database(_databasedu.Database):
                     assert len(item) == 4
                     return
                 item_type = item.pop(2)
+                self.index_record_count.change_count(
+                    item[0], int.from_bytes(item[2], byteorder="big")
+                )
                 if item_type == EXISTING_SEGMENT_REFERENCE:
                     assert len(item) == 4
                     self.prev_key = item[0]
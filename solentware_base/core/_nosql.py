@@ -43,6 +43,16 @@ from . import _database
 from . import tree
 from .bytebit import Bitarray, SINGLEBIT
 from .segmentsize import SegmentSize
+from .recordlistcache import KEY_EQ, KEY_STARTSWITH, KEY_RANGE
+from .nosqllayout import (
+    is_binary_layout,
+    encode_records,
+    decode_records,
+    encode_segment_table,
+    decode_segment_table,
+    encode_segment_numbers,
+    decode_segment_numbers,
+)
 
 # Some names are imported '* as _*' to avoid confusion with sensible
 # object names within the _sqlite module.
@@ -54,6 +64,7 @@ from .recordset import (
     RecordsetSegmentBitarray,
     RecordsetSegmentInt,
     RecordsetSegmentList,
+    RecordsetSegmentRun,
     RecordList,
     FoundSet,
     Location,
@@ -143,17 +154,31 @@ class Database(_database.Database):
 
     def start_transaction(self):
         """Start a transaction."""
+        self.start_existence_cache()
         if self.dbenv:
             self.dbenv.begin()
+            for tree_ in self.trees.values():
+                tree_.start_write_back()
 
     def backout(self):
         """Backout tranaction."""
+        self.clear_recordlist_cache()
+        self.discard_existence_cache()
         if self.dbenv:
+            # Engines without transactions keep the tree nodes written
+            # before rollback, so the trees stay consistent with the index
+            # values written during the transaction.
+            for tree_ in self.trees.values():
+                tree_.stop_write_back()
+                tree_.clear_node_cache()
             self.dbenv.rollback()
 
     def commit(self):
         """Commit tranaction."""
+        self.discard_existence_cache()
         if self.dbenv:
+            for tree_ in self.trees.values():
+                tree_.stop_write_back()
             self.dbenv.commit()
 
     def _default_checkpoint_guard(self):
@@ -210,6 +235,9 @@ class Database(_database.Database):
         database engine does not support transaction commit and backout.
 
         """
+        if self.dbenv:
+            for tree_ in self.trees.values():
+                tree_.write_back()
         name = self.generate_database_file_name(self.database_file)
         with open(os.path.join(".".join((name, "stage1"))), "xb") as stage1:
             with open(name, "rb") as original:
@@ -527,6 +555,8 @@ class Database(_database.Database):
         The files argument is ignored because the connection object is deleted.
 
         """
+        self.clear_recordlist_cache()
+        self.discard_existence_cache()
         del files
         self.table = {}
         self.table_data = {}
@@ -534,6 +564,8 @@ class Database(_database.Database):
         self.segment_records = {}
         self.ebm_control = {}
         if self.dbenv is not None:
+            for tree_ in self.trees.values():
+                tree_.stop_write_back()
             self.dbenv.close()
             self.dbenv = None
         self.segment_size_bytes = self._initial_segment_size_bytes
@@ -604,6 +636,23 @@ class Database(_database.Database):
             return key, self.dbenv[dbkey].decode()
         return None
 
+    def get_primary_records(self, file, keys):
+        """Return list of (key, value) for records in file with keys.
+
+        The dbm-like interfaces have no multiple get so the records are
+        read in one loop without the get_primary_record() call overhead.
+
+        """
+        assert file in self.specification
+        dbenv = self.dbenv
+        prefix = self.table_data[file] + SUBFILE_DELIMITER
+        records = []
+        for key in keys:
+            dbkey = prefix + str(key)
+            if dbkey in dbenv:
+                records.append((key, dbenv[dbkey].decode()))
+        return records
+
     def encode_record_number(self, key):
         """Return repr(key) because this is sqlite3 version.
 
@@ -639,8 +688,8 @@ class Database(_database.Database):
         ebmc = self.ebm_control[dbset]
         if ebmc.freed_record_number_pages is None:
             if ebmc.ebm_freed in self.dbenv:
-                ebmc.freed_record_number_pages = literal_eval(
-                    self.dbenv[ebmc.ebm_freed].decode()
+                ebmc.freed_record_number_pages = decode_segment_numbers(
+                    self.dbenv[ebmc.ebm_freed]
                 )
             else:
                 ebmc.freed_record_number_pages = []
@@ -655,7 +704,7 @@ class Database(_database.Database):
             if lfrns is None:
                 # Segment does not exist now.
                 ebmc.freed_record_number_pages.remove(segment_number)
-                self.dbenv[ebmc.ebm_freed] = repr(
+                self.dbenv[ebmc.ebm_freed] = encode_segment_numbers(
                     ebmc.freed_record_number_pages
                 )
                 continue
@@ -665,7 +714,7 @@ class Database(_database.Database):
             except ValueError:
                 # No longer any record numbers available for re-use in segment.
                 ebmc.freed_record_number_pages.remove(segment_number)
-                self.dbenv[ebmc.ebm_freed] = repr(
+                self.dbenv[ebmc.ebm_freed] = encode_segment_numbers(
                     ebmc.freed_record_number_pages
                 )
                 continue
@@ -708,8 +757,8 @@ class Database(_database.Database):
         ebmc = self.ebm_control[dbset]
         if ebmc.freed_record_number_pages is None:
             if ebmc.ebm_freed in self.dbenv:
-                ebmc.freed_record_number_pages = literal_eval(
-                    self.dbenv[ebmc.ebm_freed].decode()
+                ebmc.freed_record_number_pages = decode_segment_numbers(
+                    self.dbenv[ebmc.ebm_freed]
                 )
             else:
                 ebmc.freed_record_number_pages = []
@@ -719,7 +768,9 @@ class Database(_database.Database):
                 if ebmc.freed_record_number_pages[insert] == segment:
                     return
         ebmc.freed_record_number_pages.insert(insert, segment)
-        self.dbenv[ebmc.ebm_freed] = repr(ebmc.freed_record_number_pages)
+        self.dbenv[ebmc.ebm_freed] = encode_segment_numbers(
+            ebmc.freed_record_number_pages
+        )
 
     def remove_record_from_ebm(self, file, deletekey):
         """Remove deletekey from file's existence bitmap; return key.
@@ -727,6 +778,7 @@ class Database(_database.Database):
         deletekey is split into segment number and record number within
         segment to form the returned value.
         """
+        self.invalidate_existence_cache(file)
         segment, record_number = divmod(deletekey, SegmentSize.db_segment_size)
         ebmcf = self.ebm_control[file]
         ebmb = ebmcf.get_ebm_segment(segment, self.dbenv)
@@ -748,6 +800,7 @@ class Database(_database.Database):
         putkey is split into segment number and record number within
         segment to form the returned value.
         """
+        self.invalidate_existence_cache(file)
         segment, record_number = divmod(putkey, SegmentSize.db_segment_size)
         ebmcf = self.ebm_control[file]
         ebmb = ebmcf.get_ebm_segment(segment, self.dbenv)
@@ -786,6 +839,7 @@ class Database(_database.Database):
         increases the number of records in the set above the relevant
         limit.
         """
+        self.invalidate_recordlist_cache(file, field, key)
         segment_table_key = SUBFILE_DELIMITER.join(
             (self.segment_table[SUBFILE_DELIMITER.join((file, field))], key)
         )
@@ -794,12 +848,14 @@ class Database(_database.Database):
             # Insert key into tree before creating segment_table_key record.
             if SUBFILE_DELIMITER.join((file, field)) in self.trees:
                 self.trees[SUBFILE_DELIMITER.join((file, field))].insert(key)
-            db[segment_table_key] = repr({segment: (record_number, 1)})
+            db[segment_table_key] = encode_segment_table(
+                {segment: (record_number, 1)}
+            )
             return
-        segment_table = literal_eval(db[segment_table_key].decode())
+        segment_table = decode_segment_table(db[segment_table_key])
         if segment not in segment_table:
             segment_table[segment] = record_number, 1
-            db[segment_table_key] = repr(segment_table)
+            db[segment_table_key] = encode_segment_table(segment_table)
             return
         reference = segment_table[segment][0]
         if isinstance(reference, int):
@@ -815,13 +871,13 @@ class Database(_database.Database):
                     key,
                 )
             )
-            db[segment_records_key] = repr(
+            db[segment_records_key] = encode_records(
                 b"".join(
                     [n.to_bytes(2, byteorder="big") for n in segment_records]
                 )
             )
             segment_table[segment] = LIST_BYTES, len(segment_records)
-            db[segment_table_key] = repr(segment_table)
+            db[segment_table_key] = encode_segment_table(segment_table)
             return
         segment_records_key = SUBFILE_DELIMITER.join(
             (
@@ -834,33 +890,33 @@ class Database(_database.Database):
             segment_records = RecordsetSegmentList(
                 segment,
                 key,
-                records=literal_eval(db[segment_records_key].decode()),
+                records=decode_records(db[segment_records_key]),
             )
             segment_records.insort_left_nodup(record_number)
             count = segment_records.count_records()
             if count > SegmentSize.db_upper_conversion_limit:
-                db[segment_records_key] = repr(
+                db[segment_records_key] = encode_records(
                     segment_records.promote().tobytes()
                 )
                 segment_table[segment] = BITMAP_BYTES, count
-                db[segment_table_key] = repr(segment_table)
+                db[segment_table_key] = encode_segment_table(segment_table)
                 return
-            db[segment_records_key] = repr(segment_records.tobytes())
+            db[segment_records_key] = encode_records(segment_records.tobytes())
             segment_table[segment] = LIST_BYTES, count
-            db[segment_table_key] = repr(segment_table)
+            db[segment_table_key] = encode_segment_table(segment_table)
             return
         assert reference == BITMAP_BYTES
         segment_records = RecordsetSegmentBitarray(
             segment,
             key,
-            records=literal_eval(db[segment_records_key].decode()),
+            records=decode_records(db[segment_records_key]),
         )
         # Cheat a little rather than say:
         # segment_records[segment * <segment size> + record_number] = True
         segment_records.bitarray[record_number] = True
-        db[segment_records_key] = repr(segment_records.tobytes())
+        db[segment_records_key] = encode_records(segment_records.tobytes())
         segment_table[segment] = BITMAP_BYTES, segment_records.count_records()
-        db[segment_table_key] = repr(segment_table)
+        db[segment_table_key] = encode_segment_table(segment_table)
         return
 
     def remove_record_from_field_value(
@@ -874,13 +930,14 @@ class Database(_database.Database):
         converted from bitmap to list to integer if the removal reduces
         the number of records in the set below the relevant limit.
         """
+        self.invalidate_recordlist_cache(file, field, key)
         segment_table_key = SUBFILE_DELIMITER.join(
             (self.segment_table[SUBFILE_DELIMITER.join((file, field))], key)
         )
         db = self.dbenv
         if segment_table_key not in db:
             return
-        segment_table = literal_eval(db[segment_table_key].decode())
+        segment_table = decode_segment_table(db[segment_table_key])
         if segment not in segment_table:
             return
         reference = segment_table[segment][0]
@@ -897,16 +954,18 @@ class Database(_database.Database):
             segment_records = RecordsetSegmentBitarray(
                 segment,
                 key,
-                records=literal_eval(db[segment_records_key].decode()),
+                records=decode_records(db[segment_records_key]),
             )
             # Cheat a little rather than say:
             # segment_records[segment * <segment size> + record_number] = False
             segment_records.bitarray[record_number] = False
             count = segment_records.count_records()
             if count > SegmentSize.db_lower_conversion_limit:
-                db[segment_records_key] = repr(segment_records.tobytes())
+                db[segment_records_key] = encode_records(
+                    segment_records.tobytes()
+                )
                 segment_table[segment] = BITMAP_BYTES, count
-                db[segment_table_key] = repr(segment_table)
+                db[segment_table_key] = encode_segment_table(segment_table)
                 return
             # Cheat a little rather than say:
             # segment_records = segment_records.normalize(
@@ -914,9 +973,9 @@ class Database(_database.Database):
             # )
             rsl = RecordsetSegmentList(segment, key)
             rsl.list.extend(segment_records.bitarray.search(SINGLEBIT))
-            db[segment_records_key] = repr(rsl.tobytes())
+            db[segment_records_key] = encode_records(rsl.tobytes())
             segment_table[segment] = LIST_BYTES, len(rsl.list)
-            db[segment_table_key] = repr(segment_table)
+            db[segment_table_key] = encode_segment_table(segment_table)
             return
         if reference == LIST_BYTES:
             segment_records_key = SUBFILE_DELIMITER.join(
@@ -931,7 +990,7 @@ class Database(_database.Database):
             segment_records = RecordsetSegmentList(
                 segment,
                 key,
-                records=literal_eval(db[segment_records_key].decode()),
+                records=decode_records(db[segment_records_key]),
             )
             # Cheating is only option!
             srl = segment_records.list
@@ -940,18 +999,20 @@ class Database(_database.Database):
                 del srl[discard - 1]
             count = segment_records.count_records()
             if count > 1:
-                db[segment_records_key] = repr(segment_records.tobytes())
+                db[segment_records_key] = encode_records(
+                    segment_records.tobytes()
+                )
                 segment_table[segment] = LIST_BYTES, count
-                db[segment_table_key] = repr(segment_table)
+                db[segment_table_key] = encode_segment_table(segment_table)
                 return
             del db[segment_records_key]
             segment_table[segment] = segment_records.list[0], 1
-            db[segment_table_key] = repr(segment_table)
+            db[segment_table_key] = encode_segment_table(segment_table)
             return
         if reference == record_number:
             del segment_table[segment]
             if len(segment_table):
-                db[segment_table_key] = repr(segment_table)
+                db[segment_table_key] = encode_segment_table(segment_table)
             else:
                 # Delete segment_table_key record before deleting key
                 # from tree.
@@ -982,22 +1043,28 @@ class Database(_database.Database):
             segment_number, None, records=segment_reference
         )
 
-    def populate_recordset(self, recordset, db, keyprefix, segmentprefix, key):
+    def populate_recordset(
+        self, recordset, db, keyprefix, segmentprefix, key, within=None
+    ):
         """Populate recordset with segments of records for key.
 
         Existing segments in recordset are replaced only if a segment
         with the same key and record number is found on database.
 
+        Segments with no records in within, if given, are ignored.
+
         """
-        segment_records = literal_eval(
-            db[SUBFILE_DELIMITER.join((segmentprefix, key))].decode()
+        segment_records = decode_segment_table(
+            db[SUBFILE_DELIMITER.join((segmentprefix, key))]
         )
         for segment_number, record_number in segment_records.items():
+            if within is not None and segment_number not in within:
+                continue
             if record_number[0] == LIST_BYTES:
                 segment = RecordsetSegmentList(
                     segment_number,
                     None,
-                    records=literal_eval(
+                    records=decode_records(
                         db[
                             SUBFILE_DELIMITER.join(
                                 (
@@ -1007,14 +1074,14 @@ class Database(_database.Database):
                                     key,
                                 )
                             )
-                        ].decode()
+                        ]
                     ),
                 )
             elif record_number[0] == BITMAP_BYTES:
                 segment = RecordsetSegmentBitarray(
                     segment_number,
                     None,
-                    records=literal_eval(
+                    records=decode_records(
                         db[
                             SUBFILE_DELIMITER.join(
                                 (
@@ -1024,7 +1091,7 @@ class Database(_database.Database):
                                     key,
                                 )
                             )
-                        ].decode()
+                        ]
                     ),
                 )
             else:
@@ -1266,12 +1333,12 @@ class Database(_database.Database):
                 continue
             if segment_end is not None and segment_number > segment_end:
                 continue
-            segment_record = literal_eval(
+            segment_record = decode_records(
                 self.dbenv[
                     SUBFILE_DELIMITER.join(
                         (ebmcf.ebm_table, str(segment_number))
                     )
-                ].decode()
+                ]
             )
             if segment_number == segment_start:
                 if recnum_start:
@@ -1306,21 +1373,24 @@ class Database(_database.Database):
 
     def recordlist_ebm(self, file, cache_size=1):
         """Return RecordList containing records on file."""
+        recordlist = self.get_cached_existence(file, cache_size=cache_size)
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         ebm_table = self.ebm_control[file].ebm_table
         for segment_number in self.ebm_control[file].table_ebm_segments:
             recordlist[segment_number] = RecordsetSegmentBitarray(
                 segment_number,
                 None,
-                records=literal_eval(
+                records=decode_records(
                     self.dbenv[
                         SUBFILE_DELIMITER.join(
                             (ebm_table, str(segment_number))
                         )
-                    ].decode()
+                    ]
                 ),
             )
-        return recordlist
+        return self.cache_existence(file, recordlist, cache_size=cache_size)
 
     def recordlist_key_like(self, file, field, keylike=None, cache_size=1):
         """Return RecordList containing records for field on file.
@@ -1358,8 +1428,18 @@ class Database(_database.Database):
             cursor.close()
         return recordlist
 
-    def recordlist_key(self, file, field, key=None, cache_size=1):
-        """Return RecordList on file containing records for field with key."""
+    def recordlist_key(self, file, field, key=None, cache_size=1, within=None):
+        """Return RecordList on file containing records for field with key.
+
+        Records in segments with no records in within, if given, may be
+        omitted.
+
+        """
+        recordlist = self.get_cached_recordlist(
+            file, field, (KEY_EQ, key), cache_size=cache_size
+        )
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         db = self.dbenv
         key_root = self.table[SUBFILE_DELIMITER.join((file, field))]
@@ -1368,8 +1448,8 @@ class Database(_database.Database):
         # first without the try wrapper.  Not understood but left as it
         # is for now.
         try:
-            segment_records = literal_eval(
-                db[SUBFILE_DELIMITER.join((key_segment, key))].decode()
+            segment_records = decode_segment_table(
+                db[SUBFILE_DELIMITER.join((key_segment, key))]
             )
         except KeyError:
             return recordlist
@@ -1377,8 +1457,14 @@ class Database(_database.Database):
             if key is not None:
                 raise
             return recordlist
-        self.populate_recordset(recordlist, db, key_root, key_segment, key)
-        return recordlist
+        self.populate_recordset(
+            recordlist, db, key_root, key_segment, key, within=within
+        )
+        if within is not None:
+            return recordlist
+        return self.cache_recordlist(
+            file, field, (KEY_EQ, key), recordlist, cache_size=cache_size
+        )
 
     def recordlist_key_startswith(
         self, file, field, keystart=None, cache_size=1
@@ -1393,6 +1479,11 @@ class Database(_database.Database):
                     ("'", field, "' field in '", file, "' file is not ordered")
                 )
             )
+        recordlist = self.get_cached_recordlist(
+            file, field, (KEY_STARTSWITH, keystart), cache_size=cache_size
+        )
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         if keystart is None:
             return recordlist
@@ -1414,14 +1505,32 @@ class Database(_database.Database):
                 k = cursor.next()
         finally:
             cursor.close()
-        return recordlist
+        return self.cache_recordlist(
+            file,
+            field,
+            (KEY_STARTSWITH, keystart),
+            recordlist,
+            cache_size=cache_size,
+        )
 
     def recordlist_key_range(
-        self, file, field, ge=None, gt=None, le=None, lt=None, cache_size=1
+        self,
+        file,
+        field,
+        ge=None,
+        gt=None,
+        le=None,
+        lt=None,
+        cache_size=1,
+        within=None,
     ):
         """Return RecordList containing records for field on file.
 
         Keys are in range set by combinations of ge, gt, le, and lt.
+
+        Records in segments with no records in within, if given, may be
+        omitted.
+
         """
         if SUBFILE_DELIMITER.join((file, field)) not in self.trees:
             raise DatabaseError(
@@ -1433,6 +1542,11 @@ class Database(_database.Database):
             raise DatabaseError("Both 'ge' and 'gt' given in key range")
         if isinstance(le, str) and isinstance(lt, str):
             raise DatabaseError("Both 'le' and 'lt' given in key range")
+        recordlist = self.get_cached_recordlist(
+            file, field, (KEY_RANGE, ge, gt, le, lt), cache_size=cache_size
+        )
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         db = self.dbenv
         fieldtree = self.trees[SUBFILE_DELIMITER.join((file, field))]
@@ -1455,6 +1569,7 @@ class Database(_database.Database):
                         fieldtree.key_root,
                         fieldtree.key_segment,
                         k,
+                        within=within,
                     )
                     k = cursor.next()
             elif lt is None:
@@ -1467,6 +1582,7 @@ class Database(_database.Database):
                         fieldtree.key_root,
                         fieldtree.key_segment,
                         k,
+                        within=within,
                     )
                     k = cursor.next()
             else:
@@ -1479,11 +1595,87 @@ class Database(_database.Database):
                         fieldtree.key_root,
                         fieldtree.key_segment,
                         k,
+                        within=within,
                     )
                     k = cursor.next()
         finally:
             cursor.close()
-        return recordlist
+        if within is not None:
+            return recordlist
+        return self.cache_recordlist(
+            file,
+            field,
+            (KEY_RANGE, ge, gt, le, lt),
+            recordlist,
+            cache_size=cache_size,
+        )
+
+    def estimate_recordlist_key(self, file, field, key=None):
+        """Return number of records recordlist_key would find for key.
+
+        The record counts in the segment table for key are summed: segments
+        are not read.
+
+        """
+        if key is None:
+            return 0
+        key_root = self.table[SUBFILE_DELIMITER.join((file, field))]
+        key_segment = SUBFILE_DELIMITER.join((key_root, SEGMENT_KEY_SUFFIX))
+        try:
+            segment_table = self.dbenv[
+                SUBFILE_DELIMITER.join((key_segment, key))
+            ]
+        except KeyError:
+            return 0
+        return sum(
+            reference[1]
+            for reference in decode_segment_table(segment_table).values()
+        )
+
+    def estimate_recordlist_key_range(
+        self, file, field, ge=None, gt=None, le=None, lt=None
+    ):
+        """Return upper bound of records recordlist_key_range would find.
+
+        The record counts in the segment tables for keys in range are
+        summed, so records with more than one key in range are counted for
+        each key.  Segments are not read.
+
+        None is returned if field is not ordered.
+
+        """
+        fieldkey = SUBFILE_DELIMITER.join((file, field))
+        if fieldkey not in self.trees:
+            return None
+        db = self.dbenv
+        fieldtree = self.trees[fieldkey]
+        count = 0
+        cursor = tree.Cursor(fieldtree)
+        try:
+            if ge is None and gt is None:
+                k = cursor.first()
+            else:
+                k = cursor.nearest(ge or gt or "")
+            while k is not None:
+                if le is not None and k > le:
+                    break
+                if lt is not None and k >= lt:
+                    break
+                if gt is None or k > gt:
+                    count += sum(
+                        reference[1]
+                        for reference in decode_segment_table(
+                            db[
+                                SUBFILE_DELIMITER.join(
+                                    (fieldtree.key_segment, k)
+                                )
+                            ]
+                        ).values()
+                    )
+                k = cursor.next()
+        finally:
+            cursor.close()
+        return count
 
     def recordlist_all(self, file, field, cache_size=1):
         """Return RecordList on file containing records for field."""
@@ -1524,6 +1716,7 @@ class Database(_database.Database):
         is deleted.
 
         """
+        self.invalidate_recordlist_cache(file, field, key)
         assert file in self.table
         fieldkey = SUBFILE_DELIMITER.join((file, field))
         table_key = SUBFILE_DELIMITER.join((self.segment_table[fieldkey], key))
@@ -1531,9 +1724,7 @@ class Database(_database.Database):
         db = self.dbenv
         if table_key not in db:
             return
-        for segment_number, ref in literal_eval(
-            db[table_key].decode()
-        ).items():
+        for segment_number, ref in decode_segment_table(db[table_key]).items():
             if isinstance(ref[0], str):
                 del db[
                     SUBFILE_DELIMITER.join(
@@ -1546,6 +1737,7 @@ class Database(_database.Database):
 
     def file_records_under(self, file, field, recordset, key):
         """Replace records for index field[key] with recordset records."""
+        self.invalidate_recordlist_cache(file, field, key)
         assert recordset.dbset == file
         assert file in self.table
         fieldkey = SUBFILE_DELIMITER.join((file, field))
@@ -1559,12 +1751,15 @@ class Database(_database.Database):
         db = self.dbenv
         segments = {}
         for segment_number, rs_segment in recordset.rs_segments.items():
+            # Runs are not stored on this database engine.
+            if isinstance(rs_segment, RecordsetSegmentRun):
+                rs_segment = rs_segment.promote()
             if isinstance(rs_segment, RecordsetSegmentBitarray):
                 db[
                     SUBFILE_DELIMITER.join(
                         (segment_key, str(segment_number), key)
                     )
-                ] = repr(rs_segment.tobytes())
+                ] = encode_records(rs_segment.tobytes())
                 segments[segment_number] = (
                     BITMAP_BYTES,
                     rs_segment.count_records(),
@@ -1574,7 +1769,7 @@ class Database(_database.Database):
                     SUBFILE_DELIMITER.join(
                         (segment_key, str(segment_number), key)
                     )
-                ] = repr(rs_segment.tobytes())
+                ] = encode_records(rs_segment.tobytes())
                 segments[segment_number] = (
                     LIST_BYTES,
                     rs_segment.count_records(),
@@ -1583,10 +1778,85 @@ class Database(_database.Database):
                 segments[segment_number] = rs_segment.record_number, 1
         if fieldkey in self.trees:
             self.trees[fieldkey].insert(key)
-        db[SUBFILE_DELIMITER.join((self.segment_table[fieldkey], key))] = repr(
-            segments
+        db[SUBFILE_DELIMITER.join((self.segment_table[fieldkey], key))] = (
+            encode_segment_table(segments)
         )
 
+    def upgrade_layout(self, files=None):
+        """Rewrite index values in files stored by repr() in binary layout.
+
+        The existence bitmaps and lists of segment numbers, and the segment
+        tables and lists and bitmaps of records for ordered fields, are
+        rewritten.  Values for fields without a tree cannot be found so
+        they are rewritten when next updated.
+
+        Key counts are added to the tree nodes of ordered fields which do
+        not have them.
+
+        Return the number of values, including tree nodes, rewritten.
+
+        """
+        db = self.dbenv
+        upgraded = 0
+
+        def upgrade(key, decode, encode):
+            value = db[key]
+            if is_binary_layout(value):
+                return 0
+            db[key] = encode(decode(value))
+            return 1
+
+        if files is None:
+            files = self.specification.keys()
+        for file in files:
+            ebmc = self.ebm_control[file]
+            upgraded += upgrade(
+                ebmc.ebm_table, decode_segment_numbers, encode_segment_numbers
+            )
+            if ebmc.ebm_freed in db:
+                upgraded += upgrade(
+                    ebmc.ebm_freed,
+                    decode_segment_numbers,
+                    encode_segment_numbers,
+                )
+            for segment_number in ebmc.table_ebm_segments:
+                upgraded += upgrade(
+                    SUBFILE_DELIMITER.join(
+                        (ebmc.ebm_table, str(segment_number))
+                    ),
+                    decode_records,
+                    encode_records,
+                )
+            for field in self.specification[file][SECONDARY]:
+                fieldkey = SUBFILE_DELIMITER.join((file, field))
+                if fieldkey not in self.trees:
+                    continue
+                segment_key = self.segment_records[fieldkey]
+                cursor = tree.Cursor(self.trees[fieldkey])
+                while True:
+                    key = cursor.next()
+                    if key is None:
+                        break
+                    table_key = SUBFILE_DELIMITER.join(
+                        (self.segment_table[fieldkey], key)
+                    )
+                    segment_table = decode_segment_table(db[table_key])
+                    for segment_number, ref in segment_table.items():
+                        if isinstance(ref[0], str):
+                            upgraded += upgrade(
+                                SUBFILE_DELIMITER.join(
+                                    (segment_key, str(segment_number), key)
+                                ),
+                                decode_records,
+                                encode_records,
+                            )
+                    upgraded += upgrade(
+                        table_key, decode_segment_table, encode_segment_table
+                    )
+                cursor.close()
+                upgraded += self.trees[fieldkey].upgrade_counts()
+        return upgraded
+
     def database_cursor(self, file, field, keyrange=None, recordset=None):
         """Create and return a cursor on SQLite Connection() for (file, field).
 
@@ -1691,6 +1961,10 @@ class Database(_database.Database):
             taskmethod(db, logwidget, **taskmethodargs)
         finally:
             db.close_database()
+            # The task may have changed tree nodes held in this database's
+            # tree node caches.
+            for tree_ in self.trees.values():
+                tree_.clear_node_cache()
 
     # Anticipate maintaining a cache of database (key, value) objects.
     def _read_key(self, key):
@@ -2666,9 +2940,7 @@ class ExistenceBitmapControl(_database.ExistenceBitmapControl):
     str(int()) because <file>_<field>_<str(int())> are the data record keys.
 
     table_ebm_segments is the set of segment numbers which exist on the file.
-    It is stored on the database as a tuple because literal_eval(set()) raises
-    a ValueError exception.  Fortunately we are not trying to put a set in the
-    tuple, which gives a TypeError exception in repr().
+    It is a sorted list stored on the database by encode_segment_numbers.
     """
 
     def __init__(self, file, notional_field, database):
@@ -2705,8 +2977,8 @@ class ExistenceBitmapControl(_database.ExistenceBitmapControl):
         # will solve the problem at the repr and literal_eval interface.
         # Otherwise it's pickle.
         if self.ebm_table not in dbenv:
-            dbenv[self.ebm_table] = repr([])
-        self.table_ebm_segments = literal_eval(dbenv[self.ebm_table].decode())
+            dbenv[self.ebm_table] = encode_segment_numbers([])
+        self.table_ebm_segments = decode_segment_numbers(dbenv[self.ebm_table])
 
         self._segment_count = len(self.table_ebm_segments)
         self.set_high_record_number(dbenv)
@@ -2726,10 +2998,8 @@ class ExistenceBitmapControl(_database.ExistenceBitmapControl):
         tes = self.table_ebm_segments
         insertion_point = bisect_right(tes, key)
         if tes and tes[insertion_point - 1] == key:
-            return literal_eval(
-                dbenv[
-                    SUBFILE_DELIMITER.join((self.ebm_table, str(key)))
-                ].decode()
+            return decode_records(
+                dbenv[SUBFILE_DELIMITER.join((self.ebm_table, str(key)))]
             )
         return None
 
@@ -2741,7 +3011,7 @@ class ExistenceBitmapControl(_database.ExistenceBitmapControl):
         if tes and tes[insertion_point - 1] == key:
             del dbenv[SUBFILE_DELIMITER.join((self.ebm_table, str(key)))]
             del self.table_ebm_segments[insertion_point - 1]
-            dbenv[self.ebm_table] = repr(tes)
+            dbenv[self.ebm_table] = encode_segment_numbers(tes)
             self._segment_count = len(tes)
 
     def put_ebm_segment(self, key, value, dbenv):
@@ -2749,17 +3019,19 @@ class ExistenceBitmapControl(_database.ExistenceBitmapControl):
         tes = self.table_ebm_segments
         insertion_point = bisect_right(tes, key)
         if tes and tes[insertion_point - 1] == key:
-            dbenv[SUBFILE_DELIMITER.join((self.ebm_table, str(key)))] = repr(
-                value
+            dbenv[SUBFILE_DELIMITER.join((self.ebm_table, str(key)))] = (
+                encode_records(value)
             )
 
     def append_ebm_segment(self, value, dbenv):
         """Add existence bitmap, value, to database, dbenv."""
         segments = self.table_ebm_segments
         key = segments[-1] + 1 if len(segments) else 0
-        dbenv[SUBFILE_DELIMITER.join((self.ebm_table, str(key)))] = repr(value)
+        dbenv[SUBFILE_DELIMITER.join((self.ebm_table, str(key)))] = (
+            encode_records(value)
+        )
         segments.append(key)
-        dbenv[self.ebm_table] = repr(segments)
+        dbenv[self.ebm_table] = encode_segment_numbers(segments)
         self._segment_count = len(segments)
         return key
 
@@ -2789,7 +3061,7 @@ class SegmentsetCursor:
         self.current_segment_number = None
         self._dbenv = dbenv
         self._index = "".join((segment_table_prefix, key))
-        self.segments = literal_eval(self._dbenv[self._index].decode())
+        self.segments = decode_segment_table(self._dbenv[self._index])
         self.sorted_segment_numbers = sorted(self.segments)
         self._values_index = value_prefix, "".join((SUBFILE_DELIMITER, key))
 
@@ -2868,20 +3140,16 @@ class SegmentsetCursor:
             return RecordsetSegmentBitarray(
                 segment_number,
                 key,
-                records=literal_eval(
-                    self._dbenv[
-                        str(segment_number).join(self._values_index)
-                    ].decode()
+                records=decode_records(
+                    self._dbenv[str(segment_number).join(self._values_index)]
                 ),
             )
         if segment_type == LIST_BYTES:
             return RecordsetSegmentList(
                 segment_number,
                 key,
-                records=literal_eval(
-                    self._dbenv[
-                        str(segment_number).join(self._values_index)
-                    ].decode()
+                records=decode_records(
+                    self._dbenv[str(segment_number).join(self._values_index)]
                 ),
             )
         return RecordsetSegmentInt(
@@ -11,7 +11,6 @@ modules can be found in PyPI.
 
 """
 
-from ast import literal_eval
 from bisect import bisect_right
 
 from .constants import (
@@ -24,7 +23,14 @@ from .constants import (
 )
 from .segmentsize import SegmentSize
 from . import _databasedu
-from .recordset import RecordsetSegmentList
+from .recordset import RecordsetSegmentList, RecordsetSegmentRun
+from .nosqllayout import (
+    encode_records,
+    decode_records,
+    encode_segment_table,
+    decode_segment_table,
+    encode_segment_numbers,
+)
 
 
 class DatabaseError(_databasedu.DatabaseduError):
@@ -73,6 +79,8 @@ class Database(_databasedu.Database):
 
         """
         self._commit_on_housekeeping()
+        for tree_ in self.trees.values():
+            tree_.start_write_back()
 
     def do_final_segment_deferred_updates(self):
         """Do deferred updates for partially filled final segment."""
@@ -111,6 +119,11 @@ class Database(_databasedu.Database):
     def unset_defer_update(self):
         """Tidy-up at end of deferred update run."""
         self.set_int_to_bytes_lookup(lookup=False)
+
+        # The deferred update writers do not maintain cached RecordLists or
+        # position checkpoint summaries.
+        self.clear_recordlist_cache()
+        self.clear_position_checkpoints()
         self.first_chunk.clear()
         self.high_segment.clear()
         self.initial_high_segment.clear()
@@ -123,11 +136,11 @@ class Database(_databasedu.Database):
         tes = ebmc.table_ebm_segments
         insertion_point = bisect_right(tes, segment)
         self.dbenv[SUBFILE_DELIMITER.join((ebmc.ebm_table, str(segment)))] = (
-            repr(self.existence_bit_maps[file][segment].tobytes())
+            encode_records(self.existence_bit_maps[file][segment].tobytes())
         )
         if not (tes and tes[insertion_point - 1] == segment):
             tes.insert(insertion_point, segment)
-            self.dbenv[ebmc.ebm_table] = repr(tes)
+            self.dbenv[ebmc.ebm_table] = encode_segment_numbers(tes)
 
     def sort_and_write(self, file, field, segment):
         """Sort the segment deferred updates before writing to database.
@@ -141,6 +154,9 @@ class Database(_databasedu.Database):
         if field not in self.value_segments[file]:
             return
 
+        # Cached RecordLists may not include the records written here.
+        self.clear_recordlist_cache()
+
         # Lookup table is much quicker, and noticeable, in bulk use.
         int_to_bytes = self._int_to_bytes
 
@@ -170,34 +186,40 @@ class Database(_databasedu.Database):
             (tablename, SEGMENT_VALUE_SUFFIX, str(segment))
         )
         db = self.dbenv
+        new_keys = []
         for k, value in segvalues.items():
             segment_key = SUBFILE_DELIMITER.join((value_prefix, k))
             table_key = SUBFILE_DELIMITER.join((table_prefix, k))
             if table_key not in db:
-                if fieldtree:
-                    fieldtree.insert(k)
+                new_keys.append(k)
                 if isinstance(value, list):
                     if len(value) == 1:
-                        db[table_key] = repr({segment: (value[-1], 1)})
+                        db[table_key] = encode_segment_table(
+                            {segment: (value[-1], 1)}
+                        )
                         continue
-                    db[table_key] = repr({segment: (LIST_BYTES, len(value))})
-                    db[segment_key] = repr(
+                    db[table_key] = encode_segment_table(
+                        {segment: (LIST_BYTES, len(value))}
+                    )
+                    db[segment_key] = encode_records(
                         b"".join([int_to_bytes[n] for n in value])
                     )
                     continue
-                db[table_key] = repr({segment: (BITMAP_BYTES, value.count())})
-                db[segment_key] = repr(value.tobytes())
+                db[table_key] = encode_segment_table(
+                    {segment: (BITMAP_BYTES, value.count())}
+                )
+                db[segment_key] = encode_records(value.tobytes())
                 continue
-            segment_table = literal_eval(db[table_key].decode())
+            segment_table = decode_segment_table(db[table_key])
             if segment in segment_table:
                 type_, ref = segment_table[segment]
                 if type_ == BITMAP_BYTES:
                     current_segment = self.populate_segment(
-                        segment, literal_eval(db[segment_key].decode()), file
+                        segment, decode_records(db[segment_key]), file
                     )
                 elif type_ == LIST_BYTES:
                     current_segment = self.populate_segment(
-                        segment, literal_eval(db[segment_key].decode()), file
+                        segment, decode_records(db[segment_key]), file
                     )
                 else:
                     current_segment = self.populate_segment(segment, ref, file)
@@ -213,28 +235,41 @@ class Database(_databasedu.Database):
                 seg = (
                     self.make_segment(k, segment, *segref) | current_segment
                 ).normalize()
+                if isinstance(seg, RecordsetSegmentRun):
+                    seg = seg.promote()
                 if isinstance(seg, RecordsetSegmentList):
                     segment_table[segment] = LIST_BYTES, segref[0] + ref
                 else:
                     segment_table[segment] = BITMAP_BYTES, segref[0] + ref
-                db[table_key] = repr(segment_table)
-                db[segment_key] = repr(seg.tobytes())
+                db[table_key] = encode_segment_table(segment_table)
+                db[segment_key] = encode_records(seg.tobytes())
                 continue
             if isinstance(value, list):
                 if len(value) == 1:
                     segment_table[segment] = (value[-1], 1)
                 else:
                     segment_table[segment] = LIST_BYTES, len(value)
-                    db[segment_key] = repr(
+                    db[segment_key] = encode_records(
                         b"".join([int_to_bytes[n] for n in value])
                     )
             else:
                 segment_table[segment] = BITMAP_BYTES, value.count()
-                db[segment_key] = repr(value.tobytes())
-            db[table_key] = repr(segment_table)
+                db[segment_key] = encode_records(value.tobytes())
+            db[table_key] = encode_segment_table(segment_table)
             continue
         segvalues.clear()
 
+        # An empty tree is built in one pass from the sorted keys, otherwise
+        # the keys are inserted in order so successive inserts usually find
+        # their leaf in the node cache.
+        if fieldtree and new_keys:
+            new_keys.sort()
+            if fieldtree.get_root() is None:
+                fieldtree.bulk_load(new_keys)
+            else:
+                for k in new_keys:
+                    fieldtree.insert(k)
+
     def new_deferred_root(self, file, field):
         """Do nothing.
 
@@ -0,0 +1,209 @@
+# _npbytebit.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""A partial emulation of bitarray class for solentware_base using numpy.
+
+This module implements the subset of the bitarray interface implemented by
+the _bytebit module, but holds the bits in a numpy array of uint8 so the
+operations on whole bit arrays are done by numpy rather than by a Python
+loop over the bytes.
+
+The bits are held as bytes, rather than as uint64 words, because the bit
+order within the array must be the bit order of the bytes given to, and
+returned by, the frombytes() and tobytes() methods.  numpy does the
+boolean operations on whole arrays whatever the element size.
+
+The import of this module fails if numpy is not installed.
+
+"""
+
+import numpy
+
+_bits_count = numpy.array(
+    [bin(i).count("1") for i in range(256)], dtype=numpy.uint8
+)
+_reversed_bits = numpy.array(
+    [int(format(i, "08b")[::-1], 2) for i in range(256)], dtype=numpy.uint8
+)
+
+
+class Bitarray:
+    """Provide a bitarray."""
+
+    def __init__(self, bitlength=0):
+        """Initialize 'self.bitarray' to 'bitlength // 8' unset bits."""
+        super().__init__()
+        self.bitarray_bytes = numpy.zeros(bitlength // 8, dtype=numpy.uint8)
+
+    # 'all' for compatibility with bitarray module - conventional is 'all_'
+    def all(self):
+        """Return True if all bits in 'self.bitarray' are set."""
+        return bool((self.bitarray_bytes == 255).all())
+
+    # 'any' for compatibility with bitarray module - conventional is 'any_'
+    def any(self):
+        """Return True if at least one bit in 'self.bitarray' is set."""
+        return bool(self.bitarray_bytes.any())
+
+    def count(self, value=True):
+        """Return count of set bits in self.
+
+        The value argument is present for compatibility with count() method
+        in bitarray.bitarray class.
+
+        """
+        del value
+        return int(_bits_count[self.bitarray_bytes].sum(dtype=numpy.int64))
+
+    def frombytes(self, from_):
+        """Extend 'self.bitarray' with bitarray created from 'from_' bytes."""
+        self.bitarray_bytes = numpy.concatenate(
+            (self.bitarray_bytes, numpy.frombuffer(from_, dtype=numpy.uint8))
+        )
+
+    def index(self, value, *args):
+        """Return position of first bit with bool(value) in 'self.bitarray'.
+
+        args is an optional range specifying limits for the search:
+        [start[, stop]].  Like the _bytebit module, stop is the position of
+        the last bit included in the search.
+
+        """
+        if len(args) == 0:
+            start = 0
+            stop = 8 * len(self.bitarray_bytes) - 1
+        elif len(args) == 1:
+            start = args[0]
+            stop = 8 * len(self.bitarray_bytes) - 1
+        elif len(args) == 2:
+            start, stop = args
+        else:
+            raise TypeError(
+                "".join(
+                    (
+                        "index() takes at most 3 arguments (",
+                        str(len(args) + 1),
+                        " given)",
+                    )
+                )
+            )
+        start_byte = start // 8
+        bits = numpy.unpackbits(
+            self.bitarray_bytes[start_byte : stop // 8 + 1]
+        )[start % 8 : stop - 8 * start_byte + 1]
+        if not value:
+            bits = bits ^ 1
+        position = int(bits.argmax()) if len(bits) else 0
+        if not len(bits) or not bits[position]:
+            if value:
+                raise ValueError("Set bit (True) not found")
+            raise ValueError("Unset bit (False) not found")
+        return start + position
+
+    def invert(self):
+        """Invert all bits in 'self.bitarray'."""
+        self.bitarray_bytes = numpy.invert(self.bitarray_bytes)
+
+    def length(self):
+        """Return number of bits in 'self.bitarray'."""
+        return len(self.bitarray_bytes) * 8
+
+    # The arguments are ignored, as in the _bytebit module.
+    def search(self, bitarray, limit=None):
+        """Return list of set bit positions matching bitarray pattern.
+
+        The arguments are present for compatibility with search() method in
+        bitarray.bitarray class from the bitarray-0.8.1 package (from PyPI).
+
+        The call should be search(SINGLEBIT).
+
+        """
+        del bitarray, limit
+        return numpy.flatnonzero(
+            numpy.unpackbits(self.bitarray_bytes)
+        ).tolist()
+
+    def setall(self, value):
+        """Set all bits in 'self.bitarray' to bool(value)."""
+        self.bitarray_bytes = numpy.full(
+            len(self.bitarray_bytes), 255 if value else 0, dtype=numpy.uint8
+        )
+
+    def tobytes(self):
+        """Return 'self.bitarray' converted to bytes."""
+        return self.bitarray_bytes.tobytes()
+
+    def copy(self):
+        """Return a copy of self."""
+        j = Bitarray()
+        j.bitarray_bytes = self.bitarray_bytes.copy()
+        return j
+
+    def reverse(self):
+        """Reverse bit order of 'self.bitarray'."""
+        self.bitarray_bytes = _reversed_bits[self.bitarray_bytes[::-1]]
+
+    def __and__(self, other):
+        """Do 'new.bitarray = self.bitarray & other.bitarray': return new."""
+        j = Bitarray()
+        j.bitarray_bytes = self.bitarray_bytes & other.bitarray_bytes
+        return j
+
+    def __or__(self, other):
+        """Do 'new.bitarray = self.bitarray | other.bitarray': return new."""
+        j = Bitarray()
+        j.bitarray_bytes = self.bitarray_bytes | other.bitarray_bytes
+        return j
+
+    def __xor__(self, other):
+        """Do 'new.bitarray = self.bitarray ^ other.bitarray': return new."""
+        j = Bitarray()
+        j.bitarray_bytes = self.bitarray_bytes ^ other.bitarray_bytes
+        return j
+
+    def __iand__(self, other):
+        """Do 'self.bitarray = self.bitarray & other.bitarray': return self."""
+        self.bitarray_bytes = self.bitarray_bytes & other.bitarray_bytes
+        return self
+
+    def __ior__(self, other):
+        """Do 'self.bitarray = self.bitarray | other.bitarray': return self."""
+        self.bitarray_bytes = self.bitarray_bytes | other.bitarray_bytes
+        return self
+
+    def __ixor__(self, other):
+        """Do 'self.bitarray = self.bitarray ^ other.bitarray': return self."""
+        self.bitarray_bytes = self.bitarray_bytes ^ other.bitarray_bytes
+        return self
+
+    def __invert__(self):
+        """Return a copy of bitarray with all bits inverted."""
+        j = Bitarray()
+        j.bitarray_bytes = numpy.invert(self.bitarray_bytes)
+        return j
+
+    def __getitem__(self, key):
+        """Return True if bit for key is set in bitarray, or False if not."""
+        k, bit = divmod(key, 8)
+        if k < len(self.bitarray_bytes) and len(self.bitarray_bytes) >= -k:
+            return bool(self.bitarray_bytes[k] & 128 >> bit)
+        raise KeyError("Bit not in Bitarray")
+
+    def __setitem__(self, key, value):
+        """Set bit for key in bitarray if bool(value) is True, or unset bit."""
+        k, bit = divmod(key, 8)
+        if k < len(self.bitarray_bytes) and len(self.bitarray_bytes) >= -k:
+            if value:
+                self.bitarray_bytes[k] |= 128 >> bit
+            else:
+                self.bitarray_bytes[k] &= 255 ^ 128 >> bit
+        else:
+            raise KeyError("Bit not in Bitarray")
+
+    def __contains__(self, key):
+        """Return True if bit for key is set in bitarray, or False if not."""
+        k, bit = divmod(key, 8)
+        if k < len(self.bitarray_bytes) and len(self.bitarray_bytes) >= -k:
+            return bool(self.bitarray_bytes[k] & 128 >> bit)
+        raise IndexError("Bit not in Bitarray")
@@ -29,10 +29,16 @@ from .constants import (
     SQLITE_COUNT_COLUMN,
     SQLITE_RECORDS_COLUMN,
     INDEXPREFIX,
+    INDEX_RECORD_COUNT_PREFIX,
+    INDEX_KEY_COUNT_SUFFIX,
+    BULK_LOAD,
+    INTERACTIVE,
+    READ_MOSTLY,
 )
 from . import _database
 from .bytebit import Bitarray
 from .segmentsize import SegmentSize
+from .recordlistcache import KEY_EQ, KEY_STARTSWITH, KEY_RANGE
 
 # Some names are imported '* as _*' to avoid confusion with sensible
 # object names within the _sqlite module.
@@ -44,10 +50,49 @@ from .recordset import (
     RecordsetSegmentBitarray,
     RecordsetSegmentInt,
     RecordsetSegmentList,
+    RecordsetSegmentRun,
     RecordList,
     FoundSet,
 )
 
+# The default SQLITE_MAX_VARIABLE_NUMBER is 999 before SQLite 3.32.0 so
+# get_primary_records() selects at most this number of records per statement.
+SQLITE_MAX_IN_VALUES = 999
+
+# The pragmas set for each tuning profile, with None for the SQLite defaults.
+# The journal mode cannot be changed while a transaction is active, and the
+# journal mode of a memory-only database is always 'memory' or 'off'.
+TUNING_PRAGMAS = {
+    None: (
+        ("journal_mode", "delete"),
+        ("synchronous", "full"),
+        ("cache_size", "-2000"),
+        ("mmap_size", "0"),
+        ("temp_store", "default"),
+    ),
+    BULK_LOAD: (
+        ("journal_mode", "memory"),
+        ("synchronous", "off"),
+        ("cache_size", "-262144"),
+        ("mmap_size", "0"),
+        ("temp_store", "memory"),
+    ),
+    INTERACTIVE: (
+        ("journal_mode", "wal"),
+        ("synchronous", "normal"),
+        ("cache_size", "-16384"),
+        ("mmap_size", "0"),
+        ("temp_store", "default"),
+    ),
+    READ_MOSTLY: (
+        ("journal_mode", "wal"),
+        ("synchronous", "normal"),
+        ("cache_size", "-65536"),
+        ("mmap_size", "268435456"),
+        ("temp_store", "default"),
+    ),
+}
+
 
 class DatabaseError(_database.DatabaseError):
     """Exception for Database class."""
@@ -100,6 +145,22 @@ class Database(_database.Database):
         self.segment_table = {}
         self.ebm_control = {}
 
+        # IndexRecordCount instances for each (file, field).
+        self.index_record_count = {}
+
+        # SQL statements for each (file, field), with field None for the
+        # statements on the table and segment table for file, built when
+        # the database is opened.
+        self._statements = {}
+
+        # Cursors available for reuse by statements whose rows are fetched
+        # before the cursor is returned to the pool.
+        self._cursor_pool = []
+
+        # True if the connection, rather than the cursor, gives the rowid of
+        # the last inserted row: the apsw module rather than sqlite3.
+        self._rowid_from_connection = False
+
         # Set to value read from database on attempting to open database if
         # different from segment_size_bytes.
         self._real_segment_size_bytes = False
@@ -118,15 +179,25 @@ class Database(_database.Database):
 
     def start_transaction(self):
         """Start a transaction."""
+        self.start_existence_cache()
         if self.dbenv:
             cursor = self.dbenv.cursor()
             try:
                 cursor.execute("begin")
             finally:
                 cursor.close()
+            self.start_ebm_caches()
+            for irc in self.index_record_count.values():
+                irc.start_cache()
 
     def backout(self):
         """Backout transaction."""
+        self.clear_recordlist_cache()
+        self.discard_existence_cache()
+        self.clear_position_checkpoints()
+        self.discard_ebm_caches()
+        for irc in self.index_record_count.values():
+            irc.discard_cache()
         if self.dbenv:
             cursor = self.dbenv.cursor()
             try:
@@ -136,7 +207,13 @@ class Database(_database.Database):
 
     def commit(self):
         """Commit transaction."""
+        self.discard_existence_cache()
         if self.dbenv:
+            self.flush_ebm_caches(self.dbenv)
+            self.discard_ebm_caches()
+            for irc in self.index_record_count.values():
+                irc.flush_cache()
+                irc.discard_cache()
             cursor = self.dbenv.cursor()
             try:
                 cursor.execute("commit")
@@ -256,6 +333,9 @@ class Database(_database.Database):
         db_key = "integer primary key ,"
         db_create_index = "create unique index if not exists"
         self.dbenv = dbenv
+        self._rowid_from_connection = hasattr(dbenv, "last_insert_rowid")
+        if self.tuning_profile is not None:
+            self.apply_tuning_profile()
         if files is None:
             files = self.specification.keys()
         self.start_transaction()
@@ -298,7 +378,6 @@ class Database(_database.Database):
                     )
                 )
                 cursor.execute(statement)
-            self.ebm_control[file] = ExistenceBitmapControl(file, self)
             segmentfile = SUBFILE_DELIMITER.join((file, SEGMENT_SUFFIX))
             self.segment_table[file] = segmentfile
             if rsk is None:
@@ -353,6 +432,30 @@ class Database(_database.Database):
                         )
                     )
                     cursor.execute(statement)
+
+                # Databases created before record counts for keys were kept
+                # get the table when opened.
+                statement = " ".join(
+                    (
+                        create_table,
+                        SUBFILE_DELIMITER.join(
+                            (secondary, INDEX_KEY_COUNT_SUFFIX)
+                        ),
+                        "(",
+                        field,
+                        "primary key ,",
+                        SQLITE_COUNT_COLUMN,
+                        ") without rowid",
+                    )
+                )
+                cursor.execute(statement)
+            self._register_statements(file, fields)
+            self.ebm_control[file] = ExistenceBitmapControl(file, self)
+            for field in fields:
+                irc = IndexRecordCount(file, field, self)
+                if not irc.counts_exist():
+                    irc.create_counts()
+                self.index_record_count[file, field] = irc
         if self.database_file is not None:
             if rsk is None and rssbk is None:
                 statement = " ".join(
@@ -377,6 +480,19 @@ class Database(_database.Database):
                 cursor.execute(statement, (APPLICATION_CONTROL_KEY, repr({})))
         self.commit()
 
+    def apply_tuning_profile(self):
+        """Override, set pragmas for tuning profile if database is open."""
+        if not self.dbenv:
+            return
+        cursor = self.dbenv.cursor()
+        try:
+            for pragma, value in TUNING_PRAGMAS[self.tuning_profile]:
+                cursor.execute(
+                    " ".join(("pragma", pragma, "=", value))
+                ).fetchall()
+        finally:
+            cursor.close()
+
     def _raise_if_no_object(self, type_, name):
         """Raise DatabaseError if object of type_ and name does not exist."""
         statement = " ".join(
@@ -404,6 +520,401 @@ class Database(_database.Database):
         finally:
             cursor.close()
 
+    def _register_statements(self, file, fields):
+        """Build SQL statements used to update and read file and its fields.
+
+        The statements for the table and segment table for file are put in
+        self._statements[file, None] and those for each field are put in
+        self._statements[file, field].
+
+        """
+        table = self.table[file]
+        segment_table = self.segment_table[file]
+        ebm_table = SUBFILE_DELIMITER.join((file, EXISTENCE_BITMAP_SUFFIX))
+        self._statements[file, None] = {
+            "insert": " ".join(
+                (
+                    "insert into",
+                    table,
+                    "(",
+                    SQLITE_VALUE_COLUMN,
+                    ")",
+                    "values ( ? )",
+                )
+            ),
+            "insert_or_replace": " ".join(
+                (
+                    "insert or replace into",
+                    table,
+                    "(",
+                    SQLITE_VALUE_COLUMN,
+                    ",",
+                    file,
+                    ")",
+                    "values ( ? , ? )",
+                )
+            ),
+            "update": " ".join(
+                (
+                    "update",
+                    table,
+                    "set",
+                    SQLITE_VALUE_COLUMN,
+                    "= ?",
+                    "where",
+                    file,
+                    "== ?",
+                )
+            ),
+            "delete": " ".join(
+                (
+                    "delete from",
+                    table,
+                    "where",
+                    file,
+                    "== ?",
+                )
+            ),
+            "select": " ".join(
+                (
+                    "select * from",
+                    table,
+                    "where",
+                    file,
+                    "== ?",
+                )
+            ),
+            # Completed by get_primary_records() with a '( ? , ... )' list.
+            "select_in": " ".join(
+                (
+                    "select",
+                    file,
+                    ",",
+                    SQLITE_VALUE_COLUMN,
+                    "from",
+                    table,
+                    "where",
+                    file,
+                    "in",
+                )
+            ),
+            "select_high_record": " ".join(
+                (
+                    "select",
+                    file,
+                    ",",
+                    SQLITE_VALUE_COLUMN,
+                    "from",
+                    table,
+                    "order by",
+                    file,
+                    "desc",
+                    "limit 1",
+                )
+            ),
+            "select_segment_records": " ".join(
+                (
+                    "select",
+                    SQLITE_RECORDS_COLUMN,
+                    "from",
+                    segment_table,
+                    "where rowid == ?",
+                )
+            ),
+            "update_segment_records": " ".join(
+                (
+                    "update",
+                    segment_table,
+                    "set",
+                    SQLITE_RECORDS_COLUMN,
+                    "= ?",
+                    "where rowid == ?",
+                )
+            ),
+            "delete_segment_records": " ".join(
+                (
+                    "delete from",
+                    segment_table,
+                    "where rowid == ?",
+                )
+            ),
+            "insert_segment_records": " ".join(
+                (
+                    "insert into",
+                    segment_table,
+                    "(",
+                    SQLITE_RECORDS_COLUMN,
+                    ")",
+                    "values ( ? )",
+                )
+            ),
+            "select_ebm_segment": " ".join(
+                (
+                    "select",
+                    SQLITE_VALUE_COLUMN,
+                    "from",
+                    ebm_table,
+                    "where",
+                    ebm_table,
+                    "== ?",
+                    "limit 1",
+                )
+            ),
+            "update_ebm_segment": " ".join(
+                (
+                    "update",
+                    ebm_table,
+                    "set",
+                    SQLITE_VALUE_COLUMN,
+                    "= ?",
+                    "where",
+                    ebm_table,
+                    "== ?",
+                )
+            ),
+            "delete_ebm_segment": " ".join(
+                (
+                    "delete from",
+                    ebm_table,
+                    "where",
+                    ebm_table,
+                    "== ?",
+                )
+            ),
+            "insert_ebm_segment": " ".join(
+                (
+                    "insert into",
+                    ebm_table,
+                    "(",
+                    SQLITE_VALUE_COLUMN,
+                    ")",
+                    "values ( ? )",
+                )
+            ),
+        }
+        for field in fields:
+            secondary = self.table[SUBFILE_DELIMITER.join((file, field))]
+            count_key = "'" + INDEX_RECORD_COUNT_PREFIX + secondary + "'"
+            key_count = SUBFILE_DELIMITER.join(
+                (secondary, INDEX_KEY_COUNT_SUFFIX)
+            )
+            self._statements[file, field] = {
+                "select_record_count": " ".join(
+                    (
+                        "select",
+                        SQLITE_VALUE_COLUMN,
+                        "from",
+                        CONTROL_FILE,
+                        "where",
+                        CONTROL_FILE,
+                        "==",
+                        count_key,
+                    )
+                ),
+                "change_record_count": " ".join(
+                    (
+                        "update",
+                        CONTROL_FILE,
+                        "set",
+                        SQLITE_VALUE_COLUMN,
+                        "=",
+                        SQLITE_VALUE_COLUMN,
+                        "+ ?",
+                        "where",
+                        CONTROL_FILE,
+                        "==",
+                        count_key,
+                    )
+                ),
+                "select_existing_segment": " ".join(
+                    (
+                        "select",
+                        field,
+                        ",",
+                        SQLITE_SEGMENT_COLUMN,
+                        ",",
+                        SQLITE_COUNT_COLUMN,
+                        ",",
+                        file,
+                        "from",
+                        secondary,
+                        "where",
+                        field,
+                        "== ? and",
+                        SQLITE_SEGMENT_COLUMN,
+                        "== ?",
+                    )
+                ),
+                "update_record_count": " ".join(
+                    (
+                        "update",
+                        secondary,
+                        "set",
+                        SQLITE_COUNT_COLUMN,
+                        "= ?",
+                        "where",
+                        field,
+                        "== ? and",
+                        SQLITE_SEGMENT_COLUMN,
+                        "== ?",
+                    )
+                ),
+                "update_count_and_reference": " ".join(
+                    (
+                        "update",
+                        secondary,
+                        "set",
+                        SQLITE_COUNT_COLUMN,
+                        "= ? ,",
+                        file,
+                        "= ?",
+                        "where",
+                        field,
+                        "== ? and",
+                        SQLITE_SEGMENT_COLUMN,
+                        "== ?",
+                    )
+                ),
+                "change_key_record_count": " ".join(
+                    (
+                        "insert into",
+                        key_count,
+                        "(",
+                        field,
+                        ",",
+                        SQLITE_COUNT_COLUMN,
+                        ")",
+                        "values ( ? , ? )",
+                        "on conflict (",
+                        field,
+                        ") do update set",
+                        SQLITE_COUNT_COLUMN,
+                        "=",
+                        SQLITE_COUNT_COLUMN,
+                        "+ excluded." + SQLITE_COUNT_COLUMN,
+                    )
+                ),
+                "delete_key_record_count": " ".join(
+                    (
+                        "delete from",
+                        key_count,
+                        "where",
+                        field,
+                        "== ? and",
+                        SQLITE_COUNT_COLUMN,
+                        "== 0",
+                    )
+                ),
+                "select_partial_record_count": " ".join(
+                    (
+                        "select coalesce ( sum (",
+                        SQLITE_COUNT_COLUMN,
+                        ") , 0 ) from",
+                        key_count,
+                        "where",
+                        field,
+                        "glob ?",
+                    )
+                ),
+                "insert_new_segment": " ".join(
+                    (
+                        "insert into",
+                        secondary,
+                        "(",
+                        field,
+                        ",",
+                        SQLITE_SEGMENT_COLUMN,
+                        ",",
+                        SQLITE_COUNT_COLUMN,
+                        ",",
+                        file,
+                        ")",
+                        "values ( ? , ? , ? , ? )",
+                    )
+                ),
+                "delete_existing_segment": " ".join(
+                    (
+                        "delete from",
+                        secondary,
+                        "where",
+                        field,
+                        "== ? and",
+                        SQLITE_SEGMENT_COLUMN,
+                        "== ?",
+                    )
+                ),
+            }
+
+    def _execute(self, statement, values):
+        """Execute statement with values using a cursor from the pool."""
+        cursor_pool = self._cursor_pool
+        cursor = cursor_pool.pop() if cursor_pool else self.dbenv.cursor()
+        try:
+            cursor.execute(statement, values)
+        finally:
+            cursor_pool.append(cursor)
+
+    def _insert(self, statement, values):
+        """Return rowid of row inserted by statement with values."""
+        cursor_pool = self._cursor_pool
+        cursor = cursor_pool.pop() if cursor_pool else self.dbenv.cursor()
+        try:
+            cursor.execute(statement, values)
+            return self._last_insert_rowid(cursor)
+        finally:
+            cursor_pool.append(cursor)
+
+    def _last_insert_rowid(self, cursor):
+        """Return rowid of last row inserted by cursor.
+
+        The sqlite3 module gives the rowid as the lastrowid attribute of
+        cursor, and the apsw module gives it by the last_insert_rowid()
+        method of the connection.
+
+        """
+        if self._rowid_from_connection:
+            return self.dbenv.last_insert_rowid()
+        return cursor.lastrowid
+
+    def _execute_many(self, statement, values):
+        """Execute statement for each item in values using a pooled cursor."""
+        cursor_pool = self._cursor_pool
+        cursor = cursor_pool.pop() if cursor_pool else self.dbenv.cursor()
+        try:
+            cursor.executemany(statement, values)
+        finally:
+            cursor_pool.append(cursor)
+
+    def _fetch_one(self, statement, values):
+        """Return first row selected by statement with values or None.
+
+        All selected rows are fetched so the statement is finished before
+        the cursor is returned to the pool.  The statements used select at
+        most one row.
+
+        """
+        cursor_pool = self._cursor_pool
+        cursor = cursor_pool.pop() if cursor_pool else self.dbenv.cursor()
+        try:
+            rows = cursor.execute(statement, values).fetchall()
+        finally:
+            cursor_pool.append(cursor)
+        return rows[0] if rows else None
+
+    def _fetch_all(self, statement, values):
+        """Return list of rows selected by statement with values."""
+        cursor_pool = self._cursor_pool
+        cursor = cursor_pool.pop() if cursor_pool else self.dbenv.cursor()
+        try:
+            return cursor.execute(statement, values).fetchall()
+        finally:
+            cursor_pool.append(cursor)
+
+    def _close_cursor_pool(self):
+        """Close the cursors in the cursor pool."""
+        while self._cursor_pool:
+            self._cursor_pool.pop().close()
+
     def close_database_contexts(self, files=None):
         """Close files in database.
 
@@ -416,10 +927,16 @@ class Database(_database.Database):
         The files argument is ignored because the connection object is deleted.
 
         """
+        self.clear_recordlist_cache()
+        self.discard_existence_cache()
+        self.clear_position_checkpoints()
         del files
         self.table = {}
         self.segment_table = {}
         self.ebm_control = {}
+        self.index_record_count = {}
+        self._statements = {}
+        self._close_cursor_pool()
         if self.dbenv is not None:
             self.dbenv.close()
             self.dbenv = None
@@ -445,53 +962,25 @@ class Database(_database.Database):
         # option allows possibility of overwriting existing records by
         # ignoring put_instance.
         assert file in self.specification
-        cursor = self.dbenv.cursor()
-        try:
-            if key is None:
-                statement = " ".join(
-                    (
-                        "insert into",
-                        self.table[file],
-                        "(",
-                        SQLITE_VALUE_COLUMN,
-                        ")",
-                        "values ( ? )",
-                    )
-                )
-                cursor.execute(statement, (value,))
-                return cursor.execute(
-                    " ".join(("select last_insert_rowid() from", file))
-                ).fetchone()[0]
-
-            # The original 'update' version is probably correct!
-            # Especially if it succeeds only if SQLITE_VALUE_COLUMN has been
-            # set to 'null' by a previous delete (to indicate which rowids
-            # may be re-used).  The original's where clause is wrong and
-            # should check 'SQLITE_VALUE_COLUMN = null' too.
-            statement = " ".join(
-                (
-                    "insert or replace into",
-                    self.table[file],
-                    "(",
-                    SQLITE_VALUE_COLUMN,
-                    ",",
-                    file,
-                    ")",
-                    "values ( ? , ? )",
-                )
-            )
-            # statement = ' '.join((
-            #    'update',
-            #    self.table[file],
-            #    'set',
-            #    SQLITE_VALUE_COLUMN, '= ?',
-            #    'where',
-            #    file, '== ?',
-            #    ))
-            cursor.execute(statement, (value, key))
-            return None
-        finally:
-            cursor.close()
+        statements = self._statements[file, None]
+        if key is None:
+            return self._insert(statements["insert"], (value,))
+
+        # The original 'update' version is probably correct!
+        # Especially if it succeeds only if SQLITE_VALUE_COLUMN has been
+        # set to 'null' by a previous delete (to indicate which rowids
+        # may be re-used).  The original's where clause is wrong and
+        # should check 'SQLITE_VALUE_COLUMN = null' too.
+        # statement = ' '.join((
+        #    'update',
+        #    self.table[file],
+        #    'set',
+        #    SQLITE_VALUE_COLUMN, '= ?',
+        #    'where',
+        #    file, '== ?',
+        #    ))
+        self._execute(statements["insert_or_replace"], (value, key))
+        return None
 
     def replace(self, file, key, oldvalue, newvalue):
         """Replace key from table for file using newvalue.
@@ -500,23 +989,7 @@ class Database(_database.Database):
         """
         del oldvalue
         assert file in self.specification
-        cursor = self.dbenv.cursor()
-        try:
-            statement = " ".join(
-                (
-                    "update",
-                    self.table[file],
-                    "set",
-                    SQLITE_VALUE_COLUMN,
-                    "= ?",
-                    "where",
-                    file,
-                    "== ?",
-                )
-            )
-            cursor.execute(statement, (newvalue, key))
-        finally:
-            cursor.close()
+        self._execute(self._statements[file, None]["update"], (newvalue, key))
 
     def delete(self, file, key, value):
         """Delete key from table for file.
@@ -525,56 +998,56 @@ class Database(_database.Database):
         """
         del value
         assert file in self.specification
-        cursor = self.dbenv.cursor()
-        try:
-            # The update version is original and may be correct if comment in
-            # put has correct assessment of situation.  The original's where
-            # clause is wrong and should be same as new version.
-            statement = " ".join(
-                (
-                    "delete from",
-                    self.table[file],
-                    "where",
-                    file,
-                    "== ?",
-                )
-            )
-            # statement = ' '.join((
-            #    'update',
-            #    self.table[file],
-            #    'set',
-            #    SQLITE_VALUE_COLUMN, '= null',
-            #    'where',
-            #    file, '== ?',
-            #    ))
-            cursor.execute(statement, (key,))
-        finally:
-            cursor.close()
+        # The update version is original and may be correct if comment in
+        # put has correct assessment of situation.  The original's where
+        # clause is wrong and should be same as new version.
+        # statement = ' '.join((
+        #    'update',
+        #    self.table[file],
+        #    'set',
+        #    SQLITE_VALUE_COLUMN, '= null',
+        #    'where',
+        #    file, '== ?',
+        #    ))
+        self._execute(self._statements[file, None]["delete"], (key,))
 
     def get_primary_record(self, file, key):
         """Return the instance given the record number in key."""
         assert file in self.specification
         if key is None:
             return None
-        statement = " ".join(
-            (
-                "select * from",
-                self.table[file],
-                "where",
-                file,
-                "== ?",
-                # Assume there is a maximum of one record
-                # (unlike original query).
-                # 'order by',
-                #  file,
-                # 'limit 1',
+        # Assume there is a maximum of one record (unlike original query
+        # which had 'order by <file> limit 1' clauses).
+        return self._fetch_one(self._statements[file, None]["select"], (key,))
+
+    def get_primary_records(self, file, keys):
+        """Return list of (key, value) for records in file with keys.
+
+        The records are selected by 'in ( ? , ... )' statements with at
+        most SQLITE_MAX_IN_VALUES keys per statement.
+
+        """
+        assert file in self.specification
+        select_in = self._statements[file, None]["select_in"]
+        records = []
+        for i in range(0, len(keys), SQLITE_MAX_IN_VALUES):
+            values = keys[i : i + SQLITE_MAX_IN_VALUES]
+            records.extend(
+                self._fetch_all(
+                    " ".join(
+                        (
+                            select_in,
+                            "(",
+                            " , ".join("?" * len(values)),
+                            ")",
+                            "order by",
+                            file,
+                        )
+                    ),
+                    values,
+                )
             )
-        )
-        cursor = self.dbenv.cursor()
-        try:
-            return cursor.execute(statement, (key,)).fetchone()
-        finally:
-            cursor.close()
+        return records
 
     def encode_record_number(self, key):
         """Return repr(key) because this is sqlite3 version.
@@ -638,7 +1111,9 @@ class Database(_database.Database):
             if segment_number == ebmc.segment_count - 1:
                 return None
 
-            lfrns = ebmc.read_exists_segment(segment_number, self.dbenv)
+            lfrns = ebmc.get_cached_ebm(segment_number)
+            if lfrns is None:
+                lfrns = ebmc.read_exists_segment(segment_number, self.dbenv)
             if lfrns is None:
                 # Segment does not exist now.
                 ebmc.freed_record_number_pages.remove(segment_number)
@@ -729,178 +1204,98 @@ class Database(_database.Database):
                 "(",
                 self.table[CONTROL_FILE],
                 ",",
-                SQLITE_VALUE_COLUMN,
-                ")",
-                "values ( ? , ? )",
-            )
-        )
-        values = (ebmc.ebmkey, segment)
-        cursor = self.dbenv.cursor()
-        try:
-            cursor.execute(statement, values)
-        finally:
-            cursor.close()
-
-    def remove_record_from_ebm(self, file, deletekey):
-        """Remove deletekey from file's existence bitmap; return key.
-
-        deletekey is split into segment number and record number within
-        segment to form the returned value.
-        """
-        segment, record_number = divmod(deletekey, SegmentSize.db_segment_size)
-        ebmb = self.ebm_control[file].get_ebm_segment(segment, self.dbenv)
-        if ebmb is None:
-            raise DatabaseError("Existence bit map for segment does not exist")
-        ebm = Bitarray()
-        ebm.frombytes(ebmb)
-        ebm[record_number] = False
-        self.ebm_control[file].put_ebm_segment(
-            segment + 1, ebm.tobytes(), self.dbenv
-        )
-        return segment, record_number
-
-    def add_record_to_ebm(self, file, putkey):
-        """Add putkey to file's existence bitmap; return (segment, record).
-
-        putkey is split into segment number and record number within
-        segment to form the returned value.
-        """
-        segment, record_number = divmod(putkey, SegmentSize.db_segment_size)
-        ebmb = self.ebm_control[file].get_ebm_segment(segment, self.dbenv)
-        if ebmb is None:
-            ebm = SegmentSize.empty_bitarray.copy()
-            ebm[record_number] = True
-            self.ebm_control[file].append_ebm_segment(
-                ebm.tobytes(), self.dbenv
-            )
-        else:
-            ebm = Bitarray()
-            ebm.frombytes(ebmb)
-            ebm[record_number] = True
-            self.ebm_control[file].put_ebm_segment(
-                segment + 1, ebm.tobytes(), self.dbenv
-            )
-        return segment, record_number
-
-    def get_high_record_number(self, file):
-        """Return the high existing rowid in table for file."""
-        statement = " ".join(
-            (
-                "select",
-                file,
-                ",",
-                SQLITE_VALUE_COLUMN,
-                "from",
-                self.table[file],
-                "order by",
-                file,
-                "desc",
-                "limit 1",
-            )
-        )
-        values = ()
-        cursor = self.dbenv.cursor()
-        try:
-            last = cursor.execute(statement, values).fetchone() or None
-            if last is None:
-                return None
-            return last[0]
-        finally:
-            cursor.close()
-
-    def add_record_to_field_value(
-        self, file, field, key, segment, record_number
-    ):
-        """Add record_number to set of records in segment for key.
-
-        key is a value of index field on segment table for file.
-
-        The representation of the set of records on the database is
-        converted from integer to list to bitmap if the addition
-        increases the number of records in the set above the relevant
-        limit.
-        """
-        secondary = self.table[SUBFILE_DELIMITER.join((file, field))]
-        select_existing_segment = " ".join(
-            (
-                "select",
-                field,
-                ",",
-                SQLITE_SEGMENT_COLUMN,
-                ",",
-                SQLITE_COUNT_COLUMN,
-                ",",
-                file,
-                "from",
-                secondary,
-                "where",
-                field,
-                "== ? and",
-                SQLITE_SEGMENT_COLUMN,
-                "== ?",
-            )
-        )
-        update_record_count = " ".join(
-            (
-                "update",
-                secondary,
-                "set",
-                SQLITE_COUNT_COLUMN,
-                "= ?",
-                "where",
-                field,
-                "== ? and",
-                SQLITE_SEGMENT_COLUMN,
-                "== ?",
-            )
-        )
-        update_count_and_reference = " ".join(
-            (
-                "update",
-                secondary,
-                "set",
-                SQLITE_COUNT_COLUMN,
-                "= ? ,",
-                file,
-                "= ?",
-                "where",
-                field,
-                "== ? and",
-                SQLITE_SEGMENT_COLUMN,
-                "== ?",
-            )
-        )
-        insert_new_segment = " ".join(
-            (
-                "insert into",
-                secondary,
-                "(",
-                field,
-                ",",
-                SQLITE_SEGMENT_COLUMN,
-                ",",
-                SQLITE_COUNT_COLUMN,
-                ",",
-                file,
+                SQLITE_VALUE_COLUMN,
                 ")",
-                "values ( ? , ? , ? , ? )",
+                "values ( ? , ? )",
             )
         )
+        values = (ebmc.ebmkey, segment)
         cursor = self.dbenv.cursor()
         try:
-            segment_reference = cursor.execute(
-                select_existing_segment, (key, segment)
-            ).fetchone()
+            cursor.execute(statement, values)
         finally:
             cursor.close()
-        if segment_reference is None:
-            cursor = self.dbenv.cursor()
-            try:
-                cursor.execute(
-                    insert_new_segment, (key, segment, 1, record_number)
+
+    def remove_record_from_ebm(self, file, deletekey):
+        """Remove deletekey from file's existence bitmap; return key.
+
+        deletekey is split into segment number and record number within
+        segment to form the returned value.
+        """
+        self.invalidate_existence_cache(file)
+        segment, record_number = divmod(deletekey, SegmentSize.db_segment_size)
+        ebmc = self.ebm_control[file]
+        ebm = ebmc.get_cached_ebm(segment)
+        if ebm is None:
+            ebmb = ebmc.get_ebm_segment(segment, self.dbenv)
+            if ebmb is None:
+                raise DatabaseError(
+                    "Existence bit map for segment does not exist"
                 )
-            finally:
-                cursor.close()
+            ebm = Bitarray()
+            ebm.frombytes(ebmb)
+        ebm[record_number] = False
+        if not ebmc.cache_ebm(segment, ebm):
+            ebmc.put_ebm_segment(segment + 1, ebm.tobytes(), self.dbenv)
+        return segment, record_number
+
+    def add_record_to_ebm(self, file, putkey):
+        """Add putkey to file's existence bitmap; return (segment, record).
+
+        putkey is split into segment number and record number within
+        segment to form the returned value.
+        """
+        self.invalidate_existence_cache(file)
+        segment, record_number = divmod(putkey, SegmentSize.db_segment_size)
+        ebmc = self.ebm_control[file]
+        ebm = ebmc.get_cached_ebm(segment)
+        if ebm is None:
+            ebmb = ebmc.get_ebm_segment(segment, self.dbenv)
+            if ebmb is None:
+                ebm = SegmentSize.empty_bitarray.copy()
+                ebm[record_number] = True
+                ebmc.append_ebm_segment(ebm.tobytes(), self.dbenv)
+                return segment, record_number
+            ebm = Bitarray()
+            ebm.frombytes(ebmb)
+        ebm[record_number] = True
+        if not ebmc.cache_ebm(segment, ebm):
+            ebmc.put_ebm_segment(segment + 1, ebm.tobytes(), self.dbenv)
+        return segment, record_number
+
+    def get_high_record_number(self, file):
+        """Return the high existing rowid in table for file."""
+        last = self._fetch_one(
+            self._statements[file, None]["select_high_record"], ()
+        )
+        if last is None:
+            return None
+        return last[0]
+
+    def add_record_to_field_value(
+        self, file, field, key, segment, record_number
+    ):
+        """Add record_number to set of records in segment for key.
+
+        key is a value of index field on segment table for file.
+
+        The representation of the set of records on the database is
+        converted from integer to list to bitmap if the addition
+        increases the number of records in the set above the relevant
+        limit.
+        """
+        self.invalidate_recordlist_cache(file, field, key)
+        self.invalidate_position_checkpoints(file, field, key)
+        statements = self._statements[file, field]
+        segment_reference = self._fetch_one(
+            statements["select_existing_segment"], (key, segment)
+        )
+        if segment_reference is None:
+            self._execute(
+                statements["insert_new_segment"],
+                (key, segment, 1, record_number),
+            )
+            self.index_record_count[file, field].change_count(key, 1)
             return
         existing_segment = self.populate_segment(segment_reference, file)
         seg = (
@@ -914,35 +1309,28 @@ class Database(_database.Database):
         count = seg.count_records()
         if count == existing_segment.count_records():
             return
+        self.index_record_count[file, field].change_count(key, 1)
         if not isinstance(existing_segment, RecordsetSegmentBitarray):
             seg = seg.normalize()
         if segment_reference[2] > 1:
             self.set_segment_records(
                 (seg.tobytes(), segment_reference[3]), file
             )
-            cursor = self.dbenv.cursor()
-            try:
-                cursor.execute(
-                    update_record_count,
-                    (segment_reference[2] + 1, key, segment),
-                )
-            finally:
-                cursor.close()
+            self._execute(
+                statements["update_record_count"],
+                (segment_reference[2] + 1, key, segment),
+            )
         else:
             rowid = self.insert_segment_records((seg.tobytes(),), file)
-            cursor = self.dbenv.cursor()
-            try:
-                cursor.execute(
-                    update_count_and_reference,
-                    (
-                        segment_reference[2] + 1,
-                        rowid,
-                        key,
-                        segment_reference[1],
-                    ),
-                )
-            finally:
-                cursor.close()
+            self._execute(
+                statements["update_count_and_reference"],
+                (
+                    segment_reference[2] + 1,
+                    rowid,
+                    key,
+                    segment_reference[1],
+                ),
+            )
 
     def remove_record_from_field_value(
         self, file, field, key, segment, record_number
@@ -955,74 +1343,12 @@ class Database(_database.Database):
         converted from bitmap to list to integer if the removal reduces
         the number of records in the set below the relevant limit.
         """
-        secondary = self.table[SUBFILE_DELIMITER.join((file, field))]
-        select_existing_segment = " ".join(
-            (
-                "select",
-                field,
-                ",",
-                SQLITE_SEGMENT_COLUMN,
-                ",",
-                SQLITE_COUNT_COLUMN,
-                ",",
-                file,
-                "from",
-                secondary,
-                "where",
-                field,
-                "== ? and",
-                SQLITE_SEGMENT_COLUMN,
-                "== ?",
-            )
-        )
-        update_record_count = " ".join(
-            (
-                "update",
-                secondary,
-                "set",
-                SQLITE_COUNT_COLUMN,
-                "= ?",
-                "where",
-                field,
-                "== ? and",
-                SQLITE_SEGMENT_COLUMN,
-                "== ?",
-            )
-        )
-        update_count_and_reference = " ".join(
-            (
-                "update",
-                secondary,
-                "set",
-                SQLITE_COUNT_COLUMN,
-                "= ? ,",
-                file,
-                "= ?",
-                "where",
-                field,
-                "== ? and",
-                SQLITE_SEGMENT_COLUMN,
-                "== ?",
-            )
+        self.invalidate_recordlist_cache(file, field, key)
+        self.invalidate_position_checkpoints(file, field, key)
+        statements = self._statements[file, field]
+        segment_reference = self._fetch_one(
+            statements["select_existing_segment"], (key, segment)
         )
-        delete_existing_segment = " ".join(
-            (
-                "delete from",
-                secondary,
-                "where",
-                field,
-                "== ? and",
-                SQLITE_SEGMENT_COLUMN,
-                "== ?",
-            )
-        )
-        cursor = self.dbenv.cursor()
-        try:
-            segment_reference = cursor.execute(
-                select_existing_segment, (key, segment)
-            ).fetchone()
-        finally:
-            cursor.close()
         if segment_reference is None:
             return
         seg = RecordsetSegmentInt(
@@ -1033,6 +1359,9 @@ class Database(_database.Database):
         count = seg.count_records()
         if count == existing_segment.count_records():
             return
+        self.index_record_count[file, field].change_count(
+            key, count - segment_reference[2]
+        )
         if not isinstance(existing_segment, RecordsetSegmentBitarray):
             seg = seg.normalize()
         else:
@@ -1041,41 +1370,114 @@ class Database(_database.Database):
             self.set_segment_records(
                 (seg.tobytes(), segment_reference[3]), file
             )
-            cursor = self.dbenv.cursor()
-            try:
-                cursor.execute(update_record_count, (count, key, segment))
-            finally:
-                cursor.close()
+            self._execute(
+                statements["update_record_count"], (count, key, segment)
+            )
             return
         if count == 1:
             self.delete_segment_records((segment_reference[3],), file)
             record_number = seg.get_record_number_at_position(0)
-            cursor = self.dbenv.cursor()
-            try:
-                cursor.execute(
-                    update_count_and_reference,
+            self._execute(
+                statements["update_count_and_reference"],
+                (
+                    count,
                     (
-                        count,
-                        (
-                            record_number
-                            % (segment * SegmentSize.db_segment_size)
-                            if segment
-                            else record_number
-                        ),
-                        key,
-                        segment,
+                        record_number
+                        % (segment * SegmentSize.db_segment_size)
+                        if segment
+                        else record_number
                     ),
-                )
-            finally:
-                cursor.close()
+                    key,
+                    segment,
+                ),
+            )
             return
-        cursor = self.dbenv.cursor()
-        try:
-            cursor.execute(delete_existing_segment, (key, segment))
-        finally:
-            cursor.close()
+        self._execute(statements["delete_existing_segment"], (key, segment))
         return
 
+    def update_records_for_field_value(
+        self, file, field, key, segment, records
+    ):
+        """Override, add and remove records in segment for key.
+
+        records maps record numbers within segment to True, for records to
+        be added, or False, for records to be removed.
+
+        The segment is read and written at most once.
+        """
+        self.invalidate_recordlist_cache(file, field, key)
+        self.invalidate_position_checkpoints(file, field, key)
+        statements = self._statements[file, field]
+        segment_reference = self._fetch_one(
+            statements["select_existing_segment"], (key, segment)
+        )
+        if segment_reference is None:
+            existing_segment = None
+            seg = RecordsetSegmentBitarray(segment, None)
+        else:
+            existing_segment = self.populate_segment(segment_reference, file)
+            seg = existing_segment.promote()
+        changed = False
+        for record_number, add in records.items():
+            if seg.bitarray[record_number] != add:
+                seg.bitarray[record_number] = add
+                changed = True
+        if not changed:
+            return
+        count = seg.count_records()
+        self.index_record_count[file, field].change_count(
+            key,
+            (
+                count
+                if segment_reference is None
+                else count - segment_reference[2]
+            ),
+        )
+        if count == 0:
+            if segment_reference[2] > 1:
+                self.delete_segment_records((segment_reference[3],), file)
+            self._execute(
+                statements["delete_existing_segment"], (key, segment)
+            )
+            return
+        if count == 1:
+            if segment_reference is None:
+                self._execute(
+                    statements["insert_new_segment"],
+                    (key, segment, 1, seg.bitarray.index(True)),
+                )
+                return
+            if segment_reference[2] > 1:
+                self.delete_segment_records((segment_reference[3],), file)
+            self._execute(
+                statements["update_count_and_reference"],
+                (1, seg.bitarray.index(True), key, segment),
+            )
+            return
+        if isinstance(existing_segment, RecordsetSegmentBitarray):
+            seg = seg.normalize(use_upper_limit=False)
+        else:
+            seg = seg.normalize()
+        if segment_reference is None:
+            rowid = self.insert_segment_records((seg.tobytes(),), file)
+            self._execute(
+                statements["insert_new_segment"], (key, segment, count, rowid)
+            )
+            return
+        if segment_reference[2] > 1:
+            self.set_segment_records(
+                (seg.tobytes(), segment_reference[3]), file
+            )
+            self._execute(
+                statements["update_record_count"], (count, key, segment)
+            )
+            return
+        rowid = self.insert_segment_records((seg.tobytes(),), file)
+        self._execute(
+            statements["update_count_and_reference"],
+            (count, rowid, key, segment),
+        )
+
     def populate_segment(self, segment_reference, file):
         """Return records for segment_reference in segment table for file.
 
@@ -1099,6 +1501,10 @@ class Database(_database.Database):
             return RecordsetSegmentBitarray(
                 segment_reference[1], None, records=segment_record
             )
+        if len(segment_record) % 2:
+            return RecordsetSegmentRun(
+                segment_reference[1], None, records=segment_record
+            )
         return RecordsetSegmentList(
             segment_reference[1], None, records=segment_record
         )
@@ -1109,19 +1515,11 @@ class Database(_database.Database):
         The returned object has not been converted to the list, bitarray,
         or integer, representing a set of records.
         """
-        statement = " ".join(
-            (
-                "select",
-                SQLITE_RECORDS_COLUMN,
-                "from",
-                self.segment_table[file],
-                "where rowid == ?",
-            )
-        )
-        values = (rownumber,)
-        cursor = self.dbenv.cursor()
         try:
-            return cursor.execute(statement, values).fetchone()[0]
+            return self._fetch_one(
+                self._statements[file, None]["select_segment_records"],
+                (rownumber,),
+            )[0]
         except TypeError as exc:
             raise DatabaseError(
                 "".join(
@@ -1134,8 +1532,6 @@ class Database(_database.Database):
                     )
                 )
             ) from exc
-        finally:
-            cursor.close()
 
     def set_segment_records(self, values, file):
         """Update a segment in segment table for file.
@@ -1148,39 +1544,18 @@ class Database(_database.Database):
 
         rowid is the row in segment table for file to be updated.
         """
-        statement = " ".join(
-            (
-                "update",
-                self.segment_table[file],
-                "set",
-                SQLITE_RECORDS_COLUMN,
-                "= ?",
-                "where rowid == ?",
-            )
+        self._execute(
+            self._statements[file, None]["update_segment_records"], values
         )
-        cursor = self.dbenv.cursor()
-        try:
-            cursor.execute(statement, values)
-        finally:
-            cursor.close()
 
     def delete_segment_records(self, values, file):
         """Delete a segment from segment table for file.
 
         values is the rowid for the segment to be deleted.
         """
-        statement = " ".join(
-            (
-                "delete from",
-                self.segment_table[file],
-                "where rowid == ?",
-            )
+        self._execute(
+            self._statements[file, None]["delete_segment_records"], values
         )
-        cursor = self.dbenv.cursor()
-        try:
-            cursor.execute(statement, values)
-        finally:
-            cursor.close()
 
     def insert_segment_records(self, values, file):
         """Insert a segment into segment table for file and return rowid.
@@ -1189,29 +1564,43 @@ class Database(_database.Database):
         integers, or an integer; which represent a set of records in
         the segment.
         """
-        statement = " ".join(
-            (
-                "insert into",
-                self.segment_table[file],
-                "(",
-                SQLITE_RECORDS_COLUMN,
-                ")",
-                "values ( ? )",
-            )
+        return self._insert(
+            self._statements[file, None]["insert_segment_records"], values
         )
-        cursor = self.dbenv.cursor()
+
+    def insert_many_segment_records(self, values, file):
+        """Insert segments into segment table for file and return rowids.
+
+        values is a list of segments, each in the form accepted by
+        insert_segment_records.  The rowids are returned in a list in the
+        same order as values.
+
+        The segment table has an implicit rowid so each inserted row gets
+        the rowid one more than the highest rowid in the table.  Thus the
+        rows inserted by one executemany() call have consecutive rowids
+        ending with the rowid of the last inserted row.
+
+        """
+        if not values:
+            return []
+        cursor_pool = self._cursor_pool
+        cursor = cursor_pool.pop() if cursor_pool else self.dbenv.cursor()
         try:
-            cursor.execute(statement, values)
-            return cursor.execute(
-                " ".join(
-                    (
-                        "select last_insert_rowid() from",
-                        self.segment_table[file],
-                    )
-                )
-            ).fetchone()[0]
+            cursor.executemany(
+                self._statements[file, None]["insert_segment_records"],
+                ((value,) for value in values),
+            )
+            if self._rowid_from_connection:
+                last_rowid = self.dbenv.last_insert_rowid()
+            else:
+                # The lastrowid attribute of a sqlite3 cursor is not set by
+                # executemany().
+                last_rowid = cursor.execute(
+                    "select last_insert_rowid()"
+                ).fetchall()[0][0]
         finally:
-            cursor.close()
+            cursor_pool.append(cursor)
+        return list(range(last_rowid - len(values) + 1, last_rowid + 1))
 
     def find_values(self, valuespec, file):
         """Yield values in range defined in valuespec in index named file."""
@@ -1663,6 +2052,7 @@ class Database(_database.Database):
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         if key is None:
             return recordlist
+        self.ebm_control[file].flush_ebm_cache(self.dbenv)
         statement = " ".join(
             (
                 "select",
@@ -1707,6 +2097,7 @@ class Database(_database.Database):
         # see note in recordlist_ebm method.
         if keystart is None and keyend is None:
             return self.recordlist_ebm(file, cache_size=cache_size)
+        self.ebm_control[file].flush_ebm_cache(self.dbenv)
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         if keystart is None:
             segment_start, recnum_start = 0, 1
@@ -1811,6 +2202,10 @@ class Database(_database.Database):
 
     def recordlist_ebm(self, file, cache_size=1):
         """Return RecordList containing records on file."""
+        recordlist = self.get_cached_existence(file, cache_size=cache_size)
+        if recordlist is not None:
+            return recordlist
+        self.ebm_control[file].flush_ebm_cache(self.dbenv)
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         statement = " ".join(
             (
@@ -1837,7 +2232,7 @@ class Database(_database.Database):
 
         finally:
             cursor.close()
-        return recordlist
+        return self.cache_existence(file, recordlist, cache_size=cache_size)
 
     def recordlist_key_like(self, file, field, keylike=None, cache_size=1):
         """Return RecordList containing records for field on file.
@@ -1881,6 +2276,10 @@ class Database(_database.Database):
                         segment = RecordsetSegmentBitarray(
                             record[1], None, records=segment_record
                         )
+                    elif len(segment_record) % 2:
+                        segment = RecordsetSegmentRun(
+                            record[1], None, records=segment_record
+                        )
                     else:
                         segment = RecordsetSegmentList(
                             record[1], None, records=segment_record
@@ -1893,8 +2292,18 @@ class Database(_database.Database):
             cursor.close()
         return recordlist
 
-    def recordlist_key(self, file, field, key=None, cache_size=1):
-        """Return RecordList on file containing records for field with key."""
+    def recordlist_key(self, file, field, key=None, cache_size=1, within=None):
+        """Return RecordList on file containing records for field with key.
+
+        Records in segments with no records in within, if given, may be
+        omitted.
+
+        """
+        recordlist = self.get_cached_recordlist(
+            file, field, (KEY_EQ, key), cache_size=cache_size
+        )
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         statement = " ".join(
             (
@@ -1919,6 +2328,8 @@ class Database(_database.Database):
         cursor = self.dbenv.cursor()
         try:
             for record in cursor.execute(statement, values):
+                if within is not None and record[1] not in within:
+                    continue
                 if record[2] == 1:
                     recordlist[record[1]] = RecordsetSegmentInt(
                         record[1],
@@ -1931,13 +2342,21 @@ class Database(_database.Database):
                         recordlist[record[1]] = RecordsetSegmentBitarray(
                             record[1], None, records=segment_record
                         )
+                    elif len(segment_record) % 2:
+                        recordlist[record[1]] = RecordsetSegmentRun(
+                            record[1], None, records=segment_record
+                        )
                     else:
                         recordlist[record[1]] = RecordsetSegmentList(
                             record[1], None, records=segment_record
                         )
         finally:
             cursor.close()
-        return recordlist
+        if within is not None:
+            return recordlist
+        return self.cache_recordlist(
+            file, field, (KEY_EQ, key), recordlist, cache_size=cache_size
+        )
 
     def recordlist_key_startswith(
         self, file, field, keystart=None, cache_size=1
@@ -1946,6 +2365,11 @@ class Database(_database.Database):
 
         The records are indexed by keys starting keystart.
         """
+        recordlist = self.get_cached_recordlist(
+            file, field, (KEY_STARTSWITH, keystart), cache_size=cache_size
+        )
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         if keystart is None:
             return recordlist
@@ -1984,6 +2408,10 @@ class Database(_database.Database):
                         segment = RecordsetSegmentBitarray(
                             record[1], None, records=segment_record
                         )
+                    elif len(segment_record) % 2:
+                        segment = RecordsetSegmentRun(
+                            record[1], None, records=segment_record
+                        )
                     else:
                         segment = RecordsetSegmentList(
                             record[1], None, records=segment_record
@@ -1994,14 +2422,32 @@ class Database(_database.Database):
                     recordlist[record[1]] |= segment
         finally:
             cursor.close()
-        return recordlist
+        return self.cache_recordlist(
+            file,
+            field,
+            (KEY_STARTSWITH, keystart),
+            recordlist,
+            cache_size=cache_size,
+        )
 
     def recordlist_key_range(
-        self, file, field, ge=None, gt=None, le=None, lt=None, cache_size=1
+        self,
+        file,
+        field,
+        ge=None,
+        gt=None,
+        le=None,
+        lt=None,
+        cache_size=1,
+        within=None,
     ):
         """Return RecordList containing records for field on file.
 
         Keys are in range set by combinations of ge, gt, le, and lt.
+
+        Records in segments with no records in within, if given, may be
+        omitted.
+
         """
         if isinstance(ge, str) and isinstance(gt, str):
             raise DatabaseError("Both 'ge' and 'gt' given in key range")
@@ -2019,6 +2465,11 @@ class Database(_database.Database):
             if isinstance(gt, str)
             else ">=" if isinstance(ge, str) else None
         )
+        recordlist = self.get_cached_recordlist(
+            file, field, (KEY_RANGE, ge, gt, le, lt), cache_size=cache_size
+        )
+        if recordlist is not None:
+            return recordlist
         recordlist = RecordList(dbhome=self, dbset=file, cache_size=cache_size)
         if highop is None:
             statement = " ".join(
@@ -2088,6 +2539,8 @@ class Database(_database.Database):
         cursor = self.dbenv.cursor()
         try:
             for record in cursor.execute(statement, values):
+                if within is not None and record[1] not in within:
+                    continue
                 if record[2] == 1:
                     segment = RecordsetSegmentInt(
                         record[1],
@@ -2100,6 +2553,10 @@ class Database(_database.Database):
                         segment = RecordsetSegmentBitarray(
                             record[1], None, records=segment_record
                         )
+                    elif len(segment_record) % 2:
+                        segment = RecordsetSegmentRun(
+                            record[1], None, records=segment_record
+                        )
                     else:
                         segment = RecordsetSegmentList(
                             record[1], None, records=segment_record
@@ -2110,7 +2567,74 @@ class Database(_database.Database):
                     recordlist[record[1]] |= segment
         finally:
             cursor.close()
-        return recordlist
+        if within is not None:
+            return recordlist
+        return self.cache_recordlist(
+            file,
+            field,
+            (KEY_RANGE, ge, gt, le, lt),
+            recordlist,
+            cache_size=cache_size,
+        )
+
+    def estimate_recordlist_key(self, file, field, key=None):
+        """Return number of records recordlist_key would find for key.
+
+        The record counts in the index are summed: segments are not read.
+
+        """
+        statement = " ".join(
+            (
+                "select coalesce ( sum (",
+                SQLITE_COUNT_COLUMN,
+                ") , 0 ) from",
+                self.table[SUBFILE_DELIMITER.join((file, field))],
+                "where",
+                field,
+                "== ?",
+            )
+        )
+        cursor = self.dbenv.cursor()
+        try:
+            return cursor.execute(statement, (key,)).fetchone()[0]
+        finally:
+            cursor.close()
+
+    def estimate_recordlist_key_range(
+        self, file, field, ge=None, gt=None, le=None, lt=None
+    ):
+        """Return upper bound of records recordlist_key_range would find.
+
+        The record counts in the index for keys in range are summed, so
+        records with more than one key in range are counted for each key.
+        Segments are not read.
+
+        """
+        conditions = []
+        values = []
+        for operator, value in (
+            (">= ?", ge),
+            ("> ?", gt),
+            ("<= ?", le),
+            ("< ?", lt),
+        ):
+            if isinstance(value, str):
+                conditions.append(" ".join((field, operator)))
+                values.append(value)
+        statement = [
+            "select coalesce ( sum (",
+            SQLITE_COUNT_COLUMN,
+            ") , 0 ) from",
+            self.table[SUBFILE_DELIMITER.join((file, field))],
+        ]
+        if conditions:
+            statement.append("where")
+            statement.append(" and ".join(conditions))
+        cursor = self.dbenv.cursor()
+        try:
+            return cursor.execute(" ".join(statement), values).fetchone()[0]
+        finally:
+            cursor.close()
 
     def recordlist_all(self, file, field, cache_size=1):
         """Return RecordList on file containing records for field."""
@@ -2147,6 +2671,10 @@ class Database(_database.Database):
                         segment = RecordsetSegmentBitarray(
                             record[1], None, records=segment_record
                         )
+                    elif len(segment_record) % 2:
+                        segment = RecordsetSegmentRun(
+                            record[1], None, records=segment_record
+                        )
                     else:
                         segment = RecordsetSegmentList(
                             record[1], None, records=segment_record
@@ -2170,6 +2698,8 @@ class Database(_database.Database):
         is deleted.
 
         """
+        self.invalidate_recordlist_cache(file, field, key)
+        self.invalidate_position_checkpoints(file, field, key)
         secondary = SUBFILE_DELIMITER.join((file, field))
         select_existing_segments = " ".join(
             (
@@ -2204,6 +2734,9 @@ class Database(_database.Database):
             rows = cursor.execute(select_existing_segments, (key,)).fetchall()
         finally:
             cursor.close()
+        self.index_record_count[file, field].change_count(
+            key, -sum(r[1] for r in rows)
+        )
         old_rows = [s[1] for s in sorted((r[1], r) for r in rows if r[1] > 1)]
         rows = {r[0] for r in rows}
         cursor = self.dbenv.cursor()
@@ -2217,6 +2750,8 @@ class Database(_database.Database):
 
     def file_records_under(self, file, field, recordset, key):
         """Replace records for index field[key] with recordset records."""
+        self.invalidate_recordlist_cache(file, field, key)
+        self.invalidate_position_checkpoints(file, field, key)
         assert recordset.dbset == file
         assert file == self.table[file]
         secondary = SUBFILE_DELIMITER.join((file, field))
@@ -2247,15 +2782,20 @@ class Database(_database.Database):
         self.unfile_records_under(file, field, key)
 
         recordset.normalize()
+        self.index_record_count[file, field].change_count(
+            key, recordset.count_records()
+        )
 
         # Process the segments in segment number order.
         cursor = self.dbenv.cursor()
         try:
             for segment_number in recordset.sorted_segnums:
                 rs_segment = recordset.rs_segments[segment_number]
-                if isinstance(rs_segment, RecordsetSegmentBitarray):
+                if isinstance(
+                    rs_segment, (RecordsetSegmentBitarray, RecordsetSegmentRun)
+                ):
                     segment_key = self.insert_segment_records(
-                        (rs_segment.bitarray.tobytes(),), file
+                        (rs_segment.tobytes(),), file
                     )
                     cursor.execute(
                         insert_new_segment,
@@ -2312,6 +2852,7 @@ class Database(_database.Database):
                 self.dbenv,
                 table=self.table[file],
                 ebm=self.ebm_control[file].ebm_table,
+                ebm_control=self.ebm_control[file],
                 file=file,
                 keyrange=keyrange,
             )
@@ -2322,6 +2863,8 @@ class Database(_database.Database):
             field=field,
             keyrange=keyrange,
             segment=self.segment_table[file],
+            checkpoints=self.get_position_checkpoints(file, field),
+            index_record_count=self.index_record_count[file, field],
         )
 
     def create_recordset_cursor(self, recordset):
@@ -2538,11 +3081,17 @@ class CursorPrimary(Cursor):
 
     """
 
-    def __init__(self, dbset, ebm=None, **kargs):
+    def __init__(self, dbset, ebm=None, *, ebm_control=None, **kargs):
         """Extend, note existence bitmap table name, initialize row read."""
         super().__init__(dbset, **kargs)
         self._most_recent_row_read = False
         self._ebm = ebm
+        self._ebm_control = ebm_control
+
+    def _flush_ebm_cache(self):
+        """Write changed existence bitmap segments before reading them."""
+        if self._ebm_control is not None:
+            self._ebm_control.flush_ebm_cache(self._dbset)
 
     def close(self):
         """Delete database cursor then extend."""
@@ -2552,6 +3101,7 @@ class CursorPrimary(Cursor):
     def count_records(self):
         """Return record count or None if cursor is not usable."""
         # Quicker than executing 'select count ( * ) ...' for many records.
+        self._flush_ebm_cache()
         statement = " ".join(
             (
                 "select",
@@ -2593,6 +3143,7 @@ class CursorPrimary(Cursor):
             return 0
 
         # Quicker than executing 'select count ( * ) ...' for many records.
+        self._flush_ebm_cache()
         statement = " ".join(
             (
                 "select",
@@ -2804,6 +3355,8 @@ class CursorSecondary(Cursor):
     dbset - apsw or sqlite3 Connection() object.
     field - field name of table for file in FileSpec() object for database.
     segment - name of segment table for file in FileSpec() object for database.
+    checkpoints - positioncheckpoints.IndexCheckpoints instance or None.
+    index_record_count - IndexRecordCount instance or None.
     kargs - superclass arguments and absorb arguments for other engines.
 
     The file name is collected by super().__init__() call, and is used in this
@@ -2812,11 +3365,22 @@ class CursorSecondary(Cursor):
 
     """
 
-    def __init__(self, dbset, field=None, segment=None, **kargs):
+    def __init__(
+        self,
+        dbset,
+        field=None,
+        segment=None,
+        *,
+        checkpoints=None,
+        index_record_count=None,
+        **kargs
+    ):
         """Extend, note field and segment table names."""
         super().__init__(dbset, **kargs)
         self._field = field
         self._segment = segment
+        self._checkpoints = checkpoints
+        self._index_record_count = index_record_count
 
     @property
     def rowids_in_primary(self):
@@ -2854,23 +3418,34 @@ class CursorSecondary(Cursor):
             cursor.close()
 
     def count_records(self):
-        """Return record count."""
+        """Return record count.
+
+        The record counts maintained by index_record_count are used if
+        given, otherwise the record counts in the index are summed.
+
+        """
         if self.get_partial() in (None, False):
+            if self._index_record_count is not None:
+                return self._index_record_count.count_records()
             statement = " ".join(
                 (
-                    "select",
+                    "select coalesce ( sum (",
                     SQLITE_COUNT_COLUMN,
-                    "from",
+                    ") , 0 ) from",
                     self._table,
                 )
             )
             values = ()
         else:
+            if self._index_record_count is not None:
+                return self._index_record_count.count_records(
+                    self.get_converted_partial_with_wildcard()
+                )
             statement = " ".join(
                 (
-                    "select",
+                    "select coalesce ( sum (",
                     SQLITE_COUNT_COLUMN,
-                    "from",
+                    ") , 0 ) from",
                     self._table,
                     "where",
                     self._field,
@@ -2878,10 +3453,7 @@ class CursorSecondary(Cursor):
                 )
             )
             values = (self.get_converted_partial_with_wildcard(),)
-        count = 0
-        for row in self._cursor.execute(statement, values):
-            count += row[0]
-        return count
+        return self._cursor.execute(statement, values).fetchone()[0]
 
     def first(self):
         """Return first record taking partial key into account."""
@@ -2946,8 +3518,15 @@ class CursorSecondary(Cursor):
             value, SegmentSize.db_segment_size
         )
 
-        # Get position of record relative to start point
+        # Get position of record relative to start point, which is the
+        # nearest checkpoint before key if there are checkpoints.
+        position = 0
         if not self.get_partial():
+            if self._checkpoints is None:
+                checkpoint = None
+            else:
+                self._checkpoints.refresh(self._key_counts)
+                checkpoint, position = self._checkpoints.locate_key(key)
             statement = " ".join(
                 (
                     "select",
@@ -2960,13 +3539,18 @@ class CursorSecondary(Cursor):
                     self.rowids_in_primary,
                     "from",
                     self._table,
+                    *(
+                        ()
+                        if checkpoint is None
+                        else ("where", self._field, ">= ?")
+                    ),
                     "order by",
                     self._field,
                     ",",
                     SQLITE_SEGMENT_COLUMN,
                 )
             )
-            values = ()
+            values = () if checkpoint is None else (checkpoint,)
         else:
             statement = " ".join(
                 (
@@ -2991,7 +3575,6 @@ class CursorSecondary(Cursor):
             )
             values = (self.get_converted_partial_with_wildcard(),)
         db_segment_size_bytes = SegmentSize.db_segment_size_bytes
-        position = 0
         for row in self._cursor.execute(statement, values):
             if row[0] < key:
                 position += row[2]
@@ -3014,6 +3597,10 @@ class CursorSecondary(Cursor):
                         segment = RecordsetSegmentBitarray(
                             segment_number, None, records=segment_record
                         )
+                    elif len(segment_record) % 2:
+                        segment = RecordsetSegmentRun(
+                            segment_number, None, records=segment_record
+                        )
                     else:
                         segment = RecordsetSegmentList(
                             segment_number, None, records=segment_record
@@ -3027,6 +3614,8 @@ class CursorSecondary(Cursor):
         """Return record for positionth record in file or None."""
         if position is None:
             return None
+        if not self.get_partial() and self._checkpoints is not None:
+            return self._get_record_at_position_from_checkpoint(position)
 
         # Start at first or last record whichever is likely closer to position
         if position < 0:
@@ -3142,6 +3731,10 @@ class CursorSecondary(Cursor):
                         segment = RecordsetSegmentBitarray(
                             row[1], None, records=segment_record
                         )
+                    elif len(segment_record) % 2:
+                        segment = RecordsetSegmentRun(
+                            row[1], None, records=segment_record
+                        )
                     else:
                         segment = RecordsetSegmentList(
                             row[1], None, records=segment_record
@@ -3169,6 +3762,10 @@ class CursorSecondary(Cursor):
                         segment = RecordsetSegmentBitarray(
                             row[1], None, records=segment_record
                         )
+                    elif len(segment_record) % 2:
+                        segment = RecordsetSegmentRun(
+                            row[1], None, records=segment_record
+                        )
                     else:
                         segment = RecordsetSegmentList(
                             row[1], None, records=segment_record
@@ -3181,6 +3778,90 @@ class CursorSecondary(Cursor):
                 break
         return None
 
+    def _get_record_at_position_from_checkpoint(self, position):
+        """Return record for positionth record in file or None.
+
+        The index is scanned from the nearest checkpoint before position.
+
+        """
+        checkpoints = self._checkpoints
+        checkpoints.refresh(self._key_counts)
+        if position < 0:
+            position += checkpoints.record_count()
+            if position < 0:
+                return None
+        checkpoint, count = checkpoints.locate_position(position)
+        statement = " ".join(
+            (
+                "select",
+                self._field,
+                ",",
+                SQLITE_SEGMENT_COLUMN,
+                ",",
+                SQLITE_COUNT_COLUMN,
+                ",",
+                self.rowids_in_primary,
+                "from",
+                self._table,
+                *(
+                    ()
+                    if checkpoint is None
+                    else ("where", self._field, ">= ?")
+                ),
+                "order by",
+                self._field,
+                ",",
+                SQLITE_SEGMENT_COLUMN,
+            )
+        )
+        values = () if checkpoint is None else (checkpoint,)
+        for row in self._cursor.execute(statement, values):
+            count += row[2]
+            if count <= position:
+                continue
+            record_number = self._get_segment(
+                row[0], row[1], row[2], row[3]
+            ).get_record_number_at_position(position - count + row[2])
+            if record_number is not None:
+                return row[0], record_number
+            break
+        return None
+
+    def _key_counts(self, low, high):
+        """Yield (key, record count) for keys from low up to high.
+
+        low and high are not applied if None, and high is excluded.
+
+        """
+        conditions = []
+        values = []
+        if low is not None:
+            conditions.append(" ".join((self._field, ">= ?")))
+            values.append(low)
+        if high is not None:
+            conditions.append(" ".join((self._field, "< ?")))
+            values.append(high)
+        statement = " ".join(
+            (
+                "select",
+                self._field,
+                ", sum (",
+                SQLITE_COUNT_COLUMN,
+                ") from",
+                self._table,
+                *(("where", " and ".join(conditions)) if conditions else ()),
+                "group by",
+                self._field,
+                "order by",
+                self._field,
+            )
+        )
+        cursor = self._dbset.cursor()
+        try:
+            yield from cursor.execute(statement, values)
+        finally:
+            cursor.close()
+
     def last(self):
         """Return last record taking partial key into account."""
         if self.get_partial() is None:
@@ -3677,6 +4358,8 @@ class CursorSecondary(Cursor):
             return RecordsetSegmentBitarray(
                 segment_number, key, records=records
             )
+        if len(records) % 2:
+            return RecordsetSegmentRun(segment_number, key, records=records)
         return RecordsetSegmentList(segment_number, key, records=records)
 
     def set_current_segment(self, segment_reference):
@@ -3752,6 +4435,9 @@ class RecordsetCursor(recordsetcursor.RecordsetCursor):
         super().__init__(recordset)
         self.engine = engine
 
+        # Statement to select record value, built on first use.
+        self._select_value = None
+
     # These comments were written for solentware_base version of this class
     # and need translating!
     # Hack to get round self._dbset._database being a Sqlite.Cursor which means
@@ -3772,22 +4458,25 @@ class RecordsetCursor(recordsetcursor.RecordsetCursor):
             return None  # maybe raise
         if recnum not in dbset.rs_segments[segment]:
             return None  # maybe raise
-        statement = " ".join(
-            (
-                "select",
-                SQLITE_VALUE_COLUMN,
-                "from",
-                dbset.dbset,
-                "where",
-                dbset.dbset,
-                "== ?",
-                "limit 1",
+        if self._select_value is None:
+            self._select_value = " ".join(
+                (
+                    "select",
+                    SQLITE_VALUE_COLUMN,
+                    "from",
+                    dbset.dbset,
+                    "where",
+                    dbset.dbset,
+                    "== ?",
+                    "limit 1",
+                )
             )
-        )
         values = (record_number,)
         database_cursor = self.engine.cursor()
         try:
-            record = database_cursor.execute(statement, values).fetchone()[0]
+            record = database_cursor.execute(
+                self._select_value, values
+            ).fetchone()[0]
         finally:
             database_cursor.close()
         # maybe raise if record is None (if not, None should go on cache)
@@ -3798,7 +4487,13 @@ class RecordsetCursor(recordsetcursor.RecordsetCursor):
 
 
 class ExistenceBitmapControl(_database.ExistenceBitmapControl):
-    """Access existence bit map for file in database."""
+    """Access existence bit map for file in database.
+
+    The existence bitmap statements are registered by the database with
+    the other statements for file, and executed by the database's pooled
+    cursors.  The dbenv arguments of the methods are ignored.
+
+    """
 
     def __init__(self, file, database):
         """Note file whose existence bitmap is managed."""
@@ -3806,6 +4501,10 @@ class ExistenceBitmapControl(_database.ExistenceBitmapControl):
         self.ebm_table = SUBFILE_DELIMITER.join(
             (self._file, EXISTENCE_BITMAP_SUFFIX)
         )
+        self._statements = database._statements[file, None]
+        self._execute = database._execute
+        self._insert = database._insert
+        self._fetch_one = database._fetch_one
         create_statement = " ".join(
             (
                 "create table if not exists",
@@ -3842,91 +4541,190 @@ class ExistenceBitmapControl(_database.ExistenceBitmapControl):
 
     def get_ebm_segment(self, key, dbenv):
         """Return existence bitmap for segment number key in database dbenv."""
+        del dbenv
         # record keys are 1-based but segment_numbers are 0-based.
-        statement = " ".join(
-            (
-                "select",
-                SQLITE_VALUE_COLUMN,
-                "from",
-                self.ebm_table,
-                "where",
-                self.ebm_table,
-                "== ?",
-                "limit 1",
-            )
+        row = self._fetch_one(
+            self._statements["select_ebm_segment"], (key + 1,)
         )
-        values = (key + 1,)
-        cursor = dbenv.cursor()
-        try:
-            return cursor.execute(statement, values).fetchone()[0]
-        except TypeError:
+        if row is None:
             return None
-        finally:
-            cursor.close()
+        return row[0]
 
     # Not used at present but defined anyway.
     def delete_ebm_segment(self, key, dbenv):
         """Delete existence bitmap for segment key from database dbenv."""
-        statement = " ".join(
-            (
-                "delete from",
-                self.ebm_table,
-                "where",
-                self.ebm_table,
-                "== ?",
-            )
-        )
-        values = (key,)
-        cursor = dbenv.cursor()
-        try:
-            cursor.execute(statement, values)
-        finally:
-            cursor.close()
+        del dbenv
+        self._execute(self._statements["delete_ebm_segment"], (key,))
 
     def put_ebm_segment(self, key, value, dbenv):
         """Update existence bitmap value for segment key to database dbenv."""
-        statement = " ".join(
-            (
-                "update",
-                self.ebm_table,
-                "set",
-                SQLITE_VALUE_COLUMN,
-                "= ?",
-                "where",
-                self.ebm_table,
-                "== ?",
-            )
-        )
-        values = (value, key)
-        cursor = dbenv.cursor()
-        try:
-            cursor.execute(statement, values)
-        finally:
-            cursor.close()
+        del dbenv
+        self._execute(self._statements["update_ebm_segment"], (value, key))
+
+    def write_ebm_segment(self, segment_number, ebm, dbenv):
+        """Write existence bitmap ebm for segment_number to database dbenv."""
+        # record keys are 1-based but segment_numbers are 0-based.
+        self.put_ebm_segment(segment_number + 1, ebm.tobytes(), dbenv)
 
     def append_ebm_segment(self, value, dbenv):
         """Add existence bitmap, value, to database, dbenv."""
-        statement = " ".join(
-            (
-                "insert into",
-                self.ebm_table,
-                "(",
-                SQLITE_VALUE_COLUMN,
-                ")",
-                "values ( ? )",
-            )
+        del dbenv
+        return self._insert(self._statements["insert_ebm_segment"], (value,))
+
+
+class IndexRecordCount:
+    """Maintain record counts for field index of file in database.
+
+    The record count for the index is kept in the control table, and the
+    record count for each key in the index is kept in a table with one row
+    per key.  Partial key counts are the sum of the counts for the keys
+    which match.
+
+    Changes to the counts are held until flush_cache() is called once
+    start_cache() has been called, so a transaction writes each count once.
+    Otherwise changes are written immediately.
+
+    """
+
+    def __init__(self, file, field, database):
+        """Note statements for maintaining record counts for field in file."""
+        self._statements = database._statements[file, field]
+        self._execute = database._execute
+        self._execute_many = database._execute_many
+        self._fetch_one = database._fetch_one
+        self._secondary = database.table[SUBFILE_DELIMITER.join((file, field))]
+        self._key_count = SUBFILE_DELIMITER.join(
+            (self._secondary, INDEX_KEY_COUNT_SUFFIX)
         )
-        values = (value,)
-        cursor = dbenv.cursor()
-        try:
-            return (
-                cursor.execute(statement, values)
-                .execute(
-                    " ".join(
-                        ("select last_insert_rowid() from", self.ebm_table)
-                    )
+        self._field = field
+
+        # Record count changes by key not yet written to the database.  None
+        # means changes are written immediately.
+        self.changes = None
+
+    def start_cache(self):
+        """Hold record count changes until flush_cache() is called."""
+        if self.changes is None:
+            self.changes = {}
+
+    def discard_cache(self):
+        """Forget record count changes and write later ones immediately."""
+        self.changes = None
+
+    def flush_cache(self):
+        """Write record count changes held to database."""
+        if self.changes:
+            changes = self.changes
+            self.changes = {}
+            self.write_changes(changes)
+
+    def change_count(self, key, change):
+        """Change record count for key by change."""
+        if not change:
+            return
+        changes = self.changes
+        if changes is None:
+            self.write_changes({key: change})
+        else:
+            changes[key] = changes.get(key, 0) + change
+
+    def write_changes(self, changes):
+        """Apply changes, a dict of record count changes by key, to database.
+
+        The record count for a key is deleted when it becomes zero.
+
+        """
+        changes = [(key, change) for key, change in changes.items() if change]
+        if not changes:
+            return
+        statements = self._statements
+        self._execute_many(statements["change_key_record_count"], changes)
+        self._execute_many(
+            statements["delete_key_record_count"],
+            [(key,) for key, change in changes if change < 0],
+        )
+        self._execute(
+            statements["change_record_count"],
+            (sum(change for key, change in changes),),
+        )
+
+    def count_records(self, partial_with_wildcard=None):
+        """Return record count for index or keys matching glob pattern."""
+        self.flush_cache()
+        if partial_with_wildcard is None:
+            return self._fetch_one(
+                self._statements["select_record_count"], ()
+            )[0]
+        return self._fetch_one(
+            self._statements["select_partial_record_count"],
+            (partial_with_wildcard,),
+        )[0]
+
+    def counts_exist(self):
+        """Return True if the record count for the index exists."""
+        return (
+            self._fetch_one(self._statements["select_record_count"], ())
+            is not None
+        )
+
+    def create_counts(self):
+        """Replace the record counts by those calculated from the index.
+
+        Record count changes held are discarded.
+
+        """
+        if self.changes is not None:
+            self.changes = {}
+        self._execute(
+            " ".join(
+                (
+                    "delete from",
+                    CONTROL_FILE,
+                    "where",
+                    CONTROL_FILE,
+                    "== ?",
                 )
-                .fetchone()[0]
-            )
-        finally:
-            cursor.close()
+            ),
+            (INDEX_RECORD_COUNT_PREFIX + self._secondary,),
+        )
+        self._execute(
+            " ".join(
+                (
+                    "insert into",
+                    CONTROL_FILE,
+                    "(",
+                    CONTROL_FILE,
+                    ",",
+                    SQLITE_VALUE_COLUMN,
+                    ")",
+                    "select ? , coalesce ( sum (",
+                    SQLITE_COUNT_COLUMN,
+                    ") , 0 ) from",
+                    self._secondary,
+                )
+            ),
+            (INDEX_RECORD_COUNT_PREFIX + self._secondary,),
+        )
+        self._execute(" ".join(("delete from", self._key_count)), ())
+        self._execute(
+            " ".join(
+                (
+                    "insert into",
+                    self._key_count,
+                    "(",
+                    self._field,
+                    ",",
+                    SQLITE_COUNT_COLUMN,
+                    ")",
+                    "select",
+                    self._field,
+                    ", sum (",
+                    SQLITE_COUNT_COLUMN,
+                    ") from",
+                    self._secondary,
+                    "group by",
+                    self._field,
+                )
+            ),
+            (),
+        )
@@ -25,8 +25,12 @@ from .recordset import (
     RecordsetSegmentBitarray,
     RecordsetSegmentInt,
     RecordsetSegmentList,
+    RecordsetSegmentRun,
 )
 
+# Number of index entries written together by the merge_writer Writer.
+_MERGE_WRITER_BATCH_SIZE = 1000
+
 
 class DatabaseError(_databasedu.DatabaseduError):
     """Exception for Database class."""
@@ -116,9 +120,8 @@ class Database(_databasedu.Database):
 
         self.set_int_to_bytes_lookup(lookup=True)
 
-        # Comment these if the 'do-nothing' override of commit() is commented.
-        # self.dbenv.cursor().execute('pragma journal_mode = off')
-        # self.dbenv.cursor().execute('pragma synchronous = off')
+        # The journal and synchronous pragmas for a bulk load are set by
+        # set_tuning_profile(BULK_LOAD) before this method is called.
         self.start_transaction()
 
         for file in self.specification:
@@ -147,18 +150,20 @@ class Database(_databasedu.Database):
     def unset_defer_update(self):
         """Tidy-up at end of deferred update run."""
         self.set_int_to_bytes_lookup(lookup=False)
+
+        # The deferred update writers do not maintain cached RecordLists or
+        # position checkpoint summaries.
+        self.clear_recordlist_cache()
+        self.clear_position_checkpoints()
         for file in self.specification:
             self.high_segment[file] = None
             self.first_chunk[file] = None
 
-        # See comment in set_defer_update method.
+        # See comment in set_defer_update method.  The tuning profile in
+        # use before the bulk load is restored after this method is called.
 
         self.commit()
 
-        # Comment these if the 'do-nothing' override of commit() is commented.
-        # self.dbenv.cursor().execute('pragma journal_mode = delete')
-        # self.dbenv.cursor().execute('pragma synchronous = full')
-
     def _write_existence_bit_map(self, file, segment):
         """Write the existence bit map for segment in file."""
         assert file in self.specification
@@ -196,10 +201,18 @@ class Database(_databasedu.Database):
         if field not in self.value_segments[file]:
             return
 
+        # Cached RecordLists may not include the records written here.
+        self.clear_recordlist_cache()
+
         # Prepare to wrap the record numbers in an appropriate Segment class.
         self._prepare_segment_record_list(file, field)
         segvalues = self.value_segments[file][field]
 
+        # The records are new so each count is an increase.
+        self.index_record_count[file, field].write_changes(
+            {k: svk[0] for k, svk in segvalues.items()}
+        )
+
         # New records go into temporary databases, one for each segment, except
         # when filling the segment which was high when this update started.
         if (
@@ -321,10 +334,14 @@ class Database(_databasedu.Database):
 
         # Insert new record lists in subsidiary table and note rowids.
         # Modify the index record values to refer to the rowid if necessary.
-        for k in segvalues:
-            svk = segvalues[k]
-            if svk[0] > 1:
-                svk[1] = self.insert_segment_records((svk[1],), file)
+        keys = [k for k, svk in segvalues.items() if svk[0] > 1]
+        for k, rowid in zip(
+            keys,
+            self.insert_many_segment_records(
+                [segvalues[k][1] for k in keys], file
+            ),
+        ):
+            segvalues[k][1] = rowid
 
         # insert (index value, segment number, record count, key reference)
         # statement.
@@ -440,6 +457,8 @@ class Database(_databasedu.Database):
         indicies.
 
         """
+        self.clear_recordlist_cache()
+        self.clear_position_checkpoints()
         statement = " ".join(
             (
                 "drop table if exists",
@@ -493,6 +512,7 @@ class Database(_databasedu.Database):
             cursor.execute(statement)
         finally:
             cursor.close()
+        self.index_record_count[file, field].create_counts()
 
     def merge_writer(self, file, field):
         """Return a Writer instance for the field index on table file.
@@ -510,6 +530,8 @@ class Database(_databasedu.Database):
                 )
             if len(item[3]) == SegmentSize.db_segment_size_bytes:
                 return RecordsetSegmentBitarray(item[1], None, records=item[3])
+            if len(item[3]) % 2:
+                return RecordsetSegmentRun(item[1], None, records=item[3])
             return RecordsetSegmentList(item[1], None, records=item[3])
 
         assert file != field
@@ -581,22 +603,6 @@ class Database(_databasedu.Database):
                 "limit 1",
             )
         )
-        insert_segment_records = " ".join(
-            (
-                "insert into",
-                self.segment_table[file],
-                "(",
-                SQLITE_RECORDS_COLUMN,
-                ")",
-                "values ( ? )",
-            )
-        )
-        last_inserted_row = " ".join(
-            (
-                "select last_insert_rowid() from",
-                self.segment_table[file],
-            )
-        )
         set_segment_records = " ".join(
             (
                 "update",
@@ -609,13 +615,26 @@ class Database(_databasedu.Database):
         )
 
         class Writer:
-            """Write index entries to database."""
+            """Write index entries to database.
+
+            Index entries are held until _MERGE_WRITER_BATCH_SIZE entries
+            are ready to be written, or an entry must be spliced with the
+            index entry most recently written, or close_cursor() is called.
+            The new segment records are inserted by one call of the
+            database's insert_many_segment_records() method and the index
+            entries by one executemany() call.
+            """
 
             def __init__(self, database):
                 self.prev_segment = None
                 self.prev_key = None
                 self.database = database
+                self.index_record_count = database.index_record_count[
+                    file, field
+                ]
                 self.cursor = database.dbenv.cursor()
+                self.index_items = []
+                self.new_segment_items = []
 
             def make_new_cursor(self):
                 """Do nothing.
@@ -625,11 +644,47 @@ class Database(_databasedu.Database):
                 """
 
             def close_cursor(self):
-                """Do nothing.
+                """Write the index entries held.
 
                 Present for compatibility with _dbdu, _dbdu_tkinter, and
                 _lmdbdu.
                 """
+                self.write_index_items()
+
+            def write_index_items(self):
+                """Write the index entries held to database."""
+                new_segment_items = self.new_segment_items
+                if new_segment_items:
+                    for item, rowid in zip(
+                        new_segment_items,
+                        self.database.insert_many_segment_records(
+                            [item[3] for item in new_segment_items], file
+                        ),
+                    ):
+                        item[3] = rowid
+                    new_segment_items.clear()
+                if self.index_items:
+                    self.cursor.executemany(
+                        write_item_to_index, self.index_items
+                    )
+                    changes = {}
+                    for item in self.index_items:
+                        changes[item[0]] = changes.get(item[0], 0) + item[2]
+                    self.index_record_count.write_changes(changes)
+                    self.index_items.clear()
+
+            def hold_index_item(self, item):
+                """Hold item, without it's type, for writing to database."""
+                item_type = item.pop(2)
+                assert len(item) == 4
+                self.index_items.append(item)
+                if item_type == NEW_SEGMENT_CONTENT:
+                    if item[2] > 1:
+                        self.new_segment_items.append(item)
+                else:
+                    assert item_type == EXISTING_SEGMENT_REFERENCE
+                if len(self.index_items) >= _MERGE_WRITER_BATCH_SIZE:
+                    self.write_index_items()
 
             def write(self, item):
                 """Write item to index on database."""
@@ -638,42 +693,29 @@ class Database(_databasedu.Database):
                 if self.prev_segment != segment:
                     self.prev_segment = segment
                     self.prev_key = item[0]
-                    item_type = item.pop(2)
-                    if item_type == EXISTING_SEGMENT_REFERENCE:
-                        self.cursor.execute(write_item_to_index, item)
-                        assert len(item) == 4
-                        return
-                    if item[-2] > 1:
-                        self.cursor.execute(
-                            insert_segment_records, (item[-1],)
-                        )
-                        item[-1] = self.cursor.execute(
-                            last_inserted_row
-                        ).fetchone()[0]
-                    self.cursor.execute(write_item_to_index, item)
-                    assert item_type == NEW_SEGMENT_CONTENT
-                    assert len(item) == 4
+                    self.hold_index_item(item)
                     return
                 if self.prev_key == item[0]:
                     assert item[2] == NEW_SEGMENT_CONTENT
                     del item[2]
+                    self.write_index_items()
                     high = self.cursor.execute(
                         read_high_item_in_index
                     ).fetchone()
                     new_segment = make_segment_from_item(item)
                     new_segment |= self.database.populate_segment(high, file)
                     new_segment.normalize()
+                    self.index_record_count.change_count(
+                        high[0], new_segment.count_records() - high[2]
+                    )
                     if high[2] == 1:
-                        self.cursor.execute(
-                            insert_segment_records, (new_segment.tobytes(),)
-                        )
                         self.cursor.execute(
                             replace_index_item,
                             (
                                 new_segment.count_records(),
-                                self.cursor.execute(
-                                    last_inserted_row
-                                ).fetchone()[0],
+                                self.database.insert_segment_records(
+                                    (new_segment.tobytes(),), file
+                                ),
                                 high[0],
                                 high[1],
                             ),
@@ -689,20 +731,8 @@ class Database(_databasedu.Database):
                         )
                     assert len(item) == 4
                     return
-                item_type = item.pop(2)
-                if item_type == EXISTING_SEGMENT_REFERENCE:
+                if item[2] == EXISTING_SEGMENT_REFERENCE:
                     self.prev_key = item[0]
-                    self.cursor.execute(write_item_to_index, item)
-                    assert len(item) == 4
-                    return
-                if item[2] > 1:
-                    self.cursor.execute(insert_segment_records, (item[3],))
-                    item[3] = self.cursor.execute(
-                        last_inserted_row
-                    ).fetchone()[0]
-                self.cursor.execute(write_item_to_index, item)
-                assert item_type == NEW_SEGMENT_CONTENT
-                assert len(item) == 4
-                return
+                self.hold_index_item(item)
 
         return Writer(self)
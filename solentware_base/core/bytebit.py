@@ -4,14 +4,17 @@
 
 """Provide a bit array class (called Bitarray) for solentware_base package.
 
-Use the bitarray package if it has been installed, otherwise use the _bytebit
-module in solentware_base.core.
+Use the bitarray package if it has been installed, otherwise use the
+_npbytebit module in solentware_base.core if numpy has been installed,
+otherwise use the _bytebit module in solentware_base.core.
 
-The core._bytebit module implements the subset of the bitarray interface used
-in solentware_base.
+The core._bytebit and core._npbytebit modules implement the subset of the
+bitarray interface used in solentware_base.
 
-Bitarray mostly takes about 4 times longer to do something than bitarray, but
-takes about 100 times longer to count set bits.
+The _bytebit Bitarray mostly takes about 4 times longer to do something than
+bitarray, but takes about 100 times longer to count set bits.  The
+_npbytebit Bitarray is much quicker than the _bytebit Bitarray at counting
+and listing set bits, but slower at setting and testing single bits.
 
 """
 
@@ -28,6 +31,9 @@ try:
     SINGLEBIT = Bitarray("1")
 
 except ImportError:
-    from ._bytebit import Bitarray
+    try:
+        from ._npbytebit import Bitarray
+    except ImportError:
+        from ._bytebit import Bitarray
 
     SINGLEBIT = True
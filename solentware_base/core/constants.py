@@ -230,3 +230,25 @@ DEFAULT_MAP_BLOCKS = 1
 # Values set so existing segment reference is lower in ascending order.
 EXISTING_SEGMENT_REFERENCE = 0
 NEW_SEGMENT_CONTENT = 1
+
+# The record count for an index is kept in the control table, or datastore,
+# under the index name with this prefix.  The record count for each key in an
+# index is kept in a table, or datastore, named by the index name with this
+# suffix.
+INDEX_RECORD_COUNT_PREFIX = "C"
+INDEX_KEY_COUNT_SUFFIX = SUBFILE_DELIMITER + "count"
+
+# Tuning profiles for the set_tuning_profile() method of Database classes.
+# The engine defaults are used if no profile is set.
+BULK_LOAD = "bulk_load"
+INTERACTIVE = "interactive"
+READ_MOSTLY = "read_mostly"
+TUNING_PROFILES = frozenset((BULK_LOAD, INTERACTIVE, READ_MOSTLY))
+
+# Codecs for values on primary database records, named by the RECORD_CODEC
+# item of a file specification.  The REPR_CODEC is used if none is named.
+RECORD_CODEC = "record_codec"
+REPR_CODEC = "repr"
+MARSHAL_CODEC = "marshal"
+PICKLE_CODEC = "pickle"
+RECORD_CODECS = frozenset((REPR_CODEC, MARSHAL_CODEC, PICKLE_CODEC))
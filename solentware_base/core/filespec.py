@@ -39,6 +39,8 @@ from .constants import (
     ACCESS_METHOD,
     HASH,
     BTREE,
+    RECORD_CODEC,
+    RECORD_CODECS,
 )
 
 
@@ -328,6 +330,18 @@ class FileSpec(dict):
                     ]
                 )
                 raise FileSpecError(msg)
+            if RECORD_CODEC in specification:
+                if specification[RECORD_CODEC] not in RECORD_CODECS:
+                    msg = " ".join(
+                        [
+                            "Record codec",
+                            repr(specification[RECORD_CODEC]),
+                            "for file",
+                            name,
+                            "is not supported",
+                        ]
+                    )
+                    raise FileSpecError(msg)
             try:
                 os.path.join(specification.get(FILE))
             except TypeError as exc:
@@ -618,9 +632,13 @@ class FileSpec(dict):
                 "field in each file as defined in this FileSpec",
             )
         )
+        # The record codec affects only values written after the database
+        # is opened so it may differ from the stored specification.
         for dbs, fss in zip(sdbspec, sfsspec):
-            sdbs = sorted(s for s in stored_specification[dbs])
-            sfss = sorted(s for s in self[fss])
+            sdbs = sorted(
+                s for s in stored_specification[dbs] if s != RECORD_CODEC
+            )
+            sfss = sorted(s for s in self[fss] if s != RECORD_CODEC)
             if sdbs != sfss:
                 raise FileSpecError(msgdh)
             for dbsd in sdbs:
@@ -15,6 +15,20 @@ import re
 
 from . import where
 
+# The recordlist_key_range arguments bounding the keys for each condition.
+KEY_RANGE_BOUNDS = {
+    where.GT: ("gt",),
+    where.LT: ("lt",),
+    where.LE: ("le",),
+    where.GE: ("ge",),
+    where.BEFORE: ("lt",),
+    where.AFTER: ("gt",),
+    (where.FROM, where.TO): ("ge", "le"),
+    (where.FROM, where.BELOW): ("ge", "lt"),
+    (where.ABOVE, where.TO): ("gt", "le"),
+    (where.ABOVE, where.BELOW): ("gt", "lt"),
+}
+
 
 class FindError(Exception):
     """Exception for Find class."""
@@ -74,6 +88,13 @@ class Find:
             where.NOR: self._nor,
             where.OR: self._or,
         }
+        self.compile_field_value = {
+            where.IS: self._compile_is_not,
+            where.NE: self._compile_ne,
+            where.PRESENT: self._compile_present,
+            where.LIKE: self._compile_like,
+            where.STARTS: self._compile_starts,
+        }
 
     @property
     def db(self):
@@ -105,7 +126,33 @@ class Find:
         # 'field is not value' is only case of 'field <condition> not value'
         obj.result.answer = self.compare_field_value[case](obj)
         if bool(obj.not_condition) ^ bool(obj.not_phrase):
-            obj.result.answer = self.get_existence() ^ obj.result.answer
+            obj.result.answer = self._db.recordlist_complement(
+                self._dbset, obj.result.answer
+            )
+
+    def estimate(self, obj):
+        """Return estimated number of records in obj's index answer or None.
+
+        The estimate ignores 'not' in obj, and None is returned if an
+        estimate is not available for obj's condition.
+
+        """
+        if not self._db.exists(self._dbset, obj.field):
+            return None
+        encode = self._db.encode_record_selector
+        if obj.condition in {where.IS, where.EQ}:
+            return self._db.estimate_recordlist_key(
+                self._dbset, obj.field, key=encode(obj.value)
+            )
+        bounds = KEY_RANGE_BOUNDS.get(obj.condition)
+        if bounds is None:
+            return None
+        values = obj.value if len(bounds) == 2 else (obj.value,)
+        return self._db.estimate_recordlist_key_range(
+            self._dbset,
+            obj.field,
+            **{bound: encode(value) for bound, value in zip(bounds, values)},
+        )
 
     def not_condition(self, obj):
         """Invert node's answer if not condition or not phrase specified.
@@ -114,7 +161,9 @@ class Find:
 
         """
         if bool(obj.not_condition) ^ bool(obj.not_phrase):
-            obj.result.answer = self.get_existence() ^ obj.result.answer
+            obj.result.answer = self._db.recordlist_complement(
+                self._dbset, obj.result.answer
+            )
 
     def operator(self, obj):
         """Apply 'and', 'or', or 'nor', for obj to node and left node.
@@ -172,6 +221,52 @@ class Find:
         elif obj.condition == where.STARTS:
             self._starts(obj, record_number, record)
 
+    def compile_non_index_condition(self, obj):
+        """Return function to evaluate non-index condition on field values.
+
+        The function returns True if the tuple of values of obj.field in a
+        record, which must not be empty, fits the condition in obj.
+
+        None is returned if no record can fit the condition.
+
+        """
+        compile_ = self.compile_field_value.get(obj.condition)
+        if compile_ is None:
+            return None
+        return compile_(obj)
+
+    def evaluate_non_index_conditions(self, nodes, recordset):
+        """Evaluate the non-index conditions in nodes for recordset records.
+
+        Each condition is compiled once, the records are read in batches in
+        record number order, and each record is decoded once for all the
+        conditions.  The field values are fetched once per record for all
+        conditions on the field.
+
+        """
+        tests = {}
+        for node in nodes:
+            test = self.compile_non_index_condition(node)
+            if test is not None:
+                tests.setdefault(node.field, []).append((test, node, []))
+        if not tests:
+            return
+        tests = tuple(tests.items())
+        instance = self._recordclass()
+        for record in self._db.iter_records(recordset):
+            instance.load_record(record)
+            value = instance.value
+            for field, field_tests in tests:
+                field_values = value.get_field_values(field)
+                if not field_values:
+                    continue
+                for test, node, record_numbers in field_tests:
+                    if test(field_values):
+                        record_numbers.append(record[0])
+        for field, field_tests in tests:
+            for test, node, record_numbers in field_tests:
+                node.result.answer.place_record_numbers(record_numbers)
+
     def _is(self, obj):
         """Return RecordList for 'field is value' condition."""
         # 'field is value' and 'field is not value' are allowed
@@ -181,6 +276,7 @@ class Find:
             self._dbset,
             obj.field,
             key=self._db.encode_record_selector(obj.value),
+            within=obj.index_filter,
         )
 
     def _is_not(self, obj, record_number, record):
@@ -196,6 +292,69 @@ class Find:
         else:
             raise FindError("Attempt 'is not' where 'is' requested")
 
+    def _compile_is_not(self, obj):
+        """Return function for 'field is not value' or None for 'is'."""
+        if not obj.not_value:
+            return None
+        return self._compile_ne(obj)
+
+    @staticmethod
+    def _compile_ne(obj):
+        """Return function for 'field ne value'."""
+        value = obj.value
+
+        def test(field_values):
+            for field_value in field_values:
+                if field_value != value:
+                    return True
+            return False
+
+        return test
+
+    @staticmethod
+    def _compile_present(obj):
+        """Return function for 'field present'."""
+        del obj
+
+        def test(field_values):
+            return bool(field_values)
+
+        return test
+
+    @staticmethod
+    def _compile_like(obj):
+        """Return function for 'field like value' or None if invalid value."""
+        # The _like method ignores all exceptions, including the re.error
+        # and TypeError exceptions from a bad pattern.
+        try:
+            search = re.compile(obj.value).search
+        except Exception:
+            return None
+
+        def test(field_values):
+            for field_value in field_values:
+                try:
+                    if search(field_value):
+                        return True
+                except Exception:
+                    pass
+            return False
+
+        return test
+
+    @staticmethod
+    def _compile_starts(obj):
+        """Return function for 'field starts value'."""
+        value = obj.value
+
+        def test(field_values):
+            for field_value in field_values:
+                if field_value.startswith(value):
+                    return True
+            return False
+
+        return test
+
     def _like_by_index(self, obj):
         """Return RecordList for 'field like value' condition."""
         return self._db.recordlist_key_like(
@@ -244,6 +403,7 @@ class Find:
             self._dbset,
             obj.field,
             key=self._db.encode_record_selector(obj.value),
+            within=obj.index_filter,
         )
 
     def _ne(self, obj, record_number, record):
@@ -261,6 +421,7 @@ class Find:
             self._dbset,
             obj.field,
             gt=self._db.encode_record_selector(obj.value),
+            within=obj.index_filter,
         )
 
     def _lt(self, obj):
@@ -269,6 +430,7 @@ class Find:
             self._dbset,
             obj.field,
             lt=self._db.encode_record_selector(obj.value),
+            within=obj.index_filter,
         )
 
     def _le(self, obj):
@@ -277,6 +439,7 @@ class Find:
             self._dbset,
             obj.field,
             le=self._db.encode_record_selector(obj.value),
+            within=obj.index_filter,
         )
 
     def _ge(self, obj):
@@ -285,6 +448,7 @@ class Find:
             self._dbset,
             obj.field,
             ge=self._db.encode_record_selector(obj.value),
+            within=obj.index_filter,
         )
 
     def _before(self, obj):
@@ -293,6 +457,7 @@ class Find:
             self._dbset,
             obj.field,
             lt=self._db.encode_record_selector(obj.value),
+            within=obj.index_filter,
         )
 
     def _after(self, obj):
@@ -301,6 +466,7 @@ class Find:
             self._dbset,
             obj.field,
             gt=self._db.encode_record_selector(obj.value),
+            within=obj.index_filter,
         )
 
     def _from_to(self, obj):
@@ -310,6 +476,7 @@ class Find:
             obj.field,
             ge=self._db.encode_record_selector(obj.value[0]),
             le=self._db.encode_record_selector(obj.value[1]),
+            within=obj.index_filter,
         )
 
     def _from_below(self, obj):
@@ -319,6 +486,7 @@ class Find:
             obj.field,
             ge=self._db.encode_record_selector(obj.value[0]),
             lt=self._db.encode_record_selector(obj.value[1]),
+            within=obj.index_filter,
         )
 
     def _above_to(self, obj):
@@ -328,6 +496,7 @@ class Find:
             obj.field,
             gt=self._db.encode_record_selector(obj.value[0]),
             le=self._db.encode_record_selector(obj.value[1]),
+            within=obj.index_filter,
         )
 
     def _above_below(self, obj):
@@ -337,6 +506,7 @@ class Find:
             obj.field,
             gt=self._db.encode_record_selector(obj.value[0]),
             lt=self._db.encode_record_selector(obj.value[1]),
+            within=obj.index_filter,
         )
 
     # This is wrong not to mention 'self', surely?
@@ -346,8 +516,8 @@ class Find:
 
     def _nor(self, obj):
         """Return 'not' this node's answer 'and'ed with left node's answer."""
-        return obj.left.result.answer & (
-            self.get_existence() ^ obj.result.answer
+        return obj.left.result.answer & self._db.recordlist_complement(
+            self._dbset, obj.result.answer
         )
 
     # This is wrong not to mention 'self', surely?
@@ -25,8 +25,79 @@ class FindValues:
         self._db = db
         self._dbset = dbset
 
-    def find_values(self, valuesclause):
-        """Put values meeting valuesclause condition in valuesclause.result."""
+    def find_values(self, valuesclause, after=None, limit=None):
+        """Put values meeting valuesclause condition in valuesclause.result.
+
+        The after and limit arguments select a page of values: see the
+        iter_values() method.
+
+        """
         valuesclause.result = list(
-            self._db.find_values(valuesclause, self._dbset)
+            self.iter_values(valuesclause, after=after, limit=limit)
         )
+
+    def iter_values(self, valuesclause, after=None, limit=None):
+        """Yield values meeting valuesclause condition in ascending order.
+
+        Only values greater than after are yielded if after is not None,
+        and at most limit values if limit is not None.  A value picker can
+        fetch the next page by giving the last value of the current page
+        as after.
+
+        The values in valuesclause.in__set are looked up one at a time if
+        there is no range in valuesclause: see the ValuesClause method
+        get_in_set_lookup_values().
+
+        """
+        if limit is not None and limit < 1:
+            return
+        lookups = valuesclause.get_in_set_lookup_values()
+        if lookups is None:
+            values = self._db.find_values_ascending(
+                _values_after(valuesclause, after), self._dbset
+            )
+        else:
+            values = self._iter_lookup_values(valuesclause, lookups, after)
+        try:
+            count = 0
+            for value in values:
+                yield value
+                count += 1
+                if count == limit:
+                    break
+        finally:
+            values.close()
+
+    def _iter_lookup_values(self, valuesclause, lookups, after):
+        """Yield values in lookups, after after, which are in the index."""
+        for lookup in lookups:
+            if after is not None and lookup <= after:
+                continue
+            valuespec = valuesclause.copy_phrase()
+            valuespec.from_value = lookup
+            valuespec.to_value = lookup
+            values = self._db.find_values_ascending(valuespec, self._dbset)
+            try:
+                for value in values:
+                    if value == lookup:
+                        yield value
+                        break
+            finally:
+                values.close()
+
+
+def _values_after(valuesclause, after):
+    """Return valuesclause, or a copy with range starting above after."""
+    if after is None:
+        return valuesclause
+    if valuesclause.from_value is not None and valuesclause.from_value > after:
+        return valuesclause
+    if (
+        valuesclause.above_value is not None
+        and valuesclause.above_value >= after
+    ):
+        return valuesclause
+    valuespec = valuesclause.copy_phrase()
+    valuespec.from_value = None
+    valuespec.above_value = after
+    return valuespec
@@ -2,26 +2,210 @@
 # Copyright 2024 Roger Marsh
 # Licence: See LICENCE (BSD licence)
 
-"""Merge sorted index sequential files and populate database indicies."""
+"""Merge sorted index sequential files and populate database indicies.
+
+Two formats of sequential file are supported.
+
+The text format has one index entry per line as repr(<list of fields>),
+parsed by ast.literal_eval when read.  This format is convenient for
+debugging.
+
+The binary format starts with BINARY_DUMP_HEADER and follows it with index
+entries as length-prefixed sequences of length-prefixed fields.  Fields are
+decoded from memoryview slices of a buffer filled by large reads.
+
+The reader for a file is chosen from the file header.
+
+The put_merged_items function merges the files for one index and puts the
+sorted items on a queue.  It is intended to run in a worker process so
+several indicies can be merged at once while the process owning the
+database takes the items from the queues and does the writes.
+"""
 
 import os
 import heapq
+import struct
 from ast import literal_eval
 
+# A null byte cannot start a text format file, so a file starting with
+# BINARY_DUMP_HEADER is not a text format file.
+BINARY_DUMP_HEADER = b"\x00SBSEQ\x01\n"
+
+# Type tags for fields in binary format index entries.
+_BYTES = ord("b")
+_STR = ord("s")
+_INT = ord("i")
+_INT_LIST = ord("l")
+
+_ENTRY_LENGTH = struct.Struct(">I")
+_FIELD_HEADER = struct.Struct(">BI")
+
+_READ_BUFFER_SIZE = 1 << 16
+
+# Number of sorted items put on a queue at a time by put_merged_items.
+MERGED_ITEMS_BATCH_SIZE = 1000
+
+# Queues, keyed by index directory, and stop event for put_merged_items.
+# These are set by set_merged_item_queues in each worker process.
+_merged_item_queues = None
+_stop_merged_items = None
+
+
+def encode_binary_item(item):
+    """Return bytes for item in binary sequential file format.
+
+    item is a list of str, bytes, int, or list of int, fields: typically
+    [key, segment, NEW_SEGMENT_CONTENT, count, records].
+
+    """
+    pack_field_header = _FIELD_HEADER.pack
+    fields = []
+    for field in item:
+        if isinstance(field, bytes):
+            fields.append(pack_field_header(_BYTES, len(field)))
+            fields.append(field)
+        elif isinstance(field, str):
+            field = field.encode("utf-8")
+            fields.append(pack_field_header(_STR, len(field)))
+            fields.append(field)
+        elif isinstance(field, int):
+            field = field.to_bytes(
+                field.bit_length() // 8 + 1, byteorder="big", signed=True
+            )
+            fields.append(pack_field_header(_INT, len(field)))
+            fields.append(field)
+        elif isinstance(field, list):
+            field = struct.pack(">" + "I" * len(field), *field)
+            fields.append(pack_field_header(_INT_LIST, len(field)))
+            fields.append(field)
+        else:
+            raise TypeError(
+                "".join(
+                    (
+                        "Field type '",
+                        type(field).__name__,
+                        "' cannot be written in binary sequential format",
+                    )
+                )
+            )
+    body = b"".join(fields)
+    return _ENTRY_LENGTH.pack(len(body)) + body
+
 
 class _Reader:
-    """Yield lines read from dump_file."""
+    """Read items from dump_file in text or binary format."""
 
     def __init__(self, dump_file):
         """Set dump file name."""
         self.dump_file = dump_file
         self.file = None
+        self.read_item = None
+        self._buffer = None
+        self._view = None
+        self._position = 0
 
     def open_file(self):
-        """Yield line read from file."""
+        """Open file and choose reader appropriate to file header."""
         # pylint message R1732, 'consider-using-with' ignored for now.
         # Is it possible to work this into the Merge.sorter() method?
+        self.file = open(self.dump_file, mode="rb")
+        if self.file.read(len(BINARY_DUMP_HEADER)) == BINARY_DUMP_HEADER:
+            self._buffer = b""
+            self._view = memoryview(self._buffer)
+            self._position = 0
+            self.read_item = self._read_binary_item
+            return
+        self.file.close()
         self.file = open(self.dump_file, mode="r", encoding="utf-8")
+        self.read_item = self._read_text_item
+
+    def _read_text_item(self):
+        """Return item from next line of file or None at end of file."""
+        line = self.file.readline()
+        if not line:
+            return None
+        return literal_eval(line)
+
+    def _fill_buffer(self, length):
+        """Return True if length bytes are available from buffer position.
+
+        The unused part of the buffer is combined with the next read from
+        file if necessary.
+
+        """
+        available = len(self._view) - self._position
+        if available >= length:
+            return True
+        data = self.file.read(max(_READ_BUFFER_SIZE, length - available))
+        if not data:
+            if available:
+                raise ValueError(
+                    "".join(
+                        (
+                            "Truncated entry in binary sequential file '",
+                            self.dump_file,
+                            "'",
+                        )
+                    )
+                )
+            return False
+        self._buffer = self._view[self._position :].tobytes() + data
+        self._view = memoryview(self._buffer)
+        self._position = 0
+        return self._fill_buffer(length)
+
+    def _read_binary_item(self):
+        """Return item decoded from next entry or None at end of file."""
+        if not self._fill_buffer(_ENTRY_LENGTH.size):
+            return None
+        (length,) = _ENTRY_LENGTH.unpack_from(self._view, self._position)
+        if not self._fill_buffer(_ENTRY_LENGTH.size + length):
+            raise ValueError(
+                "".join(
+                    (
+                        "Truncated entry in binary sequential file '",
+                        self.dump_file,
+                        "'",
+                    )
+                )
+            )
+        view = self._view
+        unpack_field_header = _FIELD_HEADER.unpack_from
+        field_header_size = _FIELD_HEADER.size
+        start = self._position + _ENTRY_LENGTH.size
+        end = start + length
+        self._position = end
+        item = []
+        while start < end:
+            tag, size = unpack_field_header(view, start)
+            start += field_header_size
+            field = view[start : start + size]
+            start += size
+            if tag == _BYTES:
+                item.append(field.tobytes())
+            elif tag == _STR:
+                item.append(str(field, encoding="utf-8"))
+            elif tag == _INT:
+                item.append(
+                    int.from_bytes(field, byteorder="big", signed=True)
+                )
+            elif tag == _INT_LIST:
+                item.append(
+                    list(struct.unpack(">" + "I" * (size // 4), field))
+                )
+            else:
+                raise ValueError(
+                    "".join(
+                        (
+                            "Unknown field type tag ",
+                            repr(tag),
+                            " in binary sequential file '",
+                            self.dump_file,
+                            "'",
+                        )
+                    )
+                )
+        return item
 
 
 class Merge:
@@ -47,19 +231,19 @@ class Merge:
         }
 
     def sorter(self):
-        """Yield lines in sorted order."""
+        """Yield items in sorted order."""
         heappush = heapq.heappush
         heappop = heapq.heappop
         empty = set()
         items = []
         for name, reader in self.readers.items():
             reader.open_file()
-            line = reader.file.readline()
-            if not line:
+            item = reader.read_item()
+            if item is None:
                 reader.file.close()
                 empty.add(name)
                 continue
-            heappush(items, (literal_eval(line), name))
+            heappush(items, (item, name))
         for name in empty:
             del self.readers[name]
         readers = self.readers
@@ -69,15 +253,67 @@ class Merge:
             except IndexError:
                 break
             yield item
-            line = readers[name].file.readline()
-            if not line:
+            item = readers[name].read_item()
+            if item is None:
                 readers[name].file.close()
                 del self.readers[name]
                 continue
-            heappush(items, (literal_eval(line), name))
+            heappush(items, (item, name))
 
 
 def next_sorted_item(index_directory):
     """Yield sorted items from files in index_directory."""
     merger = Merge(index_directory)
     yield from merger.sorter()
+
+
+def set_merged_item_queues(queues, stop):
+    """Set queues and stop event used by put_merged_items.
+
+    queues maps index directory names to queues, and stop is an event which
+    tells put_merged_items to stop putting items on queues.
+
+    This is the initializer for worker processes because a
+    multiprocessing.Queue can be given to a process only when it starts.
+
+    """
+    global _merged_item_queues, _stop_merged_items
+    _merged_item_queues = queues
+    _stop_merged_items = stop
+
+
+def put_merged_items(index_directory):
+    """Put sorted items from files in index_directory on it's queue.
+
+    The items are put in lists of at most MERGED_ITEMS_BATCH_SIZE items,
+    and None is put after the last list, when the stop event is set, or
+    when an exception is raised.
+
+    The items are put as read, so the records in each item are the encoded
+    segment records written by the database's deferred update methods.
+
+    """
+    queue = _merged_item_queues[index_directory]
+    stop = _stop_merged_items
+    merger = None
+    try:
+        merger = Merge(index_directory)
+        batch = []
+        for item in merger.sorter():
+            batch.append(item)
+            if len(batch) < MERGED_ITEMS_BATCH_SIZE:
+                continue
+            if stop.is_set():
+                return
+            queue.put(batch)
+            batch = []
+        if batch and not stop.is_set():
+            queue.put(batch)
+    finally:
+        # None is put even if index_directory cannot be read, so the
+        # process taking items from the queue sees the exception.
+        if merger is not None:
+            for reader in merger.readers.values():
+                if reader.file is not None:
+                    reader.file.close()
+        queue.put(None)
@@ -0,0 +1,118 @@
+# nosqllayout.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""Encode and decode the index values stored by the _nosql module.
+
+The segment tables, lists and bitmaps of record numbers, and the lists of
+existence bitmap segment numbers, were stored as repr(<value>) and read
+with ast.literal_eval(<stored value>.decode()).  A bitmap stored this way
+is about two and a half times the size of the bitmap, and parsing it is
+the most expensive part of reading an index value.
+
+The binary layout stores a version byte, LAYOUT_VERSION, followed by:
+
+the bytes of a list or bitmap of record numbers;
+
+a struct array of segment number, segment type, and record number or
+count of records, for a segment table;
+
+a struct array of segment numbers for a list of segment numbers.
+
+repr() of a bytes, dict, or list, value never starts with the version
+byte so the decode functions accept values in either layout, and the
+upgrade_layout method of the _nosql Database class converts a database
+to the binary layout.
+
+"""
+
+from ast import literal_eval
+import struct
+
+from .constants import LIST_BYTES, BITMAP_BYTES
+
+# The first byte of values stored in the binary layout.
+LAYOUT_VERSION = b"\x01"
+
+# Segment table entries: segment number, segment type, and record number
+# or count of records.  A count can be one more than the largest 2 byte
+# number when a bitmap has all bits set.
+_SEGMENT_ENTRY = struct.Struct(">IcI")
+
+# Segment type in segment table entry for a segment with one record.
+_RECORD_NUMBER = b"R"
+
+_ENCODE_TYPE = {type_: type_.encode() for type_ in (LIST_BYTES, BITMAP_BYTES)}
+_DECODE_TYPE = {value: key for key, value in _ENCODE_TYPE.items()}
+
+_SEGMENT_NUMBER = struct.Struct(">I")
+
+
+def is_binary_layout(value):
+    """Return True if value, from database, is in the binary layout."""
+    return value[:1] == LAYOUT_VERSION
+
+
+def encode_records(records):
+    """Return bytes for records, the bytes of a list or bitmap."""
+    return LAYOUT_VERSION + records
+
+
+def decode_records(value):
+    """Return bytes of list or bitmap of records in value from database."""
+    if value[:1] == LAYOUT_VERSION:
+        return value[1:]
+    return literal_eval(value.decode())
+
+
+def encode_segment_table(segment_table):
+    """Return bytes for segment_table, a dict of segment references.
+
+    The dict values are (<record number>, 1), (LIST_BYTES, <count>), or
+    (BITMAP_BYTES, <count>), keyed by segment number.
+
+    """
+    pack = _SEGMENT_ENTRY.pack
+    encode_type = _ENCODE_TYPE
+    entries = [LAYOUT_VERSION]
+    for segment_number, (reference, count) in segment_table.items():
+        if isinstance(reference, int):
+            entries.append(pack(segment_number, _RECORD_NUMBER, reference))
+        else:
+            entries.append(
+                pack(segment_number, encode_type[reference], count)
+            )
+    return b"".join(entries)
+
+
+def decode_segment_table(value):
+    """Return dict of segment references in value from database."""
+    if value[:1] != LAYOUT_VERSION:
+        return literal_eval(value.decode())
+    decode_type = _DECODE_TYPE
+    segment_table = {}
+    for segment_number, type_, number in _SEGMENT_ENTRY.iter_unpack(
+        memoryview(value)[1:]
+    ):
+        if type_ == _RECORD_NUMBER:
+            segment_table[segment_number] = number, 1
+        else:
+            segment_table[segment_number] = decode_type[type_], number
+    return segment_table
+
+
+def encode_segment_numbers(segment_numbers):
+    """Return bytes for segment_numbers, a list of int."""
+    return LAYOUT_VERSION + struct.pack(
+        ">" + "I" * len(segment_numbers), *segment_numbers
+    )
+
+
+def decode_segment_numbers(value):
+    """Return list of segment numbers in value from database."""
+    if value[:1] != LAYOUT_VERSION:
+        return literal_eval(value.decode())
+    return [
+        number[0]
+        for number in _SEGMENT_NUMBER.iter_unpack(memoryview(value)[1:])
+    ]
@@ -0,0 +1,177 @@
+# positioncheckpoints.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""Sparse summaries of index record counts used for positional access.
+
+The summary for an index divides the keys, in key order, into blocks of
+about interval keys.  The first key of each block except the first is a
+checkpoint, and the number of records indexed by the keys in each block
+is noted.  A positional lookup bisects the checkpoints, or the cumulative
+record counts, and scans the keys of one block rather than all the keys
+before the wanted position.
+
+The summary is built from the index when first used.  A change to the
+records indexed by a key marks the block containing the key for recount
+when the summary is next used.  A recounted block is split if it has
+grown to more than twice interval keys.
+
+The summaries assume the Database instance is the only updater of the
+database.
+"""
+
+from bisect import bisect_right
+from itertools import accumulate
+
+
+class PositionCheckpoints:
+    """Position checkpoint summaries for indicies keyed by (file, field)."""
+
+    def __init__(self, interval):
+        """Create empty collection of summaries of interval keys per block."""
+        self.interval = interval
+        self._summaries = {}
+
+    def __len__(self):
+        """Return number of summaries in collection."""
+        return len(self._summaries)
+
+    def get(self, file, field):
+        """Return summary for field in file, creating it if necessary."""
+        summary = self._summaries.get((file, field))
+        if summary is None:
+            summary = IndexCheckpoints(self.interval)
+            self._summaries[file, field] = summary
+        return summary
+
+    def invalidate(self, file, field, key):
+        """Mark the block containing key in summary for field for recount."""
+        summary = self._summaries.get((file, field))
+        if summary is not None:
+            summary.invalidate(key)
+
+    def clear(self):
+        """Discard all summaries so they are built when next refreshed.
+
+        The summaries are kept in the collection because cursors refer to
+        them.
+
+        """
+        for summary in self._summaries.values():
+            summary.clear()
+
+
+class IndexCheckpoints:
+    """Position checkpoint summary for an index.
+
+    The summary is empty until the refresh() method is called.  The
+    key_counts argument of refresh() is a function of (low, high) which
+    yields (key, record count) in key order for keys k in the index such
+    that low <= k < high, where None means no limit.
+
+    """
+
+    def __init__(self, interval):
+        """Create empty summary of interval keys per block."""
+        self.interval = interval
+        self.clear()
+
+    def clear(self):
+        """Discard the summary so it is built when next refreshed."""
+
+        # The first key of blocks after the first.
+        self._checkpoints = None
+
+        # The number of records indexed by keys in each block.
+        self._counts = None
+
+        # The number of records indexed by keys in blocks before each block.
+        self._offsets = None
+
+        # The blocks to be recounted.
+        self._stale = set()
+
+    def invalidate(self, key):
+        """Mark the block containing key for recount."""
+        if self._checkpoints is not None:
+            self._stale.add(bisect_right(self._checkpoints, key))
+            self._offsets = None
+
+    def refresh(self, key_counts):
+        """Build summary if necessary and recount blocks marked stale."""
+        if self._checkpoints is None:
+            self._checkpoints, self._counts = self._count_blocks(
+                key_counts(None, None)
+            )
+            self._stale.clear()
+        elif self._stale:
+            checkpoints = self._checkpoints
+            for block in sorted(self._stale, reverse=True):
+                new_checkpoints, counts = self._count_blocks(
+                    key_counts(
+                        checkpoints[block - 1] if block else None,
+                        (
+                            checkpoints[block]
+                            if block < len(checkpoints)
+                            else None
+                        ),
+                    )
+                )
+                if len(counts) > 2:
+                    checkpoints[block:block] = new_checkpoints
+                    self._counts[block : block + 1] = counts
+                else:
+                    self._counts[block] = sum(counts)
+            self._stale.clear()
+        if self._offsets is None:
+            self._offsets = list(accumulate(self._counts[:-1], initial=0))
+
+    def record_count(self):
+        """Return number of records in index at last refresh()."""
+        return self._offsets[-1] + self._counts[-1]
+
+    def locate_key(self, key):
+        """Return (checkpoint, records before checkpoint) for key.
+
+        The checkpoint is the greatest checkpoint not greater than key, or
+        None if key is before the first checkpoint.
+
+        """
+        block = bisect_right(self._checkpoints, key)
+        return (
+            self._checkpoints[block - 1] if block else None,
+            self._offsets[block],
+        )
+
+    def locate_position(self, position):
+        """Return (checkpoint, records before checkpoint) for position.
+
+        The checkpoint is the first key of the block containing the record
+        at position, or None if that is the first block.  position is not
+        negative.
+
+        """
+        block = bisect_right(self._offsets, position) - 1
+        return (
+            self._checkpoints[block - 1] if block else None,
+            self._offsets[block],
+        )
+
+    def _count_blocks(self, key_counts):
+        """Return checkpoints and block record counts for key_counts.
+
+        key_counts yields (key, record count) in key order.
+
+        """
+        interval = self.interval
+        checkpoints = []
+        counts = [0]
+        keys = 0
+        for key, count in key_counts:
+            if keys == interval:
+                checkpoints.append(key)
+                counts.append(0)
+                keys = 0
+            counts[-1] += count
+            keys += 1
+        return checkpoints, counts
@@ -0,0 +1,69 @@
+# querycache.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""Cache lexed and parsed Where and WhereValues instances.
+
+The cache is a bounded least-recently-used mapping of (selector class,
+statement) to a lexed and parsed instance of the selector class, either
+where.Where or wherevalues.WhereValues, used only as a template.
+
+Callers are given clone() copies of the template.  The lex() and parse()
+methods of a copy do nothing because the copy is already parsed, and the
+value in each phrase of a Where copy can be changed by fill_placeholders()
+without changing the template.
+
+The template and it's copies share the record of the tables, dbset
+arguments, for which the statement has been validated, so validate() does
+not repeat the checks for a table in later copies.
+
+Statements with syntax errors are parsed each time they are given, and
+are not cached.
+"""
+
+from collections import OrderedDict
+
+
+class QueryCache:
+    """Bounded least-recently-used cache of parsed query selectors."""
+
+    def __init__(self, maxsize):
+        """Create empty cache holding at most maxsize parsed selectors."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._selectors = OrderedDict()
+
+    def __len__(self):
+        """Return number of parsed selectors in cache."""
+        return len(self._selectors)
+
+    def get(self, selector_class, statement):
+        """Return parsed selector_class instance for statement.
+
+        A copy of the cached instance is returned if possible.  Otherwise
+        the statement is lexed and parsed, and, if no errors are found,
+        the instance is cached and a copy returned.
+
+        """
+        cache_key = (selector_class, statement)
+        selector = self._selectors.get(cache_key)
+        if selector is not None:
+            self.hits += 1
+            self._selectors.move_to_end(cache_key)
+            return selector.clone()
+        self.misses += 1
+        selector = selector_class(statement)
+        selector.lex()
+        selector.parse()
+        if selector.parse_failed():
+            selector.parsed = True
+            return selector
+        self._selectors[cache_key] = selector
+        while len(self._selectors) > self.maxsize:
+            self._selectors.popitem(last=False)
+        return selector.clone()
+
+    def clear(self):
+        """Remove all entries from cache but keep hit and miss counts."""
+        self._selectors.clear()
@@ -19,6 +19,8 @@ Subclasses of Record will have different defaults.
 from pickle import dumps, loads
 from ast import literal_eval
 
+from . import recordcodec
+
 # import collections
 
 
@@ -205,8 +207,45 @@ class Value(_Comparison):
     override the pack_value method to change the way values are stored on
     database records.
 
+    The pack_value method uses the codec set by set_codec(), or the repr
+    codec if none is set.  Database classes set the codec named by the
+    RECORD_CODEC item of the file specification before packing a value.
+    The load method accepts values encoded by any codec in recordcodec.
+
     """
 
+    # The codec is kept out of self.__dict__, which is the value.
+    __slots__ = ("_codec",)
+
+    def set_codec(self, codec):
+        """Set codec, one of those in recordcodec, for pack_value."""
+        self._codec = codec
+
+    def get_codec(self):
+        """Return codec for pack_value, recordcodec.REPR if none set."""
+        try:
+            return self._codec
+        except AttributeError:
+            return recordcodec.REPR
+
+    def __getstate__(self):
+        """Return (self.__dict__, name of codec or None) for pickle.
+
+        Pickle protocols 0 and 1 cannot pickle instances of classes with
+        __slots__ unless __getstate__ is defined.
+
+        """
+        try:
+            return (self.__dict__, self._codec.name)
+        except AttributeError:
+            return (self.__dict__, None)
+
+    def __setstate__(self, state):
+        """Restore __dict__ and codec from state given by __getstate__."""
+        self.__dict__, codec = state
+        if codec is not None:
+            self._codec = recordcodec.CODECS[codec]
+
     def empty(self):
         """Set all existing attributes to None.
 
@@ -216,7 +255,7 @@ class Value(_Comparison):
         self.__dict__.clear()
 
     def load(self, value):
-        """Set self.__dict__ to ast.literal_eval(value).
+        """Set self.__dict__ to recordcodec.decode(value).
 
         Method Record.load_value does not call load if value is a subclass of
         Value and value is pickled.  This is appropriate if Value.pack_value
@@ -227,7 +266,7 @@ class Value(_Comparison):
         pickling self.pack_value()
 
         """
-        self.__dict__ = literal_eval(value)
+        self.__dict__ = recordcodec.decode(value)
 
     def pack(self):
         """Return packed value and empty index dictionary.
@@ -238,7 +277,7 @@ class Value(_Comparison):
         return (self.pack_value(), {})
 
     def pack_value(self):
-        """Return repr(self.__dict__).
+        """Return self.__dict__ encoded by codec, repr(self.__dict__) usually.
 
         Subclasses must override this method if the return value
         is not pickled before use as record value.
@@ -247,7 +286,7 @@ class Value(_Comparison):
         method Record.load_value must call self.load to reconstruct the value.
 
         """
-        return repr(self.__dict__)
+        return self.get_codec().encode(self.__dict__)
 
     def get_field_value(self, fieldname, occurrence=0):
         """Return the value of a field, or None if field is not in __dict__.
@@ -292,12 +331,12 @@ class ValueData(Value):
         self.data = None
 
     def load(self, value):
-        """Bind self.data to ast.literal_eval(value)."""
-        self.data = literal_eval(value)
+        """Bind self.data to recordcodec.decode(value)."""
+        self.data = recordcodec.decode(value)
 
     def pack_value(self):
-        """Return repr(self.data)."""
-        return repr(self.data)
+        """Return self.data encoded by codec, repr(self.data) usually."""
+        return self.get_codec().encode(self.data)
 
 
 class ValueDict(Value):
@@ -340,17 +379,25 @@ class ValueList(Value):
         """Bind attributes in self._attributes_order to items in value.
 
         self.__dict__ is populated with keys from self._attribute_order
-        mapped by position to values in ast.literal_eval(value).
+        mapped by position to values in recordcodec.decode(value).
         """
         try:
-            for attr, data in zip(self._attribute_order, literal_eval(value)):
+            for attr, data in zip(
+                self._attribute_order, recordcodec.decode(value)
+            ):
                 self.__dict__[attr] = data
         except Exception:
             self.__dict__ = {}
 
     def pack_value(self):
-        """Return repr(list(<attributes in self._attribute_order>))."""
-        return repr([self.__dict__.get(a) for a in self._attribute_order])
+        """Return list(<attributes in self._attribute_order>) encoded.
+
+        The encoding is by codec, repr(list(...)) usually.
+
+        """
+        return self.get_codec().encode(
+            [self.__dict__.get(a) for a in self._attribute_order]
+        )
 
     def _empty(self):
         """Set initial attributes to default values."""
@@ -629,9 +676,9 @@ class Record:
         self.load_value(record[1])
 
     def load_value(self, value):
-        """Load self.value from value which is repr(<data>).
+        """Load self.value from value which is repr(<data>) usually.
 
-        literal_eval(value) is delegated to self.value.load() method.
+        Decoding value is delegated to self.value.load() method.
 
         """
         self.srvalue = value
@@ -674,8 +721,8 @@ class Record:
         return (value, i)
 
     def get_srvalue(self):
-        """Apply ast.literal_eval to self.srvalue and return created object."""
-        return literal_eval(self.srvalue)
+        """Apply recordcodec.decode to self.srvalue and return the object."""
+        return recordcodec.decode(self.srvalue)
 
     def get_field_value(self, fieldname, occurrence=0):
         """Return value of a field occurrence, the first by default.
@@ -0,0 +1,103 @@
+# recordcodec.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""Encode and decode the values stored on primary database records.
+
+The Value classes in the record module store repr(<value>) by default and
+use ast.literal_eval(<stored value>) to reconstruct the value.  Parsing the
+repr is the most expensive part of reading a record.
+
+The marshal and pickle codecs store the bytes from marshal.dumps() and
+pickle.dumps() as a str, decoded as iso-8859-1, so the database engine
+interfaces see a str as before.  The str starts with TAG_MARK and a tag
+character naming the codec.  repr() never returns a str starting with
+TAG_MARK so values stored before the codecs were used are still readable.
+
+The marshal format may change between Python versions, although older
+formats can be read.  Unpickling data can run arbitrary code so the pickle
+codec should be used only where the database is trusted.
+
+"""
+
+import marshal
+import pickle
+from ast import literal_eval
+
+from .constants import (
+    REPR_CODEC,
+    MARSHAL_CODEC,
+    PICKLE_CODEC,
+)
+
+# The first character of values encoded by a codec other than repr.
+TAG_MARK = "\x00"
+
+
+class ReprCodec:
+    """Encode values with repr() and decode with ast.literal_eval()."""
+
+    name = REPR_CODEC
+
+    @staticmethod
+    def encode(value):
+        """Return repr(value)."""
+        return repr(value)
+
+    @staticmethod
+    def decode(value):
+        """Return ast.literal_eval(value)."""
+        return literal_eval(value)
+
+
+class MarshalCodec:
+    """Encode values with marshal.dumps() and decode with marshal.loads()."""
+
+    name = MARSHAL_CODEC
+    tag = TAG_MARK + "m"
+
+    def encode(self, value):
+        """Return tagged str of marshal.dumps(value)."""
+        return self.tag + marshal.dumps(value).decode("iso-8859-1")
+
+    @staticmethod
+    def decode(value):
+        """Return marshal.loads() of the bytes in tagged str value."""
+        return marshal.loads(value[2:].encode("iso-8859-1"))
+
+
+class PickleCodec:
+    """Encode values with pickle.dumps() and decode with pickle.loads()."""
+
+    name = PICKLE_CODEC
+    tag = TAG_MARK + "p"
+
+    def encode(self, value):
+        """Return tagged str of pickle.dumps(value) with protocol 5."""
+        return self.tag + pickle.dumps(value, protocol=5).decode("iso-8859-1")
+
+    @staticmethod
+    def decode(value):
+        """Return pickle.loads() of the bytes in tagged str value."""
+        return pickle.loads(value[2:].encode("iso-8859-1"))
+
+
+REPR = ReprCodec()
+MARSHAL = MarshalCodec()
+PICKLE = PickleCodec()
+
+# The codecs by name, for the RECORD_CODEC item in file specifications.
+CODECS = {codec.name: codec for codec in (REPR, MARSHAL, PICKLE)}
+
+_DECODERS = {codec.tag: codec.decode for codec in (MARSHAL, PICKLE)}
+
+
+def decode(value):
+    """Return object encoded in value by any codec.
+
+    Values without a codec tag are assumed to be repr(<object>).
+
+    """
+    if value[:1] == TAG_MARK:
+        return _DECODERS[value[:2]](value)
+    return literal_eval(value)
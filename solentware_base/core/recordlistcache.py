@@ -0,0 +1,88 @@
+# recordlistcache.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""Cache RecordList instances created by recordlist_key* methods.
+
+The cache is a bounded least-recently-used mapping of (file, field, key
+specification) to RecordList.  The key specifications are:
+
+(KEY_EQ, key) for recordlist_key
+(KEY_STARTSWITH, keystart) for recordlist_key_startswith
+(KEY_RANGE, ge, gt, le, lt) for recordlist_key_range
+
+Callers are given copy_on_write() copies of the cached RecordList so
+amending the copy does not amend the cached RecordList.
+
+A change to the records indexed by key of field in file invalidates the
+(KEY_EQ, key) entry, and all KEY_STARTSWITH and KEY_RANGE entries, for
+field in file.
+
+The cache assumes the Database instance is the only updater of the
+database.
+"""
+
+from collections import OrderedDict
+
+KEY_EQ = "key"
+KEY_STARTSWITH = "startswith"
+KEY_RANGE = "range"
+
+
+class RecordListCache:
+    """Bounded least-recently-used cache of RecordList instances."""
+
+    def __init__(self, maxsize):
+        """Create empty cache holding at most maxsize RecordLists."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._recordlists = OrderedDict()
+
+        # The KEY_STARTSWITH and KEY_RANGE entries for each (file, field).
+        self._partial_keys = {}
+
+    def __len__(self):
+        """Return number of RecordLists in cache."""
+        return len(self._recordlists)
+
+    def get(self, file, field, keyspec, cache_size=1):
+        """Return copy of cached RecordList for arguments or None."""
+        cache_key = (file, field, keyspec)
+        recordlist = self._recordlists.get(cache_key)
+        if recordlist is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._recordlists.move_to_end(cache_key)
+        return recordlist.copy_on_write(cache_size=cache_size)
+
+    def put(self, file, field, keyspec, recordlist, cache_size=1):
+        """Cache recordlist for arguments and return a copy of it."""
+        cache_key = (file, field, keyspec)
+        self._recordlists[cache_key] = recordlist
+        self._recordlists.move_to_end(cache_key)
+        if keyspec[0] != KEY_EQ:
+            self._partial_keys.setdefault((file, field), set()).add(cache_key)
+        while len(self._recordlists) > self.maxsize:
+            self._discard(self._recordlists.popitem(last=False)[0])
+        return recordlist.copy_on_write(cache_size=cache_size)
+
+    def invalidate(self, file, field, key):
+        """Remove entries which may include records indexed by key."""
+        self._recordlists.pop((file, field, (KEY_EQ, key)), None)
+        for cache_key in self._partial_keys.pop((file, field), ()):
+            self._recordlists.pop(cache_key, None)
+
+    def clear(self):
+        """Remove all entries from cache but keep hit and miss counts."""
+        self._recordlists.clear()
+        self._partial_keys.clear()
+
+    def _discard(self, cache_key):
+        """Forget cache_key in KEY_STARTSWITH and KEY_RANGE entries."""
+        partial_keys = self._partial_keys.get(cache_key[:2])
+        if partial_keys is not None:
+            partial_keys.discard(cache_key)
+            if not partial_keys:
+                del self._partial_keys[cache_key[:2]]
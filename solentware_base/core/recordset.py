@@ -2,7 +2,7 @@
 # Copyright 2013 Roger Marsh
 # Licence: See LICENCE (BSD licence)
 
-"""Classes that use bitarrays, lists, or ints, to represent sets of records.
+"""Classes that use bitarrays, lists, runs, or ints, to represent record sets.
 
 Follows the example of DPT's record sets (www.dptoolkit.com).
 
@@ -10,12 +10,18 @@ Follows the example of DPT's record sets (www.dptoolkit.com).
 
 from collections import deque
 from copy import deepcopy
-from bisect import bisect_left
+from bisect import bisect_left, bisect_right
+import operator
 
 from .bytebit import Bitarray, SINGLEBIT
 from .segmentsize import SegmentSize
 from . import recordsetbasecursor
 
+# RecordsetSegmentRun.tobytes() output starts with RUN_SEGMENT_MARKER and
+# then has RUN_BYTES bytes for each run.
+RUN_SEGMENT_MARKER = b"R"
+RUN_BYTES = 4
+
 
 class RecordsetError(Exception):
     """Exception for classes in recordset module."""
@@ -27,9 +33,9 @@ class Location:
     _Recordset class defines a default location cursor which is passed to
     all segment instances within the recordset.
 
-    RecordsetSegmentInt, RecordsetSegmentBitarray, and RecordsetSegmentList
-    define a default location cursor if one is not passed by the _Recordset
-    instance.
+    RecordsetSegmentInt, RecordsetSegmentBitarray, RecordsetSegmentList, and
+    RecordsetSegmentRun define a default location cursor if one is not passed
+    by the _Recordset instance.
 
     The current_position_in_segment and current_segment attributes replace
     similar attributes in the segment specific classes and _Recordset.
@@ -108,6 +114,13 @@ class RecordsetSegmentInt:
             )
         return None
 
+    def record_numbers(self):
+        """Return list of record numbers in segment in ascending order."""
+        return [
+            self.record_number
+            + (self.segment_number * SegmentSize.db_segment_size)
+        ]
+
     def last(self, location=None):
         """Return last record in segment with location as cursor."""
         location = location or self.location
@@ -197,6 +210,8 @@ class RecordsetSegmentInt:
             raise RecordsetError(
                 "Attempt to 'or' segments with different segment numbers"
             )
+        if isinstance(other, RecordsetSegmentRun):
+            return _run_segment(self) | other
         return self.promote() | other.promote()
 
     def __and__(self, other):
@@ -205,6 +220,8 @@ class RecordsetSegmentInt:
             raise RecordsetError(
                 "Attempt to 'and' segments with different segment numbers"
             )
+        if isinstance(other, RecordsetSegmentRun):
+            return _run_segment(self) & other
         return self.promote() & other.promote()
 
     def __xor__(self, other):
@@ -213,6 +230,8 @@ class RecordsetSegmentInt:
             raise RecordsetError(
                 "Attempt to 'xor' segments with different segment numbers"
             )
+        if isinstance(other, RecordsetSegmentRun):
+            return _run_segment(self) ^ other
         return self.promote() ^ other.promote()
 
     def tobytes(self):
@@ -284,6 +303,16 @@ class RecordsetSegmentBitarray:
         """Return position of recnum in segment counting records that exist."""
         return bisect_left(self.bitarray.search(SINGLEBIT), recnum) + 1
 
+    def record_numbers(self):
+        """Return list of record numbers in segment in ascending order.
+
+        The search() method of the bitarray gives the set bits without a
+        Python loop over the bits.
+
+        """
+        base = self.segment_number * SegmentSize.db_segment_size
+        return [base + offset for offset in self.bitarray.search(SINGLEBIT)]
+
     def get_record_number_at_position(self, position):
         """Return record number at position in segment.
 
@@ -382,16 +411,19 @@ class RecordsetSegmentBitarray:
         avoid excessive conversion in delete-insert sequences around a single
         conversion point.
 
+        A RecordsetSegmentRun is returned instead of self if the runs of set
+        bits take less space than self.
+
         """
         k = self.bitarray.count()
         if k > SegmentSize.db_upper_conversion_limit:
-            return self
+            return self._runs_if_smaller()
         if use_upper_limit:
             limit = SegmentSize.db_upper_conversion_limit
         else:
             limit = SegmentSize.db_lower_conversion_limit
         if k > limit:
-            return self
+            return self._runs_if_smaller()
         if k == 1:
             return RecordsetSegmentInt(
                 self.segment_number,
@@ -409,6 +441,19 @@ class RecordsetSegmentBitarray:
         """Return RecordsetSegmentBitarray version of self."""
         return self
 
+    def _runs_if_smaller(self):
+        """Return RecordsetSegmentRun version of self if smaller, or self."""
+        records = self.bitarray.tobytes()
+        if (
+            len(RUN_SEGMENT_MARKER)
+            + RUN_BYTES * _count_runs_in_bitarray_bytes(records)
+            >= len(records)
+        ):
+            return self
+        segment = RecordsetSegmentRun(self.segment_number, self.index_key)
+        segment.runs = _runs_from_bitarray_bytes(records)
+        return segment
+
     def _empty_segment(self):
         """Create and return an empty instance of RecordsetSegmentBitarray."""
 
@@ -595,6 +640,11 @@ class RecordsetSegmentList:
         except IndexError:
             return None
 
+    def record_numbers(self):
+        """Return list of record numbers in segment in ascending order."""
+        base = self.segment_number * SegmentSize.db_segment_size
+        return [base + offset for offset in self.list]
+
     def last(self, location=None):
         """Return last record in segment with location as cursor."""
         location = location or self.location
@@ -682,6 +732,16 @@ class RecordsetSegmentList:
         """
         k = self.count_records()
         if k > SegmentSize.db_upper_conversion_limit:
+            runs = _runs_from_record_numbers(self.list)
+            if (
+                len(RUN_SEGMENT_MARKER) + RUN_BYTES * len(runs)
+                < SegmentSize.db_segment_size_bytes
+            ):
+                segment = RecordsetSegmentRun(
+                    self.segment_number, self.index_key
+                )
+                segment.runs = runs
+                return segment
             return self.promote()
         if use_upper_limit:
             limit = SegmentSize.db_upper_conversion_limit
@@ -717,6 +777,8 @@ class RecordsetSegmentList:
             raise RecordsetError(
                 "Attempt to 'or' segments with different segment numbers"
             )
+        if isinstance(other, RecordsetSegmentRun):
+            return _run_segment(self) | other
         return self.promote() | other.promote()
 
     def __and__(self, other):
@@ -725,6 +787,8 @@ class RecordsetSegmentList:
             raise RecordsetError(
                 "Attempt to 'and' segments with different segment numbers"
             )
+        if isinstance(other, RecordsetSegmentRun):
+            return _run_segment(self) & other
         return self.promote() & other.promote()
 
     def __xor__(self, other):
@@ -733,6 +797,8 @@ class RecordsetSegmentList:
             raise RecordsetError(
                 "Attempt to 'xor' segments with different segment numbers"
             )
+        if isinstance(other, RecordsetSegmentRun):
+            return _run_segment(self) ^ other
         return self.promote() ^ other.promote()
 
     def _empty_segment(self):
@@ -764,6 +830,320 @@ class RecordsetSegmentList:
         return b"".join([n.to_bytes(2, byteorder="big") for n in self.list])
 
 
+class RecordsetSegmentRun:
+    """Runs of consecutive record numbers in a segment.
+
+    Segment for record number interval where the records are in few enough
+    runs of consecutive record numbers for the runs to take less space than
+    the bitarray which would otherwise be used.  Each run is a (start, stop)
+    tuple of segment record numbers, like the arguments of range(), and the
+    runs are in ascending order without overlap or adjacency.
+
+    The location cursor is the segment record number, as in the
+    RecordsetSegmentBitarray class.
+
+    """
+
+    def __init__(self, segment_number, key, records=RUN_SEGMENT_MARKER):
+        """Create run segment for key for records in segment number.
+
+        records is RUN_SEGMENT_MARKER followed by
+        b''.join([start.to_bytes(2, byteorder='big') +
+                  (stop - start - 1).to_bytes(2, byteorder='big')
+                  for start, stop in runs])
+        where runs is a sorted list of (start, stop) tuples of
+        segment_record_number and
+        segment_number, segment_record_number = divmod(
+            record_number_in_file, SegmentSize.db_segment_size)
+
+        The odd number of bytes distinguishes these records from the even
+        number of bytes for RecordsetSegmentList and RecordsetSegmentBitarray
+        records on a database.
+
+        """
+        super().__init__()
+        self.runs = []
+        for i in range(len(RUN_SEGMENT_MARKER), len(records), RUN_BYTES):
+            start = int.from_bytes(records[i : i + 2], byteorder="big")
+            self.runs.append(
+                (
+                    start,
+                    start
+                    + int.from_bytes(records[i + 2 : i + 4], byteorder="big")
+                    + 1,
+                )
+            )
+        self.index_key = key
+        self.segment_number = segment_number
+        self.location = Location()
+
+    def count_records(self):
+        """Return record count in segment."""
+        return sum(stop - start for start, stop in self.runs)
+
+    def current(self, location=None):
+        """Return current record in segment with location as cursor."""
+        location = location or self.location
+        if location.current_position_in_segment is not None:
+            return (
+                self.index_key,
+                location.current_position_in_segment
+                + (self.segment_number * SegmentSize.db_segment_size),
+            )
+        return None
+
+    def first(self, location=None):
+        """Return first record in segment with location as cursor."""
+        location = location or self.location
+        if not self.runs:
+            return None
+        location.current_position_in_segment = self.runs[0][0]
+        return (
+            self.index_key,
+            location.current_position_in_segment
+            + (self.segment_number * SegmentSize.db_segment_size),
+        )
+
+    def get_position_of_record_number(self, recnum):
+        """Return position of recnum in segment counting records that exist."""
+        position = 0
+        for start, stop in self.runs:
+            if recnum < start:
+                break
+            position += min(stop, recnum + 1) - start
+        return position
+
+    def get_record_number_at_position(self, position):
+        """Return record number at position from start or end of segment."""
+        if position < 0:
+            position += self.count_records()
+            if position < 0:
+                return None
+        for start, stop in self.runs:
+            if position < stop - start:
+                return (
+                    start
+                    + position
+                    + (self.segment_number * SegmentSize.db_segment_size)
+                )
+            position -= stop - start
+        return None
+
+    def record_numbers(self):
+        """Return list of record numbers in segment in ascending order."""
+        base = self.segment_number * SegmentSize.db_segment_size
+        record_numbers = []
+        for start, stop in self.runs:
+            record_numbers.extend(range(base + start, base + stop))
+        return record_numbers
+
+    def last(self, location=None):
+        """Return last record in segment with location as cursor."""
+        location = location or self.location
+        if not self.runs:
+            return None
+        location.current_position_in_segment = self.runs[-1][1] - 1
+        return (
+            self.index_key,
+            location.current_position_in_segment
+            + (self.segment_number * SegmentSize.db_segment_size),
+        )
+
+    def next(self, location=None):
+        """Return next record in segment with location as cursor."""
+        location = location or self.location
+        if location.current_position_in_segment is None:
+            return self.first()
+        record = location.current_position_in_segment + 1
+        i = self._run_index(record)
+        if i < 0 or self.runs[i][1] <= record:
+            i += 1
+            if i == len(self.runs):
+                return None
+            record = self.runs[i][0]
+        location.current_position_in_segment = record
+        return (
+            self.index_key,
+            record + (self.segment_number * SegmentSize.db_segment_size),
+        )
+
+    def prev(self, location=None):
+        """Return previous record in segment with location as cursor."""
+        location = location or self.location
+        if location.current_position_in_segment is None:
+            return self.last()
+        record = location.current_position_in_segment - 1
+        i = self._run_index(record)
+        if i < 0:
+            return None
+        record = min(record, self.runs[i][1] - 1)
+        location.current_position_in_segment = record
+        return (
+            self.index_key,
+            record + (self.segment_number * SegmentSize.db_segment_size),
+        )
+
+    def setat(self, record, location=None):
+        """Return current record after positioning location at record."""
+        location = location or self.location
+        segment, record_number = divmod(record, SegmentSize.db_segment_size)
+        if self.segment_number == segment and record_number in self:
+            location.current_position_in_segment = record_number
+            return (self.index_key, record)
+        return None
+
+    def _run_index(self, record_number):
+        """Return index of last run starting at or before record_number.
+
+        -1 is returned if all runs start after record_number.
+
+        """
+        return bisect_right(self.runs, (record_number + 1,)) - 1
+
+    def __contains__(self, relative_record_number):
+        """Return True if relative record number is in self, else False."""
+        i = self._run_index(relative_record_number)
+        return bool(i >= 0 and relative_record_number < self.runs[i][1])
+
+    def normalize(self, use_upper_limit=True):
+        """Return version of self appropriate to record count of self.
+
+        See RecordsetSegmentBitarray.normalize() for use_upper_limit.
+
+        The record count decides between int, list, and one of runs or
+        bitarray, like the bitarray version.  The smaller of runs and
+        bitarray is chosen.
+
+        """
+        k = self.count_records()
+        if use_upper_limit:
+            limit = SegmentSize.db_upper_conversion_limit
+        else:
+            limit = SegmentSize.db_lower_conversion_limit
+        if k > limit or k > SegmentSize.db_upper_conversion_limit:
+            if (
+                len(RUN_SEGMENT_MARKER) + RUN_BYTES * len(self.runs)
+                < SegmentSize.db_segment_size_bytes
+            ):
+                return self
+            return self.promote()
+        if k == 1:
+            return RecordsetSegmentInt(
+                self.segment_number,
+                self.index_key,
+                records=self.runs[0][0].to_bytes(2, byteorder="big"),
+            )
+        j = RecordsetSegmentList(self.segment_number, self.index_key)
+        for start, stop in self.runs:
+            j.list.extend(range(start, stop))
+        return j
+
+    def promote(self):
+        """Return RecordsetSegmentBitarray version of self."""
+        return RecordsetSegmentBitarray(
+            self.segment_number,
+            self.index_key,
+            records=_bitarray_bytes_from_runs(self.runs),
+        )
+
+    def __or__(self, other):
+        """Return new segment of self records with other records included."""
+        if self.segment_number != other.segment_number:
+            raise RecordsetError(
+                "Attempt to 'or' segments with different segment numbers"
+            )
+        if isinstance(other, RecordsetSegmentBitarray):
+            return self.promote() | other
+        return self._combine(other, operator.or_)
+
+    def __and__(self, other):
+        """Return new segment of records in both self and other segments."""
+        if self.segment_number != other.segment_number:
+            raise RecordsetError(
+                "Attempt to 'and' segments with different segment numbers"
+            )
+        if isinstance(other, RecordsetSegmentBitarray):
+            return self.promote() & other
+        return self._combine(other, operator.and_)
+
+    def __xor__(self, other):
+        """Return new segment of self records with other records included."""
+        if self.segment_number != other.segment_number:
+            raise RecordsetError(
+                "Attempt to 'xor' segments with different segment numbers"
+            )
+        if isinstance(other, RecordsetSegmentBitarray):
+            return self.promote() ^ other
+        return self._combine(other, operator.xor)
+
+    def _combine(self, other, operation):
+        """Return new segment of runs for operation on self and other runs.
+
+        operation is applied to the bools saying whether a record number is
+        in self and in other.  other must not be a RecordsetSegmentBitarray.
+
+        """
+        runs = self.runs
+        other_runs = _segment_runs(other)
+        points = sorted({point for run in runs + other_runs for point in run})
+        combined = []
+        i = j = 0
+        for start, stop in zip(points, points[1:]):
+            while i < len(runs) and runs[i][1] <= start:
+                i += 1
+            while j < len(other_runs) and other_runs[j][1] <= start:
+                j += 1
+            if operation(
+                i < len(runs) and runs[i][0] <= start,
+                j < len(other_runs) and other_runs[j][0] <= start,
+            ):
+                if combined and combined[-1][1] == start:
+                    combined[-1] = (combined[-1][0], stop)
+                else:
+                    combined.append((start, stop))
+        segment = self._empty_segment()
+        segment.runs = combined
+        segment.index_key = self.index_key
+        segment.segment_number = self.segment_number
+        segment.location = Location()
+        return segment
+
+    def _empty_segment(self):
+        """Create and return an empty instance of RecordsetSegmentRun."""
+
+        class _E(RecordsetSegmentRun):
+            def __init__(self):
+                # Do nothing.
+                pass
+
+        k = _E()
+        k.__class__ = RecordsetSegmentRun
+        return k
+
+    def __deepcopy__(self, memo):
+        """Return a customized copy of self."""
+        segment = self._empty_segment()
+        # the runs are tuples so a shallow copy of the list is enough
+        segment.runs = self.runs.copy()
+        # bind the immutable attributes
+        segment.index_key = self.index_key
+        segment.segment_number = self.segment_number
+        # the copy forgets the current position in segment
+        segment.location = Location()
+        return segment
+
+    def tobytes(self):
+        """Return self.runs as bytes."""
+        return b"".join(
+            [RUN_SEGMENT_MARKER]
+            + [
+                start.to_bytes(2, byteorder="big")
+                + (stop - start - 1).to_bytes(2, byteorder="big")
+                for start, stop in self.runs
+            ]
+        )
+
+
 class _Recordset:
     """Define a record set on a database with record access.
 
@@ -794,6 +1174,8 @@ class _Recordset:
         self.record_deque = deque(maxlen=max(1, cache_size))
         self.location = Location()
         self._sorted_segnums = []
+        self._shared_segments = set()
+        self._cumulative_counts = None
         # self._clientcursors = {}
         if dbhome.exists(dbset, dbset):
             self._dbhome = dbhome
@@ -834,6 +1216,8 @@ class _Recordset:
         self.record_deque.clear()
         self.location.clear()
         self._sorted_segnums.clear()
+        self._shared_segments.clear()
+        self._cumulative_counts = None
 
     @property
     def dbhome(self):
@@ -865,17 +1249,31 @@ class _Recordset:
         return len(self._rs_segments)
 
     def __getitem__(self, segment):
-        """Return segment in record set."""
+        """Return segment in record set.
+
+        A segment shared with a copy_on_write() copy is copied first because
+        the caller may amend the segment in place.  For the same reason the
+        cumulative record counts are discarded.
+
+        """
+        self._cumulative_counts = None
+        if segment in self._shared_segments:
+            self._shared_segments.remove(segment)
+            self._rs_segments[segment] = deepcopy(self._rs_segments[segment])
         return self._rs_segments[segment]
 
     def __setitem__(self, segment, record_numbers):
         """Add segment to record set."""
         self._rs_segments[segment] = record_numbers
+        self._shared_segments.discard(segment)
+        self._cumulative_counts = None
         self.insort_left_nodup(segment)
 
     def __delitem__(self, segment):
         """Remove segment from record set."""
         del self._rs_segments[segment]
+        self._shared_segments.discard(segment)
+        self._cumulative_counts = None
         i = bisect_left(self._sorted_segnums, segment)
         if i != len(self._sorted_segnums):
             if self._sorted_segnums[i] == segment:
@@ -896,8 +1294,31 @@ class _Recordset:
 
     def count_records(self):
         """Return number of records in recordset."""
+        if self._cumulative_counts is not None:
+            return self._cumulative_counts[-1]
         return sum(s.count_records() for s in self._rs_segments.values())
 
+    def _get_cumulative_counts(self):
+        """Return cumulative record counts of segments in sorted_segnums.
+
+        Element i is the number of records in the segments before the i'th
+        segment in sorted_segnums, and the last element is the number of
+        records in the recordset.
+
+        The counts are calculated when needed after any change to the
+        segments in the recordset.
+
+        """
+        if self._cumulative_counts is None:
+            counts = [0]
+            total = 0
+            segments = self._rs_segments
+            for i in self._sorted_segnums:
+                total += segments[i].count_records()
+                counts.append(total)
+            self._cumulative_counts = counts
+        return self._cumulative_counts
+
     def get_position_of_record_number(self, recnum):
         """Return recnum position in recordset counting records that exist."""
         segment, record_number = divmod(recnum, SegmentSize.db_segment_size)
@@ -908,34 +1329,37 @@ class _Recordset:
         except KeyError:
             position = 0
         return (
-            sum(
-                rss.count_records()
-                for s, rss in self._rs_segments.items()
-                if s < segment
-            )
+            self._get_cumulative_counts()[
+                bisect_left(self._sorted_segnums, segment)
+            ]
             + position
         )
 
     def get_record_number_at_position(self, position):
         """Return record number at position from start or end of recordset."""
-        k = 0
-        segments = self.rs_segments
+        counts = self._get_cumulative_counts()
         if position < 0:
-            for i in reversed(self.sorted_segnums):
-                segcount = segments[i].count_records()
-                k -= segcount
-                if k > position:
-                    continue
-                k += segcount
-                return segments[i].get_record_number_at_position(position - k)
-        else:
-            for i in self.sorted_segnums:
-                segcount = segments[i].count_records()
-                k += segcount
-                if k <= position:
-                    continue
-                k -= segcount
-                return segments[i].get_record_number_at_position(position - k)
+            position += counts[-1]
+            if position < 0:
+                return None
+        elif position >= counts[-1]:
+            return None
+        i = bisect_right(counts, position) - 1
+        return self._rs_segments[
+            self._sorted_segnums[i]
+        ].get_record_number_at_position(position - counts[i])
+
+    def iter_record_numbers(self):
+        """Yield record numbers in recordset in ascending order.
+
+        The record numbers are generated a segment at a time.  Segments
+        added to, or removed from, the recordset after the first record
+        number is yielded are not noticed.
+
+        """
+        segments = self._rs_segments
+        for segment in [segments[i] for i in self._sorted_segnums]:
+            yield from segment.record_numbers()
 
     def insort_left_nodup(self, segment):
         """Insert item in sorted order without duplicating entries."""
@@ -1041,7 +1465,7 @@ class _Recordset:
         for segment, value in self._rs_segments.items():
             if segment in other:
                 # Maybe both being RecordsetSegmentInt should be special case
-                recordset[segment] = value | other[segment]
+                recordset[segment] = value | other._rs_segments[segment]
             else:
                 recordset[segment] = deepcopy(value)
         for segment, value in other._rs_segments.items():
@@ -1062,7 +1486,7 @@ class _Recordset:
         for segment, value in self._rs_segments.items():
             if segment in other:
                 # Maybe both being RecordsetSegmentInt should be special case
-                self[segment] = value | other[segment]
+                self[segment] = value | other._rs_segments[segment]
         for segment, value in other._rs_segments.items():
             if segment not in self:
                 self[segment] = deepcopy(value)
@@ -1082,7 +1506,7 @@ class _Recordset:
         for segment, value in self._rs_segments.items():
             if segment in other:
                 # Maybe both being RecordsetSegmentInt should be special case
-                recordset[segment] = value & other[segment]
+                recordset[segment] = value & other._rs_segments[segment]
                 if recordset[segment].count_records() == 0:
                     del recordset[segment]
         return recordset
@@ -1101,7 +1525,7 @@ class _Recordset:
         for segment, value in self._rs_segments.items():
             if segment in other:
                 # Maybe both being RecordsetSegmentInt should be special case
-                self[segment] = value & other[segment]
+                self[segment] = value & other._rs_segments[segment]
                 if self[segment].count_records() == 0:
                     drs.append(segment)
             else:
@@ -1124,7 +1548,7 @@ class _Recordset:
         for segment, value in self._rs_segments.items():
             if segment in other:
                 # Maybe both being RecordsetSegmentInt should be special case
-                recordset[segment] = value ^ other[segment]
+                recordset[segment] = value ^ other._rs_segments[segment]
                 if recordset[segment].count_records() == 0:
                     del recordset[segment]
             else:
@@ -1148,7 +1572,7 @@ class _Recordset:
         for segment, value in self._rs_segments.items():
             if segment in other:
                 # Maybe both being RecordsetSegmentInt should be special case
-                self[segment] = value ^ other[segment]
+                self[segment] = value ^ other._rs_segments[segment]
                 if self[segment].count_records() == 0:
                     drs.append(segment)
         for segment, value in other._rs_segments.items():
@@ -1158,6 +1582,48 @@ class _Recordset:
             del self[segment]
         return self
 
+    def __sub__(self, other):
+        """Return record set of self records which are not in other."""
+        if self._database is not other._database:
+            raise RecordsetError(
+                "Attempt to 'sub' record sets for different databases"
+            )
+        if self._dbset != other._dbset:
+            raise RecordsetError(
+                "Attempt to 'sub' record sets for different tables"
+            )
+        recordset = _Recordset(self._dbhome, self._dbset)
+        for segment, value in self._rs_segments.items():
+            if segment in other:
+                recordset[segment] = value ^ (
+                    value & other._rs_segments[segment]
+                )
+                if recordset[segment].count_records() == 0:
+                    del recordset[segment]
+            else:
+                recordset[segment] = deepcopy(value)
+        return recordset
+
+    def __isub__(self, other):
+        """Remove records from self which are in other."""
+        if self._database is not other._database:
+            raise RecordsetError(
+                "Attempt to 'isub' record sets for different databases"
+            )
+        if self._dbset != other._dbset:
+            raise RecordsetError(
+                "Attempt to 'isub' record sets for different tables"
+            )
+        drs = []
+        for segment, value in self._rs_segments.items():
+            if segment in other:
+                self[segment] = value ^ (value & other._rs_segments[segment])
+                if self[segment].count_records() == 0:
+                    drs.append(segment)
+        for segment in drs:
+            del self[segment]
+        return self
+
     def normalize(self, use_upper_limit=True):
         """Convert record set segments to version for record count.
 
@@ -1190,6 +1656,8 @@ class _Recordset:
         recordset._dbhome = self._dbhome
         recordset._dbset = self._dbset
         recordset._database = self._database
+        recordset._shared_segments = set()
+        recordset._cumulative_counts = None
         # the copy forgets the current position in recordset
         recordset.location = Location()
         # the copy forgets the current recordset cursors
@@ -1204,6 +1672,30 @@ class _Recordset:
         #                                                        ] = True
         return recordset
 
+    def copy_on_write(self, cache_size=1):
+        """Return a copy of self which shares segments with self.
+
+        A shared segment is copied, by self or the copy, when it is accessed
+        by segment number because the segment may be amended in place.
+        Boolean operations replace segments rather than amend them, so the
+        cost of copying is avoided when the copy is combined with other
+        record sets.
+
+        """
+        recordset = _empty__recordset()
+        recordset._rs_segments = self._rs_segments.copy()
+        recordset._sorted_segnums = self._sorted_segnums.copy()
+        recordset._shared_segments = set(self._rs_segments)
+        self._shared_segments.update(self._rs_segments)
+        recordset._cumulative_counts = self._cumulative_counts
+        recordset._dbhome = self._dbhome
+        recordset._dbset = self._dbset
+        recordset._database = self._database
+        recordset.location = Location()
+        recordset.record_cache = {}
+        recordset.record_deque = deque(maxlen=max(1, cache_size))
+        return recordset
+
     def place_record_number(self, record_number):
         """Set the bit representing record_number."""
         segment, offset = divmod(record_number, SegmentSize.db_segment_size)
@@ -1300,6 +1792,16 @@ class _RecordSetBase:
         """Return count of records in recordset."""
         return self.recordset.count_records()
 
+    def iter_record_numbers(self):
+        """Yield record numbers in recordset in ascending order.
+
+        The generator does not use, or move, the recordset location cursor.
+        It refers to self so the recordset is not closed by __del__ while
+        the generator is in use.
+
+        """
+        yield from self.recordset.iter_record_numbers()
+
     # recordset set to None for compatibility with _DPTRecordList class in
     # _dpt module.
     def close(self):
@@ -1336,7 +1838,7 @@ class _RecordSetBase:
         """Convert recordset segments to form for number of records held.
 
         Each segment will be a RecordsetSegmentInt, RecordsetSegmentList,
-        or RecordsetSegmentBitarray, instance.
+        RecordsetSegmentRun, or RecordsetSegmentBitarray, instance.
 
         Recordsets are manipulated in bitarray form, and will need to be
         normalized before storing on a database.
@@ -1384,7 +1886,13 @@ class RecordList(_RecordSetBase):
 
     def __iand__(self, other):
         """Remove records from self which are not in other."""
-        self.recordset &= other.recordset
+        if (
+            isinstance(other, RecordListComplement)
+            and other.complemented is not None
+        ):
+            self.recordset -= other.complemented.recordset
+        else:
+            self.recordset &= other.recordset
         return self
 
     def __ixor__(self, other):
@@ -1396,6 +1904,14 @@ class RecordList(_RecordSetBase):
         """Remove all records from recordset."""
         self.recordset.clear_recordset()
 
+    def copy_on_write(self, cache_size=1):
+        """Return a RecordList sharing segments with self until amended."""
+        recordlist = _empty_recordlist()
+        recordlist.recordset = self.recordset.copy_on_write(
+            cache_size=cache_size
+        )
+        return recordlist
+
     # An exception may be appropriate if record not in EBM.
     def place_record_number(self, record_number):
         """Place record record_number on self, a RecordList."""
@@ -1404,6 +1920,19 @@ class RecordList(_RecordSetBase):
         ).is_record_number_in_record_set(record_number):
             self.recordset.place_record_number(record_number)
 
+    def place_record_numbers(self, record_numbers):
+        """Place records in record_numbers on self, a RecordList.
+
+        Like place_record_number() for each record number but the existence
+        bitmap is fetched once.
+
+        """
+        ebm = self.recordset.dbhome.recordlist_ebm(self.recordset.dbset)
+        recordset = self.recordset
+        for record_number in record_numbers:
+            if ebm.is_record_number_in_record_set(record_number):
+                recordset.place_record_number(record_number)
+
     # An exception may be appropriate if record not in EBM.
     def remove_record_number(self, record_number):
         """Remove record record_number on self, a RecordList."""
@@ -1431,6 +1960,73 @@ class RecordList(_RecordSetBase):
         self.recordset |= newrecords.recordset
 
 
+class RecordListComplement(RecordList):
+    """Extend RecordList to be the existing records not in a RecordList.
+
+    The existence bitmap is not read until the records are needed, so
+    'A & ~B', where ~B is a RecordListComplement, is evaluated segment by
+    segment as the records in A which are not in B.  Likewise '~A & ~B'
+    is evaluated as '~(A | B)'.
+
+    The records are fetched, and the instance behaves as an ordinary
+    RecordList, when the recordset attribute is first used.
+
+    RecordListComplement should be instantiated only by the Database class
+    defined in the ._database module.
+    """
+
+    def __init__(self, recordlist):
+        """Note recordlist, the RecordList whose complement is self."""
+        self.complemented = recordlist
+        self._recordset = None
+
+    def __del__(self):
+        """Destroy _Recordset instance if fetched and not explicitly closed."""
+        if getattr(self, "_recordset", None):
+            self.close()
+
+    @property
+    def recordset(self):
+        """Return _Recordset of records, fetching them if necessary."""
+        if self.complemented is not None:
+            complemented = self.complemented
+            existence = complemented.dbhome.recordlist_ebm(complemented.dbset)
+            self._recordset = existence.recordset ^ complemented.recordset
+            self.complemented = None
+        return self._recordset
+
+    @recordset.setter
+    def recordset(self, value):
+        """Bind value, a _Recordset, as the records in self."""
+        self.complemented = None
+        self._recordset = value
+
+    def close(self):
+        """Close recordset without fetching records not yet fetched."""
+        if self._recordset is not None:
+            self._recordset.close()
+        self.recordset = None
+
+    def __and__(self, other):
+        """Return record set of records in both self and other record sets."""
+        if self.complemented is None:
+            return super().__and__(other)
+        if (
+            isinstance(other, RecordListComplement)
+            and other.complemented is not None
+        ):
+            return RecordListComplement(self.complemented | other.complemented)
+        recordlist = _empty_recordlist()
+        recordlist.recordset = other.recordset - self.complemented.recordset
+        return recordlist
+
+    def __rand__(self, other):
+        """Return record set of records in both other and self record sets."""
+        if self.complemented is None:
+            return NotImplemented
+        return self.__and__(other)
+
+
 class FoundSet(_RecordSetBase):
     """Extend _RecordSetBase to be base class without in-place amendment.
 
@@ -1480,3 +2076,79 @@ def _empty_recordlist():
     k = _E()
     k.__class__ = RecordList
     return k
+
+
+def _segment_runs(segment):
+    """Return list of (start, stop) runs of record numbers in segment."""
+    if isinstance(segment, RecordsetSegmentRun):
+        return segment.runs
+    if isinstance(segment, RecordsetSegmentInt):
+        return [(segment.record_number, segment.record_number + 1)]
+    if isinstance(segment, RecordsetSegmentList):
+        return _runs_from_record_numbers(segment.list)
+    return _runs_from_bitarray_bytes(segment.tobytes())
+
+
+def _run_segment(segment):
+    """Return RecordsetSegmentRun version of segment."""
+    run_segment = RecordsetSegmentRun(
+        segment.segment_number, segment.index_key
+    )
+    run_segment.runs = _segment_runs(segment).copy()
+    return run_segment
+
+
+def _runs_from_record_numbers(record_numbers):
+    """Return list of (start, stop) runs in sorted record_numbers."""
+    runs = []
+    for number in record_numbers:
+        if runs and runs[-1][1] == number:
+            runs[-1] = (runs[-1][0], number + 1)
+        else:
+            runs.append((number, number + 1))
+    return runs
+
+
+def _count_runs_in_bitarray_bytes(records):
+    """Return number of runs of set bits in records, bitarray bytes."""
+    bits = int.from_bytes(records, byteorder="big")
+
+    # A run starts at a set bit whose more significant neighbour is unset.
+    return bin(bits & ~(bits >> 1)).count("1")
+
+
+def _runs_from_bitarray_bytes(records):
+    """Return list of (start, stop) runs of set bits in records."""
+    bits = int.from_bytes(records, byteorder="big")
+    starts = Bitarray()
+    starts.frombytes(
+        (bits & ~(bits >> 1)).to_bytes(len(records), byteorder="big")
+    )
+    lasts = Bitarray()
+    lasts.frombytes(
+        (bits & ~(bits << 1)).to_bytes(len(records), byteorder="big")
+    )
+    return [
+        (start, last + 1)
+        for start, last in zip(
+            starts.search(SINGLEBIT), lasts.search(SINGLEBIT)
+        )
+    ]
+
+
+def _bitarray_bytes_from_runs(runs):
+    """Return bitarray bytes for segment with bits in runs set."""
+    records = bytearray(SegmentSize.db_segment_size_bytes)
+    for start, stop in runs:
+        first_byte, first_bit = divmod(start, 8)
+        stop_byte, stop_bit = divmod(stop, 8)
+        if first_byte == stop_byte:
+            records[first_byte] |= (255 >> first_bit) ^ (255 >> stop_bit)
+            continue
+        records[first_byte] |= 255 >> first_bit
+        records[first_byte + 1 : stop_byte] = b"\xff" * (
+            stop_byte - first_byte - 1
+        )
+        if stop_bit:
+            records[stop_byte] |= 255 ^ (255 >> stop_bit)
+    return bytes(records)
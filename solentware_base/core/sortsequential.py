@@ -8,12 +8,17 @@ Two classes are provided:
 
 SortIndiciesToSequentialFiles
 SortDPTIndiciesToSequentialFiles
+
+The sequential files are written in the binary format defined in the merge
+module by default.  The text format, one repr(<index entry>) per line, is
+available for debugging by passing binary=False when creating instances.
 """
 
 import os
 
 from .segmentsize import SegmentSize
 from .constants import SECONDARY, NEW_SEGMENT_CONTENT
+from .merge import BINARY_DUMP_HEADER, encode_binary_item
 
 
 class SortIndiciesToSequentialFiles:
@@ -26,10 +31,11 @@ class SortIndiciesToSequentialFiles:
     updates to all supported databases except DPT.
     """
 
-    def __init__(self, database, file, ignore=None):
+    def __init__(self, database, file, ignore=None, binary=True):
         """Extend and initialize deferred update data structures."""
         self.database = database
         self.file = file
+        self.binary = binary
         self.segment = None
         indicies = set(database.specification[file][SECONDARY])
         if ignore is not None:
@@ -84,20 +90,31 @@ class SortIndiciesToSequentialFiles:
         encode_number = self.database.encode_number_for_sequential_file_dump
         encode_segment = self.database.encode_segment_for_sequential_file_dump
         segment = encode_number(self.segment, 4)
+        self._write_items_to_sequential_file(
+            (
+                [
+                    encode_record_selector(key),
+                    segment,
+                    NEW_SEGMENT_CONTENT,
+                    encode_number(len(value), 2),
+                    encode_segment(value),
+                ]
+                for key, value in sorted(reference.items())
+            ),
+            dump_file,
+        )
+
+    def _write_items_to_sequential_file(self, items, dump_file):
+        """Write items to sequential file in binary or text format."""
+        if self.binary:
+            with open(dump_file, mode="wb") as output:
+                output.write(BINARY_DUMP_HEADER)
+                for item in items:
+                    output.write(encode_binary_item(item))
+            return
         with open(dump_file, mode="w", encoding="utf-8") as output:
-            for key, value in sorted(reference.items()):
-                output.write(
-                    repr(
-                        [
-                            encode_record_selector(key),
-                            segment,
-                            NEW_SEGMENT_CONTENT,
-                            encode_number(len(value), 2),
-                            encode_segment(value),
-                        ]
-                    )
-                    + "\n"
-                )
+            for item in items:
+                output.write(repr(item) + "\n")
 
     def write_final_segments_to_sequential_file(self):
         """Write final segments to sequential file."""
@@ -137,15 +154,14 @@ class SortDPTIndiciesToSequentialFiles(SortIndiciesToSequentialFiles):
         """Write index references for segment to sequential file."""
         encode_record_selector = self.database.encode_record_selector
         segment = self.segment
-        with open(dump_file, mode="w", encoding="utf-8") as output:
-            for key, value in sorted(reference.items()):
-                output.write(
-                    repr(
-                        [
-                            encode_record_selector(key),
-                            segment,
-                            value,
-                        ]
-                    )
-                    + "\n"
-                )
+        self._write_items_to_sequential_file(
+            (
+                [
+                    encode_record_selector(key),
+                    segment,
+                    value,
+                ]
+                for key, value in sorted(reference.items())
+            ),
+            dump_file,
+        )
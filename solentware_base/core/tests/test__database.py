@@ -17,6 +17,7 @@ from ..segmentsize import SegmentSize
 from .. import record
 from .. import _db
 from .. import _sqlite
+from .. import constants
 
 
 def random_kwarg():
@@ -305,6 +306,25 @@ class Database_01(unittest.TestCase):
             self.database.values_selector(""), wherevalues.WhereValues
         )
 
+    def test_record_selector_query_cache(self):
+        self.assertEqual(self.database.get_query_cache_statistics(), None)
+        self.database.set_query_cache_size(2)
+        self.assertEqual(self.database.get_query_cache_statistics(), (0, 0, 0))
+        selector = self.database.record_selector("field1 eq ?v?")
+        self.assertIsInstance(selector, where.Where)
+        self.assertEqual(selector.parsed, True)
+        self.assertEqual(selector.node.down.value, "?v?")
+        other = self.database.record_selector("field1 eq ?v?")
+        self.assertIsNot(other.node, selector.node)
+        self.assertEqual(self.database.get_query_cache_statistics(), (1, 1, 1))
+        self.assertIsInstance(
+            self.database.values_selector("field1 from a"),
+            wherevalues.WhereValues,
+        )
+        self.assertEqual(self.database.get_query_cache_statistics(), (1, 2, 2))
+        self.database.set_query_cache_size(0)
+        self.assertEqual(self.database.get_query_cache_statistics(), None)
+
     def test_make_segment_01(self):
         self.assertIsInstance(
             self.database.make_segment("", 1, 1, 5),
@@ -331,6 +351,29 @@ class Database_01(unittest.TestCase):
     def test_set_segment_size(self):
         self.assertEqual(self.database.set_segment_size(), None)
 
+    def test_set_tuning_profile_01(self):
+        self.assertEqual(self.database.tuning_profile, None)
+        self.assertEqual(
+            self.database.set_tuning_profile(constants.BULK_LOAD), None
+        )
+        self.assertEqual(self.database.tuning_profile, constants.BULK_LOAD)
+        self.assertEqual(
+            self.database.set_tuning_profile(None), constants.BULK_LOAD
+        )
+        self.assertEqual(self.database.tuning_profile, None)
+
+    def test_set_tuning_profile_02(self):
+        self.assertRaisesRegex(
+            _database.DatabaseError,
+            "Tuning profile 'fast' not known$",
+            self.database.set_tuning_profile,
+            *("fast",),
+        )
+        self.assertEqual(self.database.tuning_profile, None)
+
+    def test_apply_tuning_profile(self):
+        self.assertEqual(self.database.apply_tuning_profile(), None)
+
     def test_exists(self):
         self.assertEqual(self.database.exists("file1", "file1"), True)
         self.assertEqual(self.database.exists("file2", "field1"), False)
@@ -425,6 +468,7 @@ class Database_02_empty_instance(unittest.TestCase):
                 return None
 
         self.database = D()
+        self.database.specification = {"file1": {}}
         self.instance = record.Record()
 
     def tearDown(self):
@@ -517,6 +561,11 @@ class Database_03_delete_instance(unittest.TestCase):
             self.database.delete_instance("file1", self.instance), None
         )
 
+    def test_delete_instances(self):
+        self.assertEqual(
+            self.database.delete_instances("file1", [self.instance]), None
+        )
+
 
 # Why does edit_instance not use get_lowest_freed_record_number?
 class Database_04_edit_instance(unittest.TestCase):
@@ -639,6 +688,13 @@ class Database_04_edit_instance(unittest.TestCase):
             self.database.edit_instance("file1", self.instance), None
         )
 
+    def test_edit_instances(self):
+        self.instance.key.recno = 10
+        self.newinstance.key.recno = 11
+        self.assertEqual(
+            self.database.edit_instances("file1", [self.instance]), None
+        )
+
 
 class _Database_05_put_instance(unittest.TestCase):
     def setUp(self):
@@ -713,6 +769,11 @@ class Database_05_put_instance_01(_Database_05_put_instance):
             self.database.put_instance("file1", self.instance), None
         )
 
+    def test_put_instances(self):
+        self.assertEqual(
+            self.database.put_instances("file1", [self.instance]), None
+        )
+
 
 # Reuse record number.
 class Database_05_put_instance_02(_Database_05_put_instance):
@@ -954,8 +1015,17 @@ class Database_06_subclass_methods(unittest.TestCase):
                     "set_application_control",
                     "set_segment_records",
                     "insert_segment_records",
+                    "insert_many_segment_records",
                     "SegmentSizeError",
                     "_raise_if_no_object",
+                    "_register_statements",
+                    "_execute",
+                    "_execute_many",
+                    "_insert",
+                    "_last_insert_rowid",
+                    "_fetch_one",
+                    "_fetch_all",
+                    "_close_cursor_pool",
                 )
             ),
         )
@@ -1081,6 +1151,52 @@ class Database_07_datasourcecursor(unittest.TestCase):
         )
 
 
+class IndexChanges(unittest.TestCase):
+    def setUp(self):
+        class D(_database.Database):
+            def __init__(self):
+                self.updates = []
+
+            def add_record_to_field_value(self, *args):
+                self.updates.append(("add",) + args)
+
+            def remove_record_from_field_value(self, *args):
+                self.updates.append(("remove",) + args)
+
+        self.database = D()
+        self.changes = _database.IndexChanges()
+
+    def tearDown(self):
+        self.database = None
+        self.changes = None
+
+    def test___init__(self):
+        self.assertEqual(self.changes.changes, {})
+
+    def test_add_remove_record(self):
+        self.changes.add_record_to_field_value("file1", "f", "k", 2, 5)
+        self.changes.add_record_to_field_value("file1", "f", "k", 2, 7)
+        self.changes.remove_record_from_field_value("file1", "f", "k", 2, 5)
+        self.changes.remove_record_from_field_value("file1", "f", "j", 1, 3)
+        self.assertEqual(
+            self.changes.changes,
+            {("f", "k", 2): {5: False, 7: True}, ("f", "j", 1): {3: False}},
+        )
+
+    def test_apply(self):
+        self.changes.add_record_to_field_value("file1", "f", "k", 2, 5)
+        self.changes.remove_record_from_field_value("file1", "f", "j", 1, 3)
+        self.changes.apply(self.database, "file1")
+        self.assertEqual(
+            self.database.updates,
+            [
+                ("add", "file1", "f", "k", 2, 5),
+                ("remove", "file1", "f", "j", 1, 3),
+            ],
+        )
+        self.assertEqual(self.changes.changes, {})
+
+
 class ExistenceBitmapControl(unittest.TestCase):
     def setUp(self):
         class D(_database.Database):
@@ -1116,6 +1232,41 @@ class ExistenceBitmapControl(unittest.TestCase):
         sc = rrnc.segment_count
         self.assertEqual(sc, 4)
 
+    def test_ebm_cache_01(self):
+        rrnc = _database.ExistenceBitmapControl("file", self.database)
+        self.assertEqual(rrnc.ebm_cache, None)
+        self.assertEqual(rrnc.get_cached_ebm(0), None)
+        self.assertEqual(rrnc.cache_ebm(0, "ebm"), False)
+        self.assertEqual(rrnc.ebm_cache, None)
+        rrnc.flush_ebm_cache(None)
+
+    def test_ebm_cache_02(self):
+        rrnc = _database.ExistenceBitmapControl("file", self.database)
+        rrnc.start_ebm_cache()
+        self.assertEqual(rrnc.ebm_cache, {})
+        self.assertEqual(rrnc.cache_ebm(2, "ebm2"), True)
+        self.assertEqual(rrnc.cache_ebm(1, "ebm1"), True)
+        self.assertEqual(rrnc.get_cached_ebm(1), "ebm1")
+        self.assertEqual(rrnc.get_cached_ebm(0), None)
+        written = []
+        rrnc.write_ebm_segment = lambda *a: written.append(a)
+        rrnc.flush_ebm_cache("dbenv")
+        self.assertEqual(
+            written, [(1, "ebm1", "dbenv"), (2, "ebm2", "dbenv")]
+        )
+        self.assertEqual(rrnc.ebm_cache, {})
+        rrnc.discard_ebm_cache()
+        self.assertEqual(rrnc.ebm_cache, None)
+
+    def test_write_ebm_segment(self):
+        rrnc = _database.ExistenceBitmapControl("file", self.database)
+        self.assertRaisesRegex(
+            _database.DatabaseError,
+            "Existence bitmap cache not supported for this database engine$",
+            rrnc.write_ebm_segment,
+            *(0, "ebm", None),
+        )
+
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner
@@ -1129,4 +1280,5 @@ if __name__ == "__main__":
     runner().run(loader(Database_05_put_instance_03))
     runner().run(loader(Database_06_subclass_methods))
     runner().run(loader(Database_07_datasourcecursor))
+    runner().run(loader(IndexChanges))
     runner().run(loader(ExistenceBitmapControl))
@@ -622,6 +622,20 @@ if berkeleydb:
         def test_05(self):
             self.database.commit()
 
+        # Existence bitmap changes held in cache are seen by cursor.
+        def test_06_get_record_at_position(self):
+            self.database.start_transaction()
+            for value in ("a", "b", "c"):
+                key = self.database.put("file1", None, value)
+                self.database.add_record_to_ebm("file1", key)
+            cursor = self.database.database_cursor("file1", "file1")
+            try:
+                self.assertEqual(cursor.get_record_at_position(3), (3, "c"))
+                self.assertEqual(cursor.get_record_at_position(-3), (1, "a"))
+            finally:
+                cursor.close()
+            self.database.commit()
+
     class Database_put_replace_delete(_DBOpen):
         def test_01(self):
             self.assertRaisesRegex(
@@ -1586,6 +1600,7 @@ if berkeleydb:
 
             finally:
                 cursor.close()
+            self.database.index_record_count["file1", "field1"].create_counts()
 
         def tearDown(self):
             self.database.commit()
@@ -1641,12 +1656,12 @@ if berkeleydb:
                 TypeError,
                 "".join(
                     (
-                        r"recordlist_key\(\) takes from 3 to 5 ",
-                        "positional arguments but 6 were given$",
+                        r"recordlist_key\(\) takes from 3 to 6 ",
+                        "positional arguments but 7 were given$",
                     )
                 ),
                 self.database.recordlist_key,
-                *(None, None, None, None, None),
+                *(None, None, None, None, None, None),
             )
             self.assertRaisesRegex(
                 TypeError,
@@ -1663,12 +1678,12 @@ if berkeleydb:
                 TypeError,
                 "".join(
                     (
-                        r"recordlist_key_range\(\) takes from 3 to 8 ",
-                        "positional arguments but 9 were given$",
+                        r"recordlist_key_range\(\) takes from 3 to 9 ",
+                        "positional arguments but 10 were given$",
                     )
                 ),
                 self.database.recordlist_key_range,
-                *(None, None, None, None, None, None, None, None),
+                *(None, None, None, None, None, None, None, None, None),
             )
             self.assertRaisesRegex(
                 TypeError,
@@ -2578,6 +2593,169 @@ if berkeleydb:
             self.assertEqual(rc._get_record(10), (10, "10Any value"))
             self.assertEqual(rc._get_record(155), (155, "155Any value"))
 
+    def _count_records(database, partial=None):
+        cursor = database.database_cursor("file1", "field1")
+        try:
+            if partial is not None:
+                cursor.set_partial_key(partial)
+            return cursor.count_records()
+        finally:
+            cursor.close()
+
+    def _key_counts(database):
+        irc = database.index_record_count["file1", "field1"]
+        counts = []
+        cursor = irc.key_count_table.cursor(txn=database.dbtxn)
+        try:
+            record = cursor.first()
+            while record:
+                key, value = record
+                counts.append((key, int.from_bytes(value, byteorder="big")))
+                record = cursor.next()
+        finally:
+            cursor.close()
+        return counts
+
+    class IndexRecordCount(_DBOpen):
+        def test_01_counts_exist(self):
+            irc = self.database.index_record_count["file1", "field1"]
+            self.assertIsInstance(irc, _db.IndexRecordCount)
+            self.assertEqual(irc.changes, None)
+            self.assertEqual(irc.counts_exist(), True)
+            self.assertEqual(_count_records(self.database), 0)
+            self.assertEqual(_key_counts(self.database), [])
+
+        def test_02_add_and_remove_record(self):
+            self.database.start_transaction()
+            for key, record_number in (
+                ("ab", 1),
+                ("ab", 2),
+                ("ab", 2),
+                ("ac", 3),
+                ("bc", 4),
+            ):
+                self.database.add_record_to_field_value(
+                    "file1", "field1", key, 0, record_number
+                )
+            self.database.add_record_to_field_value(
+                "file1", "field1", "ab", 1, 5
+            )
+            self.assertEqual(
+                self.database.index_record_count["file1", "field1"].changes,
+                {b"ab": 3, b"ac": 1, b"bc": 1},
+            )
+            self.assertEqual(_count_records(self.database), 5)
+            self.assertEqual(_count_records(self.database, partial="a"), 4)
+            self.assertEqual(
+                self.database.index_record_count["file1", "field1"].changes,
+                {},
+            )
+            self.database.remove_record_from_field_value(
+                "file1", "field1", "ac", 0, 3
+            )
+            self.database.remove_record_from_field_value(
+                "file1", "field1", "ab", 0, 1
+            )
+            self.database.remove_record_from_field_value(
+                "file1", "field1", "ab", 0, 1
+            )
+            self.database.commit()
+            self.assertEqual(
+                self.database.index_record_count["file1", "field1"].changes,
+                None,
+            )
+            self.assertEqual(_count_records(self.database), 3)
+            self.assertEqual(_count_records(self.database, partial="a"), 2)
+            self.assertEqual(
+                _key_counts(self.database), [(b"ab", 2), (b"bc", 1)]
+            )
+
+        def test_03_list_and_bitmap_segments(self):
+            self.database.start_transaction()
+            limit = SegmentSize.db_upper_conversion_limit
+            for record_number in range(limit + 3):
+                self.database.add_record_to_field_value(
+                    "file1", "field1", "ab", 0, record_number
+                )
+            self.database.add_record_to_field_value(
+                "file1", "field1", "ab", 0, 0
+            )
+            self.assertEqual(_count_records(self.database), limit + 3)
+            for record_number in range(limit + 1):
+                self.database.remove_record_from_field_value(
+                    "file1", "field1", "ab", 0, record_number
+                )
+            self.database.remove_record_from_field_value(
+                "file1", "field1", "ab", 0, 0
+            )
+            self.assertEqual(_count_records(self.database), 2)
+            self.database.commit()
+            self.assertEqual(_key_counts(self.database), [(b"ab", 2)])
+
+        def test_04_backout(self):
+            self.database.start_transaction()
+            self.database.add_record_to_field_value(
+                "file1", "field1", "ab", 0, 1
+            )
+            self.database.commit()
+            self.database.start_transaction()
+            self.database.add_record_to_field_value(
+                "file1", "field1", "ab", 0, 2
+            )
+            self.database.add_record_to_field_value(
+                "file1", "field1", "ac", 0, 3
+            )
+            self.assertEqual(_count_records(self.database), 3)
+            self.database.add_record_to_field_value(
+                "file1", "field1", "ad", 0, 4
+            )
+            self.database.backout()
+            self.assertEqual(_count_records(self.database), 1)
+            self.assertEqual(_key_counts(self.database), [(b"ab", 1)])
+
+        def test_05_file_and_unfile_records_under(self):
+            self.database.start_transaction()
+            for record_number in range(3):
+                self.database.add_record_to_field_value(
+                    "file1", "field1", "ab", 0, record_number
+                )
+            recordlist = recordset.RecordList(self.database, "file1")
+            recordlist[0] = recordset.RecordsetSegmentList(
+                0, None, records=b"\x00\x04\x00\x05"
+            )
+            self.database.file_records_under(
+                "file1", "field1", recordlist, b"ab"
+            )
+            self.database.file_records_under(
+                "file1", "field1", recordlist, b"ac"
+            )
+            self.assertEqual(_count_records(self.database), 4)
+            self.database.unfile_records_under("file1", "field1", b"ab")
+            self.database.commit()
+            self.assertEqual(_count_records(self.database), 2)
+            self.assertEqual(_key_counts(self.database), [(b"ac", 2)])
+
+        def test_06_create_counts(self):
+            self.database.start_transaction()
+            for key, record_number in (("ab", 1), ("ab", 2), ("ac", 3)):
+                self.database.add_record_to_field_value(
+                    "file1", "field1", key, 0, record_number
+                )
+            irc = self.database.index_record_count["file1", "field1"]
+            irc.flush_cache()
+            self.database.table[CONTROL_FILE].delete(
+                b"Cfile1_field1", txn=self.database.dbtxn
+            )
+            irc.key_count_table.truncate(txn=self.database.dbtxn)
+            self.assertEqual(irc.counts_exist(), False)
+            irc.create_counts()
+            self.assertEqual(irc.counts_exist(), True)
+            self.assertEqual(_count_records(self.database), 3)
+            self.assertEqual(
+                _key_counts(self.database), [(b"ab", 2), (b"ac", 1)]
+            )
+            self.database.commit()
+
     def encode(value):
         """Return encoded value.
 
@@ -2612,3 +2790,4 @@ if __name__ == "__main__":
         runner().run(loader(Database_freed_record_number))
         runner().run(loader(Database_empty_freed_record_number))
         runner().run(loader(RecordsetCursor))
+        runner().run(loader(IndexRecordCount))
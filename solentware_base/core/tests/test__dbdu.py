@@ -954,6 +954,9 @@ if berkeleydb:
                     break
                 ra.append(r)
             self.assertEqual(ra, [])
+            irc = self.database.index_record_count["file1", "field1"]
+            self.assertEqual(irc.count_records(), 1)
+            self.assertEqual(irc.count_records(partial=b"li"), 1)
 
         def test_11(self):
             self.database.value_segments["file1"] = {
@@ -991,6 +994,9 @@ if berkeleydb:
                     break
                 ra.append(r)
             self.assertEqual(ra, [(1, b"\x00\x01\x00\x04")])
+            irc = self.database.index_record_count["file1", "field1"]
+            self.assertEqual(irc.count_records(), 2)
+            self.assertEqual(irc.count_records(partial=b"lists"), 0)
 
         def test_12(self):
             ba = Bitarray()
@@ -1024,6 +1030,9 @@ if berkeleydb:
                     break
                 ra.append(r)
             self.assertEqual(ra, [(1, b"\n\n\n\n\n\n\n\n\n\n\n\n\n\n\n\n")])
+            irc = self.database.index_record_count["file1", "field1"]
+            self.assertEqual(irc.count_records(), 32)
+            self.assertEqual(irc.count_records(partial=b"bits"), 32)
 
     # merge() does nothing.
     class Database_merge(_DBOpen):
@@ -1051,6 +1060,18 @@ if berkeleydb:
                 self.database.delete_index("file1", "field1") is None, True
             )
 
+        def test_delete_index_02(self):
+            self.database.start_transaction()
+            self.database.add_record_to_field_value(
+                "file1", "field1", "a", 0, 1
+            )
+            irc = self.database.index_record_count["file1", "field1"]
+            self.assertEqual(irc.count_records(), 1)
+            self.database.delete_index("file1", "field1")
+            self.assertEqual(irc.count_records(), 0)
+            self.assertEqual(irc.count_records(partial=b"a"), 0)
+            self.database.commit()
+
     class Database_find_value_segments(_DBOpen):
         def test_01(self):
             database = self._D({}, segment_size_bytes=None)
@@ -1317,6 +1338,9 @@ if berkeleydb:
             ):
                 self.assertEqual(count, 2)
             self.database.commit()
+            irc = self.database.index_record_count["file1", "field1"]
+            self.assertEqual(irc.count_records(), 3)
+            self.assertEqual(irc.count_records(partial=b"b"), 1)
 
     def encode(value):
         """Return encoded value.
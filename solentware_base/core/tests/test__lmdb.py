@@ -1219,6 +1219,20 @@ class DatabaseTransactions(_DBOpen):
     def test_05(self):
         self.database.commit()
 
+    # Existence bitmap changes held in cache are seen by cursor.
+    def test_06_get_record_at_position(self):
+        self.database.start_transaction()
+        for value in ("a", "b", "c"):
+            key = self.database.put("file1", None, value)
+            self.database.add_record_to_ebm("file1", key)
+        cursor = self.database.database_cursor("file1", "file1")
+        try:
+            self.assertEqual(cursor.get_record_at_position(3), (2, "c"))
+            self.assertEqual(cursor.get_record_at_position(-3), (0, "a"))
+        finally:
+            cursor.close()
+        self.database.commit()
+
 
 # All actions must be within a transaction.
 class Database_put_replace_delete(_DBOpen):
@@ -2577,6 +2591,7 @@ class _Database_recordset(_DBOpen):
             cursor.put(*record)
             self.references.add(record)
             self.keyrefmap[k][1] = reference
+        self.database.index_record_count["file1", "field1"].create_counts()
         self.database.commit()
 
     def tearDown(self):
@@ -2675,12 +2690,12 @@ class Database_make_recordset(_Database_recordset):
             TypeError,
             "".join(
                 (
-                    r"recordlist_key\(\) takes from 3 to 5 ",
-                    "positional arguments but 6 were given$",
+                    r"recordlist_key\(\) takes from 3 to 6 ",
+                    "positional arguments but 7 were given$",
                 )
             ),
             self.database.recordlist_key,
-            *(None, None, None, None, None),
+            *(None, None, None, None, None, None),
         )
         self.assertRaisesRegex(
             TypeError,
@@ -2697,12 +2712,12 @@ class Database_make_recordset(_Database_recordset):
             TypeError,
             "".join(
                 (
-                    r"recordlist_key_range\(\) takes from 3 to 8 ",
-                    "positional arguments but 9 were given$",
+                    r"recordlist_key_range\(\) takes from 3 to 9 ",
+                    "positional arguments but 10 were given$",
                 )
             ),
             self.database.recordlist_key_range,
-            *(None, None, None, None, None, None, None, None),
+            *(None, None, None, None, None, None, None, None, None),
         )
         self.assertRaisesRegex(
             TypeError,
@@ -3489,10 +3504,15 @@ class Database_freed_record_number(_DBOpen):
                 record = cursor.item()
                 records.append(record)
                 record = cursor.next()
-        self.assertEqual(len(records), 3)
+        self.assertEqual(len(records), 4)
         self.assertEqual(
             records,
-            [(b"Efile1", b"\x00"), (b"Efile1", b"\x01"), (b"Efile1", b"\x02")],
+            [
+                (b"Cfile1_field1", b"\x00"),
+                (b"Efile1", b"\x00"),
+                (b"Efile1", b"\x01"),
+                (b"Efile1", b"\x02"),
+            ],
         )
 
     def test_02_note_freed_record_number_segment_02(self):
@@ -3791,6 +3811,197 @@ class RecordsetCursor(_DBOpen):
         self.assertEqual(rc._get_record(155), (155, "155Any value"))
 
 
+def _count_records(database, partial=None):
+    cursor = database.database_cursor("file1", "field1")
+    try:
+        if partial is not None:
+            cursor.set_partial_key(partial)
+        return cursor.count_records()
+    finally:
+        cursor.close()
+
+
+def _key_counts(database):
+    irc = database.index_record_count["file1", "field1"]
+    counts = []
+    with database.dbtxn.transaction.cursor(
+        irc.key_count_table.datastore
+    ) as cursor:
+        record = cursor.first()
+        while record:
+            key, value = cursor.item()
+            counts.append((key, int.from_bytes(value, byteorder="big")))
+            record = cursor.next()
+    return counts
+
+
+class IndexRecordCount(_DBOpen):
+    def test_01_counts_exist(self):
+        irc = self.database.index_record_count["file1", "field1"]
+        self.assertIsInstance(irc, _lmdb.IndexRecordCount)
+        self.assertEqual(irc.changes, None)
+        self.database.start_read_only_transaction()
+        self.assertEqual(irc.counts_exist(), True)
+        self.assertEqual(_count_records(self.database), 0)
+        self.assertEqual(_key_counts(self.database), [])
+        self.database.end_read_only_transaction()
+
+    def test_02_add_and_remove_record(self):
+        self.database.start_transaction()
+        for key, record_number in (
+            ("ab", 1),
+            ("ab", 2),
+            ("ab", 2),
+            ("ac", 3),
+            ("bc", 4),
+        ):
+            self.database.add_record_to_field_value(
+                "file1", "field1", key, 0, record_number
+            )
+        self.database.add_record_to_field_value("file1", "field1", "ab", 1, 5)
+        self.assertEqual(
+            self.database.index_record_count["file1", "field1"].changes,
+            {b"ab": 3, b"ac": 1, b"bc": 1},
+        )
+        self.assertEqual(_count_records(self.database), 5)
+        self.assertEqual(_count_records(self.database, partial="a"), 4)
+        self.assertEqual(
+            self.database.index_record_count["file1", "field1"].changes, {}
+        )
+        self.database.remove_record_from_field_value(
+            "file1", "field1", "ac", 0, 3
+        )
+        self.database.remove_record_from_field_value(
+            "file1", "field1", "ab", 0, 1
+        )
+        self.database.remove_record_from_field_value(
+            "file1", "field1", "ab", 0, 1
+        )
+        self.database.commit()
+        self.assertEqual(
+            self.database.index_record_count["file1", "field1"].changes, None
+        )
+        self.database.start_read_only_transaction()
+        self.assertEqual(_count_records(self.database), 3)
+        self.assertEqual(_count_records(self.database, partial="a"), 2)
+        self.assertEqual(
+            _key_counts(self.database), [(b"ab", 2), (b"bc", 1)]
+        )
+        self.database.end_read_only_transaction()
+
+    def test_03_list_and_bitmap_segments(self):
+        self.database.start_transaction()
+        for record_number in range(SegmentSize.db_upper_conversion_limit + 3):
+            self.database.add_record_to_field_value(
+                "file1", "field1", "ab", 0, record_number
+            )
+        self.database.add_record_to_field_value("file1", "field1", "ab", 0, 0)
+        self.assertEqual(
+            _count_records(self.database),
+            SegmentSize.db_upper_conversion_limit + 3,
+        )
+        for record_number in range(SegmentSize.db_upper_conversion_limit + 1):
+            self.database.remove_record_from_field_value(
+                "file1", "field1", "ab", 0, record_number
+            )
+        self.database.remove_record_from_field_value(
+            "file1", "field1", "ab", 0, 0
+        )
+        self.assertEqual(_count_records(self.database), 2)
+        self.database.commit()
+        self.database.start_read_only_transaction()
+        self.assertEqual(_key_counts(self.database), [(b"ab", 2)])
+        self.database.end_read_only_transaction()
+
+    def test_04_backout(self):
+        self.database.start_transaction()
+        self.database.add_record_to_field_value("file1", "field1", "ab", 0, 1)
+        self.database.commit()
+        self.database.start_transaction()
+        self.database.add_record_to_field_value("file1", "field1", "ab", 0, 2)
+        self.database.add_record_to_field_value("file1", "field1", "ac", 0, 3)
+        self.assertEqual(_count_records(self.database), 3)
+        self.database.add_record_to_field_value("file1", "field1", "ad", 0, 4)
+        self.database.backout()
+        self.database.start_read_only_transaction()
+        self.assertEqual(_count_records(self.database), 1)
+        self.assertEqual(_key_counts(self.database), [(b"ab", 1)])
+        self.database.end_read_only_transaction()
+
+    def test_05_file_and_unfile_records_under(self):
+        self.database.start_transaction()
+        for record_number in range(3):
+            self.database.add_record_to_field_value(
+                "file1", "field1", "ab", 0, record_number
+            )
+        recordlist = recordset.RecordList(self.database, "file1")
+        recordlist[0] = recordset.RecordsetSegmentList(
+            0, None, records=b"\x00\x04\x00\x05"
+        )
+        self.database.file_records_under("file1", "field1", recordlist, b"ab")
+        self.database.file_records_under("file1", "field1", recordlist, b"ac")
+        self.assertEqual(_count_records(self.database), 4)
+        self.database.unfile_records_under("file1", "field1", b"ab")
+        self.database.commit()
+        self.database.start_read_only_transaction()
+        self.assertEqual(_count_records(self.database), 2)
+        self.assertEqual(_key_counts(self.database), [(b"ac", 2)])
+        self.database.end_read_only_transaction()
+
+    def test_06_create_counts(self):
+        self.database.start_transaction()
+        for key, record_number in (("ab", 1), ("ab", 2), ("ac", 3)):
+            self.database.add_record_to_field_value(
+                "file1", "field1", key, 0, record_number
+            )
+        irc = self.database.index_record_count["file1", "field1"]
+        irc.flush_cache()
+        self.database.dbtxn.transaction.delete(
+            b"Cfile1_field1",
+            db=self.database.table[CONTROL_FILE].datastore,
+        )
+        self.database.dbtxn.transaction.drop(
+            irc.key_count_table.datastore, delete=False
+        )
+        self.assertEqual(irc.counts_exist(), False)
+        irc.create_counts()
+        self.assertEqual(irc.counts_exist(), True)
+        self.assertEqual(_count_records(self.database), 3)
+        self.assertEqual(
+            _key_counts(self.database), [(b"ab", 2), (b"ac", 1)]
+        )
+        self.database.commit()
+
+    def test_07_open_database_creates_counts(self):
+        self.database.start_transaction()
+        for key, record_number in (("ab", 1), ("ab", 2), ("ac", 3)):
+            self.database.add_record_to_field_value(
+                "file1", "field1", key, 0, record_number
+            )
+        irc = self.database.index_record_count["file1", "field1"]
+        irc.flush_cache()
+        self.database.dbtxn.transaction.delete(
+            b"Cfile1_field1",
+            db=self.database.table[CONTROL_FILE].datastore,
+        )
+        self.database.dbtxn.transaction.drop(
+            irc.key_count_table.datastore, delete=True
+        )
+        self.database.commit()
+        self.database.close_database()
+        self.database.open_database(self.dbe_module)
+        self.assertIsNot(
+            self.database.index_record_count["file1", "field1"], irc
+        )
+        self.database.start_read_only_transaction()
+        self.assertEqual(_count_records(self.database), 3)
+        self.assertEqual(_count_records(self.database, partial="ab"), 2)
+        self.assertEqual(
+            _key_counts(self.database), [(b"ab", 2), (b"ac", 1)]
+        )
+        self.database.end_read_only_transaction()
+
+
 def encode(value):
     return value.encode()
 
@@ -3847,3 +4058,4 @@ if __name__ == "__main__":
     runner().run(loader(Database_freed_record_number))
     runner().run(loader(Database_empty_freed_record_number))
     runner().run(loader(RecordsetCursor))
+    runner().run(loader(IndexRecordCount))
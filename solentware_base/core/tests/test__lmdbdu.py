@@ -1041,6 +1041,9 @@ class Database_sort_and_write(_DBOpen):
                     break
                 ra.append(cursor.item())
         self.assertEqual(ra, [])
+        irc = self.database.index_record_count["file1", "field1"]
+        self.assertEqual(irc.count_records(), 1)
+        self.assertEqual(irc.count_records(partial=b"li"), 1)
 
     def test_11(self):
         self.database.value_segments["file1"] = {"field1": {"list": [1, 4]}}
@@ -1074,6 +1077,9 @@ class Database_sort_and_write(_DBOpen):
                     break
                 ra.append(cursor.item())
         self.assertEqual(ra, [(b"\x00\x00\x00\x00", b"\x00\x01\x00\x04")])
+        irc = self.database.index_record_count["file1", "field1"]
+        self.assertEqual(irc.count_records(), 2)
+        self.assertEqual(irc.count_records(partial=b"lists"), 0)
 
     def test_12(self):
         ba = Bitarray()
@@ -1107,6 +1113,9 @@ class Database_sort_and_write(_DBOpen):
         self.assertEqual(
             ra, [(b"\x00\x00\x00\x00", b"\n\n\n\n\n\n\n\n\n\n\n\n\n\n\n\n")]
         )
+        irc = self.database.index_record_count["file1", "field1"]
+        self.assertEqual(irc.count_records(), 32)
+        self.assertEqual(irc.count_records(partial=b"bits"), 32)
 
 
 # merge() does nothing.
@@ -1138,6 +1147,16 @@ class Database_delete_index(_DBOpen):
         )
         self.database.backout()
 
+    def test_delete_index_02(self):
+        self.database.start_transaction()
+        self.database.add_record_to_field_value("file1", "field1", "a", 0, 1)
+        irc = self.database.index_record_count["file1", "field1"]
+        self.assertEqual(irc.count_records(), 1)
+        self.database.delete_index("file1", "field1")
+        self.assertEqual(irc.count_records(), 0)
+        self.assertEqual(irc.count_records(partial=b"a"), 0)
+        self.database.commit()
+
 
 class Database_find_value_segments(_DBOpen):
     def test_01(self):
@@ -1389,6 +1408,11 @@ class Database_merge_import(_DBOpenDisk):
         ):
             self.assertEqual(count, 2)
         self.database.commit()
+        self.database.start_read_only_transaction()
+        irc = self.database.index_record_count["file1", "field1"]
+        self.assertEqual(irc.count_records(), 3)
+        self.assertEqual(irc.count_records(partial=b"b"), 1)
+        self.database.end_read_only_transaction()
 
 
 def encode(value):
@@ -26,7 +26,6 @@ Sometimes a unit test will have an attempt at exhaustive testing too.
 
 import unittest
 import os
-from ast import literal_eval
 import shutil
 
 try:
@@ -54,6 +53,13 @@ from .. import recordsetcursor
 from .. import recordsetbasecursor
 from ..segmentsize import SegmentSize
 from ..wherevalues import ValuesClause
+from ..nosqllayout import (
+    is_binary_layout,
+    encode_records,
+    decode_records,
+    decode_segment_table,
+    encode_segment_numbers,
+)
 
 _NDBM_TEST_ROOT = "___ndbm_test_nosql"
 _GNU_TEST_ROOT = "___gnu_test_nosql"
@@ -877,7 +883,7 @@ class Database_methods:
     def t16_recordset_record_number(self):
         dbenv = self.database.dbenv
         self.assertEqual(dbenv.exists("1_0"), False)
-        self.assertEqual(dbenv["1_0__ebm"], b"[]")
+        self.assertEqual(dbenv["1_0__ebm"], encode_segment_numbers([]))
         self.assertEqual(dbenv.exists("1_0__ebm_0"), False)
         dbenv["1_0"] = repr("Some value")
         self.database.ebm_control["file1"].append_ebm_segment(
@@ -1005,6 +1011,25 @@ class Database_methods:
         self.assertIsInstance(rlebm, recordset.RecordList)
         self.assertEqual(rlebm.sorted_segnums, [0])
 
+    def t27_get_primary_records(self):
+        for number in range(3):
+            self.database.put("file1", None, repr("value " + str(number)))
+        self.assertEqual(
+            self.database.get_primary_records("file1", [0, 2, 5]),
+            [(0, "'value 0'"), (2, "'value 2'")],
+        )
+
+    def t28_iter_records(self):
+        for number in range(3):
+            self.database.put("file1", None, repr("value " + str(number)))
+        recordlist = self.database.recordlist_nil("file1")
+        for number in (1, 2, 5):
+            recordlist.recordset.place_record_number(number)
+        self.assertEqual(
+            list(self.database.iter_records(recordlist, batch_size=1)),
+            [(1, "'value 1'"), (2, "'value 2'")],
+        )
+
     def create_ebm(self):
         self.database.ebm_control["file1"].append_ebm_segment(
             b"\xff" + b"\xff" * (SegmentSize.db_segment_size_bytes - 1),
@@ -1714,20 +1739,20 @@ class DatabaseAddRecordToFieldValue:
         self.assertEqual(db.exists("1_1"), True)
         self.assertEqual(db.exists("1_1_0_indexvalue"), True)
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()), {2: (0, 1)}
+            decode_segment_table(db["1_1_0_indexvalue"]), {2: (0, 1)}
         )
         self.database.add_record_to_field_value(
             "file1", "field1", "indexvalue", 3, 5
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()),
+            decode_segment_table(db["1_1_0_indexvalue"]),
             {2: (0, 1), 3: (5, 1)},
         )
         self.database.add_record_to_field_value(
             "file1", "field1", "indexvalue", 3, 5
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()),
+            decode_segment_table(db["1_1_0_indexvalue"]),
             {2: (0, 1), 3: (5, 1)},
         )
         self.assertEqual(db.exists("1_1_1_3_indexvalue"), False)
@@ -1735,22 +1760,22 @@ class DatabaseAddRecordToFieldValue:
             "file1", "field1", "indexvalue", 3, 6
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()),
+            decode_segment_table(db["1_1_0_indexvalue"]),
             {2: (0, 1), 3: ("L", 2)},
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_3_indexvalue"].decode()),
+            decode_records(db["1_1_1_3_indexvalue"]),
             b"\x00\x05\x00\x06",
         )
         self.database.add_record_to_field_value(
             "file1", "field1", "indexvalue", 3, 2
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()),
+            decode_segment_table(db["1_1_0_indexvalue"]),
             {2: (0, 1), 3: ("L", 3)},
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_3_indexvalue"].decode()),
+            decode_records(db["1_1_1_3_indexvalue"]),
             b"\x00\x02\x00\x05\x00\x06",
         )
         for i in 10, 20, 30, 40:
@@ -1758,22 +1783,22 @@ class DatabaseAddRecordToFieldValue:
                 "file1", "field1", "indexvalue", 3, i
             )
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()),
+            decode_segment_table(db["1_1_0_indexvalue"]),
             {2: (0, 1), 3: ("L", 7)},
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_3_indexvalue"].decode()),
+            decode_records(db["1_1_1_3_indexvalue"]),
             b"\x00\x02\x00\x05\x00\x06\x00\x0a\x00\x14\x00\x1e\x00\x28",
         )
         self.database.add_record_to_field_value(
             "file1", "field1", "indexvalue", 3, 50
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()),
+            decode_segment_table(db["1_1_0_indexvalue"]),
             {2: (0, 1), 3: ("B", 8)},
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_3_indexvalue"].decode()),
+            decode_records(db["1_1_1_3_indexvalue"]),
             b"".join(
                 (
                     b"\x26\x20\x08\x02\x00\x80\x20\x00",
@@ -1785,11 +1810,11 @@ class DatabaseAddRecordToFieldValue:
             "file1", "field1", "indexvalue", 3, 50
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()),
+            decode_segment_table(db["1_1_0_indexvalue"]),
             {2: (0, 1), 3: ("B", 8)},
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_3_indexvalue"].decode()),
+            decode_records(db["1_1_1_3_indexvalue"]),
             b"".join(
                 (
                     b"\x26\x20\x08\x02\x00\x80\x20\x00",
@@ -1801,11 +1826,11 @@ class DatabaseAddRecordToFieldValue:
             "file1", "field1", "indexvalue", 3, 51
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()),
+            decode_segment_table(db["1_1_0_indexvalue"]),
             {2: (0, 1), 3: ("B", 9)},
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_3_indexvalue"].decode()),
+            decode_records(db["1_1_1_3_indexvalue"]),
             b"".join(
                 (
                     b"\x26\x20\x08\x02\x00\x80\x30\x00",
@@ -1822,7 +1847,7 @@ class DatabaseAddRecordToFieldValue:
         self.assertEqual(db.exists("2_1"), False)  # This record never exists.
         self.assertEqual(db.exists("2_1_0_indexvalue"), True)
         self.assertEqual(
-            literal_eval(db["2_1_0_indexvalue"].decode()), {2: (0, 1)}
+            decode_segment_table(db["2_1_0_indexvalue"]), {2: (0, 1)}
         )
 
 
@@ -1850,11 +1875,11 @@ class DatabaseRemoveRecordFieldValue:
             "file1", "field1", "indexvalue", 2, 0
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()),
+            decode_segment_table(db["1_1_0_indexvalue"]),
             {2: (0, 1), 3: ("B", 9)},
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_3_indexvalue"].decode()),
+            decode_records(db["1_1_1_3_indexvalue"]),
             b"".join(
                 (
                     b"\x26\x20\x08\x02\x00\x80\x30\x00",
@@ -1866,11 +1891,11 @@ class DatabaseRemoveRecordFieldValue:
             "file1", "field1", "indexvalue", 4, 40
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()),
+            decode_segment_table(db["1_1_0_indexvalue"]),
             {2: (0, 1), 3: ("B", 9)},
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_3_indexvalue"].decode()),
+            decode_records(db["1_1_1_3_indexvalue"]),
             b"".join(
                 (
                     b"\x26\x20\x08\x02\x00\x80\x30\x00",
@@ -1882,11 +1907,11 @@ class DatabaseRemoveRecordFieldValue:
             "file1", "field1", "indexvalue", 3, 40
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()),
+            decode_segment_table(db["1_1_0_indexvalue"]),
             {2: (0, 1), 3: ("B", 8)},
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_3_indexvalue"].decode()),
+            decode_records(db["1_1_1_3_indexvalue"]),
             b"".join(
                 (
                     b"\x26\x20\x08\x02\x00\x00\x30\x00",
@@ -1899,11 +1924,11 @@ class DatabaseRemoveRecordFieldValue:
                 "file1", "field1", "indexvalue", 3, i
             )
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()),
+            decode_segment_table(db["1_1_0_indexvalue"]),
             {2: (0, 1), 3: ("B", 5)},
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_3_indexvalue"].decode()),
+            decode_records(db["1_1_1_3_indexvalue"]),
             b"".join(
                 (
                     b"\x26\x20\x00\x02\x00\x00\x00\x00",
@@ -1915,11 +1940,11 @@ class DatabaseRemoveRecordFieldValue:
             "file1", "field1", "indexvalue", 3, 10
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()),
+            decode_segment_table(db["1_1_0_indexvalue"]),
             {2: (0, 1), 3: ("L", 4)},
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_3_indexvalue"].decode()),
+            decode_records(db["1_1_1_3_indexvalue"]),
             b"\x00\x02\x00\x05\x00\x06\x00\x1e",
         )
         for i in 2, 6:
@@ -1927,18 +1952,18 @@ class DatabaseRemoveRecordFieldValue:
                 "file1", "field1", "indexvalue", 3, i
             )
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()),
+            decode_segment_table(db["1_1_0_indexvalue"]),
             {2: (0, 1), 3: ("L", 2)},
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_3_indexvalue"].decode()),
+            decode_records(db["1_1_1_3_indexvalue"]),
             b"\x00\x05\x00\x1e",
         )
         self.database.remove_record_from_field_value(
             "file1", "field1", "indexvalue", 3, 5
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()),
+            decode_segment_table(db["1_1_0_indexvalue"]),
             {2: (0, 1), 3: (30, 1)},
         )
         self.assertEqual(db.exists("1_1_1_3_indexvalue"), False)
@@ -1946,7 +1971,7 @@ class DatabaseRemoveRecordFieldValue:
             "file1", "field1", "indexvalue", 3, 30
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_indexvalue"].decode()), {2: (0, 1)}
+            decode_segment_table(db["1_1_0_indexvalue"]), {2: (0, 1)}
         )
         self.assertEqual(db.exists("1_1_1_3_indexvalue"), False)
         self.assertEqual(db.exists("1_1_1_2_indexvalue"), False)
@@ -1967,7 +1992,7 @@ class DatabaseRemoveRecordFieldValue:
         self.assertEqual(db.exists("2_1"), False)  # This record never exists.
         self.assertEqual(db.exists("2_1_0_indexvalue"), True)
         self.assertEqual(
-            literal_eval(db["2_1_0_indexvalue"].decode()), {2: (0, 1)}
+            decode_segment_table(db["2_1_0_indexvalue"]), {2: (0, 1)}
         )
         self.database.remove_record_from_field_value(
             "file2", "field2", "indexvalue", 2, 0
@@ -2125,12 +2150,12 @@ class Database_make_recordset:
             TypeError,
             "".join(
                 (
-                    r"recordlist_key\(\) takes from 3 to 5 ",
-                    "positional arguments but 6 were given$",
+                    r"recordlist_key\(\) takes from 3 to 6 ",
+                    "positional arguments but 7 were given$",
                 )
             ),
             self.database.recordlist_key,
-            *(None, None, None, None, None),
+            *(None, None, None, None, None, None),
         )
         self.assertRaisesRegex(
             TypeError,
@@ -2147,12 +2172,12 @@ class Database_make_recordset:
             TypeError,
             "".join(
                 (
-                    r"recordlist_key_range\(\) takes from 3 to 8 ",
-                    "positional arguments but 9 were given$",
+                    r"recordlist_key_range\(\) takes from 3 to 9 ",
+                    "positional arguments but 10 were given$",
                 )
             ),
             self.database.recordlist_key_range,
-            *(None, None, None, None, None, None, None, None),
+            *(None, None, None, None, None, None, None, None, None),
         )
         self.assertRaisesRegex(
             TypeError,
@@ -2429,6 +2454,42 @@ class Database_make_recordset:
         self.assertIsInstance(rs, recordset.RecordList)
         self.assertEqual(len(rs), 0)
 
+    def t37_recordlist_within(self):
+        d = self.database
+        within = d.recordlist_key("file1", "field1", key="www")
+        self.assertEqual(len(within), 2)
+        del within[0]
+        rs = d.recordlist_key("file1", "field1", key="www", within=within)
+        self.assertEqual(rs.sorted_segnums, [1])
+        rs = d.recordlist_key("file1", "field1", key="a_o", within=within)
+        self.assertEqual(len(rs), 0)
+        rs = d.recordlist_key_range("file1", "field1", ge="w", within=within)
+        self.assertEqual(rs.sorted_segnums, [1])
+        rs = d.recordlist_key_range("file1", "field1", ge="w")
+        self.assertEqual(rs.sorted_segnums, [0, 1])
+
+    def t38_estimate_recordlist(self):
+        d = self.database
+        self.assertEqual(d.estimate_recordlist_key("file1", "field1"), 0)
+        for key, count in (("www", 6), ("a_o", 32), ("zzz", 0)):
+            self.assertEqual(
+                d.estimate_recordlist_key("file1", "field1", key=key), count
+            )
+        for bounds, count in (
+            ({}, 189),
+            ({"ge": "t", "le": "tz"}, 5),
+            ({"gt": "tww", "lt": "www"}, 3),
+            ({"lt": "b"}, 56),
+            ({"gt": "www"}, 0),
+        ):
+            self.assertEqual(
+                d.estimate_recordlist_key_range("file1", "field1", **bounds),
+                count,
+            )
+        self.assertEqual(
+            d.estimate_recordlist_key_range("file2", "field2"), None
+        )
+
 
 class Database_file_unfile_records:
     def t01(self):
@@ -2491,10 +2552,10 @@ class Database_file_unfile_records:
         db = self.database.dbenv
         rs = self.database.recordlist_all("file1", "field1")
         self.assertEqual(
-            literal_eval(db["1_1_0_aa_o"].decode()), {0: ("B", 24)}
+            decode_segment_table(db["1_1_0_aa_o"]), {0: ("B", 24)}
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_0_aa_o"].decode()),
+            decode_records(db["1_1_1_0_aa_o"]),
             b"".join(
                 (
                     b"\x00\x00\x00\xff\xff\xff\x00\x00",
@@ -2504,11 +2565,11 @@ class Database_file_unfile_records:
         )
         self.database.file_records_under("file1", "field1", rs, "aa_o")
         self.assertEqual(
-            literal_eval(db["1_1_0_aa_o"].decode()),
+            decode_segment_table(db["1_1_0_aa_o"]),
             {0: ("B", 128), 1: ("L", 3)},
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_0_aa_o"].decode()),
+            decode_records(db["1_1_1_0_aa_o"]),
             b"".join(
                 (
                     b"\xff\xff\xff\xff\xff\xff\xff\xff",
@@ -2517,7 +2578,7 @@ class Database_file_unfile_records:
             ),
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_1_aa_o"].decode()), b"\x00B\x00C\x00D"
+            decode_records(db["1_1_1_1_aa_o"]), b"\x00B\x00C\x00D"
         )
 
     def t05_file_records_under(self):
@@ -2526,11 +2587,11 @@ class Database_file_unfile_records:
         rs = self.database.recordlist_all("file1", "field1")
         self.database.file_records_under("file1", "field1", rs, "rrr")
         self.assertEqual(
-            literal_eval(db["1_1_0_rrr"].decode()),
+            decode_segment_table(db["1_1_0_rrr"]),
             {0: ("B", 128), 1: ("L", 3)},
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_0_rrr"].decode()),
+            decode_records(db["1_1_1_0_rrr"]),
             b"".join(
                 (
                     b"\xff\xff\xff\xff\xff\xff\xff\xff",
@@ -2539,20 +2600,20 @@ class Database_file_unfile_records:
             ),
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_1_rrr"].decode()), b"\x00B\x00C\x00D"
+            decode_records(db["1_1_1_1_rrr"]), b"\x00B\x00C\x00D"
         )
 
     def t06_file_records_under(self):
         db = self.database.dbenv
-        self.assertEqual(literal_eval(db["1_1_0_twy"].decode()), {0: ("L", 3)})
+        self.assertEqual(decode_segment_table(db["1_1_0_twy"]), {0: ("L", 3)})
         self.assertEqual(
-            literal_eval(db["1_1_1_0_twy"].decode()), b"\x00B\x00C\x00D"
+            decode_records(db["1_1_1_0_twy"]), b"\x00B\x00C\x00D"
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_aa_o"].decode()), {0: ("B", 24)}
+            decode_segment_table(db["1_1_0_aa_o"]), {0: ("B", 24)}
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_0_aa_o"].decode()),
+            decode_records(db["1_1_1_0_aa_o"]),
             b"".join(
                 (
                     b"\x00\x00\x00\xff\xff\xff\x00\x00",
@@ -2562,43 +2623,43 @@ class Database_file_unfile_records:
         )
         rs = self.database.recordlist_key("file1", "field1", key="twy")
         self.database.file_records_under("file1", "field1", rs, "aa_o")
-        self.assertEqual(literal_eval(db["1_1_0_twy"].decode()), {0: ("L", 3)})
+        self.assertEqual(decode_segment_table(db["1_1_0_twy"]), {0: ("L", 3)})
         self.assertEqual(
-            literal_eval(db["1_1_1_0_twy"].decode()), b"\x00B\x00C\x00D"
+            decode_records(db["1_1_1_0_twy"]), b"\x00B\x00C\x00D"
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_aa_o"].decode()), {0: ("L", 3)}
+            decode_segment_table(db["1_1_0_aa_o"]), {0: ("L", 3)}
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_0_aa_o"].decode()), b"\x00B\x00C\x00D"
+            decode_records(db["1_1_1_0_aa_o"]), b"\x00B\x00C\x00D"
         )
 
     def t07_file_records_under(self):
         db = self.database.dbenv
-        self.assertEqual(literal_eval(db["1_1_0_twy"].decode()), {0: ("L", 3)})
+        self.assertEqual(decode_segment_table(db["1_1_0_twy"]), {0: ("L", 3)})
         self.assertEqual(
-            literal_eval(db["1_1_1_0_twy"].decode()), b"\x00B\x00C\x00D"
+            decode_records(db["1_1_1_0_twy"]), b"\x00B\x00C\x00D"
         )
         rs = self.database.recordlist_key("file1", "field1", key="twy")
         self.assertEqual(db.exists("1_1_0_rrr"), False)
         self.database.file_records_under("file1", "field1", rs, "rrr")
-        self.assertEqual(literal_eval(db["1_1_0_twy"].decode()), {0: ("L", 3)})
+        self.assertEqual(decode_segment_table(db["1_1_0_twy"]), {0: ("L", 3)})
         self.assertEqual(
-            literal_eval(db["1_1_1_0_twy"].decode()), b"\x00B\x00C\x00D"
+            decode_records(db["1_1_1_0_twy"]), b"\x00B\x00C\x00D"
         )
-        self.assertEqual(literal_eval(db["1_1_0_rrr"].decode()), {0: ("L", 3)})
+        self.assertEqual(decode_segment_table(db["1_1_0_rrr"]), {0: ("L", 3)})
         self.assertEqual(
-            literal_eval(db["1_1_1_0_rrr"].decode()), b"\x00B\x00C\x00D"
+            decode_records(db["1_1_1_0_rrr"]), b"\x00B\x00C\x00D"
         )
 
     def t08_file_records_under(self):
         db = self.database.dbenv
-        self.assertEqual(literal_eval(db["1_1_0_one"].decode()), {0: (50, 1)})
+        self.assertEqual(decode_segment_table(db["1_1_0_one"]), {0: (50, 1)})
         self.assertEqual(
-            literal_eval(db["1_1_0_aa_o"].decode()), {0: ("B", 24)}
+            decode_segment_table(db["1_1_0_aa_o"]), {0: ("B", 24)}
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_0_aa_o"].decode()),
+            decode_records(db["1_1_1_0_aa_o"]),
             b"".join(
                 (
                     b"\x00\x00\x00\xff\xff\xff\x00\x00",
@@ -2608,26 +2669,26 @@ class Database_file_unfile_records:
         )
         rs = self.database.recordlist_key("file1", "field1", key="one")
         self.database.file_records_under("file1", "field1", rs, "aa_o")
-        self.assertEqual(literal_eval(db["1_1_0_one"].decode()), {0: (50, 1)})
-        self.assertEqual(literal_eval(db["1_1_0_aa_o"].decode()), {0: (50, 1)})
+        self.assertEqual(decode_segment_table(db["1_1_0_one"]), {0: (50, 1)})
+        self.assertEqual(decode_segment_table(db["1_1_0_aa_o"]), {0: (50, 1)})
         self.assertEqual(db.exists("1_1_1_0_aa_o"), False)
 
     def t09_file_records_under(self):
         db = self.database.dbenv
-        self.assertEqual(literal_eval(db["1_1_0_one"].decode()), {0: (50, 1)})
+        self.assertEqual(decode_segment_table(db["1_1_0_one"]), {0: (50, 1)})
         self.assertEqual(db.exists("1_1_0_rrr"), False)
         rs = self.database.recordlist_key("file1", "field1", key="one")
         self.database.file_records_under("file1", "field1", rs, "rrr")
-        self.assertEqual(literal_eval(db["1_1_0_one"].decode()), {0: (50, 1)})
-        self.assertEqual(literal_eval(db["1_1_0_rrr"].decode()), {0: (50, 1)})
+        self.assertEqual(decode_segment_table(db["1_1_0_one"]), {0: (50, 1)})
+        self.assertEqual(decode_segment_table(db["1_1_0_rrr"]), {0: (50, 1)})
 
     def t10_file_records_under(self):
         db = self.database.dbenv
         self.assertEqual(
-            literal_eval(db["1_1_0_ba_o"].decode()), {0: ("B", 24)}
+            decode_segment_table(db["1_1_0_ba_o"]), {0: ("B", 24)}
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_0_ba_o"].decode()),
+            decode_records(db["1_1_1_0_ba_o"]),
             b"".join(
                 (
                     b"\x00\x00\x00\x00\x00\xff\xff\xff",
@@ -2636,21 +2697,21 @@ class Database_file_unfile_records:
             ),
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_www"].decode()), {0: ("L", 3), 1: ("L", 3)}
+            decode_segment_table(db["1_1_0_www"]), {0: ("L", 3), 1: ("L", 3)}
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_0_www"].decode()), b"\x00B\x00C\x00D"
+            decode_records(db["1_1_1_0_www"]), b"\x00B\x00C\x00D"
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_1_www"].decode()), b"\x00B\x00C\x00D"
+            decode_records(db["1_1_1_1_www"]), b"\x00B\x00C\x00D"
         )
         rs = self.database.recordlist_key("file1", "field1", key="ba_o")
         self.database.file_records_under("file1", "field1", rs, "www")
         self.assertEqual(
-            literal_eval(db["1_1_0_ba_o"].decode()), {0: ("B", 24)}
+            decode_segment_table(db["1_1_0_ba_o"]), {0: ("B", 24)}
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_0_ba_o"].decode()),
+            decode_records(db["1_1_1_0_ba_o"]),
             b"".join(
                 (
                     b"\x00\x00\x00\x00\x00\xff\xff\xff",
@@ -2659,10 +2720,10 @@ class Database_file_unfile_records:
             ),
         )
         self.assertEqual(
-            literal_eval(db["1_1_0_www"].decode()), {0: ("B", 24)}
+            decode_segment_table(db["1_1_0_www"]), {0: ("B", 24)}
         )
         self.assertEqual(
-            literal_eval(db["1_1_1_0_www"].decode()),
+            decode_records(db["1_1_1_0_www"]),
             b"".join(
                 (
                     b"\x00\x00\x00\x00\x00\xff\xff\xff",
@@ -2673,6 +2734,40 @@ class Database_file_unfile_records:
         self.assertEqual(db.exists("1_1_1_1_www"), False)
 
 
+class Database_upgrade_layout:
+    def t01_upgrade_layout(self):
+        db = self.database.dbenv
+        keys = ["1_1_0_" + k for k in ("a_o", "aa_o", "ba_o", "bb_o")]
+        keys.extend("1_1_0_" + k for k in ("c_o", "cep", "deq", "tww"))
+        keys.extend("1_1_0_" + k for k in ("twy", "one", "nin", "www"))
+        keys.extend(
+            ["1_1_1_0_" + k for k in ("a_o", "aa_o", "ba_o", "bb_o")]
+        )
+        keys.extend("1_1_1_0_" + k for k in ("c_o", "cep", "deq", "tww"))
+        keys.extend(("1_1_1_0_twy", "1_1_1_0_www", "1_1_1_1_www"))
+        values = {
+            k: (decode_segment_table if k[4] == "0" else decode_records)(db[k])
+            for k in keys
+        }
+        for k in keys:
+            self.assertEqual(is_binary_layout(db[k]), False)
+        count = self.database.recordlist_all("file1", "field1").count_records()
+        self.assertEqual(self.database.upgrade_layout(), len(keys))
+        for k in keys:
+            self.assertEqual(is_binary_layout(db[k]), True)
+            self.assertEqual(
+                (decode_segment_table if k[4] == "0" else decode_records)(
+                    db[k]
+                ),
+                values[k],
+            )
+        self.assertEqual(
+            self.database.recordlist_all("file1", "field1").count_records(),
+            count,
+        )
+        self.assertEqual(self.database.upgrade_layout(), 0)
+
+
 class Database_database_create_cursors:
     def t01(self):
         self.assertRaisesRegex(
@@ -3122,7 +3217,7 @@ class ExistenceBitmapControl:
         )
         self.assertEqual(
             self.database.dbenv["_".join(("1", "0", "_ebm", "0"))],
-            repr(bits).encode(),
+            encode_records(bits),
         )
 
     def t10_append_ebm_segment(self):
@@ -3349,6 +3444,8 @@ if gnu_module:
         test_23 = Database_methods.t23_recordset_record_number_range
         test_24 = Database_methods.t24_recordset_ebm
         test_25 = Database_methods.t25_recordset_ebm
+        test_27 = Database_methods.t27_get_primary_records
+        test_28 = Database_methods.t28_iter_records
 
         def test26_get_table_connection(self):
             self.assertIsInstance(
@@ -3574,6 +3671,8 @@ if gnu_module:
         test_34 = Database_make_recordset.t34_make_recordset_all
         test_35 = Database_make_recordset.t35_make_recordset_all
         test_36 = Database_make_recordset.t36_make_recordset_nil
+        test_37 = Database_make_recordset.t37_recordlist_within
+        test_38 = Database_make_recordset.t38_estimate_recordlist
 
     class Database_file_unfile_recordsGnu(_NoSQLOpenPopulatedGnu):
         test_01 = Database_file_unfile_records.t01
@@ -3587,6 +3686,9 @@ if gnu_module:
         test_09 = Database_file_unfile_records.t09_file_records_under
         test_10 = Database_file_unfile_records.t10_file_records_under
 
+    class Database_upgrade_layoutGnu(_NoSQLOpenPopulatedGnu):
+        test_01 = Database_upgrade_layout.t01_upgrade_layout
+
     class Database_database_create_cursorsGnu(_NoSQLOpenGnu):
         test_01 = Database_database_create_cursors.t01
         test_02 = Database_database_create_cursors.t02_database_cursor_primary
@@ -3810,6 +3912,8 @@ if ndbm_module:
         test_23 = Database_methods.t23_recordset_record_number_range
         test_24 = Database_methods.t24_recordset_ebm
         test_25 = Database_methods.t25_recordset_ebm
+        test_27 = Database_methods.t27_get_primary_records
+        test_28 = Database_methods.t28_iter_records
 
         def test26_get_table_connection(self):
             self.assertIsInstance(
@@ -4035,6 +4139,8 @@ if ndbm_module:
         test_34 = Database_make_recordset.t34_make_recordset_all
         test_35 = Database_make_recordset.t35_make_recordset_all
         test_36 = Database_make_recordset.t36_make_recordset_nil
+        test_37 = Database_make_recordset.t37_recordlist_within
+        test_38 = Database_make_recordset.t38_estimate_recordlist
 
     class Database_file_unfile_recordsNdbm(_NoSQLOpenPopulatedNdbm):
         test_01 = Database_file_unfile_records.t01
@@ -4048,6 +4154,9 @@ if ndbm_module:
         test_09 = Database_file_unfile_records.t09_file_records_under
         test_10 = Database_file_unfile_records.t10_file_records_under
 
+    class Database_upgrade_layoutNdbm(_NoSQLOpenPopulatedNdbm):
+        test_01 = Database_upgrade_layout.t01_upgrade_layout
+
     class Database_database_create_cursorsNdbm(_NoSQLOpenNdbm):
         test_01 = Database_database_create_cursors.t01
         test_02 = Database_database_create_cursors.t02_database_cursor_primary
@@ -4251,6 +4360,8 @@ if unqlite:
         test_23 = Database_methods.t23_recordset_record_number_range
         test_24 = Database_methods.t24_recordset_ebm
         test_25 = Database_methods.t25_recordset_ebm
+        test_27 = Database_methods.t27_get_primary_records
+        test_28 = Database_methods.t28_iter_records
 
         def test26_get_table_connection(self):
             self.assertIsInstance(
@@ -4476,6 +4587,8 @@ if unqlite:
         test_34 = Database_make_recordset.t34_make_recordset_all
         test_35 = Database_make_recordset.t35_make_recordset_all
         test_36 = Database_make_recordset.t36_make_recordset_nil
+        test_37 = Database_make_recordset.t37_recordlist_within
+        test_38 = Database_make_recordset.t38_estimate_recordlist
 
     class Database_file_unfile_recordsUnqlite(_NoSQLOpenPopulatedUnqlite):
         test_01 = Database_file_unfile_records.t01
@@ -4489,6 +4602,9 @@ if unqlite:
         test_09 = Database_file_unfile_records.t09_file_records_under
         test_10 = Database_file_unfile_records.t10_file_records_under
 
+    class Database_upgrade_layoutUnqlite(_NoSQLOpenPopulatedUnqlite):
+        test_01 = Database_upgrade_layout.t01_upgrade_layout
+
     class Database_database_create_cursorsUnqlite(_NoSQLOpenUnqlite):
         test_01 = Database_database_create_cursors.t01
         test_02 = Database_database_create_cursors.t02_database_cursor_primary
@@ -4692,6 +4808,8 @@ if vedis:
         test_23 = Database_methods.t23_recordset_record_number_range
         test_24 = Database_methods.t24_recordset_ebm
         test_25 = Database_methods.t25_recordset_ebm
+        test_27 = Database_methods.t27_get_primary_records
+        test_28 = Database_methods.t28_iter_records
 
         def test26_get_table_connection(self):
             self.assertIsInstance(
@@ -4917,6 +5035,8 @@ if vedis:
         test_34 = Database_make_recordset.t34_make_recordset_all
         test_35 = Database_make_recordset.t35_make_recordset_all
         test_36 = Database_make_recordset.t36_make_recordset_nil
+        test_37 = Database_make_recordset.t37_recordlist_within
+        test_38 = Database_make_recordset.t38_estimate_recordlist
 
     class Database_file_unfile_recordsVedis(_NoSQLOpenPopulatedVedis):
         test_01 = Database_file_unfile_records.t01
@@ -4930,6 +5050,9 @@ if vedis:
         test_09 = Database_file_unfile_records.t09_file_records_under
         test_10 = Database_file_unfile_records.t10_file_records_under
 
+    class Database_upgrade_layoutVedis(_NoSQLOpenPopulatedVedis):
+        test_01 = Database_upgrade_layout.t01_upgrade_layout
+
     class Database_database_create_cursorsVedis(_NoSQLOpenVedis):
         test_01 = Database_database_create_cursors.t01
         test_02 = Database_database_create_cursors.t02_database_cursor_primary
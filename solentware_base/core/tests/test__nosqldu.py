@@ -6,7 +6,6 @@
 
 import unittest
 import os
-from ast import literal_eval
 
 try:
     import unqlite
@@ -27,6 +26,8 @@ except ImportError:  # Not ModuleNotFoundError for Pythons earlier than 3.6
     gnu_module = None
 from .. import _nosql
 from .. import _nosqldu
+from .. import tree
+from ..nosqllayout import decode_records, decode_segment_table
 from .. import filespec
 from .. import recordset
 from ..segmentsize import SegmentSize
@@ -322,13 +323,13 @@ class Database_methods:
         self.database.existence_bit_maps["file1"][segment] = bs
         self.database._write_existence_bit_map("file1", segment)
         ae = self.assertEqual
-        ae(literal_eval(self.database.dbenv["1_0__ebm_0"].decode()), b)
+        ae(decode_records(self.database.dbenv["1_0__ebm_0"]), b)
         ae(self.database.ebm_control["file1"].table_ebm_segments, [0])
         c = b"\x00\xff\xff\xff\xff\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
         cs = recordset.RecordsetSegmentBitarray(segment, None, c)
         self.database.existence_bit_maps["file1"][segment] = cs
         self.database._write_existence_bit_map("file1", segment)
-        ae(literal_eval(self.database.dbenv["1_0__ebm_0"].decode()), c)
+        ae(decode_records(self.database.dbenv["1_0__ebm_0"]), c)
         ae(self.database.ebm_control["file1"].table_ebm_segments, [0])
 
     def t05_new_deferred_root(self):
@@ -564,7 +565,7 @@ class Database_sort_and_write:
         ae = self.assertEqual
         db = self.database.dbenv
         ae(self.database.table["file1_field1"], "1_1")
-        ae(literal_eval(db["1_1_0_list"].decode()), {5: (7, 1)})
+        ae(decode_segment_table(db["1_1_0_list"]), {5: (7, 1)})
         ae("1_1_1_5_int" in db, False)
 
     def t11(self):
@@ -580,9 +581,9 @@ class Database_sort_and_write:
         ae = self.assertEqual
         db = self.database.dbenv
         ae(self.database.table["file1_field1"], "1_1")
-        ae(literal_eval(db["1_1_0_list"].decode()), {5: ("L", 2)})
+        ae(decode_segment_table(db["1_1_0_list"]), {5: ("L", 2)})
         ae("1_1_1_5_list" in db, True)
-        ae(literal_eval(db["1_1_1_5_list"].decode()), b"\x00\x01\x00\x04")
+        ae(decode_records(db["1_1_1_5_list"]), b"\x00\x01\x00\x04")
 
     def t12(self):
         ba = Bitarray()
@@ -595,10 +596,10 @@ class Database_sort_and_write:
         ae = self.assertEqual
         db = self.database.dbenv
         ae(self.database.table["file1_field1"], "1_1")
-        ae(literal_eval(db["1_1_0_bits"].decode()), {5: ("B", 32)})
+        ae(decode_segment_table(db["1_1_0_bits"]), {5: ("B", 32)})
         ae("1_1_1_5_bits" in db, True)
         ae(
-            literal_eval(db["1_1_1_5_bits"].decode()),
+            decode_records(db["1_1_1_5_bits"]),
             b"".join(
                 (
                     b"\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x0a",
@@ -607,6 +608,34 @@ class Database_sort_and_write:
             ),
         )
 
+    def t13(self):
+        fieldtree = self.database.trees["file1_field1"]
+        fieldtree.branching_factor = 4
+        keys = ["k" + str(i) for i in range(20)]
+        self.database.value_segments["file1"] = {
+            "field1": {k: [7] for k in reversed(keys)}
+        }
+        self.database.first_chunk["file1"] = False
+        self.database.initial_high_segment["file1"] = 4
+        self.database.high_segment["file1"] = 3
+        self.database.sort_and_write("file1", "field1", 5)
+        ae = self.assertEqual
+        ae(fieldtree.get_root()[1], 1)
+        self.database.value_segments["file1"] = {
+            "field1": {"k5": [8], "k50": [8], "k05": [8]}
+        }
+        self.database.sort_and_write("file1", "field1", 5)
+        cursor = tree.Cursor(fieldtree)
+        walk = [cursor.first()]
+        while walk[-1] is not None:
+            walk.append(cursor.next())
+        cursor.close()
+        ae(walk[:-1], sorted(keys + ["k50", "k05"]))
+        ae(
+            decode_segment_table(self.database.dbenv["1_1_0_k5"]),
+            {5: ("L", 2)},
+        )
+
 
 # merge() does nothing.
 class Database_merge(_NoSQLOpen):
@@ -689,6 +718,7 @@ if gnu_module:
         test_10 = Database_sort_and_write.t10
         test_11 = Database_sort_and_write.t11
         test_12 = Database_sort_and_write.t12
+        test_13 = Database_sort_and_write.t13
 
     # merge() does nothing.
     class Database_mergeGnu(_NoSQLOpenGnu):
@@ -780,6 +810,7 @@ if ndbm_module:
         test_10 = Database_sort_and_write.t10
         test_11 = Database_sort_and_write.t11
         test_12 = Database_sort_and_write.t12
+        test_13 = Database_sort_and_write.t13
 
     # merge() does nothing.
     class Database_mergeNdbm(_NoSQLOpenNdbm):
@@ -851,6 +882,7 @@ if unqlite:
         test_10 = Database_sort_and_write.t10
         test_11 = Database_sort_and_write.t11
         test_12 = Database_sort_and_write.t12
+        test_13 = Database_sort_and_write.t13
 
     # merge() does nothing.
     class Database_mergeUnqlite(_NoSQLOpenUnqlite):
@@ -922,6 +954,7 @@ if vedis:
         test_10 = Database_sort_and_write.t10
         test_11 = Database_sort_and_write.t11
         test_12 = Database_sort_and_write.t12
+        test_13 = Database_sort_and_write.t13
 
     # merge() does nothing.
     class Database_mergeVedis(_NoSQLOpenVedis):
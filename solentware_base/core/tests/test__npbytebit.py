@@ -0,0 +1,206 @@
+# test__npbytebit.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""_npbytebit tests"""
+
+import unittest
+
+try:
+    from .. import _npbytebit
+except ImportError:  # numpy not installed.
+    _npbytebit = None
+from .. import _bytebit
+
+if _npbytebit:
+
+    class Bitarray(unittest.TestCase):
+        def setUp(self):
+            self.baone = _npbytebit.Bitarray(1)
+            self.batwo = _npbytebit.Bitarray(1)
+            self.baten = _npbytebit.Bitarray(1)
+            self.baall = _npbytebit.Bitarray(1)
+            self.baone.frombytes(b"\x03")
+            self.batwo.frombytes(b"\x05")
+            self.baten.frombytes(b"\x08\x00\xff\x00\x0a\x00\x81\x00\xff\x02")
+            self.baall.frombytes(b"\xff" * 10)
+
+        def tearDown(self):
+            pass
+
+        def test___assumptions(self):
+            msg = "Failure of this test invalidates all other tests"
+            self.assertEqual(self.baone.tobytes(), b"\x03", msg)
+            self.assertEqual(
+                self.baten.tobytes(),
+                b"\x08\x00\xff\x00\x0a\x00\x81\x00\xff\x02",
+                msg,
+            )
+            self.assertEqual(
+                _npbytebit._bits_count.tobytes(),
+                bytes(_bytebit._bits_count),
+                msg,
+            )
+            self.assertEqual(
+                _npbytebit._reversed_bits.tobytes(),
+                bytes(_bytebit._reversed_bits),
+                msg,
+            )
+
+        def test___init__(self):
+            self.assertEqual(_npbytebit.Bitarray().tobytes(), b"")
+            self.assertEqual(_npbytebit.Bitarray(16).tobytes(), b"\x00\x00")
+
+        def test__and__(self):
+            ba = self.baone & self.batwo
+            self.assertEqual(ba.tobytes(), b"\x01")
+            self.assertEqual(self.baone.tobytes(), b"\x03")
+            self.assertEqual(self.batwo.tobytes(), b"\x05")
+
+        def test__or__(self):
+            ba = self.baone | self.batwo
+            self.assertEqual(ba.tobytes(), b"\x07")
+            self.assertEqual(self.baone.tobytes(), b"\x03")
+            self.assertEqual(self.batwo.tobytes(), b"\x05")
+
+        def test__xor__(self):
+            ba = self.baten ^ self.baall
+            self.assertEqual(
+                ba.tobytes(), b"\xf7\xff\x00\xff\xf5\xff\x7e\xff\x00\xfd"
+            )
+            self.assertEqual(self.baall.tobytes(), b"\xff" * 10)
+
+        def test__iand__(self):
+            self.baone &= self.batwo
+            self.assertEqual(self.baone.tobytes(), b"\x01")
+            self.assertEqual(self.batwo.tobytes(), b"\x05")
+
+        def test__ior__(self):
+            self.baone |= self.batwo
+            self.assertEqual(self.baone.tobytes(), b"\x07")
+            self.assertEqual(self.batwo.tobytes(), b"\x05")
+
+        def test__ixor__(self):
+            self.baone ^= self.batwo
+            self.assertEqual(self.baone.tobytes(), b"\x06")
+            self.assertEqual(self.batwo.tobytes(), b"\x05")
+
+        def test__invert__(self):
+            ba = ~self.baone
+            self.assertEqual(self.baone.tobytes(), b"\x03")
+            self.assertEqual(ba.tobytes(), b"\xfc")
+
+        def test__getitem__(self):
+            self.assertRaises(KeyError, self.baone.__getitem__, *(-9,))
+            self.assertRaises(KeyError, self.baone.__getitem__, *(8,))
+            self.assertEqual(
+                [self.baone[i] for i in range(-8, 8)],
+                [False] * 6 + [True] * 2 + [False] * 6 + [True] * 2,
+            )
+            self.assertIsInstance(self.baten[79], bool)
+
+        def test__setitem__(self):
+            self.assertRaises(KeyError, self.baone.__setitem__, *(-9, True))
+            self.assertRaises(KeyError, self.baone.__setitem__, *(8, True))
+            self.baone[0] = True
+            self.assertEqual(self.baone.tobytes(), b"\x83")
+            self.baone[-1] = False
+            self.assertEqual(self.baone.tobytes(), b"\x82")
+            self.baall[79] = False
+            self.baall[0] = False
+            self.assertEqual(
+                self.baall.tobytes(), b"\x7f" + b"\xff" * 8 + b"\xfe"
+            )
+
+        def test__contains__(self):
+            self.assertRaises(IndexError, self.baone.__contains__, *(-9,))
+            self.assertRaises(IndexError, self.baone.__contains__, *(8,))
+            self.assertIs(6 in self.baone, True)
+            self.assertIs(5 in self.baone, False)
+
+        def test_all(self):
+            self.assertIs(self.baall.all(), True)
+            self.assertIs(self.baten.all(), False)
+
+        def test_any(self):
+            self.assertIs(self.baten.any(), True)
+            self.assertIs(_npbytebit.Bitarray(8).any(), False)
+
+        def test_count(self):
+            self.assertEqual(self.baall.count(), 80)
+            self.assertEqual(self.baten.count(), 22)
+            self.baten[28] = True
+            self.assertEqual(self.baten.count(), 23)
+
+        def test_frombytes(self):
+            self.baall.frombytes(b"abcdef")
+            self.assertEqual(self.baall.tobytes(), b"\xff" * 10 + b"abcdef")
+
+        def test_index(self):
+            reference = _bytebit.Bitarray()
+            reference.frombytes(self.baten.tobytes())
+            for value in (True, False):
+                for start in range(80):
+                    for stop in range(start, 80):
+                        try:
+                            expected = reference.index(value, start, stop)
+                        except ValueError:
+                            self.assertRaises(
+                                ValueError,
+                                self.baten.index,
+                                *(value, start, stop),
+                            )
+                            continue
+                        self.assertEqual(
+                            self.baten.index(value, start, stop), expected
+                        )
+            self.assertEqual(self.baten.index(True), 4)
+            self.assertEqual(self.baten.index(True, 5), 16)
+            self.assertRaises(ValueError, self.baten.index, *(True, 79))
+            self.assertRaises(TypeError, self.baten.index, *(True, 1, 2, 3))
+
+        def test_invert(self):
+            self.baten.invert()
+            self.assertEqual(
+                self.baten.tobytes(),
+                b"\xf7\xff\x00\xff\xf5\xff\x7e\xff\x00\xfd",
+            )
+
+        def test_length(self):
+            self.assertEqual(self.baten.length(), 80)
+
+        def test_search(self):
+            reference = _bytebit.Bitarray()
+            reference.frombytes(self.baten.tobytes())
+            self.assertEqual(self.baten.search(True), reference.search(True))
+            self.assertIsInstance(self.baten.search(True)[0], int)
+
+        def test_setall(self):
+            self.baten.setall(True)
+            self.assertEqual(self.baten.tobytes(), b"\xff" * 10)
+            self.baten.setall(False)
+            self.assertEqual(self.baten.tobytes(), b"\x00" * 10)
+
+        def test_copy(self):
+            ba = self.baten.copy()
+            self.assertIsNot(ba.bitarray_bytes, self.baten.bitarray_bytes)
+            ba[0] = True
+            self.assertEqual(
+                self.baten.tobytes(),
+                b"\x08\x00\xff\x00\x0a\x00\x81\x00\xff\x02",
+            )
+
+        def test_reverse(self):
+            self.baten.reverse()
+            self.assertEqual(
+                self.baten.tobytes(),
+                b"\x40\xff\x00\x81\x00\x50\x00\xff\x00\x10",
+            )
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner
+    loader = unittest.defaultTestLoader.loadTestsFromTestCase
+
+    if _npbytebit:
+        runner().run(loader(Bitarray))
@@ -19,7 +19,9 @@ except ImportError:  # Not ModuleNotFoundError for Pythons earlier than 3.6
 
 from .. import _sqlite
 from .. import filespec
+from .. import record
 from .. import recordset
+from .. import recordcodec
 from .. import recordsetcursor
 from .. import recordsetbasecursor
 from ..segmentsize import SegmentSize
@@ -381,6 +383,53 @@ class Database_open_database:
         for v in self.database.ebm_control.values():
             self.assertIsInstance(v, _sqlite.ExistenceBitmapControl)
 
+    def t14_register_statements(self):
+        self.database = self._D(
+            filespec.FileSpec(**{"file1": {"field1"}, "file2": ()})
+        )
+        d = self.database
+        self.open_database_temp(d)
+        self.assertEqual(
+            set(d._statements),
+            {("file1", None), ("file1", "field1"), ("file2", None)},
+        )
+        self.assertEqual(
+            d._statements["file1", None]["delete"],
+            "delete from file1 where file1 == ?",
+        )
+        self.assertEqual(
+            d._statements["file1", "field1"]["delete_existing_segment"],
+            "delete from file1_field1 where field1 == ? and Segment == ?",
+        )
+        self.assertEqual(len(d._cursor_pool), 1)
+        self.assertEqual(d.put("file1", None, "value"), 1)
+        self.assertEqual(d.put("file1", None, "value"), 2)
+        self.assertEqual(d.get_primary_record("file1", 2), (2, "value"))
+        self.assertEqual(len(d._cursor_pool), 1)
+        d.close_database()
+        self.assertEqual(d._statements, {})
+        self.assertEqual(d._cursor_pool, [])
+
+    def t15_tuning_profile(self):
+        self.database = self._D({})
+        d = self.database
+        self.assertEqual(d.set_tuning_profile(_sqlite.BULK_LOAD), None)
+        self.open_database_temp(d)
+
+        def pragma(name):
+            return d.dbenv.cursor().execute("pragma " + name).fetchall()
+
+        self.assertEqual(pragma("synchronous"), [(0,)])
+        self.assertEqual(pragma("cache_size"), [(-262144,)])
+        self.assertEqual(pragma("temp_store"), [(2,)])
+        self.assertEqual(d.set_tuning_profile(None), _sqlite.BULK_LOAD)
+        self.assertEqual(pragma("synchronous"), [(2,)])
+        self.assertEqual(pragma("cache_size"), [(-2000,)])
+        self.assertEqual(pragma("temp_store"), [(0,)])
+        self.assertEqual(d.set_tuning_profile(_sqlite.INTERACTIVE), None)
+        self.assertEqual(pragma("synchronous"), [(1,)])
+        self.assertEqual(pragma("cache_size"), [(-16384,)])
+
     # Comment in _sqlite.py suggests this method is not needed.
     def t12_is_database_file_active(self):
         self.database = self._D(
@@ -438,6 +487,37 @@ class DatabaseAddFieldToExistingDatabase:
         shutil.rmtree(folder)
 
 
+# Memory databases cannot be used for these tests.
+class DatabaseExistenceCacheTwoConnections:
+    def t01_other_connection(self):
+        folder = "aaaa"
+        writer = self._D({"file1": {"field1"}}, folder=folder)
+        reader = self._D({"file1": {"field1"}}, folder=folder)
+        try:
+            self.open_database_temp(writer)
+            self.open_database_temp(reader)
+            writer.start_transaction()
+            writer.add_record_to_ebm("file1", 2)
+            writer.commit()
+            self.assertEqual(reader.recordlist_ebm("file1").count_records(), 1)
+            writer.start_transaction()
+            self.assertEqual(writer.recordlist_ebm("file1").count_records(), 1)
+            writer.add_record_to_ebm("file1", 4)
+            writer.commit()
+            self.assertEqual(reader.recordlist_ebm("file1").count_records(), 2)
+            reader.start_read_only_transaction()
+            self.assertEqual(reader.recordlist_ebm("file1").count_records(), 2)
+            reader.end_read_only_transaction()
+            self.assertEqual(writer.recordlist_ebm("file1").count_records(), 2)
+            reader.start_transaction()
+            self.assertEqual(reader.recordlist_ebm("file1").count_records(), 2)
+            reader.commit()
+        finally:
+            writer.close_database()
+            reader.close_database()
+            shutil.rmtree(folder)
+
+
 # Memory databases are used for these tests.
 # This one has to look like a real application (almost).
 # Do not need to catch the self.__class__.SegmentSizeError exception in
@@ -515,6 +595,243 @@ class DatabaseTransactions:
             self.database.commit,
         )
 
+    def t06_ebm_cache_commit(self):
+        ebmc = self.database.ebm_control["file1"]
+        self.assertEqual(ebmc.ebm_cache, None)
+        self.database.start_transaction()
+        self.assertEqual(ebmc.ebm_cache, {})
+        self.database.add_record_to_ebm("file1", 2)
+        self.assertEqual(ebmc.ebm_cache, {})
+        self.database.add_record_to_ebm("file1", 4)
+        self.assertEqual(list(ebmc.ebm_cache), [0])
+        self.assertEqual(ebmc.get_cached_ebm(0).count(), 2)
+        self.assertEqual(
+            ebmc.read_exists_segment(0, self.database.dbenv).count(), 1
+        )
+        self.database.commit()
+        self.assertEqual(ebmc.ebm_cache, None)
+        self.assertEqual(
+            ebmc.read_exists_segment(0, self.database.dbenv).count(), 2
+        )
+
+    def t07_ebm_cache_backout(self):
+        ebmc = self.database.ebm_control["file1"]
+        self.database.start_transaction()
+        self.database.add_record_to_ebm("file1", 2)
+        self.database.add_record_to_ebm("file1", 4)
+        self.assertEqual(list(ebmc.ebm_cache), [0])
+        self.database.backout()
+        self.assertEqual(ebmc.ebm_cache, None)
+        self.assertEqual(
+            ebmc.read_exists_segment(0, self.database.dbenv), None
+        )
+
+    def t08_ebm_cache_read_through(self):
+        ebmc = self.database.ebm_control["file1"]
+        self.database.start_transaction()
+        self.database.add_record_to_ebm("file1", 2)
+        self.database.add_record_to_ebm("file1", 4)
+        self.database.remove_record_from_ebm("file1", 2)
+        self.assertEqual(ebmc.get_cached_ebm(0).count(), 1)
+        recordlist = self.database.recordlist_ebm("file1")
+        self.assertEqual(ebmc.ebm_cache, {})
+        self.assertEqual(list(recordlist.iter_record_numbers()), [4])
+        self.database.commit()
+
+    def t09_existence_cache(self):
+        self.assertEqual(self.database.existence_cache, None)
+        self.database.start_transaction()
+        self.database.add_record_to_ebm("file1", 2)
+        self.database.add_record_to_ebm("file1", 4)
+        recordlist = self.database.recordlist_ebm("file1")
+        self.assertEqual(list(self.database.existence_cache), ["file1"])
+        cached = self.database.recordlist_ebm("file1")
+        self.assertIsNot(cached, recordlist)
+        self.assertEqual(list(cached.iter_record_numbers()), [2, 4])
+        cached.remove_record_number(2)
+        self.assertEqual(
+            list(self.database.recordlist_ebm("file1").iter_record_numbers()),
+            [2, 4],
+        )
+        self.database.add_record_to_ebm("file1", 6)
+        self.assertEqual(self.database.existence_cache, {})
+        self.assertEqual(
+            list(self.database.recordlist_ebm("file1").iter_record_numbers()),
+            [2, 4, 6],
+        )
+        self.database.remove_record_from_ebm("file1", 4)
+        self.assertEqual(self.database.existence_cache, {})
+        self.assertEqual(
+            list(self.database.recordlist_ebm("file1").iter_record_numbers()),
+            [2, 6],
+        )
+        self.database.backout()
+        self.assertEqual(self.database.existence_cache, None)
+        recordlist = self.database.recordlist_ebm("file1")
+        self.assertEqual(self.database.existence_cache, None)
+        self.database.start_transaction()
+        self.database.add_record_to_ebm("file1", 8)
+        recordlist = self.database.recordlist_ebm("file1")
+        self.assertEqual(list(self.database.existence_cache), ["file1"])
+        self.database.commit()
+        self.assertEqual(self.database.existence_cache, None)
+
+    def t10_recordlist_complement(self):
+        self.database.start_transaction()
+        for record_number in (2, 4, 6, 8):
+            self.database.add_record_to_ebm("file1", record_number)
+        some = self.database.recordlist_ebm("file1")
+        some.remove_record_number(4)
+        some.remove_record_number(6)
+        complement = self.database.recordlist_complement("file1", some)
+        self.assertIsInstance(complement, recordset.RecordListComplement)
+        self.assertIs(complement.complemented, some)
+        self.assertIs(
+            self.database.recordlist_complement("file1", complement), some
+        )
+        both = self.database.recordlist_ebm("file1")
+        both.remove_record_number(8)
+        answer = both & complement
+        self.assertIsInstance(answer, recordset.RecordList)
+        self.assertIs(complement.complemented, some)
+        self.assertEqual(list(answer.iter_record_numbers()), [4, 6])
+        both &= complement
+        self.assertIs(complement.complemented, some)
+        self.assertEqual(list(both.iter_record_numbers()), [4, 6])
+        self.assertEqual(list(complement.iter_record_numbers()), [4, 6])
+        self.assertEqual(complement.complemented, None)
+        self.database.commit()
+
+
+class _InstancesValue(record.Value):
+    def pack(self):
+        value = super().pack()
+        value[1]["field1"] = self.field1
+        return value
+
+
+def _new_instance(values, key=None):
+    instance = record.Record(
+        keyclass=record.KeyData, valueclass=_InstancesValue
+    )
+    instance.value.field1 = values
+    instance.key.load(key)
+    return instance
+
+
+def _instance_values(number):
+    values = [str(number % 3), "all"]
+    if number % 10 == 0:
+        values.append("ten")
+    if 50 <= number < 200:
+        values.append("run")
+    return values
+
+
+class Database_put_edit_delete_instances:
+    def put_instances(self):
+        instances = [_new_instance(_instance_values(n)) for n in range(300)]
+        self.database.put_instances("file1", instances)
+        return instances
+
+    def check_index(self, instances):
+        expected = {}
+        for instance in instances:
+            for value in instance.value.field1:
+                expected.setdefault(value, []).append(instance.key.recno)
+        for value in ("0", "1", "2", "all", "ten", "run", "x", "y"):
+            self.assertEqual(
+                list(
+                    self.database.recordlist_key(
+                        "file1", "field1", key=value
+                    ).iter_record_numbers()
+                ),
+                sorted(expected.get(value, [])),
+            )
+        self.assertEqual(
+            list(self.database.recordlist_ebm("file1").iter_record_numbers()),
+            sorted(instance.key.recno for instance in instances),
+        )
+
+    def t01_put_instances(self):
+        self.database.start_transaction()
+        instances = self.put_instances()
+        self.assertEqual(
+            [instance.key.recno for instance in instances],
+            list(range(1, 301)),
+        )
+        self.database.commit()
+        self.check_index(instances)
+
+    def t02_edit_instances(self):
+        self.database.start_transaction()
+        instances = self.put_instances()
+        edits = []
+        for instance in instances:
+            if instance.key.recno % 4:
+                continue
+            values = instance.value.field1
+            edit = _new_instance(values, key=instance.key.recno)
+            if "ten" in values:
+                values = values[:1]
+            else:
+                values = values + ["ten"]
+            edit.newrecord = _new_instance(values, key=instance.key.recno)
+            edits.append(edit)
+            instance.value.field1 = values
+        edit = _new_instance(instances[5].value.field1, key=6)
+        edit.newrecord = _new_instance(["x"], key=6)
+        edits.append(edit)
+        edit = _new_instance(["x"], key=6)
+        edit.newrecord = _new_instance(["y"], key=6)
+        edits.append(edit)
+        instances[5].value.field1 = ["y"]
+        self.database.edit_instances("file1", edits)
+        self.database.commit()
+        self.check_index(instances)
+
+    def t03_delete_instances(self):
+        self.database.start_transaction()
+        instances = self.put_instances()
+        self.database.delete_instances(
+            "file1",
+            [instance for instance in instances if instance.key.recno % 3],
+        )
+        self.database.commit()
+        self.check_index(
+            [instance for instance in instances if not instance.key.recno % 3]
+        )
+
+    def t04_delete_instances_all(self):
+        self.database.start_transaction()
+        instances = self.put_instances()
+        self.database.delete_instances("file1", instances)
+        self.database.commit()
+        self.check_index([])
+
+    def t05_record_codec(self):
+        self.database.specification["file1"]["record_codec"] = "marshal"
+        self.database.start_transaction()
+        instances = self.put_instances()
+        edit = _new_instance(instances[0].value.field1, key=1)
+        edit.newrecord = _new_instance(["x"], key=1)
+        instances[0].value.field1 = ["x"]
+        self.database.edit_instances("file1", [edit])
+        del self.database.specification["file1"]["record_codec"]
+        self.database.put_instance("file1", _new_instance(["y"]))
+        self.database.commit()
+        self.check_index(instances + [_new_instance(["y"], key=301)])
+        for key, value, prefix in (
+            (1, ["x"], recordcodec.MARSHAL.tag),
+            (2, ["1", "all"], recordcodec.MARSHAL.tag),
+            (301, ["y"], "{'"),
+        ):
+            primary = self.database.get_primary_record("file1", key)
+            self.assertEqual(primary[1][:2], prefix)
+            instance = _new_instance(None)
+            instance.load_record(primary)
+            self.assertEqual(instance.value.field1, value)
+
 
 class Database_put_replace_delete:
     def t01(self):
@@ -759,6 +1076,21 @@ class Database_methods:
             self.database.insert_segment_records((12,), "file1"), 1
         )
 
+    def t13_insert_many_segment_records(self):
+        d = self.database
+        self.assertEqual(d.insert_many_segment_records([], "file1"), [])
+        self.assertEqual(d.insert_segment_records((12,), "file1"), 1)
+        self.assertEqual(
+            d.insert_many_segment_records([13, 14, 15], "file1"), [2, 3, 4]
+        )
+        d.delete_segment_records((3,), "file1")
+        self.assertEqual(
+            d.insert_many_segment_records([16, 17], "file1"), [5, 6]
+        )
+        self.assertEqual(d.get_segment_records(4, "file1"), 15)
+        self.assertEqual(d.get_segment_records(6, "file1"), 17)
+        self.assertEqual(d.insert_segment_records((18,), "file1"), 7)
+
     def t14_recordset_record_number(self):
         self.assertIsInstance(
             self.database.recordlist_record_number("file1"),
@@ -930,6 +1262,43 @@ class Database_methods:
             self.get_connection_class(),
         )
 
+    def t27_get_primary_records(self):
+        for number in range(1, 1101):
+            self.database.put("file1", None, "value " + str(number))
+        self.assertEqual(
+            self.database.get_primary_records("file1", [2, 3, 7, 1200]),
+            [(2, "value 2"), (3, "value 3"), (7, "value 7")],
+        )
+        self.assertEqual(
+            self.database.get_primary_records("file1", list(range(1101))),
+            [(n, "value " + str(n)) for n in range(1, 1101)],
+        )
+        self.assertEqual(self.database.get_primary_records("file1", []), [])
+
+    def t28_iter_records(self):
+        for number in range(1, 301):
+            self.database.put("file1", None, "value " + str(number))
+        recordlist = self.database.recordlist_nil("file1")
+        record_numbers = [2, 5] + list(range(130, 141)) + [299, 400]
+        for number in record_numbers:
+            recordlist.recordset.place_record_number(number)
+        expected = [(n, "value " + str(n)) for n in record_numbers[:-1]]
+        self.assertEqual(
+            list(self.database.iter_records(recordlist, batch_size=4)),
+            expected,
+        )
+        self.assertEqual(
+            list(self.database.iter_records(recordlist)), expected
+        )
+        self.assertEqual(
+            list(
+                self.database.iter_records(
+                    self.database.recordlist_nil("file1")
+                )
+            ),
+            [],
+        )
+
     def create_ebm(self):
         cursor = self.database.dbenv.cursor()
         statement = " ".join(
@@ -1523,12 +1892,12 @@ class Database_make_recordset:
             TypeError,
             "".join(
                 (
-                    r"recordlist_key\(\) takes from 3 to 5 ",
-                    "positional arguments but 6 were given$",
+                    r"recordlist_key\(\) takes from 3 to 6 ",
+                    "positional arguments but 7 were given$",
                 )
             ),
             self.database.recordlist_key,
-            *(None, None, None, None, None),
+            *(None, None, None, None, None, None),
         )
         self.assertRaisesRegex(
             TypeError,
@@ -1545,12 +1914,12 @@ class Database_make_recordset:
             TypeError,
             "".join(
                 (
-                    r"recordlist_key_range\(\) takes from 3 to 8 ",
-                    "positional arguments but 9 were given$",
+                    r"recordlist_key_range\(\) takes from 3 to 9 ",
+                    "positional arguments but 10 were given$",
                 )
             ),
             self.database.recordlist_key_range,
-            *(None, None, None, None, None, None, None, None),
+            *(None, None, None, None, None, None, None, None, None),
         )
         self.assertRaisesRegex(
             TypeError,
@@ -1966,6 +2335,180 @@ class Database_make_recordset:
             d.create_recordset_cursor(rs), recordsetcursor.RecordsetCursor
         )
 
+    def t58_recordlist_cache(self):
+        d = self.database
+        self.assertEqual(d.get_recordlist_cache_statistics(), None)
+        d.set_recordlist_cache_size(10)
+        self.assertEqual(d.get_recordlist_cache_statistics(), (0, 0, 0))
+        rs1 = d.recordlist_key("file1", "field1", key="one")
+        rs2 = d.recordlist_key("file1", "field1", key="one")
+        rs3 = d.recordlist_key_startswith("file1", "field1", keystart="o")
+        self.assertEqual(d.get_recordlist_cache_statistics(), (1, 2, 2))
+        self.assertIsNot(rs1, rs2)
+        self.assertIsNot(rs1.recordset, rs2.recordset)
+        self.assertEqual(rs2.count_records(), 1)
+        self.assertEqual(rs3.count_records(), 1)
+
+        # Amending a copy does not amend the cached RecordList.
+        rs2.clear_recordset()
+        rs2 = d.recordlist_key("file1", "field1", key="one")
+        self.assertEqual(rs2.count_records(), 1)
+        self.assertEqual(d.get_recordlist_cache_statistics(), (2, 2, 2))
+
+        # Index updates invalidate affected entries.
+        d.add_record_to_field_value("file1", "field1", "one", 0, 10)
+        self.assertEqual(d.get_recordlist_cache_statistics(), (2, 2, 0))
+        rs2 = d.recordlist_key("file1", "field1", key="one")
+        self.assertEqual(rs2.count_records(), 2)
+        self.assertEqual(d.get_recordlist_cache_statistics(), (2, 3, 1))
+        d.remove_record_from_field_value("file1", "field1", "one", 0, 10)
+        rs2 = d.recordlist_key("file1", "field1", key="one")
+        self.assertEqual(rs2.count_records(), 1)
+        d.file_records_under("file1", "field1", rs2, "zzz")
+        d.recordlist_key("file1", "field1", key="one")
+        self.assertEqual(d.get_recordlist_cache_statistics(), (3, 4, 1))
+        d.unfile_records_under("file1", "field1", "one")
+        self.assertEqual(
+            d.recordlist_key("file1", "field1", key="one").count_records(), 0
+        )
+
+        # Backout clears the cache.
+        d.backout()
+        self.assertEqual(d.get_recordlist_cache_statistics(), (3, 5, 0))
+        d.set_recordlist_cache_size(0)
+        self.assertEqual(d.get_recordlist_cache_statistics(), None)
+
+    def t59_run_segment(self):
+        d = self.database
+        ss = " ".join(
+            (
+                "select field1 , Segment , RecordCount , file1 from",
+                "file1_field1 where field1 == 'run' and Segment == 0",
+            )
+        )
+        rs = d.recordlist_key("file1", "field1", key="aa_o")
+        d.file_records_under("file1", "field1", rs, "run")
+        reference = d.dbenv.cursor().execute(ss).fetchone()
+        self.assertEqual(reference[2], 24)
+        self.assertEqual(
+            d.get_segment_records(reference[3], "file1"),
+            b"R\x00\x18\x00\x17",
+        )
+        s = d.populate_segment(reference, "file1")
+        self.assertIsInstance(s, recordset.RecordsetSegmentRun)
+        self.assertEqual(s.runs, [(24, 48)])
+        d.add_record_to_field_value("file1", "field1", "run", 0, 48)
+        d.remove_record_from_field_value("file1", "field1", "run", 0, 30)
+        reference = d.dbenv.cursor().execute(ss).fetchone()
+        self.assertEqual(reference[2], 24)
+        s = d.populate_segment(reference, "file1")
+        self.assertIsInstance(s, recordset.RecordsetSegmentRun)
+        self.assertEqual(s.runs, [(24, 30), (31, 49)])
+        rs = d.recordlist_key("file1", "field1", key="run")
+        self.assertEqual(rs.count_records(), 24)
+        self.assertEqual(rs.recordset.get_record_number_at_position(6), 31)
+
+    def t60_position_checkpoints(self):
+        d = self.database
+        self.assertEqual(d.get_position_checkpoints("file1", "field1"), None)
+
+        # The counts on file1_field1 do not match the segments for some keys.
+        d.dbenv.cursor().execute("delete from file1_field1")
+        for number in range(200):
+            d.add_record_to_field_value(
+                "file1", "field1", "k" + str(number % 13), *divmod(number, 128)
+            )
+        plain = d.database_cursor("file1", "field1")
+        d.set_position_checkpoint_interval(2)
+        cursor = d.database_cursor("file1", "field1")
+        self.assertIs(
+            cursor._checkpoints, d.get_position_checkpoints("file1", "field1")
+        )
+
+        def compare():
+            records = []
+            record = plain.first()
+            while record:
+                records.append(record)
+                record = plain.next()
+            for position in range(-len(records) - 1, len(records) + 1):
+                self.assertEqual(
+                    cursor.get_record_at_position(position),
+                    plain.get_record_at_position(position),
+                )
+            for record in records + [("", 0), ("zzz", 0)]:
+                self.assertEqual(
+                    cursor.get_position_of_record(record),
+                    plain.get_position_of_record(record),
+                )
+            return len(records)
+
+        self.assertEqual(compare(), 200)
+        self.assertEqual(cursor.get_record_at_position(31), ("k1", 196))
+        self.assertEqual(cursor.get_position_of_record(("k10", 10)), 33)
+
+        # Index updates mark the affected part of the summary for recount.
+        d.add_record_to_field_value("file1", "field1", "b", 0, 120)
+        d.remove_record_from_field_value("file1", "field1", "k0", 0, 13)
+        self.assertEqual(compare(), 200)
+        self.assertEqual(cursor.get_position_of_record(("k10", 10)), 33)
+        rs = d.recordlist_key("file1", "field1", key="k1")
+        d.file_records_under("file1", "field1", rs, "bz")
+        d.unfile_records_under("file1", "field1", "k12")
+        self.assertEqual(compare(), 201)
+
+        # Backout discards the summary.
+        d.backout()
+        compare()
+        plain.close()
+        cursor.close()
+        d.set_position_checkpoint_interval(0)
+        self.assertEqual(d.get_position_checkpoints("file1", "field1"), None)
+
+    def t61_recordlist_within(self):
+        d = self.database
+        within = d.recordlist_key("file1", "field1", key="www")
+        self.assertEqual(len(within), 2)
+        del within[0]
+        rs = d.recordlist_key("file1", "field1", key="www", within=within)
+        self.assertEqual(rs.sorted_segnums, [1])
+        rs = d.recordlist_key("file1", "field1", key="a_o", within=within)
+        self.assertEqual(len(rs), 0)
+        rs = d.recordlist_key_range("file1", "field1", ge="w", within=within)
+        self.assertEqual(rs.sorted_segnums, [1])
+
+        # Answers restricted by within are not put in the cache, but an
+        # answer in the cache is used whatever within says.
+        d.set_recordlist_cache_size(10)
+        rs = d.recordlist_key_range("file1", "field1", ge="w", within=within)
+        self.assertEqual(rs.sorted_segnums, [1])
+        self.assertEqual(d.get_recordlist_cache_statistics(), (0, 1, 0))
+        rs = d.recordlist_key_range("file1", "field1", ge="w")
+        self.assertEqual(rs.sorted_segnums, [0, 1])
+        rs = d.recordlist_key_range("file1", "field1", ge="w", within=within)
+        self.assertEqual(rs.sorted_segnums, [0, 1])
+        self.assertEqual(d.get_recordlist_cache_statistics(), (1, 2, 1))
+        d.set_recordlist_cache_size(0)
+
+    def t62_estimate_recordlist(self):
+        d = self.database
+        self.assertEqual(d.estimate_recordlist_key("file1", "field1"), 0)
+        for key, count in (("www", 4), ("a_o", 31), ("zzz", 0)):
+            self.assertEqual(
+                d.estimate_recordlist_key("file1", "field1", key=key), count
+            )
+        for bounds, count in (
+            ({}, 233),
+            ({"ge": "t", "le": "tz"}, 4),
+            ({"gt": "tww", "lt": "www"}, 2),
+            ({"lt": "b"}, 63),
+            ({"gt": "www"}, 0),
+        ):
+            self.assertEqual(
+                d.estimate_recordlist_key_range("file1", "field1", **bounds),
+                count,
+            )
+
 
 class Database_freed_record_number:
     def setup_detail(self):
@@ -2293,6 +2836,141 @@ class RecordsetCursor:
         self.assertEqual(rc._get_record(155), (155, "155Any value"))
 
 
+def _count_records(database, partial=None):
+    cursor = database.database_cursor("file1", "field1")
+    try:
+        if partial is not None:
+            cursor.set_partial_key(partial)
+        return cursor.count_records()
+    finally:
+        cursor.close()
+
+
+def _key_counts(database):
+    cursor = database.dbenv.cursor()
+    try:
+        return cursor.execute(
+            "select * from file1_field1__count order by field1"
+        ).fetchall()
+    finally:
+        cursor.close()
+
+
+class IndexRecordCount:
+    def t01_counts_exist(self):
+        irc = self.database.index_record_count["file1", "field1"]
+        self.assertIsInstance(irc, _sqlite.IndexRecordCount)
+        self.assertEqual(irc.counts_exist(), True)
+        self.assertEqual(irc.changes, None)
+        self.assertEqual(_count_records(self.database), 0)
+        self.assertEqual(_key_counts(self.database), [])
+
+    def t02_add_and_remove_record(self):
+        self.database.start_transaction()
+        for key, record_number in (
+            ("ab", 1),
+            ("ab", 2),
+            ("ab", 2),
+            ("ac", 3),
+            ("bc", 4),
+        ):
+            self.database.add_record_to_field_value(
+                "file1", "field1", key, 0, record_number
+            )
+        self.database.add_record_to_field_value("file1", "field1", "ab", 1, 5)
+        self.assertEqual(
+            self.database.index_record_count["file1", "field1"].changes,
+            {"ab": 3, "ac": 1, "bc": 1},
+        )
+        self.assertEqual(_count_records(self.database), 5)
+        self.assertEqual(_count_records(self.database, partial="a"), 4)
+        self.assertEqual(
+            self.database.index_record_count["file1", "field1"].changes, {}
+        )
+        self.database.remove_record_from_field_value(
+            "file1", "field1", "ac", 0, 3
+        )
+        self.database.remove_record_from_field_value(
+            "file1", "field1", "ab", 0, 1
+        )
+        self.database.commit()
+        self.assertEqual(
+            self.database.index_record_count["file1", "field1"].changes, None
+        )
+        self.assertEqual(_count_records(self.database), 3)
+        self.assertEqual(_count_records(self.database, partial="a"), 2)
+        self.assertEqual(_key_counts(self.database), [("ab", 2), ("bc", 1)])
+
+    def t03_backout(self):
+        self.database.start_transaction()
+        self.database.add_record_to_field_value("file1", "field1", "ab", 0, 1)
+        self.database.commit()
+        self.database.start_transaction()
+        self.database.add_record_to_field_value("file1", "field1", "ab", 0, 2)
+        self.database.add_record_to_field_value("file1", "field1", "ac", 0, 3)
+        self.assertEqual(_count_records(self.database), 3)
+        self.database.add_record_to_field_value("file1", "field1", "ad", 0, 4)
+        self.database.backout()
+        self.assertEqual(_count_records(self.database), 1)
+        self.assertEqual(_key_counts(self.database), [("ab", 1)])
+
+    def t04_file_and_unfile_records_under(self):
+        self.database.start_transaction()
+        for record_number in range(3):
+            self.database.add_record_to_field_value(
+                "file1", "field1", "ab", 0, record_number
+            )
+        recordlist = recordset.RecordList(self.database, "file1")
+        recordlist[0] = recordset.RecordsetSegmentList(
+            0, None, records=b"\x00\x04\x00\x05"
+        )
+        self.database.file_records_under("file1", "field1", recordlist, "ab")
+        self.database.file_records_under("file1", "field1", recordlist, "ac")
+        self.assertEqual(_count_records(self.database), 4)
+        self.database.unfile_records_under("file1", "field1", "ab")
+        self.database.commit()
+        self.assertEqual(_count_records(self.database), 2)
+        self.assertEqual(_key_counts(self.database), [("ac", 2)])
+
+    def t05_update_records_for_field_value(self):
+        self.database.start_transaction()
+        self.database.update_records_for_field_value(
+            "file1", "field1", "ab", 0, {1: True, 2: True, 3: True}
+        )
+        self.database.update_records_for_field_value(
+            "file1", "field1", "ab", 0, {1: False, 4: True}
+        )
+        self.database.update_records_for_field_value(
+            "file1", "field1", "ac", 0, {5: True}
+        )
+        self.database.commit()
+        self.assertEqual(_count_records(self.database), 4)
+        self.assertEqual(_key_counts(self.database), [("ab", 3), ("ac", 1)])
+
+    def t06_create_counts(self):
+        self.database.start_transaction()
+        for key, record_number in (("ab", 1), ("ab", 2), ("ac", 3)):
+            self.database.add_record_to_field_value(
+                "file1", "field1", key, 0, record_number
+            )
+        self.database.commit()
+        cursor = self.database.dbenv.cursor()
+        try:
+            cursor.execute(
+                "delete from ___control where ___control == ?",
+                ("Cfile1_field1",),
+            )
+            cursor.execute("delete from file1_field1__count")
+        finally:
+            cursor.close()
+        irc = self.database.index_record_count["file1", "field1"]
+        self.assertEqual(irc.counts_exist(), False)
+        irc.create_counts()
+        self.assertEqual(irc.counts_exist(), True)
+        self.assertEqual(_count_records(self.database), 3)
+        self.assertEqual(_key_counts(self.database), [("ab", 2), ("ac", 1)])
+
+
 class ExistenceBitmapControl:
     def t01(self):
         self.assertRaisesRegex(
@@ -2516,6 +3194,8 @@ if sqlite3:
         test_08 = Database_open_database.t08
         test_09 = Database_open_database.t09
         test_12 = Database_open_database.t12_is_database_file_active
+        test_14 = Database_open_database.t14_register_statements
+        test_15 = Database_open_database.t15_tuning_profile
         check_specification = Database_open_database.check_specification
 
     class Database_add_field_to_existing_databaseSqlite3(_SQLiteSqlite3):
@@ -2523,6 +3203,9 @@ if sqlite3:
             DatabaseAddFieldToExistingDatabase.t13_add_field_to_open_database
         )
 
+    class Database_existence_cache_two_connectionsSqlite3(_SQLiteSqlite3):
+        test_01 = DatabaseExistenceCacheTwoConnections.t01_other_connection
+
     class Database_do_database_taskSqlite3(Database_do_database_task):
         def setUp(self):
             self._ssb = SegmentSize.db_segment_size_bytes
@@ -2562,6 +3245,11 @@ if sqlite3:
         test_03 = DatabaseTransactions.t03
         test_04 = DatabaseTransactions.t04
         test_05 = DatabaseTransactions.t05
+        test_06 = DatabaseTransactions.t06_ebm_cache_commit
+        test_07 = DatabaseTransactions.t07_ebm_cache_backout
+        test_08 = DatabaseTransactions.t08_ebm_cache_read_through
+        test_09 = DatabaseTransactions.t09_existence_cache
+        test_10 = DatabaseTransactions.t10_recordlist_complement
 
     class Database_put_replace_deleteSqlite3(_SQLiteOpenSqlite3):
         test_01 = Database_put_replace_delete.t01
@@ -2571,6 +3259,16 @@ if sqlite3:
         test_05 = Database_put_replace_delete.t05_replace
         test_06 = Database_put_replace_delete.t06_delete
 
+    class Database_put_edit_delete_instancesSqlite3(_SQLiteOpenSqlite3):
+        Dpedi = Database_put_edit_delete_instances
+        put_instances = Dpedi.put_instances
+        check_index = Dpedi.check_index
+        test_01 = Dpedi.t01_put_instances
+        test_02 = Dpedi.t02_edit_instances
+        test_03 = Dpedi.t03_delete_instances
+        test_04 = Dpedi.t04_delete_instances_all
+        test_05 = Dpedi.t05_record_codec
+
     class Database_methodsSqlite3(_SQLiteOpenSqlite3):
         test_01 = Database_methods.t01
         test_02 = Database_methods.t02_get_primary_record
@@ -2585,6 +3283,7 @@ if sqlite3:
         test_11 = Database_methods.t11_set_segment_records
         test_12 = Database_methods.t12_delete_segment_records
         test_13 = Database_methods.t13_insert_segment_records
+        test_13_many = Database_methods.t13_insert_many_segment_records
         test_14 = Database_methods.t14_recordset_record_number
         test_15 = Database_methods.t15_recordset_record_number
         test_16 = Database_methods.t16_recordset_record_number
@@ -2598,6 +3297,8 @@ if sqlite3:
         test_24 = Database_methods.t24_recordset_ebm
         test_25 = Database_methods.t25_recordset_ebm
         test_26 = Database_methods.t26_get_table_connection
+        test_27 = Database_methods.t27_get_primary_records
+        test_28 = Database_methods.t28_iter_records
         create_ebm = Database_methods.create_ebm
         create_ebm_extra = Database_methods.create_ebm_extra
 
@@ -2817,6 +3518,11 @@ if sqlite3:
         test_55 = Database_make_recordset.t55_file_records_under
         test_56 = Database_make_recordset.t56_database_cursor
         test_57 = Database_make_recordset.t57_create_recordset_cursor
+        test_58 = Database_make_recordset.t58_recordlist_cache
+        test_59 = Database_make_recordset.t59_run_segment
+        test_60 = Database_make_recordset.t60_position_checkpoints
+        test_61 = Database_make_recordset.t61_recordlist_within
+        test_62 = Database_make_recordset.t62_estimate_recordlist
 
     class Database_freed_record_numberSqlite3(_SQLiteOpenSqlite3):
         def setUp(self):
@@ -2863,6 +3569,14 @@ if sqlite3:
         test_03 = RecordsetCursor.t03___init__02
         test_04 = RecordsetCursor.t04__get_record
 
+    class IndexRecordCountSqlite3(_SQLiteOpenSqlite3):
+        test_01 = IndexRecordCount.t01_counts_exist
+        test_02 = IndexRecordCount.t02_add_and_remove_record
+        test_03 = IndexRecordCount.t03_backout
+        test_04 = IndexRecordCount.t04_file_and_unfile_records_under
+        test_05 = IndexRecordCount.t05_update_records_for_field_value
+        test_06 = IndexRecordCount.t06_create_counts
+
     class ExistenceBitmapControlSqlite3(_SQLiteOpenSqlite3):
         test_01 = ExistenceBitmapControl.t01
         test_02 = ExistenceBitmapControl.t02_read_exists_segment_01
@@ -2933,6 +3647,8 @@ if apsw:
         test_08 = Database_open_database.t08
         test_09 = Database_open_database.t09
         test_12 = Database_open_database.t12_is_database_file_active
+        test_14 = Database_open_database.t14_register_statements
+        test_15 = Database_open_database.t15_tuning_profile
         check_specification = Database_open_database.check_specification
 
     class Database_add_field_to_existing_databaseApsw(_SQLiteApsw):
@@ -2940,6 +3656,9 @@ if apsw:
             DatabaseAddFieldToExistingDatabase.t13_add_field_to_open_database
         )
 
+    class Database_existence_cache_two_connectionsApsw(_SQLiteApsw):
+        test_01 = DatabaseExistenceCacheTwoConnections.t01_other_connection
+
     class Database_do_database_taskApsw(Database_do_database_task):
         def setUp(self):
             self._ssb = SegmentSize.db_segment_size_bytes
@@ -2977,6 +3696,11 @@ if apsw:
         test_03 = DatabaseTransactions.t03
         test_04 = DatabaseTransactions.t04
         test_05 = DatabaseTransactions.t05
+        test_06 = DatabaseTransactions.t06_ebm_cache_commit
+        test_07 = DatabaseTransactions.t07_ebm_cache_backout
+        test_08 = DatabaseTransactions.t08_ebm_cache_read_through
+        test_09 = DatabaseTransactions.t09_existence_cache
+        test_10 = DatabaseTransactions.t10_recordlist_complement
 
     class Database_put_replace_deleteApsw(_SQLiteOpenApsw):
         test_01 = Database_put_replace_delete.t01
@@ -2986,6 +3710,16 @@ if apsw:
         test_05 = Database_put_replace_delete.t05_replace
         test_06 = Database_put_replace_delete.t06_delete
 
+    class Database_put_edit_delete_instancesApsw(_SQLiteOpenApsw):
+        Dpedi = Database_put_edit_delete_instances
+        put_instances = Dpedi.put_instances
+        check_index = Dpedi.check_index
+        test_01 = Dpedi.t01_put_instances
+        test_02 = Dpedi.t02_edit_instances
+        test_03 = Dpedi.t03_delete_instances
+        test_04 = Dpedi.t04_delete_instances_all
+        test_05 = Dpedi.t05_record_codec
+
     class Database_methodsApsw(_SQLiteOpenApsw):
         test_01 = Database_methods.t01
         test_02 = Database_methods.t02_get_primary_record
@@ -3000,6 +3734,7 @@ if apsw:
         test_11 = Database_methods.t11_set_segment_records
         test_12 = Database_methods.t12_delete_segment_records
         test_13 = Database_methods.t13_insert_segment_records
+        test_13_many = Database_methods.t13_insert_many_segment_records
         test_14 = Database_methods.t14_recordset_record_number
         test_15 = Database_methods.t15_recordset_record_number
         test_16 = Database_methods.t16_recordset_record_number
@@ -3013,6 +3748,8 @@ if apsw:
         test_24 = Database_methods.t24_recordset_ebm
         test_25 = Database_methods.t25_recordset_ebm
         test_26 = Database_methods.t26_get_table_connection
+        test_27 = Database_methods.t27_get_primary_records
+        test_28 = Database_methods.t28_iter_records
         create_ebm = Database_methods.create_ebm
         create_ebm_extra = Database_methods.create_ebm_extra
 
@@ -3232,6 +3969,11 @@ if apsw:
         test_55 = Database_make_recordset.t55_file_records_under
         test_56 = Database_make_recordset.t56_database_cursor
         test_57 = Database_make_recordset.t57_create_recordset_cursor
+        test_58 = Database_make_recordset.t58_recordlist_cache
+        test_59 = Database_make_recordset.t59_run_segment
+        test_60 = Database_make_recordset.t60_position_checkpoints
+        test_61 = Database_make_recordset.t61_recordlist_within
+        test_62 = Database_make_recordset.t62_estimate_recordlist
 
     class Database_freed_record_numberApsw(_SQLiteOpenApsw):
         def setUp(self):
@@ -3278,6 +4020,14 @@ if apsw:
         test_03 = RecordsetCursor.t03___init__02
         test_04 = RecordsetCursor.t04__get_record
 
+    class IndexRecordCountApsw(_SQLiteOpenApsw):
+        test_01 = IndexRecordCount.t01_counts_exist
+        test_02 = IndexRecordCount.t02_add_and_remove_record
+        test_03 = IndexRecordCount.t03_backout
+        test_04 = IndexRecordCount.t04_file_and_unfile_records_under
+        test_05 = IndexRecordCount.t05_update_records_for_field_value
+        test_06 = IndexRecordCount.t06_create_counts
+
     class ExistenceBitmapControlApsw(_SQLiteOpenApsw):
         test_01 = ExistenceBitmapControl.t01
         test_02 = ExistenceBitmapControl.t02_read_exists_segment_01
@@ -3299,9 +4049,11 @@ if __name__ == "__main__":
         runner().run(loader(DatabaseInstanceSqlite3))
         runner().run(loader(Database_open_databaseSqlite3))
         runner().run(loader(Database_add_field_to_existing_databaseSqlite3))
+        runner().run(loader(Database_existence_cache_two_connectionsSqlite3))
         runner().run(loader(Database_do_database_taskSqlite3))
         runner().run(loader(DatabaseTransactionsSqlite3))
         runner().run(loader(Database_put_replace_deleteSqlite3))
+        runner().run(loader(Database_put_edit_delete_instancesSqlite3))
         runner().run(loader(Database_methodsSqlite3))
         runner().run(loader(Database_find_valuesSqlite3))
         runner().run(loader(Database_find_values_ascendingSqlite3))
@@ -3310,6 +4062,7 @@ if __name__ == "__main__":
         runner().run(loader(Database_freed_record_numberSqlite3))
         runner().run(loader(Database_empty_freed_record_numberSqlite3))
         runner().run(loader(RecordsetCursorSqlite3))
+        runner().run(loader(IndexRecordCountSqlite3))
         runner().run(loader(ExistenceBitmapControlSqlite3))
     if apsw:
         runner().run(loader(Database___init__Apsw))
@@ -3317,9 +4070,11 @@ if __name__ == "__main__":
         runner().run(loader(DatabaseInstanceApsw))
         runner().run(loader(Database_open_databaseApsw))
         runner().run(loader(Database_add_field_to_existing_databaseApsw))
+        runner().run(loader(Database_existence_cache_two_connectionsApsw))
         runner().run(loader(Database_do_database_taskApsw))
         runner().run(loader(DatabaseTransactionsApsw))
         runner().run(loader(Database_put_replace_deleteApsw))
+        runner().run(loader(Database_put_edit_delete_instancesApsw))
         runner().run(loader(Database_methodsApsw))
         runner().run(loader(Database_find_valuesApsw))
         runner().run(loader(Database_find_values_ascendingApsw))
@@ -3328,4 +4083,5 @@ if __name__ == "__main__":
         runner().run(loader(Database_freed_record_numberApsw))
         runner().run(loader(Database_empty_freed_record_numberApsw))
         runner().run(loader(RecordsetCursorApsw))
+        runner().run(loader(IndexRecordCountApsw))
         runner().run(loader(ExistenceBitmapControlApsw))
@@ -1033,6 +1033,58 @@ class Cursor_secondary:
     def t61_refresh_recordset(self):
         self.cursor.refresh_recordset()
 
+    def t62_count_records_03(self):
+        cursor = self.database.dbenv.cursor()
+        try:
+            cursor.execute(
+                "delete from file1_field1 where field1 == ? and Segment == ?",
+                ("ba_o", 1),
+            )
+            cursor.execute(
+                " ".join(
+                    (
+                        "update file1_field1 set RecordCount = 20",
+                        "where field1 == ? and Segment == ?",
+                    )
+                ),
+                ("cep", 0),
+            )
+            cursor.execute(
+                " ".join(
+                    (
+                        "insert or replace into file1_field1",
+                        "( field1 , Segment , RecordCount , file1 )",
+                        "values ( ? , ? , ? , ? )",
+                    )
+                ),
+                ("twy", 1, 2, 9),
+            )
+        finally:
+            cursor.close()
+        self.assertEqual(self.cursor.count_records(), 175)
+        self.cursor._partial = "b"
+        self.assertEqual(self.cursor.count_records(), 49)
+
+    def t63_count_records_04(self):
+        irc = self.database.index_record_count["file1", "field1"]
+        irc.create_counts()
+        cursor = _sqlite.CursorSecondary(
+            self.database.dbenv,
+            table=self.database.table["file1_field1"],
+            segment=self.database.segment_table["file1"],
+            file="file1",
+            field="field1",
+            index_record_count=irc,
+        )
+        try:
+            self.assertEqual(cursor.count_records(), 182)
+            cursor._partial = "b"
+            self.assertEqual(cursor.count_records(), 51)
+            irc.change_count("bc", 2)
+            self.assertEqual(cursor.count_records(), 53)
+        finally:
+            cursor.close()
+
 
 class CursorSecondaryGetRecordAtPosition:
     def setup_detail(self):
@@ -1229,6 +1281,8 @@ if sqlite3:
         test_59 = Cursor_secondary.t59__get_segment_03
         test_60 = Cursor_secondary.t60_set_current_segment
         test_61 = Cursor_secondary.t61_refresh_recordset
+        test_62 = Cursor_secondary.t62_count_records_03
+        test_63 = Cursor_secondary.t63_count_records_04
 
     class Cursor_secondary__get_record_at_positionSqlite3(_SQLiteSqlite3):
         def setUp(self):
@@ -1350,6 +1404,8 @@ if apsw:
         test_59 = Cursor_secondary.t59__get_segment_03
         test_60 = Cursor_secondary.t60_set_current_segment
         test_61 = Cursor_secondary.t61_refresh_recordset
+        test_62 = Cursor_secondary.t62_count_records_03
+        test_63 = Cursor_secondary.t63_count_records_04
 
     class Cursor_secondary__get_record_at_positionApsw(_SQLiteApsw):
         def setUp(self):
@@ -21,6 +21,8 @@ from .. import _sqlite
 from .. import _sqlitedu
 from .. import filespec
 from .. import recordset
+from .. import recordlistcache
+from .. import merge
 from ..segmentsize import SegmentSize
 from ..bytebit import Bitarray
 
@@ -37,6 +39,16 @@ class _SQLitedu(unittest.TestCase):
         SegmentSize.db_segment_size_bytes = self.__ssb
 
 
+def _cache_recordlist(database):
+    database.set_recordlist_cache_size(10)
+    database.recordlist_cache.put(
+        "file1",
+        "field1",
+        (recordlistcache.KEY_STARTSWITH, "a"),
+        recordset.RecordList(database, "file1"),
+    )
+
+
 # Same tests as test__sqlite.Database___init__ with relevant additions.
 # Alternative is one test method with just the additional tests.
 class Database___init__:
@@ -222,6 +234,18 @@ class Database_methods:
         self.database.start_transaction()
         self.database.unset_defer_update()
 
+    def t04_unset_defer_update_caches(self):
+        _cache_recordlist(self.database)
+        self.database.set_position_checkpoint_interval(10)
+        summary = self.database.get_position_checkpoints("file1", "field1")
+        summary.refresh(lambda low, high: iter([("a", 1)]))
+        self.assertEqual(summary.record_count(), 1)
+        self.database.start_transaction()
+        self.database.unset_defer_update()
+        self.assertEqual(len(self.database.recordlist_cache), 0)
+        summary.refresh(lambda low, high: iter([("a", 1), ("b", 2)]))
+        self.assertEqual(summary.record_count(), 3)
+
     def t05_new_deferred_root(self):
         self.assertEqual(self.database.table["file1_field1"], "file1_field1")
         self.assertEqual(self.database.index["file1_field1"], "ixfile1_field1")
@@ -653,6 +677,47 @@ class Database_sort_and_write:
             [(2,)],
         )
 
+    def t15_record_counts(self):
+        ba = Bitarray()
+        ba.frombytes(b"\x0a" * 16)
+        self.database.value_segments["file1"] = {
+            "field1": {"bits": ba, "list": [1, 2], "int": [9]}
+        }
+        self.database.first_chunk["file1"] = False
+        self.database.initial_high_segment["file1"] = 4
+        self.database.high_segment["file1"] = 3
+        self.database._int_to_bytes = [
+            n.to_bytes(2, byteorder="big")
+            for n in range(SegmentSize.db_segment_size)
+        ]
+        self.database.sort_and_write("file1", "field1", 5)
+        self.assertEqual(
+            self.database.index_record_count[
+                "file1", "field1"
+            ].count_records(),
+            35,
+        )
+        cursor = self.database.dbenv.cursor()
+        try:
+            self.assertEqual(
+                cursor.execute(
+                    "select * from file1_field1__count order by field1"
+                ).fetchall(),
+                [("bits", 32), ("int", 1), ("list", 2)],
+            )
+        finally:
+            cursor.close()
+
+    def t16_recordlist_cache(self):
+        _cache_recordlist(self.database)
+        self.database.value_segments["file1"] = {"field1": {"list": [1]}}
+        self.database.first_chunk["file1"] = False
+        self.database.initial_high_segment["file1"] = 4
+        self.database.high_segment["file1"] = 3
+        self.database.sort_and_write("file1", "field1", 5)
+        self.assertEqual(len(self.database.recordlist_cache), 0)
+        self.assertEqual(self.database.recordlist_cache._partial_keys, {})
+
 
 # merge() does nothing.
 class Database_merge(_SQLiteOpen):
@@ -681,6 +746,20 @@ class Database_delete_index:
             self.database.delete_index("file1", "field1") is None, True
         )
 
+    def t03_delete_index_record_counts(self):
+        irc = self.database.index_record_count["file1", "field1"]
+        self.database.add_record_to_field_value("file1", "field1", "a", 0, 1)
+        self.database.add_record_to_field_value("file1", "field1", "b", 0, 2)
+        self.assertEqual(irc.count_records(), 2)
+        self.database.delete_index("file1", "field1")
+        self.assertEqual(irc.count_records(), 0)
+        self.assertEqual(irc.count_records("*"), 0)
+
+    def t04_delete_index_recordlist_cache(self):
+        _cache_recordlist(self.database)
+        self.database.delete_index("file1", "field1")
+        self.assertEqual(len(self.database.recordlist_cache), 0)
+
 
 class Database_find_value_segments:
     def t01(self):
@@ -867,6 +946,196 @@ class Database_merge_import:
             self.assertEqual(count, 2)
         self.database.commit()
 
+    def t11_merge_import(self):
+        with open(os.path.join(self.field, "0"), mode="wb") as file:
+            file.write(merge.BINARY_DUMP_HEADER)
+            for key in ("a", "b", "c"):
+                file.write(merge.encode_binary_item([key, 1, 1, 1, 7]))
+        self.database.start_transaction()
+        for count in self.database.merge_import(
+            self.field, "file1", "field1", 2
+        ):
+            self.assertEqual(count, 2)
+        self.database.commit()
+        cursor = self.database.dbenv.cursor()
+        try:
+            self.assertEqual(
+                cursor.execute(
+                    "select field1 , Segment , RecordCount , file1 from "
+                    "file1_field1 order by field1"
+                ).fetchall(),
+                [("a", 1, 1, 7), ("b", 1, 1, 7), ("c", 1, 1, 7)],
+            )
+        finally:
+            cursor.close()
+
+    def t12_merge_import(self):
+        # New segment records are inserted together and spliced entries
+        # see the index entries held by the writer.
+        with open(os.path.join(self.field, "0"), mode="wb") as file:
+            file.write(merge.BINARY_DUMP_HEADER)
+            for item in (
+                ["a", 0, 1, 2, b"\x00\x07\x00\x08"],
+                ["b", 0, 1, 1, 9],
+                ["c", 0, 1, 2, b"\x00\x03\x00\x04"],
+                ["d", 1, 1, 2, b"\x00\x03\x00\x04"],
+            ):
+                file.write(merge.encode_binary_item(item))
+        with open(os.path.join(self.field, "1"), mode="wb") as file:
+            file.write(merge.BINARY_DUMP_HEADER)
+            file.write(merge.encode_binary_item(["d", 1, 1, 1, 5]))
+        self.database.start_transaction()
+        self.assertEqual(
+            list(
+                self.database.merge_import(self.field, "file1", "field1", 100)
+            ),
+            [],
+        )
+        self.database.commit()
+        cursor = self.database.dbenv.cursor()
+        try:
+            self.assertEqual(
+                cursor.execute(
+                    "select field1 , Segment , RecordCount , file1 from "
+                    "file1_field1 order by field1"
+                ).fetchall(),
+                [
+                    ("a", 0, 2, 1),
+                    ("b", 0, 1, 9),
+                    ("c", 0, 2, 2),
+                    ("d", 1, 3, 3),
+                ],
+            )
+        finally:
+            cursor.close()
+        self.assertEqual(
+            self.database.get_segment_records(1, "file1"),
+            b"\x00\x07\x00\x08",
+        )
+        self.assertEqual(
+            self.database.get_segment_records(3, "file1"),
+            b"\x1c" + b"\x00" * 15,
+        )
+        irc = self.database.index_record_count["file1", "field1"]
+        self.assertEqual(irc.count_records(), 8)
+        self.assertEqual(irc.count_records("d*"), 3)
+
+    def t13_merge_import(self):
+        # Index entries referring to existing segment records are written
+        # when the batch is full, like entries for new segment records.
+        writer = self.database.merge_writer("file1", "field1")
+        batch_size = _sqlitedu._MERGE_WRITER_BATCH_SIZE
+        try:
+            _sqlitedu._MERGE_WRITER_BATCH_SIZE = 2
+            writer.write(["a", 0, 0, 1, 7])
+            self.assertEqual(len(writer.index_items), 1)
+            writer.write(["b", 0, 0, 1, 8])
+            self.assertEqual(writer.index_items, [])
+            writer.write(["c", 0, 0, 1, 9])
+            self.assertEqual(len(writer.index_items), 1)
+        finally:
+            _sqlitedu._MERGE_WRITER_BATCH_SIZE = batch_size
+        writer.close_cursor()
+        cursor = self.database.dbenv.cursor()
+        try:
+            self.assertEqual(
+                cursor.execute(
+                    "select field1 , Segment , RecordCount , file1 from "
+                    "file1_field1 order by field1"
+                ).fetchall(),
+                [("a", 0, 1, 7), ("b", 0, 1, 8), ("c", 0, 1, 9)],
+            )
+        finally:
+            cursor.close()
+
+    def t14_merge_import_recordlist_cache(self):
+        with open(os.path.join(self.field, "0"), mode="w") as file:
+            file.write(repr(["a", 0, 1, 1, 7]))
+            file.write("\n")
+        self.database.start_transaction()
+        _cache_recordlist(self.database)
+        self.assertEqual(
+            list(
+                self.database.merge_import(self.field, "file1", "field1", 100)
+            ),
+            [],
+        )
+        self.database.commit()
+        self.assertEqual(len(self.database.recordlist_cache), 0)
+
+
+class Database_merge_import_parallel:
+    def t01_merge_import_parallel(self):
+        with open(os.path.join(self.field, "0"), mode="w") as file:
+            for key in ("c", "a"):
+                file.write(repr([key, 0, 1, 1, 7]))
+                file.write("\n")
+        with open(os.path.join(self.field, "1"), mode="wb") as file:
+            file.write(merge.BINARY_DUMP_HEADER)
+            file.write(merge.encode_binary_item(["b", 1, 1, 1, 8]))
+        self.database.start_transaction()
+        self.assertEqual(
+            list(
+                self.database.merge_import_parallel(
+                    {"field1": self.field}, "file1", 2, max_workers=2
+                )
+            ),
+            [2],
+        )
+        self.database.commit()
+        self.assertEqual(sorted(os.listdir(self.field)), ["0", "1"])
+        cursor = self.database.dbenv.cursor()
+        try:
+            self.assertEqual(
+                cursor.execute(
+                    "select field1 , Segment , RecordCount , file1 from "
+                    "file1_field1 order by field1"
+                ).fetchall(),
+                [("a", 0, 1, 7), ("b", 1, 1, 8), ("c", 0, 1, 7)],
+            )
+        finally:
+            cursor.close()
+
+    def t02_merge_import_parallel_close(self):
+        with open(os.path.join(self.field, "0"), mode="w") as file:
+            for key in ("a", "b", "c"):
+                file.write(repr([key, 0, 1, 1, 7]))
+                file.write("\n")
+        self.database.start_transaction()
+        counts = self.database.merge_import_parallel(
+            {"field1": self.field}, "file1", 1, max_workers=1
+        )
+        self.assertEqual(next(counts), 1)
+        counts.close()
+        cursor = self.database.dbenv.cursor()
+        try:
+            self.assertEqual(
+                cursor.execute(
+                    "select field1 , Segment , RecordCount , file1 from "
+                    "file1_field1 order by field1"
+                ).fetchall(),
+                [("a", 0, 1, 7)],
+            )
+        finally:
+            cursor.close()
+
+    def t03_merge_import_parallel_nodir(self):
+        # Allow for different OS descriptive text for FileNotFoundError.
+        self.database.start_transaction()
+        self.assertRaisesRegex(
+            FileNotFoundError,
+            "".join(
+                (
+                    r"((No such file or directory)|(The system cannot find",
+                    r" the path specified)): 'ss'$",
+                )
+            ),
+            list,
+            self.database.merge_import_parallel(
+                {"field1": "ss"}, "file1", 2, max_workers=1
+            ),
+        )
+
 
 if sqlite3:
 
@@ -909,6 +1178,7 @@ if sqlite3:
         test_01 = Database_methods.t01
         test_02 = Database_methods.t02_database_cursor
         test_03 = Database_methods.t03_unset_defer_update
+        test_04 = Database_methods.t04_unset_defer_update_caches
         test_05 = Database_methods.t05_new_deferred_root
         test_06 = Database_methods.t06_set_defer_update_01
         test_07 = Database_methods.t07_set_defer_update_02
@@ -943,6 +1213,8 @@ if sqlite3:
         test_12 = Database_sort_and_write.t12
         test_13 = Database_sort_and_write.t13
         test_14 = Database_sort_and_write.t14
+        test_15 = Database_sort_and_write.t15_record_counts
+        test_16 = Database_sort_and_write.t16_recordlist_cache
 
     # merge() does nothing.
     class Database_mergeSqlite3(_SQLiteOpenSqlite3):
@@ -954,6 +1226,8 @@ if sqlite3:
     class Database_delete_indexSqlite3(_SQLiteOpenSqlite3):
         test_01 = Database_delete_index.t01
         test_02 = Database_delete_index.t02_delete_index
+        test_03 = Database_delete_index.t03_delete_index_record_counts
+        test_04 = Database_delete_index.t04_delete_index_recordlist_cache
 
     class Database_find_value_segmentsSqlite3(_SQLiteOpenSqlite3):
         test_01 = Database_find_value_segments.t01
@@ -982,6 +1256,19 @@ if sqlite3:
         test08 = Database_merge_import.t08_merge_import
         test09 = Database_merge_import.t09_merge_import
         test10 = Database_merge_import.t10_merge_import
+        test11 = Database_merge_import.t11_merge_import
+        test12 = Database_merge_import.t12_merge_import
+        test13 = Database_merge_import.t13_merge_import
+        test14 = Database_merge_import.t14_merge_import_recordlist_cache
+
+    class Database_merge_import_parallelSqlite3(_SQLiteMergeSqlite3):
+        def setUp(self):
+            super().setUp()
+            _SQLiteMerge.setup_detail(self)
+
+        test01 = Database_merge_import_parallel.t01_merge_import_parallel
+        test02 = Database_merge_import_parallel.t02_merge_import_parallel_close
+        test03 = Database_merge_import_parallel.t03_merge_import_parallel_nodir
 
 
 if apsw:
@@ -1025,6 +1312,7 @@ if apsw:
         test_01 = Database_methods.t01
         test_02 = Database_methods.t02_database_cursor
         test_03 = Database_methods.t03_unset_defer_update
+        test_04 = Database_methods.t04_unset_defer_update_caches
         test_05 = Database_methods.t05_new_deferred_root
         test_06 = Database_methods.t06_set_defer_update_01
         test_07 = Database_methods.t07_set_defer_update_02
@@ -1057,6 +1345,8 @@ if apsw:
         test_12 = Database_sort_and_write.t12
         test_13 = Database_sort_and_write.t13
         test_14 = Database_sort_and_write.t14
+        test_15 = Database_sort_and_write.t15_record_counts
+        test_16 = Database_sort_and_write.t16_recordlist_cache
 
     # merge() does nothing.
     class Database_mergeApsw(_SQLiteOpenApsw):
@@ -1068,6 +1358,8 @@ if apsw:
     class Database_delete_indexApsw(_SQLiteOpenApsw):
         test_01 = Database_delete_index.t01
         test_02 = Database_delete_index.t02_delete_index
+        test_03 = Database_delete_index.t03_delete_index_record_counts
+        test_04 = Database_delete_index.t04_delete_index_recordlist_cache
 
     class Database_find_value_segmentsApsw(_SQLiteOpenApsw):
         test_01 = Database_find_value_segments.t01
@@ -1096,6 +1388,19 @@ if apsw:
         test08 = Database_merge_import.t08_merge_import
         test09 = Database_merge_import.t09_merge_import
         test10 = Database_merge_import.t10_merge_import
+        test11 = Database_merge_import.t11_merge_import
+        test12 = Database_merge_import.t12_merge_import
+        test13 = Database_merge_import.t13_merge_import
+        test14 = Database_merge_import.t14_merge_import_recordlist_cache
+
+    class Database_merge_import_parallelApsw(_SQLiteMergeApsw):
+        def setUp(self):
+            super().setUp()
+            _SQLiteMerge.setup_detail(self)
+
+        test01 = Database_merge_import_parallel.t01_merge_import_parallel
+        test02 = Database_merge_import_parallel.t02_merge_import_parallel_close
+        test03 = Database_merge_import_parallel.t03_merge_import_parallel_nodir
 
 
 if __name__ == "__main__":
@@ -1112,6 +1417,7 @@ if __name__ == "__main__":
         runner().run(loader(Database_delete_indexSqlite3))
         runner().run(loader(Database_find_value_segmentsSqlite3))
         runner().run(loader(Database_merge_importSqlite3))
+        runner().run(loader(Database_merge_import_parallelSqlite3))
     if apsw:
         runner().run(loader(Database___init__Apsw))
         runner().run(loader(Database_open_databaseApsw))
@@ -1123,3 +1429,4 @@ if __name__ == "__main__":
         runner().run(loader(Database_delete_indexApsw))
         runner().run(loader(Database_find_value_segmentsApsw))
         runner().run(loader(Database_merge_importApsw))
+        runner().run(loader(Database_merge_import_parallelApsw))
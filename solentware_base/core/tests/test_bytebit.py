@@ -11,6 +11,10 @@ try:
 except ImportError:
     bitarray = False
 
+try:
+    from .. import _npbytebit
+except ImportError:
+    _npbytebit = None
 from .. import bytebit, _bytebit
 
 
@@ -24,6 +28,8 @@ class Bitarray(unittest.TestCase):
     def test_Bitarray(self):
         if bitarray:
             self.assertIs(bitarray, bytebit.Bitarray)
+        elif _npbytebit:
+            self.assertIs(_npbytebit.Bitarray, bytebit.Bitarray)
         else:
             self.assertIs(_bytebit.Bitarray, bytebit.Bitarray)
 
@@ -185,8 +185,25 @@ class ConstantsFunctions(unittest.TestCase):
         ae(constants.LMDB_MODULE, "lmdb")
         ae(constants.EXISTING_SEGMENT_REFERENCE, 0),
         ae(constants.NEW_SEGMENT_CONTENT, 1),
+        ae(constants.INDEX_RECORD_COUNT_PREFIX, "C")
+        ae(constants.INDEX_KEY_COUNT_SUFFIX, "_count")
+        ae(constants.BULK_LOAD, "bulk_load")
+        ae(constants.INTERACTIVE, "interactive")
+        ae(constants.READ_MOSTLY, "read_mostly")
+        ae(
+            constants.TUNING_PROFILES,
+            frozenset(("bulk_load", "interactive", "read_mostly")),
+        )
+        ae(constants.RECORD_CODEC, "record_codec")
+        ae(constants.REPR_CODEC, "repr")
+        ae(constants.MARSHAL_CODEC, "marshal")
+        ae(constants.PICKLE_CODEC, "pickle")
+        ae(
+            constants.RECORD_CODECS,
+            frozenset(("repr", "marshal", "pickle")),
+        )
         cc = [d for d in dir(constants) if not d.endswith("__")]
-        ae(len(cc), 109)
+        ae(len(cc), 120)
         ae(
             sorted(cc),
             sorted(
@@ -300,6 +317,17 @@ class ConstantsFunctions(unittest.TestCase):
                     "DEFAULT_MAP_PAGES",
                     "EXISTING_SEGMENT_REFERENCE",
                     "NEW_SEGMENT_CONTENT",
+                    "INDEX_RECORD_COUNT_PREFIX",
+                    "INDEX_KEY_COUNT_SUFFIX",
+                    "BULK_LOAD",
+                    "INTERACTIVE",
+                    "READ_MOSTLY",
+                    "TUNING_PROFILES",
+                    "RECORD_CODEC",
+                    "REPR_CODEC",
+                    "MARSHAL_CODEC",
+                    "PICKLE_CODEC",
+                    "RECORD_CODECS",
                 ]
             ),
         )
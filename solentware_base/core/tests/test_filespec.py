@@ -398,5 +398,50 @@ class FileSpec_06(unittest.TestCase):
         )
 
 
+class FileSpec_07(unittest.TestCase):
+    def setUp(self):
+        self.spec = dict(
+            a={
+                "primary": "a",
+                "ddname": "DDNAME1",
+                "file": "a.dpt",
+                "secondary": {"b": None},
+                "fields": {"a": None, "B": None},
+                "filedesc": {
+                    "brecppg": 10,
+                    "fileorg": 36,
+                    "bsize": 20,
+                    "dsize": 160,
+                },
+                "btod_factor": 8,
+                "record_codec": "marshal",
+            },
+        )
+
+    def tearDown(self):
+        pass
+
+    def test___init__01_record_codec(self):
+        self.spec["a"]["record_codec"] = "json"
+        self.assertRaisesRegex(
+            filespec.FileSpecError,
+            "Record codec 'json' for file a is not supported$",
+            filespec.FileSpec,
+            **self.spec
+        )
+
+    def test___init__02_record_codec(self):
+        fs = filespec.FileSpec(**self.spec)
+        self.assertEqual(fs["a"]["record_codec"], "marshal")
+
+    def test_is_consistent_with_record_codec(self):
+        fs = filespec.FileSpec(**self.spec)
+        stored = {"a": dict(fs["a"])}
+        del stored["a"]["record_codec"]
+        self.assertEqual(fs.is_consistent_with(stored), None)
+        stored["a"]["record_codec"] = "pickle"
+        self.assertEqual(fs.is_consistent_with(stored), None)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -485,7 +485,7 @@ class FindTC(unittest.TestCase):
         )
         ftd = DatabaseEngine(self.findtest_database)
         f = find.Find(ftd, GAMES_FILE_DEF)
-        self.assertEqual(len(f.__dict__), 5)
+        self.assertEqual(len(f.__dict__), 6)
         self.assertEqual(f._db, ftd)
         self.assertEqual(f._dbset, "games")
         self.assertEqual(f._recordclass, None)
@@ -530,6 +530,16 @@ class FindTC(unittest.TestCase):
                 "or": f._or,
             },
         )
+        self.assertEqual(
+            f.compile_field_value,
+            {
+                "is": f._compile_is_not,
+                "ne": f._compile_ne,
+                "present": f._compile_present,
+                "like": f._compile_like,
+                "starts": f._compile_starts,
+            },
+        )
 
     def test_conditions(self):
         ftd = DatabaseEngine(self.findtest_database)
@@ -673,6 +683,251 @@ class FindTC(unittest.TestCase):
         finally:
             ftd.delete_database()
 
+    def test_evaluate_non_index_conditions(self):
+        ftd = DatabaseEngine(self.findtest_database)
+        try:
+            ftd.open_database()
+            f = find.Find(ftd, GAMES_FILE_DEF, recordclass=SampleNameRecord)
+            createsampledatabase(ftd)
+            nodes = []
+            for condition, kw in (
+                (where.IS, dict(field="Date", value="datedata1")),
+                (
+                    where.IS,
+                    dict(field="Date", value="datedata1", not_value=True),
+                ),
+                (where.PRESENT, dict(field="Event")),
+                (where.NE, dict(field="Black", value="blackness")),
+                (where.LIKE, dict(field="Black", value="00")),
+                (where.LIKE, dict(field="Black", value="(")),
+                (where.STARTS, dict(field="Black", value="blackd")),
+            ):
+                wc = where.WhereClause()
+                wc.condition = condition
+                for k, v in kw.items():
+                    setattr(wc, k, v)
+                wc.result = where.WhereResult()
+                f.initialize_answer(wc)
+                nodes.append(wc)
+            f.evaluate_non_index_conditions(nodes, f.get_existence())
+            answers = []
+            for wc in nodes:
+                c = wc.result.answer.create_recordsetbase_cursor()
+                rns = set()
+                while True:
+                    r = c.next()
+                    if not r:
+                        break
+                    rns.add(r[0])
+                answers.append(rns)
+            self.assertEqual(
+                answers,
+                [
+                    set(),
+                    {n + RECNUMBASE for n in (1,)},
+                    {n + RECNUMBASE for n in (0, 1, 2)},
+                    {n + RECNUMBASE for n in range(13)},
+                    {n + RECNUMBASE for n in range(3, 13)},
+                    set(),
+                    {n + RECNUMBASE for n in (0, 1, 2)},
+                ],
+            )
+        finally:
+            ftd.delete_database()
+
+    def test_where_evaluate_non_index_conditions(self):
+        ftd = DatabaseEngine(self.findtest_database)
+        try:
+            ftd.open_database()
+            f = find.Find(ftd, GAMES_FILE_DEF, recordclass=SampleNameRecord)
+            createsampledatabase(ftd)
+            for statement, expected in (
+                ("Black ne blackness and Date is not datedata1", (1,)),
+                ("Black starts blackd or Black like 04", range(13)),
+                ("White eq whitedata3 and Event present", (0, 2)),
+                ("Black not starts blackd", range(3, 13)),
+            ):
+                w = where.Where(statement)
+                w.lex()
+                w.parse()
+                self.assertEqual(w.validate(ftd, GAMES_FILE_DEF), None)
+                w.evaluate(f)
+                c = w.get_node_result_answer().create_recordsetbase_cursor()
+                rns = set()
+                while True:
+                    r = c.next()
+                    if not r:
+                        break
+                    rns.add(r[0])
+                self.assertEqual(
+                    rns, {n + RECNUMBASE for n in expected}, msg=statement
+                )
+        finally:
+            ftd.delete_database()
+
+    def test_where_evaluate_cached_statement(self):
+        ftd = DatabaseEngine(self.findtest_database)
+        try:
+            ftd.open_database()
+            ftd.set_query_cache_size(5)
+            f = find.Find(ftd, GAMES_FILE_DEF, recordclass=SampleNameRecord)
+            createsampledatabase(ftd)
+            for value, expected in (
+                ("whitedata3", (0, 2)),
+                ("whitedata2", (1,)),
+                ("whitedata3", (0, 2)),
+            ):
+                w = ftd.record_selector("White eq ?v? and Event present")
+                w.lex()
+                w.parse()
+                self.assertEqual(w.validate(ftd, GAMES_FILE_DEF), None)
+                w.fill_placeholders(replacements={"?v?": value})
+                w.evaluate(f)
+                c = w.get_node_result_answer().create_recordsetbase_cursor()
+                rns = set()
+                while True:
+                    r = c.next()
+                    if not r:
+                        break
+                    rns.add(r[0])
+                self.assertEqual(
+                    rns, {n + RECNUMBASE for n in expected}, msg=value
+                )
+            self.assertEqual(ftd.get_query_cache_statistics(), (2, 1, 1))
+        finally:
+            ftd.delete_database()
+
+    def test_estimate(self):
+        ftd = DatabaseEngine(self.findtest_database)
+        try:
+            ftd.open_database()
+            f = find.Find(ftd, GAMES_FILE_DEF)
+            createsampledatabase(ftd)
+            dates = ("datedata1", "datedata3")
+            for condition, kw, expected in (
+                (where.EQ, dict(field="Black", value="black0004"), 10),
+                (where.IS, dict(field="White", value="whitedata3"), 2),
+                (where.GT, dict(field="Black", value="black0004"), 3),
+                (where.LT, dict(field="White", value="whitedata3"), 1),
+                (where.AFTER, dict(field="White", value="whitedata3"), 0),
+                ((where.FROM, where.TO), dict(field="Date", value=dates), 3),
+                (
+                    (where.ABOVE, where.BELOW),
+                    dict(field="Date", value=dates),
+                    0,
+                ),
+                (where.LIKE, dict(field="Black", value="00"), None),
+                (where.EQ, dict(field="Nofield", value="x"), None),
+            ):
+                wc = where.WhereClause()
+                wc.condition = condition
+                for k, v in kw.items():
+                    setattr(wc, k, v)
+                self.assertEqual(f.estimate(wc), expected, msg=condition)
+        finally:
+            ftd.delete_database()
+
+    def test_where_evaluate_index_conditions_by_estimate(self):
+        evaluated = []
+
+        class LoggedFind(find.Find):
+            def condition(self, obj):
+                evaluated.append((obj.field, obj.index_filter is not None))
+                super().condition(obj)
+
+        class QueryOrderFind(find.Find):
+            estimate = None
+
+        def answer(statement, finder):
+            w = where.Where(statement)
+            w.lex()
+            w.parse()
+            self.assertEqual(w.validate(ftd, GAMES_FILE_DEF), None)
+            w.evaluate(finder)
+            c = w.get_node_result_answer().create_recordsetbase_cursor()
+            rns = set()
+            while True:
+                r = c.next()
+                if not r:
+                    break
+                rns.add(r[0])
+            return rns
+
+        ftd = DatabaseEngine(self.findtest_database)
+        try:
+            ftd.open_database()
+            f = LoggedFind(ftd, GAMES_FILE_DEF, recordclass=SampleNameRecord)
+            q = QueryOrderFind(
+                ftd, GAMES_FILE_DEF, recordclass=SampleNameRecord
+            )
+            createsampledatabase(ftd)
+            for statement, expected, order in (
+                (
+                    "Black eq black0004 and White eq whitedata3",
+                    (),
+                    [("White", False), ("Black", True)],
+                ),
+                (
+                    "Black eq blackdata0 and White eq whitedata3",
+                    (0, 2),
+                    [("White", False), ("Black", True)],
+                ),
+                (
+                    " ".join(
+                        (
+                            "White eq whitedata3 and Black eq blackness",
+                            "and Date eq datedata1",
+                        )
+                    ),
+                    (),
+                    [("Black", False)],
+                ),
+                (
+                    "Black eq blackdata0 nor White eq whitedata3",
+                    (1,),
+                    [("Black", False), ("White", True)],
+                ),
+                (
+                    "Black eq blackdata0 and not White eq whitedata3",
+                    (1,),
+                    [("Black", False), ("White", True)],
+                ),
+                (
+                    " ".join(
+                        (
+                            "Black eq black0004 or White eq whitedata3",
+                            "and Date eq datedata1",
+                        )
+                    ),
+                    (0, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12),
+                    [("White", False), ("Date", True), ("Black", False)],
+                ),
+                (
+                    " ".join(
+                        (
+                            "( Black eq blackdata0 and Date eq datedata3 )",
+                            "or Result eq result0004",
+                        )
+                    ),
+                    (1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12),
+                    [("Result", False), ("Date", False), ("Black", True)],
+                ),
+                (
+                    "Black eq blackdata0 and Event present",
+                    (0, 1, 2),
+                    [("Black", False)],
+                ),
+            ):
+                evaluated.clear()
+                rns = answer(statement, f)
+                self.assertEqual(
+                    rns, {n + RECNUMBASE for n in expected}, msg=statement
+                )
+                self.assertEqual(evaluated, order, msg=statement)
+                self.assertEqual(rns, answer(statement, q), msg=statement)
+        finally:
+            ftd.delete_database()
+
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner
@@ -596,6 +596,107 @@ class FindValuesTC(unittest.TestCase):
             like_pattern=like_pattern,
         )
 
+    def name_clause(self, **kw):
+        vc = wherevalues.ValuesClause()
+        vc.valid_phrase = True
+        vc.field = NAME_FIELD_DEF
+        for k, v in kw.items():
+            setattr(vc, k, v)
+        return vc
+
+    def test_iter_values_01(self):
+        fv = findvalues.FindValues(self.ftd, GAMES_FILE_DEF)
+        vc = self.name_clause()
+        self.assertEqual(
+            list(fv.iter_values(vc)),
+            ["black0004", "blackdata0", "whitedata2", "whitedata3"],
+        )
+        self.assertEqual(
+            list(fv.iter_values(vc, limit=2)), ["black0004", "blackdata0"]
+        )
+        self.assertEqual(
+            list(fv.iter_values(vc, after="blackdata0", limit=2)),
+            ["whitedata2", "whitedata3"],
+        )
+        self.assertEqual(list(fv.iter_values(vc, after="whitedata3")), [])
+        self.assertEqual(list(fv.iter_values(vc, limit=0)), [])
+        self.assertEqual(vc.above_value, None)
+
+    def test_iter_values_02(self):
+        fv = findvalues.FindValues(self.ftd, GAMES_FILE_DEF)
+        vc = self.name_clause(from_value="blackdata0", to_value="whitedata2")
+        self.assertEqual(
+            list(fv.iter_values(vc, after="black")),
+            ["blackdata0", "whitedata2"],
+        )
+        self.assertEqual(
+            list(fv.iter_values(vc, after="blackdata0")), ["whitedata2"]
+        )
+        vc = self.name_clause(above_value="blackdata0")
+        self.assertEqual(
+            list(fv.iter_values(vc, after="black", limit=1)), ["whitedata2"]
+        )
+        self.assertEqual(
+            list(fv.iter_values(vc, after="whitedata2")), ["whitedata3"]
+        )
+        self.assertEqual(vc.above_value, "blackdata0")
+
+    def test_iter_values_in_set(self):
+        lookups = []
+        find_values_ascending = self.ftd.find_values_ascending
+
+        def logged(valuespec, file):
+            lookups.append((valuespec.from_value, valuespec.to_value))
+            return find_values_ascending(valuespec, file)
+
+        self.ftd.find_values_ascending = logged
+        fv = findvalues.FindValues(self.ftd, GAMES_FILE_DEF)
+        vc = self.name_clause(
+            in__set={"whitedata3", "none", "black0004", "blackdata0"}
+        )
+        self.assertEqual(
+            list(fv.iter_values(vc)), ["black0004", "blackdata0", "whitedata3"]
+        )
+        self.assertEqual(
+            lookups,
+            [
+                ("black0004", "black0004"),
+                ("blackdata0", "blackdata0"),
+                ("none", "none"),
+                ("whitedata3", "whitedata3"),
+            ],
+        )
+        lookups.clear()
+        self.assertEqual(
+            list(fv.iter_values(vc, after="black0004", limit=1)),
+            ["blackdata0"],
+        )
+        self.assertEqual(lookups, [("blackdata0", "blackdata0")])
+        lookups.clear()
+        vc.like_pattern = re.compile("white")
+        self.assertEqual(list(fv.iter_values(vc)), ["whitedata3"])
+        self.assertEqual(len(lookups), 4)
+
+        # A range, 'not in', or a str in__set, scans the index.
+        for kw in (
+            dict(in__set={"whitedata2"}, to_value="whitedata2"),
+            dict(in__set={"whitedata2"}, in_=False),
+            dict(in__set="whitedata2"),
+        ):
+            lookups.clear()
+            list(fv.iter_values(self.name_clause(**kw)))
+            self.assertEqual(len(lookups), 1, msg=kw)
+
+    def test_find_values_page(self):
+        fv = findvalues.FindValues(self.ftd, GAMES_FILE_DEF)
+        vc = self.name_clause()
+        fv.find_values(vc, after="black0004", limit=2)
+        self.assertEqual(vc.result, ["blackdata0", "whitedata2"])
+        fv.find_values(vc)
+        self.assertEqual(
+            vc.result, ["black0004", "blackdata0", "whitedata2", "whitedata3"]
+        )
+
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner
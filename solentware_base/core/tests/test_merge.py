@@ -0,0 +1,187 @@
+# test_merge.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""merge tests"""
+
+import unittest
+import os
+import shutil
+import queue
+import threading
+
+from .. import merge
+
+
+class _Merge(unittest.TestCase):
+    def setUp(self):
+        self._testfolder = os.path.join(
+            os.path.dirname(__file__), "_merge_test_folder"
+        )
+        self.field = os.path.join(self._testfolder, "field1")
+        os.makedirs(self.field)
+
+    def tearDown(self):
+        shutil.rmtree(self._testfolder)
+
+    def write_text(self, name, items):
+        with open(
+            os.path.join(self.field, name), mode="w", encoding="utf-8"
+        ) as file:
+            for item in items:
+                file.write(repr(item) + "\n")
+
+    def write_binary(self, name, items):
+        with open(os.path.join(self.field, name), mode="wb") as file:
+            file.write(merge.BINARY_DUMP_HEADER)
+            for item in items:
+                file.write(merge.encode_binary_item(item))
+
+
+class EncodeBinaryItem(unittest.TestCase):
+    def test_encode_binary_item_01(self):
+        self.assertEqual(
+            merge.encode_binary_item([b"a", "b", 1, [2, 3]]),
+            b"".join(
+                (
+                    b"\x00\x00\x00\x1f",
+                    b"b\x00\x00\x00\x01a",
+                    b"s\x00\x00\x00\x01b",
+                    b"i\x00\x00\x00\x01\x01",
+                    b"l\x00\x00\x00\x08\x00\x00\x00\x02\x00\x00\x00\x03",
+                )
+            ),
+        )
+
+    def test_encode_binary_item_02(self):
+        self.assertRaisesRegex(
+            TypeError,
+            "Field type 'float' cannot be written in binary sequential "
+            "format$",
+            merge.encode_binary_item,
+            *([1.5],),
+        )
+
+
+class Merge(_Merge):
+    def test_sorter_01(self):
+        self.assertEqual(list(merge.Merge(self.field).sorter()), [])
+
+    def test_sorter_02(self):
+        items = [
+            ["a", 0, 1, 1, 7],
+            ["b", 0, 1, 2, b"\x00\x07\x00\x08"],
+        ]
+        self.write_text("0", items)
+        self.assertEqual(list(merge.Merge(self.field).sorter()), items)
+
+    def test_sorter_03(self):
+        items = [
+            [b"a", b"\x00\x00\x00\x00", 1, b"\x00\x01", b"\x00\x07"],
+            ["bé", 0, 1, -1, b"\x00\x07\x00\x08"],
+            ["c", 70000, 0, 2, [3, 65535]],
+        ]
+        self.write_binary("0", items)
+        self.assertEqual(list(merge.Merge(self.field).sorter()), items)
+
+    def test_sorter_04(self):
+        # Text and binary format files merged together.
+        self.write_text("0", [["a", 0, 1, 1, 7], ["d", 0, 1, 1, 7]])
+        self.write_binary(
+            "1", [["b", 1, 1, 1, 8], ["c", 1, 1, 1, 8], ["e", 1, 1, 1, 8]]
+        )
+        self.write_binary("field1", [["a", 2, 0, 1, 9]])
+        self.assertEqual(
+            [item[:2] for item in merge.Merge(self.field).sorter()],
+            [["a", 0], ["a", 2], ["b", 1], ["c", 1], ["d", 0], ["e", 1]],
+        )
+
+    def test_sorter_05(self):
+        # Entries spanning reads from file into buffer.
+        items = [
+            ["k" + str(i).zfill(6), i, 1, 2, bytes(range(256)) * 3]
+            for i in range(300)
+        ]
+        self.write_binary("0", items)
+        self.assertEqual(list(merge.Merge(self.field).sorter()), items)
+
+    def test_sorter_06(self):
+        self.write_binary("0", [["a", 0, 1, 1, 7]])
+        with open(os.path.join(self.field, "0"), mode="ab") as file:
+            file.write(b"\x00\x00\x01\x00b")
+        sorter = merge.Merge(self.field).sorter()
+        self.assertEqual(next(sorter), ["a", 0, 1, 1, 7])
+        self.assertRaisesRegex(
+            ValueError,
+            "Truncated entry in binary sequential file '.*0'$",
+            next,
+            *(sorter,),
+        )
+
+    def test_next_sorted_item_01(self):
+        self.write_binary("0", [["a", 0, 1, 1, 7]])
+        self.assertEqual(
+            list(merge.next_sorted_item(self.field)), [["a", 0, 1, 1, 7]]
+        )
+
+
+class PutMergedItems(_Merge):
+    def setUp(self):
+        super().setUp()
+        self.queue = queue.Queue()
+        self.stop = threading.Event()
+        merge.set_merged_item_queues({self.field: self.queue}, self.stop)
+        self.batch_size = merge.MERGED_ITEMS_BATCH_SIZE
+        merge.MERGED_ITEMS_BATCH_SIZE = 3
+
+    def tearDown(self):
+        merge.MERGED_ITEMS_BATCH_SIZE = self.batch_size
+        merge.set_merged_item_queues(None, None)
+        super().tearDown()
+
+    def get_batches(self):
+        batches = []
+        while not self.queue.empty():
+            batches.append(self.queue.get())
+        return batches
+
+    def test_put_merged_items_01(self):
+        self.write_text("0", [["a", 0, 1, 1, 7], ["d", 0, 1, 1, 7]])
+        self.write_binary("1", [["b", 1, 1, 1, 8], ["c", 1, 1, 1, 8]])
+        merge.put_merged_items(self.field)
+        self.assertEqual(
+            self.get_batches(),
+            [
+                [["a", 0, 1, 1, 7], ["b", 1, 1, 1, 8], ["c", 1, 1, 1, 8]],
+                [["d", 0, 1, 1, 7]],
+                None,
+            ],
+        )
+        self.assertEqual(sorted(os.listdir(self.field)), ["0", "1"])
+
+    def test_put_merged_items_02(self):
+        merge.put_merged_items(self.field)
+        self.assertEqual(self.get_batches(), [None])
+
+    def test_put_merged_items_03(self):
+        self.write_text("0", [["a", 0, 1, 1, 7], ["d", 0, 1, 1, 7]])
+        self.stop.set()
+        merge.put_merged_items(self.field)
+        self.assertEqual(self.get_batches(), [None])
+
+    def test_put_merged_items_04(self):
+        missing = os.path.join(self._testfolder, "missing")
+        merge.set_merged_item_queues({missing: self.queue}, self.stop)
+        self.assertRaises(
+            FileNotFoundError, merge.put_merged_items, missing
+        )
+        self.assertEqual(self.get_batches(), [None])
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner
+    loader = unittest.defaultTestLoader.loadTestsFromTestCase
+
+    runner().run(loader(EncodeBinaryItem))
+    runner().run(loader(Merge))
+    runner().run(loader(PutMergedItems))
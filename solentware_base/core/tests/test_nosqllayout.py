@@ -0,0 +1,87 @@
+# test_nosqllayout.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""nosqllayout tests"""
+
+import unittest
+
+from .. import nosqllayout
+
+SEGMENT_TABLE = {0: (50, 1), 3: ("L", 3), 70000: ("B", 65536)}
+
+
+class Layout(unittest.TestCase):
+    def test_LAYOUT_VERSION(self):
+        self.assertEqual(nosqllayout.LAYOUT_VERSION, b"\x01")
+
+    def test_is_binary_layout(self):
+        self.assertEqual(nosqllayout.is_binary_layout(b"\x01"), True)
+        self.assertEqual(nosqllayout.is_binary_layout(b"b'\\x01'"), False)
+        self.assertEqual(nosqllayout.is_binary_layout(b"{}"), False)
+        self.assertEqual(nosqllayout.is_binary_layout(b"[]"), False)
+        self.assertEqual(nosqllayout.is_binary_layout(b""), False)
+
+    def test_records(self):
+        records = b"\x00\x01\xff\x00"
+        encoded = nosqllayout.encode_records(records)
+        self.assertEqual(encoded, b"\x01\x00\x01\xff\x00")
+        self.assertEqual(nosqllayout.decode_records(encoded), records)
+        self.assertEqual(
+            nosqllayout.decode_records(repr(records).encode()), records
+        )
+
+    def test_segment_table(self):
+        encoded = nosqllayout.encode_segment_table(SEGMENT_TABLE)
+        self.assertEqual(len(encoded), 28)
+        self.assertEqual(
+            encoded[:10], b"\x01\x00\x00\x00\x00R\x00\x00\x00\x32"
+        )
+        self.assertEqual(
+            nosqllayout.decode_segment_table(encoded), SEGMENT_TABLE
+        )
+        self.assertEqual(
+            nosqllayout.decode_segment_table(repr(SEGMENT_TABLE).encode()),
+            SEGMENT_TABLE,
+        )
+
+    def test_segment_table_empty(self):
+        encoded = nosqllayout.encode_segment_table({})
+        self.assertEqual(encoded, b"\x01")
+        self.assertEqual(nosqllayout.decode_segment_table(encoded), {})
+
+    def test_segment_table_bad_type(self):
+        self.assertRaisesRegex(
+            KeyError,
+            "'X'",
+            nosqllayout.encode_segment_table,
+            *({0: ("X", 3)},),
+        )
+
+    def test_segment_numbers(self):
+        numbers = [0, 1, 5, 70000]
+        encoded = nosqllayout.encode_segment_numbers(numbers)
+        self.assertEqual(len(encoded), 17)
+        self.assertEqual(nosqllayout.decode_segment_numbers(encoded), numbers)
+        self.assertEqual(
+            nosqllayout.decode_segment_numbers(repr(numbers).encode()),
+            numbers,
+        )
+
+    def test_segment_numbers_empty(self):
+        encoded = nosqllayout.encode_segment_numbers([])
+        self.assertEqual(encoded, b"\x01")
+        self.assertEqual(nosqllayout.decode_segment_numbers(encoded), [])
+        self.assertEqual(nosqllayout.decode_segment_numbers(b"[]"), [])
+
+    def test_bitmap_size(self):
+        bitmap = bytes(range(256)) * 16
+        self.assertEqual(len(nosqllayout.encode_records(bitmap)), 4097)
+        self.assertGreater(len(repr(bitmap)), 10000)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner
+    loader = unittest.defaultTestLoader.loadTestsFromTestCase
+
+    runner().run(loader(Layout))
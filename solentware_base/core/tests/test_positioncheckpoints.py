@@ -0,0 +1,130 @@
+# test_positioncheckpoints.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""positioncheckpoints tests"""
+
+import unittest
+
+from .. import positioncheckpoints
+
+
+class Index:
+    def __init__(self, counts):
+        self.counts = counts
+        self.calls = []
+
+    def key_counts(self, low, high):
+        self.calls.append((low, high))
+        for key in sorted(self.counts):
+            if low is not None and key < low:
+                continue
+            if high is not None and key >= high:
+                break
+            yield key, self.counts[key]
+
+
+class PositionCheckpoints(unittest.TestCase):
+    def setUp(self):
+        self.checkpoints = positioncheckpoints.PositionCheckpoints(2)
+
+    def test___init__(self):
+        self.assertEqual(self.checkpoints.interval, 2)
+        self.assertEqual(len(self.checkpoints), 0)
+
+    def test_get(self):
+        summary = self.checkpoints.get("f", "x")
+        self.assertIsInstance(summary, positioncheckpoints.IndexCheckpoints)
+        self.assertEqual(summary.interval, 2)
+        self.assertIs(self.checkpoints.get("f", "x"), summary)
+        self.assertIsNot(self.checkpoints.get("f", "y"), summary)
+        self.assertEqual(len(self.checkpoints), 2)
+
+    def test_invalidate(self):
+        index = Index({"a": 1, "b": 2, "c": 3})
+        summary = self.checkpoints.get("f", "x")
+        summary.refresh(index.key_counts)
+        self.checkpoints.invalidate("f", "y", "a")
+        self.checkpoints.invalidate("f", "x", "c")
+        index.counts["c"] = 5
+        summary.refresh(index.key_counts)
+        self.assertEqual(index.calls, [(None, None), ("c", None)])
+        self.assertEqual(summary.record_count(), 8)
+
+    def test_clear(self):
+        index = Index({"a": 1})
+        summary = self.checkpoints.get("f", "x")
+        summary.refresh(index.key_counts)
+        self.checkpoints.clear()
+        self.assertEqual(len(self.checkpoints), 1)
+        self.assertIs(self.checkpoints.get("f", "x"), summary)
+        summary.refresh(index.key_counts)
+        self.assertEqual(index.calls, [(None, None), (None, None)])
+
+
+class IndexCheckpoints(unittest.TestCase):
+    def setUp(self):
+        self.index = Index({k: n for n, k in enumerate("abcdefg", start=1)})
+        self.summary = positioncheckpoints.IndexCheckpoints(3)
+        self.summary.refresh(self.index.key_counts)
+
+    def test_refresh_01(self):
+        self.assertEqual(self.index.calls, [(None, None)])
+        self.assertEqual(self.summary.record_count(), 28)
+        self.summary.refresh(self.index.key_counts)
+        self.assertEqual(self.index.calls, [(None, None)])
+
+    def test_refresh_02(self):
+        summary = positioncheckpoints.IndexCheckpoints(3)
+        summary.refresh(Index({}).key_counts)
+        self.assertEqual(summary.record_count(), 0)
+        self.assertEqual(summary.locate_key("a"), (None, 0))
+        self.assertEqual(summary.locate_position(0), (None, 0))
+
+    def test_refresh_03(self):
+        # Recount the block from 'd' with one key added.
+        self.index.counts["dd"] = 10
+        self.summary.invalidate("dd")
+        self.summary.refresh(self.index.key_counts)
+        self.assertEqual(self.index.calls[1:], [("d", "g")])
+        self.assertEqual(self.summary.record_count(), 38)
+        self.assertEqual(self.summary.locate_key("g"), ("g", 31))
+
+    def test_refresh_04(self):
+        # The block before 'd' grows past 6 keys and is split.
+        for key in ("a1", "a2", "a3", "a4"):
+            self.index.counts[key] = 1
+        self.summary.invalidate("a1")
+        self.summary.refresh(self.index.key_counts)
+        self.assertEqual(self.index.calls[1:], [(None, "d")])
+        self.assertEqual(self.summary.locate_key("a2"), (None, 0))
+        self.assertEqual(self.summary.locate_key("b"), ("a3", 3))
+        self.assertEqual(self.summary.locate_key("c"), ("c", 7))
+        self.assertEqual(self.summary.locate_key("d"), ("d", 10))
+        self.assertEqual(self.summary.record_count(), 32)
+
+    def test_locate_key(self):
+        self.assertEqual(self.summary.locate_key(""), (None, 0))
+        self.assertEqual(self.summary.locate_key("c"), (None, 0))
+        self.assertEqual(self.summary.locate_key("d"), ("d", 6))
+        self.assertEqual(self.summary.locate_key("ff"), ("d", 6))
+        self.assertEqual(self.summary.locate_key("z"), ("g", 21))
+
+    def test_locate_position(self):
+        self.assertEqual(self.summary.locate_position(0), (None, 0))
+        self.assertEqual(self.summary.locate_position(5), (None, 0))
+        self.assertEqual(self.summary.locate_position(6), ("d", 6))
+        self.assertEqual(self.summary.locate_position(20), ("d", 6))
+        self.assertEqual(self.summary.locate_position(27), ("g", 21))
+
+    def test_clear(self):
+        self.summary.clear()
+        self.summary.refresh(self.index.key_counts)
+        self.assertEqual(self.index.calls, [(None, None), (None, None)])
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner
+    loader = unittest.defaultTestLoader.loadTestsFromTestCase
+    runner().run(loader(PositionCheckpoints))
+    runner().run(loader(IndexCheckpoints))
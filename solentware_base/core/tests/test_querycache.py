@@ -0,0 +1,178 @@
+# test_querycache.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""querycache tests"""
+
+import unittest
+
+from .. import querycache
+from .. import where
+from .. import wherevalues
+
+
+class DB:
+    def __init__(self):
+        self.exists_calls = 0
+
+    def exists(self, dbset, field):
+        self.exists_calls += 1
+        return field in ("f", "g")
+
+
+class QueryCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = querycache.QueryCache(2)
+
+    def test___init__(self):
+        self.assertEqual(self.cache.maxsize, 2)
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(self.cache.misses, 0)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_get_01(self):
+        statement = "f eq ?a? and g eq ?b?"
+        first = self.cache.get(where.Where, statement)
+        self.assertIsInstance(first, where.Where)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+        second = self.cache.get(where.Where, statement)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertIsNot(first, second)
+        self.assertIs(first.tokens, second.tokens)
+        self.assertEqual(len(self.cache), 1)
+
+        # lex() and parse() do nothing, and the copies have separate nodes.
+        node = second.node
+        second.lex()
+        second.parse()
+        self.assertIs(second.node, node)
+        second.fill_placeholders(replacements={"?a?": "x", "?b?": "y"})
+        first.fill_placeholders(replacements={"?a?": "z", "?b?": "w"})
+        second_clauses = second.node.get_clauses_from_root_in_walk_order()
+        first_clauses = first.node.get_clauses_from_root_in_walk_order()
+        self.assertEqual([c.value for c in second_clauses], [None, "x", "y"])
+        self.assertEqual([c.value for c in first_clauses], [None, "z", "w"])
+        self.assertEqual(
+            [c.operator for c in first_clauses], [None, None, "and"]
+        )
+
+    def test_get_02(self):
+        # Statements with syntax errors are not cached.
+        self.assertRaisesRegex(
+            where.WhereError,
+            "Unable to process token 'and'$",
+            self.cache.get,
+            *(where.Where, "and f eq a"),
+        )
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+
+    def test_get_03(self):
+        # Least recently used entry is evicted.
+        self.cache.get(where.Where, "f eq a")
+        self.cache.get(wherevalues.WhereValues, "f eq a")
+        self.cache.get(where.Where, "f eq a")
+        self.cache.get(where.Where, "g eq a")
+        self.assertEqual(len(self.cache), 2)
+        self.cache.get(where.Where, "f eq a")
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 3))
+        self.cache.get(wherevalues.WhereValues, "f eq a")
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 4))
+
+    def test_validate_01(self):
+        db = DB()
+        first = self.cache.get(where.Where, "f eq a or g eq b")
+        self.assertEqual(first.validate(db, "t"), None)
+        calls = db.exists_calls
+        second = self.cache.get(where.Where, "f eq a or g eq b")
+        self.assertEqual(second.validate(db, "t"), None)
+        self.assertEqual(db.exists_calls, calls)
+        self.assertEqual(second.validate(db, "u"), None)
+        self.assertEqual(db.exists_calls, 2 * calls)
+
+    def test_validate_02(self):
+        db = DB()
+        first = self.cache.get(where.Where, "h eq a")
+        self.assertIsInstance(
+            first.validate(db, "t"), where.WhereStatementError
+        )
+        second = self.cache.get(where.Where, "h eq a")
+        self.assertIsInstance(
+            second.validate(db, "t"), where.WhereStatementError
+        )
+
+    def test_wherevalues_01(self):
+        db = DB()
+        statement = "f from a to c like b in x"
+        first = self.cache.get(wherevalues.WhereValues, statement)
+        self.assertEqual(first.validate(db, "t"), True)
+        self.assertEqual(db.exists_calls, 1)
+        second = self.cache.get(wherevalues.WhereValues, statement)
+        self.assertEqual(second.validate(db, "t"), True)
+        self.assertEqual(db.exists_calls, 1)
+        self.assertIsNot(second.node, first.node)
+        self.assertEqual(second.node.from_value, "a")
+        self.assertEqual(second.node.to_value, "c")
+        self.assertIs(second.node.like_pattern, first.node.like_pattern)
+        self.assertEqual(second.node.in__set, "x")
+        self.assertEqual(second.node.valid_phrase, True)
+
+    def test_wherevalues_02(self):
+        selector = self.cache.get(wherevalues.WhereValues, "f like like")
+        self.assertEqual(selector.parse_failed(), True)
+        self.assertEqual(selector.parsed, True)
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(selector.validate(DB(), "t"), ["f", "like"])
+
+    def test_clear(self):
+        self.cache.get(where.Where, "f eq a")
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+
+
+class WhereClone(unittest.TestCase):
+    def test_clone_01(self):
+        selector = where.Where("f eq ?a? and not (g eq b nor f eq ?c?)")
+        selector.lex()
+        selector.parse()
+        clone = selector.clone(replacements={"?a?": "x", "?c?": "y"})
+        self.assertEqual(clone.parsed, True)
+        self.assertEqual(selector.parsed, False)
+        clauses = selector.node.get_clauses_from_root_in_walk_order()
+        copies = clone.node.get_clauses_from_root_in_walk_order()
+        self.assertEqual(len(clauses), len(copies))
+        for clause, copy in zip(clauses, copies):
+            self.assertIsNot(clause, copy)
+            self.assertEqual(clause.field, copy.field)
+            self.assertEqual(clause.condition, copy.condition)
+            self.assertEqual(clause.operator, copy.operator)
+            self.assertEqual(clause.not_phrase, copy.not_phrase)
+            for attr in ("left", "right", "up", "down"):
+                if getattr(clause, attr) is None:
+                    self.assertIs(getattr(copy, attr), None)
+                else:
+                    self.assertIs(
+                        getattr(copy, attr),
+                        copies[clauses.index(getattr(clause, attr))],
+                    )
+        self.assertEqual(
+            [c.value for c in clauses if c.value],
+            ["?a?", "b", "?c?"],
+        )
+        self.assertEqual(
+            [c.value for c in copies if c.value], ["x", "b", "y"]
+        )
+
+    def test_clone_02(self):
+        selector = where.Where("")
+        selector.lex()
+        selector.parse()
+        self.assertEqual(selector.clone().node.field, None)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner
+    loader = unittest.defaultTestLoader.loadTestsFromTestCase
+    runner().run(loader(QueryCache))
+    runner().run(loader(WhereClone))
@@ -5,8 +5,10 @@
 """record tests"""
 
 import unittest
+import pickle
 
 from .. import record
+from .. import recordcodec
 
 
 class _Comparison(unittest.TestCase):
@@ -634,6 +636,33 @@ class Value(unittest.TestCase):
         self.assertEqual(self.value.pack_value(), "{}")
         self.assertEqual(self.ovalue.pack_value(), "{'a': None}")
 
+    def test_set_codec(self):
+        self.assertIs(self.value.get_codec(), recordcodec.REPR)
+        self.assertEqual(self.value.set_codec(recordcodec.MARSHAL), None)
+        self.assertIs(self.value.get_codec(), recordcodec.MARSHAL)
+        self.assertEqual(self.value.__dict__, {})
+        self.assertEqual(self.value, self.ovalue)
+
+    def test_pack_value_codec(self):
+        self.value.__dict__["a"] = [1, "b"]
+        self.value.set_codec(recordcodec.MARSHAL)
+        packed = self.value.pack_value()
+        self.assertEqual(packed[:2], recordcodec.MARSHAL.tag)
+        self.assertEqual(self.ovalue.load(packed), None)
+        self.assertEqual(self.ovalue.__dict__, {"a": [1, "b"]})
+
+    def test_pickle(self):
+        self.value.__dict__["a"] = [1, "b"]
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            value = pickle.loads(pickle.dumps(self.value, protocol=protocol))
+            self.assertEqual(value.__dict__, {"a": [1, "b"]})
+            self.assertIs(value.get_codec(), recordcodec.REPR)
+        self.value.set_codec(recordcodec.MARSHAL)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            value = pickle.loads(pickle.dumps(self.value, protocol=protocol))
+            self.assertEqual(value.__dict__, {"a": [1, "b"]})
+            self.assertIs(value.get_codec(), recordcodec.MARSHAL)
+
     def test_pack_get_field_value(self):
         self.assertEqual(self.value.get_field_value("a"), None)
 
@@ -717,6 +746,23 @@ class ValueData(unittest.TestCase):
         self.value.data = {"a": None}
         self.assertEqual(self.value.pack_value(), "{'a': None}")
 
+    def test_pickle(self):
+        self.value.data = {"a": None}
+        self.value.set_codec(recordcodec.PICKLE)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            value = pickle.loads(pickle.dumps(self.value, protocol=protocol))
+            self.assertEqual(value.data, {"a": None})
+            self.assertIs(value.get_codec(), recordcodec.PICKLE)
+
+    def test_pack_value_codec(self):
+        self.value.data = {"a": None}
+        self.value.set_codec(recordcodec.PICKLE)
+        packed = self.value.pack_value()
+        self.assertEqual(packed[:2], recordcodec.PICKLE.tag)
+        self.value.data = None
+        self.assertEqual(self.value.load(packed), None)
+        self.assertEqual(self.value.data, {"a": None})
+
 
 class ValueDict(unittest.TestCase):
     def setUp(self):
@@ -820,6 +866,21 @@ class ValueList(unittest.TestCase):
     def test_pack_value(self):
         self.assertEqual(self.value.pack_value(), "[]")
 
+    def test_pack_value_codec(self):
+        class VL(record.ValueList):
+            attributes = dict(a=None, b=None)
+            _attribute_order = ("b", "a")
+
+        vl = VL()
+        vl.a = 1
+        vl.b = "b"
+        vl.set_codec(recordcodec.MARSHAL)
+        packed = vl.pack_value()
+        self.assertEqual(packed[:2], recordcodec.MARSHAL.tag)
+        other = VL()
+        self.assertEqual(other.load(packed), None)
+        self.assertEqual(other.__dict__, {"a": 1, "b": "b"})
+
     def test__empty(self):
         class VL(record.ValueList):
             attributes = dict(a=set, b="b")
@@ -0,0 +1,64 @@
+# test_recordcodec.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""recordcodec tests"""
+
+import unittest
+
+from .. import recordcodec
+
+VALUE = {"a": [1, 2.5, None], "b": "café ♞", "c": (True, b"\x00")}
+
+
+class Codecs(unittest.TestCase):
+    def test_CODECS(self):
+        self.assertEqual(
+            recordcodec.CODECS,
+            {
+                "repr": recordcodec.REPR,
+                "marshal": recordcodec.MARSHAL,
+                "pickle": recordcodec.PICKLE,
+            },
+        )
+
+    def test_repr(self):
+        encoded = recordcodec.REPR.encode(VALUE)
+        self.assertEqual(encoded, repr(VALUE))
+        self.assertEqual(recordcodec.REPR.decode(encoded), VALUE)
+        self.assertEqual(recordcodec.decode(encoded), VALUE)
+
+    def test_marshal(self):
+        encoded = recordcodec.MARSHAL.encode(VALUE)
+        self.assertIsInstance(encoded, str)
+        self.assertEqual(encoded[:2], "\x00m")
+        self.assertEqual(recordcodec.MARSHAL.decode(encoded), VALUE)
+        self.assertEqual(recordcodec.decode(encoded), VALUE)
+
+    def test_pickle(self):
+        encoded = recordcodec.PICKLE.encode(VALUE)
+        self.assertIsInstance(encoded, str)
+        self.assertEqual(encoded[:2], "\x00p")
+        self.assertEqual(recordcodec.PICKLE.decode(encoded), VALUE)
+        self.assertEqual(recordcodec.decode(encoded), VALUE)
+
+    def test_utf8_round_trip(self):
+        # Database engines may store values as utf-8 encoded bytes.
+        for codec in recordcodec.CODECS.values():
+            encoded = codec.encode(VALUE).encode("utf8").decode("utf8")
+            self.assertEqual(recordcodec.decode(encoded), VALUE)
+
+    def test_decode_unknown_tag(self):
+        self.assertRaisesRegex(
+            KeyError,
+            "'\\\\x00z'",
+            recordcodec.decode,
+            *("\x00z",),
+        )
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner
+    loader = unittest.defaultTestLoader.loadTestsFromTestCase
+
+    runner().run(loader(Codecs))
@@ -0,0 +1,112 @@
+# test_recordlistcache.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""recordlistcache tests"""
+
+import unittest
+
+from .. import recordlistcache
+
+
+class RecordList:
+    def __init__(self, name):
+        self.name = name
+        self.copies = 0
+
+    def copy_on_write(self, cache_size=1):
+        self.copies += 1
+        return (self.name, cache_size)
+
+
+class RecordListCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = recordlistcache.RecordListCache(3)
+
+    def test___init__(self):
+        self.assertEqual(self.cache.maxsize, 3)
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(self.cache.misses, 0)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_get_01(self):
+        self.assertEqual(
+            self.cache.get("f", "x", (recordlistcache.KEY_EQ, "k")), None
+        )
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+
+    def test_get_02(self):
+        recordlist = RecordList("a")
+        keyspec = (recordlistcache.KEY_EQ, "k")
+        self.assertEqual(
+            self.cache.put("f", "x", keyspec, recordlist), ("a", 1)
+        )
+        self.assertEqual(
+            self.cache.get("f", "x", keyspec, cache_size=5), ("a", 5)
+        )
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 0))
+        self.assertEqual(recordlist.copies, 2)
+        self.assertEqual(self.cache.get("f", "y", keyspec), None)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_put_01(self):
+        # Least recently used entry is evicted.
+        for name in "abc":
+            self.cache.put(
+                "f", "x", (recordlistcache.KEY_EQ, name), RecordList(name)
+            )
+        self.cache.get("f", "x", (recordlistcache.KEY_EQ, "a"))
+        self.cache.put(
+            "f", "x", (recordlistcache.KEY_STARTSWITH, "d"), RecordList("d")
+        )
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(
+            self.cache.get("f", "x", (recordlistcache.KEY_EQ, "b")), None
+        )
+        self.assertEqual(
+            self.cache.get("f", "x", (recordlistcache.KEY_EQ, "a")), ("a", 1)
+        )
+        self.cache.put(
+            "f", "x", (recordlistcache.KEY_EQ, "e"), RecordList("e")
+        )
+        self.cache.put(
+            "f", "x", (recordlistcache.KEY_EQ, "g"), RecordList("g")
+        )
+        self.assertEqual(self.cache._partial_keys, {})
+
+    def test_invalidate_01(self):
+        self.cache.put(
+            "f", "x", (recordlistcache.KEY_EQ, "a"), RecordList("a")
+        )
+        self.cache.put(
+            "f", "x", (recordlistcache.KEY_EQ, "b"), RecordList("b")
+        )
+        self.cache.put(
+            "f",
+            "x",
+            (recordlistcache.KEY_RANGE, None, "a", None, "c"),
+            RecordList("r"),
+        )
+        self.cache.invalidate("f", "x", "a")
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(
+            self.cache.get("f", "x", (recordlistcache.KEY_EQ, "b")), ("b", 1)
+        )
+        self.assertEqual(self.cache._partial_keys, {})
+
+    def test_clear_01(self):
+        self.cache.put(
+            "f", "x", (recordlistcache.KEY_STARTSWITH, "a"), RecordList("a")
+        )
+        self.cache.get("f", "x", (recordlistcache.KEY_STARTSWITH, "a"))
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache._partial_keys, {})
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 0))
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner
+    loader = unittest.defaultTestLoader.loadTestsFromTestCase
+
+    runner().run(loader(RecordListCache))
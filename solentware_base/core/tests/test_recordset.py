@@ -104,10 +104,12 @@ class _Recordset(unittest.TestCase):
         self.assertEqual(
             sorted(self.rs.__dict__.keys()),
             [
+                "_cumulative_counts",
                 "_database",
                 "_dbhome",
                 "_dbset",
                 "_rs_segments",
+                "_shared_segments",
                 "_sorted_segnums",
                 "location",
                 "record_cache",
@@ -554,6 +556,25 @@ class _Recordset(unittest.TestCase):
         )
         self.assertEqual(self.rs.get_position_of_record_number(322), 5)
 
+    def test_get_position_of_record_number_02(self):
+        # Cumulative counts are recalculated after the record set changes.
+        self.rs[self.rsl.segment_number] = self.rsl
+        self.assertEqual(self.rs.get_position_of_record_number(323), 3)
+        self.assertEqual(self.rs._cumulative_counts, [0, 3])
+        self.rs.place_record_number(1)
+        self.assertEqual(self.rs._cumulative_counts, None)
+        self.assertEqual(self.rs.get_position_of_record_number(323), 4)
+        self.rs.remove_record_number(321)
+        self.assertEqual(self.rs.get_position_of_record_number(323), 3)
+        self.rs.place_record_number(500)
+        self.assertEqual(self.rs.get_position_of_record_number(323), 3)
+        self.assertEqual(self.rs._cumulative_counts, [0, 1, 3, 4])
+        self.assertEqual(self.rs.count_records(), 4)
+        del self.rs[0]
+        self.assertEqual(self.rs.get_position_of_record_number(323), 2)
+        self.rs.clear_recordset()
+        self.assertEqual(self.rs.get_position_of_record_number(323), 0)
+
     def test_get_record_number_at_position_01(self):
         if sys.version_info[:2] < (3, 6):
             excmsg = r"(unorderable types: str\(\) [<>] int\(\))"
@@ -600,6 +621,36 @@ class _Recordset(unittest.TestCase):
         self.assertEqual(self.rs.get_record_number_at_position(15), 388)
         self.assertEqual(self.rs.get_record_number_at_position(16), None)
 
+    def test_iter_record_numbers(self):
+        self.assertEqual(list(self.rs.iter_record_numbers()), [])
+        self.rs[self.rsl.segment_number] = self.rsl
+        self.rs[0] = recordset.RecordsetSegmentList(
+            0, "key", records=b"\x00A\x00B\x00C"
+        )
+        self.rs[1] = recordset.RecordsetSegmentBitarray(
+            1, "key", records=b"\x00\x7e\xe0" + b"\x00" * 13
+        )
+        self.rs[3] = recordset.RecordsetSegmentInt(3, "key", records=b"\x04")
+        self.rs[4] = recordset.RecordsetSegmentRun(
+            4, "key", records=b"R\x00\x01\x00\x02"
+        )
+        self.assertEqual(
+            list(self.rs.iter_record_numbers()),
+            [65, 66, 67, 137, 138, 139, 140, 141, 142, 144, 145, 146]
+            + [321, 322, 323, 388, 513, 514, 515],
+        )
+        self.assertEqual(self.rs.location.current_position_in_segment, None)
+
+    def test_iter_record_numbers_delete_segment(self):
+        self.rs[0] = recordset.RecordsetSegmentList(
+            0, "key", records=b"\x00A\x00B"
+        )
+        self.rs[3] = recordset.RecordsetSegmentInt(3, "key", records=b"\x04")
+        record_numbers = self.rs.iter_record_numbers()
+        self.assertEqual(next(record_numbers), 65)
+        del self.rs[3]
+        self.assertEqual(list(record_numbers), [66, 388])
+
     def test_get_record_number_at_position_03(self):
         self.rs[self.rsl.segment_number] = self.rsl
         self.rs[0] = recordset.RecordsetSegmentList(
@@ -870,6 +921,59 @@ class _Recordset(unittest.TestCase):
         self.assertEqual(rs1.count_records(), 0)
         self.assertEqual(self.rs.count_records(), 3)
 
+    def test___sub___01(self):
+        d = self.D()
+        rsl = recordset.RecordsetSegmentList(
+            2, "key", records=b"\x00C\x00D\x00E"
+        )
+        rs1 = recordset._Recordset(self.d, "file1")
+        rs2 = recordset._Recordset(self.d, "file2")
+        rsd = recordset._Recordset(d, "file1")
+        self.assertRaisesRegex(
+            recordset.RecordsetError,
+            "".join(
+                ("Attempt to 'sub' record sets for different databases$",)
+            ),
+            self.rs.__sub__,
+            *(rsd,),
+        )
+        self.assertRaisesRegex(
+            recordset.RecordsetError,
+            "".join(("Attempt to 'sub' record sets for different tables$",)),
+            self.rs.__sub__,
+            *(rs2,),
+        )
+        self.rs[self.rsl.segment_number] = self.rsl
+        rs1[rsl.segment_number] = rsl
+        rs = self.rs - rs1
+        self.assertEqual(rs.count_records(), 2)
+        rs = rs1 - rs1
+        self.assertEqual(rs.count_records(), 0)
+        self.assertEqual(rs.rs_segments, {})
+        self.assertEqual(rs1.count_records(), 3)
+        self.assertEqual(self.rs.count_records(), 3)
+
+    def test___isub___01(self):
+        d = self.D()
+        rsl = recordset.RecordsetSegmentList(
+            3, "key", records=b"\x00C\x00D\x00E"
+        )
+        rs1 = recordset._Recordset(self.d, "file1")
+        rs2 = recordset._Recordset(self.d, "file2")
+        self.assertRaisesRegex(
+            recordset.RecordsetError,
+            "".join(("Attempt to 'isub' record sets for different tables$",)),
+            self.rs.__isub__,
+            *(rs2,),
+        )
+        self.rs[self.rsl.segment_number] = self.rsl
+        rs1[rsl.segment_number] = rsl
+        rs1 -= self.rs
+        self.assertEqual(rs1.count_records(), 3)
+        rs1 -= rs1
+        self.assertEqual(rs1.count_records(), 0)
+        self.assertEqual(self.rs.count_records(), 3)
+
     def test___xor___01(self):
         d = self.D()
         rsl = recordset.RecordsetSegmentList(
@@ -988,6 +1092,27 @@ class _Recordset(unittest.TestCase):
     def test___deepcopy__(self):
         self.assertIsInstance(self.rs.__deepcopy__({}), recordset._Recordset)
 
+    def test_copy_on_write_01(self):
+        self.rs[self.rsl.segment_number] = self.rsl
+        rs = self.rs.copy_on_write()
+        self.assertIsInstance(rs, recordset._Recordset)
+        self.assertIs(rs._rs_segments[2], self.rs._rs_segments[2])
+        self.assertEqual(rs._shared_segments, {2})
+        self.assertEqual(self.rs._shared_segments, {2})
+        self.assertEqual(rs.count_records(), 3)
+
+        # Amending the copy leaves the original unchanged.
+        rs.place_record_number(320)
+        self.assertEqual(rs.count_records(), 4)
+        self.assertEqual(self.rs.count_records(), 3)
+        self.assertIsNot(rs._rs_segments[2], self.rs._rs_segments[2])
+        self.assertEqual(rs._shared_segments, set())
+
+        # Amending the original leaves the copy unchanged.
+        self.rs.remove_record_number(321)
+        self.assertEqual(self.rs.count_records(), 2)
+        self.assertEqual(rs.count_records(), 4)
+
     def test_place_record_number_01(self):
         self.assertEqual(len(self.rs._rs_segments), 0)
         self.assertEqual(self.rs.place_record_number(300), None)
@@ -51,12 +51,14 @@ class RecordsetSegmentBitarray(unittest.TestCase):
             **dict(xxxxx=None),
         )
         # Matches "'bool' ..." before Python 3.8 but "can't ..." otherwise.
+        # Matches "a bytes-like ..." if the _npbytebit Bitarray is used.
         self.assertRaisesRegex(
             TypeError,
             "|".join(
                 (
                     "'bool' object is not iterable",
                     "can't extend bytearray with bool$",
+                    "a bytes-like object is required, not 'bool'$",
                 )
             ),
             recordset.RecordsetSegmentBitarray,
@@ -268,7 +270,7 @@ class RecordsetSegmentBitarray(unittest.TestCase):
 
     def test___init__(self):
         s = self.rsi
-        self.assertEqual(s.bitarray.bitarray_bytes, self.sbytes)
+        self.assertEqual(s.bitarray.tobytes(), self.sbytes)
         self.assertEqual(s.index_key, "key")
         self.assertEqual(s.segment_number, 2)
         self.assertEqual(s.location.current_position_in_segment, None)
@@ -344,6 +346,12 @@ class RecordsetSegmentBitarray(unittest.TestCase):
         self.assertEqual(self.rsi.get_record_number_at_position(-9), 263)
         self.assertEqual(self.rsi.get_record_number_at_position(-10), None)
 
+    def test_record_numbers(self):
+        self.assertEqual(
+            self.rsi.record_numbers(),
+            [263, 272, 273, 274, 275, 276, 277, 278, 279],
+        )
+
     def test_last_01(self):
         self.assertEqual(self.rsi.last(), ("key", 279))
         self.assertEqual(self.rsi.location.current_position_in_segment, 23)
@@ -391,6 +399,12 @@ class RecordsetSegmentBitarray(unittest.TestCase):
         self.assertEqual(self.rsi.setat(600), None)
 
     def test_normalize_01(self):
+        s = self.rsi.normalize()
+        self.assertIsInstance(s, recordset.RecordsetSegmentRun)
+        self.assertEqual(s.runs, [(7, 8), (16, 24)])
+        self.assertEqual(s.promote().tobytes(), self.sbytes)
+        for i in range(32, 96, 2):
+            self.rsi.bitarray[i] = True
         self.assertIs(self.rsi.normalize(), self.rsi)
 
     def test_normalize_02(self):
@@ -421,6 +435,12 @@ class RecordsetSegmentBitarray(unittest.TestCase):
         for i in range(65544, 65550):
             s, o = divmod(i, SegmentSize.db_segment_size)
             self.rsi.bitarray[o] = False
+        self.assertIsInstance(
+            self.rsi.normalize(use_upper_limit=False),
+            recordset.RecordsetSegmentRun,
+        )
+        for i in range(32, 96, 2):
+            self.rsi.bitarray[i] = True
         self.assertIs(self.rsi.normalize(use_upper_limit=False), self.rsi)
 
     def test_promote(self):
@@ -300,6 +300,9 @@ class RecordsetSegmentInt(unittest.TestCase):
         self.assertEqual(self.rsi.get_record_number_at_position(-1), 321)
         self.assertEqual(self.rsi.get_record_number_at_position(-2), None)
 
+    def test_record_numbers(self):
+        self.assertEqual(self.rsi.record_numbers(), [321])
+
     def test_last_01(self):
         self.assertEqual(self.rsi.last(), ("key", 321))
         self.assertEqual(self.rsi.location.current_position_in_segment, 0)
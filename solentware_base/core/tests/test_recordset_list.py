@@ -324,6 +324,9 @@ class RecordsetSegmentList(unittest.TestCase):
         self.assertEqual(self.rsl.get_record_number_at_position(-3), 321)
         self.assertEqual(self.rsl.get_record_number_at_position(-4), None)
 
+    def test_record_numbers(self):
+        self.assertEqual(self.rsl.record_numbers(), [321, 322, 323])
+
     def test_last_01(self):
         self.assertEqual(self.rsl.last(), ("key", 323))
         self.assertEqual(self.rsl.location.current_position_in_segment, 2)
@@ -390,11 +393,18 @@ class RecordsetSegmentList(unittest.TestCase):
 
     def test_normalize_03(self):
         for i in range(SegmentSize.db_upper_conversion_limit):
-            self.rsl.list.append(i + 100)
+            self.rsl.list.append(i * 2 + 100)
         self.assertIsInstance(
             self.rsl.normalize(), recordset.RecordsetSegmentBitarray
         )
 
+    def test_normalize_03_runs(self):
+        for i in range(SegmentSize.db_upper_conversion_limit):
+            self.rsl.list.append(i + 100)
+        s = self.rsl.normalize()
+        self.assertIsInstance(s, recordset.RecordsetSegmentRun)
+        self.assertEqual(s.runs, [(65, 68), (100, 107)])
+
     def test_normalize_04(self):
         for i in range(SegmentSize.db_lower_conversion_limit):
             self.rsl.list.append(i + 100)
@@ -0,0 +1,224 @@
+# test_recordset_run.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""recordset tests for RecordsetSegmentRun class"""
+
+import unittest
+
+from .. import recordset
+from ..segmentsize import SegmentSize
+
+
+class RecordsetSegmentRun(unittest.TestCase):
+    def setUp(self):
+        self.__ssb = SegmentSize.db_segment_size_bytes
+        SegmentSize.db_segment_size_bytes = None
+        self.rsr = recordset.RecordsetSegmentRun(
+            2, "key", records=b"R\x00A\x00\x02\x00d\x00\x04"
+        )
+
+    def tearDown(self):
+        SegmentSize.db_segment_size_bytes = self.__ssb
+        self.rsr = None
+
+    def test__assumptions(self):
+        msg = "Failure of this test invalidates all other tests"
+        self.assertEqual(SegmentSize.db_segment_size, 128, msg)
+        self.assertEqual(SegmentSize.db_upper_conversion_limit, 7, msg)
+        self.assertEqual(SegmentSize.db_lower_conversion_limit, 4, msg)
+        self.assertEqual(self.rsr.runs, [(65, 68), (100, 105)], msg)
+        self.assertEqual(
+            sorted(self.rsr.__dict__.keys()),
+            [
+                "index_key",
+                "location",
+                "runs",
+                "segment_number",
+            ],
+            msg,
+        )
+
+    def test___init__(self):
+        s = recordset.RecordsetSegmentRun(3, "k")
+        self.assertEqual(s.runs, [])
+        self.assertEqual(s.index_key, "k")
+        self.assertEqual(s.segment_number, 3)
+        self.assertEqual(s.location.current_position_in_segment, None)
+
+    def test_count_records(self):
+        self.assertEqual(self.rsr.count_records(), 8)
+
+    def test_current(self):
+        self.assertEqual(self.rsr.current(), None)
+        self.rsr.first()
+        self.assertEqual(self.rsr.current(), ("key", 321))
+
+    def test_first_last(self):
+        self.assertEqual(self.rsr.first(), ("key", 321))
+        self.assertEqual(self.rsr.last(), ("key", 360))
+        s = recordset.RecordsetSegmentRun(3, "k")
+        self.assertEqual(s.first(), None)
+        self.assertEqual(s.last(), None)
+
+    def test_next(self):
+        records = []
+        while True:
+            record = self.rsr.next()
+            if record is None:
+                break
+            records.append(record[1])
+        self.assertEqual(records, [321, 322, 323, 356, 357, 358, 359, 360])
+        self.assertEqual(self.rsr.current(), ("key", 360))
+
+    def test_prev(self):
+        records = []
+        while True:
+            record = self.rsr.prev()
+            if record is None:
+                break
+            records.append(record[1])
+        self.assertEqual(records, [360, 359, 358, 357, 356, 323, 322, 321])
+        self.assertEqual(self.rsr.current(), ("key", 321))
+
+    def test_setat(self):
+        self.assertEqual(self.rsr.setat(357), ("key", 357))
+        self.assertEqual(self.rsr.location.current_position_in_segment, 101)
+        self.assertEqual(self.rsr.next(), ("key", 358))
+        self.assertEqual(self.rsr.setat(330), None)
+        self.assertEqual(self.rsr.setat(101), None)
+
+    def test_get_position_of_record_number(self):
+        self.assertEqual(self.rsr.get_position_of_record_number(10), 0)
+        self.assertEqual(self.rsr.get_position_of_record_number(65), 1)
+        self.assertEqual(self.rsr.get_position_of_record_number(67), 3)
+        self.assertEqual(self.rsr.get_position_of_record_number(80), 3)
+        self.assertEqual(self.rsr.get_position_of_record_number(101), 5)
+        self.assertEqual(self.rsr.get_position_of_record_number(127), 8)
+
+    def test_record_numbers(self):
+        self.assertEqual(
+            self.rsr.record_numbers(), [321, 322, 323, 356, 357, 358, 359, 360]
+        )
+        self.assertEqual(
+            recordset.RecordsetSegmentRun(3, "k").record_numbers(), []
+        )
+
+    def test_get_record_number_at_position(self):
+        self.assertEqual(self.rsr.get_record_number_at_position(0), 321)
+        self.assertEqual(self.rsr.get_record_number_at_position(3), 356)
+        self.assertEqual(self.rsr.get_record_number_at_position(7), 360)
+        self.assertEqual(self.rsr.get_record_number_at_position(8), None)
+        self.assertEqual(self.rsr.get_record_number_at_position(-1), 360)
+        self.assertEqual(self.rsr.get_record_number_at_position(-8), 321)
+        self.assertEqual(self.rsr.get_record_number_at_position(-9), None)
+
+    def test___contains__(self):
+        self.assertEqual(64 in self.rsr, False)
+        self.assertEqual(65 in self.rsr, True)
+        self.assertEqual(67 in self.rsr, True)
+        self.assertEqual(68 in self.rsr, False)
+        self.assertEqual(104 in self.rsr, True)
+        self.assertEqual(105 in self.rsr, False)
+
+    def test_normalize_01(self):
+        self.assertIs(self.rsr.normalize(), self.rsr)
+
+    def test_normalize_02(self):
+        self.rsr.runs = [(65, 67), (100, 105)]
+        self.assertIsInstance(
+            self.rsr.normalize(), recordset.RecordsetSegmentList
+        )
+        self.assertIs(self.rsr.normalize(use_upper_limit=False), self.rsr)
+
+    def test_normalize_03(self):
+        self.rsr.runs = [(65, 66)]
+        s = self.rsr.normalize()
+        self.assertIsInstance(s, recordset.RecordsetSegmentInt)
+        self.assertEqual(s.record_number, 65)
+
+    def test_normalize_04(self):
+        self.rsr.runs = [(i, i + 1) for i in range(0, 20, 2)]
+        self.assertIsInstance(
+            self.rsr.normalize(), recordset.RecordsetSegmentBitarray
+        )
+
+    def test_promote(self):
+        s = self.rsr.promote()
+        self.assertIsInstance(s, recordset.RecordsetSegmentBitarray)
+        self.assertEqual(
+            s.tobytes(),
+            b"\x00" * 8 + b"\x70\x00\x00\x00\x0f\x80\x00\x00",
+        )
+
+    def test___or__(self):
+        s = self.rsr | recordset.RecordsetSegmentInt(
+            2, None, records=b"\x00D"
+        )
+        self.assertIsInstance(s, recordset.RecordsetSegmentRun)
+        self.assertEqual(s.runs, [(65, 69), (100, 105)])
+        s = recordset.RecordsetSegmentList(
+            2, None, records=b"\x00\x01\x00\x02\x00c"
+        ) | self.rsr
+        self.assertIsInstance(s, recordset.RecordsetSegmentRun)
+        self.assertEqual(s.runs, [(1, 3), (65, 68), (99, 105)])
+        self.assertEqual(s.index_key, None)
+        s = self.rsr | recordset.RecordsetSegmentBitarray(
+            2, None, records=b"\x80" + b"\x00" * 15
+        )
+        self.assertIsInstance(s, recordset.RecordsetSegmentBitarray)
+        self.assertEqual(s.count_records(), 9)
+        self.assertRaisesRegex(
+            recordset.RecordsetError,
+            "Attempt to 'or' segments with different segment numbers$",
+            self.rsr.__or__,
+            *(recordset.RecordsetSegmentRun(3, None),),
+        )
+
+    def test___and__(self):
+        other = recordset.RecordsetSegmentRun(
+            2, None, records=b"R\x00B\x00\x28"
+        )
+        s = self.rsr & other
+        self.assertIsInstance(s, recordset.RecordsetSegmentRun)
+        self.assertEqual(s.runs, [(66, 68), (100, 105)])
+        s = recordset.RecordsetSegmentInt(2, None, records=b"\x00C") & other
+        self.assertEqual(s.runs, [(67, 68)])
+        s = recordset.RecordsetSegmentInt(2, None, records=b"\x00A") & other
+        self.assertEqual(s.count_records(), 0)
+
+    def test___xor__(self):
+        other = recordset.RecordsetSegmentRun(
+            2, None, records=b"R\x00B\x00\x28"
+        )
+        s = self.rsr ^ other
+        self.assertIsInstance(s, recordset.RecordsetSegmentRun)
+        self.assertEqual(s.runs, [(65, 66), (68, 100), (105, 107)])
+        self.assertEqual((s ^ s).runs, [])
+
+    def test___deepcopy__(self):
+        self.rsr.first()
+        s = self.rsr.__deepcopy__({})
+        self.assertIsInstance(s, recordset.RecordsetSegmentRun)
+        self.assertEqual(s.runs, self.rsr.runs)
+        self.assertIsNot(s.runs, self.rsr.runs)
+        self.assertEqual(s.location.current_position_in_segment, None)
+
+    def test_tobytes(self):
+        self.assertEqual(self.rsr.tobytes(), b"R\x00A\x00\x02\x00d\x00\x04")
+        self.assertEqual(len(self.rsr.tobytes()) % 2, 1)
+
+    def test_bitarray_round_trip(self):
+        s = self.rsr.promote().normalize()
+        self.assertIsInstance(s, recordset.RecordsetSegmentRun)
+        self.assertEqual(s.runs, self.rsr.runs)
+        self.rsr.runs = [(0, 4), (124, 128)]
+        self.assertEqual(
+            self.rsr.promote().normalize().runs, [(0, 4), (124, 128)]
+        )
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner
+    loader = unittest.defaultTestLoader.loadTestsFromTestCase
+    runner().run(loader(RecordsetSegmentRun))
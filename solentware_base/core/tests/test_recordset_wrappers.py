@@ -285,6 +285,26 @@ class FoundSet(unittest.TestCase):
     def test_count_records(self):
         self.assertEqual(self.fs1.count_records(), 0)
 
+    def test_iter_record_numbers(self):
+        self.assertEqual(list(self.fs1.iter_record_numbers()), [])
+        self.fs1[2] = recordset.RecordsetSegmentList(
+            2, "key", records=b"\x00A\x00B"
+        )
+        base = 2 * SegmentSize.db_segment_size
+        self.assertEqual(
+            list(self.fs1.iter_record_numbers()), [base + 65, base + 66]
+        )
+
+    def test_iter_record_numbers_unreferenced(self):
+        fs = recordset.FoundSet(recordset._Recordset(self.d, "file1"))
+        fs[2] = recordset.RecordsetSegmentList(
+            2, "key", records=b"\x00A\x00B"
+        )
+        record_numbers = fs.iter_record_numbers()
+        del fs
+        base = 2 * SegmentSize.db_segment_size
+        self.assertEqual(list(record_numbers), [base + 65, base + 66])
+
     def test_close(self):
         self.assertEqual(self.fs1.close(), None)
 
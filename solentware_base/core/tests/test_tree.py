@@ -77,7 +77,10 @@ class Tree___init__:
         self.assertEqual(
             sorted(t.__dict__.keys()),
             [
+                "_dirty_nodes",
                 "_next_node",
+                "_node_cache",
+                "_write_back",
                 "branching_factor",
                 "database",
                 "field",
@@ -93,6 +96,9 @@ class Tree___init__:
         self.assertEqual(t.key_segment, "1_1_0")
         self.assertEqual(t.high_node, "1_1__high_tree_node")
         self.assertEqual(t._next_node, None)
+        self.assertEqual(t._node_cache, {})
+        self.assertEqual(t._dirty_nodes, {})
+        self.assertEqual(t._write_back, False)
         self.assertEqual(t.branching_factor, 5)
         self.assertIs(t.database, self.database)
 
@@ -257,6 +263,18 @@ class Tree_file1_field1(Tree):
         if len(nodes) > 1:
             self.assertEqual(leaf_keys, sorted(all_keys))
 
+        def count_keys(node):
+            if node[1] in (2, 4):
+                return len(node[4])
+            self.assertEqual(len(node), 7)  # key counts present.
+            counts = [count_keys(nodes[entry]) for entry in node[5]]
+            self.assertEqual(node[6], counts, msg="Node " + str(node[0]))
+            return sum(counts)
+
+        for v in nodes.values():
+            if v[1] == 1:  # root.
+                self.assertEqual(count_keys(v), len(all_keys))
+
 
 class Tree_insert_branching_5:
     def t01_insert__arguments(self):
@@ -331,7 +349,7 @@ class Tree_insert_branching_5:
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1"].decode()),
-            [2, 1, None, None, ["k4"], [0, 1]],
+            [2, 1, None, None, ["k4"], [0, 1], [3, 2]],
         )
         self.tree.insert("k59")
         # self.print_nodes()
@@ -347,7 +365,7 @@ class Tree_insert_branching_5:
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1"].decode()),
-            [2, 1, None, None, ["k4"], [0, 1]],
+            [2, 1, None, None, ["k4"], [0, 1], [3, 4]],
         )
         self.tree.insert("k57")
         # self.print_nodes()
@@ -371,7 +389,15 @@ class Tree_insert_branching_5:
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1"].decode()),
-            [2, 1, None, None, ["k4", "k54", "k56", "k58"], [0, 1, 5, 4, 3]],
+            [
+                2,
+                1,
+                None,
+                None,
+                ["k4", "k54", "k56", "k58"],
+                [0, 1, 5, 4, 3],
+                [4, 3, 2, 2, 2],
+            ],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_3"].decode()),
@@ -397,7 +423,7 @@ class Tree_insert_branching_5:
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_2"].decode()),
-            [2, 3, None, None, ["k31", "k4"], [0, 6, 1]],
+            [2, 3, None, None, ["k31", "k4"], [0, 6, 1], [3, 2, 3]],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_3"].decode()),
@@ -417,11 +443,11 @@ class Tree_insert_branching_5:
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_7"].decode()),
-            [7, 3, None, None, ["k56", "k58"], [5, 4, 3]],
+            [7, 3, None, None, ["k56", "k58"], [5, 4, 3], [2, 2, 2]],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1"].decode()),
-            [8, 1, None, None, ["k54"], [2, 7]],
+            [8, 1, None, None, ["k54"], [2, 7], [8, 6]],
         )
         self.tree.insert("k84")
         # self.print_nodes()
@@ -447,7 +473,7 @@ class Tree_insert_branching_5:
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_2"].decode()),
-            [2, 3, None, None, ["k31", "k4"], [0, 6, 1]],
+            [2, 3, None, None, ["k31", "k4"], [0, 6, 1], [3, 2, 3]],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_3"].decode()),
@@ -467,11 +493,19 @@ class Tree_insert_branching_5:
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_7"].decode()),
-            [7, 3, None, None, ["k56", "k58", "k84", "k87"], [5, 4, 3, 9, 10]],
+            [
+                7,
+                3,
+                None,
+                None,
+                ["k56", "k58", "k84", "k87"],
+                [5, 4, 3, 9, 10],
+                [2, 2, 4, 3, 2],
+            ],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1"].decode()),
-            [8, 1, None, None, ["k54"], [2, 7]],
+            [8, 1, None, None, ["k54"], [2, 7], [8, 13]],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_9"].decode()),
@@ -493,7 +527,7 @@ class Tree_insert_branching_5:
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_2"].decode()),
-            [2, 3, None, None, ["k31", "k4"], [0, 6, 1]],
+            [2, 3, None, None, ["k31", "k4"], [0, 6, 1], [3, 2, 3]],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_3"].decode()),
@@ -513,11 +547,11 @@ class Tree_insert_branching_5:
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_7"].decode()),
-            [7, 3, None, None, ["k56", "k58"], [5, 4, 3]],
+            [7, 3, None, None, ["k56", "k58"], [5, 4, 3], [2, 2, 3]],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1"].decode()),
-            [8, 1, None, None, ["k54", "k81"], [2, 7, 12]],
+            [8, 1, None, None, ["k54", "k81"], [2, 7, 12], [8, 7, 7]],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_9"].decode()),
@@ -533,7 +567,7 @@ class Tree_insert_branching_5:
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_12"].decode()),
-            [12, 3, None, None, ["k84", "k87"], [11, 9, 10]],
+            [12, 3, None, None, ["k84", "k87"], [11, 9, 10], [2, 3, 2]],
         )
 
 
@@ -563,7 +597,7 @@ class Tree_insert_branching_4(Tree_file1_field1):
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1"].decode()),
-            [2, 1, None, None, ["k3"], [0, 1]],
+            [2, 1, None, None, ["k3"], [0, 1], [2, 2]],
         )
         self.tree.insert("k4")
         # self.print_nodes()
@@ -585,7 +619,15 @@ class Tree_insert_branching_4(Tree_file1_field1):
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1"].decode()),
-            [2, 1, None, None, ["k3", "k5", "k58"], [0, 1, 3, 4]],
+            [
+                2,
+                1,
+                None,
+                None,
+                ["k3", "k5", "k58"],
+                [0, 1, 3, 4],
+                [2, 2, 3, 2],
+            ],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_3"].decode()),
@@ -607,7 +649,7 @@ class Tree_insert_branching_4(Tree_file1_field1):
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_2"].decode()),
-            [2, 3, None, None, ["k3"], [0, 1]],
+            [2, 3, None, None, ["k3"], [0, 1], [2, 2]],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_3"].decode()),
@@ -623,11 +665,11 @@ class Tree_insert_branching_4(Tree_file1_field1):
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_6"].decode()),
-            [6, 3, None, None, ["k56", "k58"], [3, 5, 4]],
+            [6, 3, None, None, ["k56", "k58"], [3, 5, 4], [2, 2, 2]],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1"].decode()),
-            [7, 1, None, None, ["k5"], [2, 6]],
+            [7, 1, None, None, ["k5"], [2, 6], [4, 6]],
         )
         self.tree.insert("k54")
         # self.print_nodes()
@@ -647,7 +689,7 @@ class Tree_insert_branching_4(Tree_file1_field1):
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_2"].decode()),
-            [2, 3, None, None, ["k3"], [0, 1]],
+            [2, 3, None, None, ["k3"], [0, 1], [2, 3]],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_3"].decode()),
@@ -663,11 +705,19 @@ class Tree_insert_branching_4(Tree_file1_field1):
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_6"].decode()),
-            [6, 3, None, None, ["k54", "k56", "k58"], [3, 8, 5, 4]],
+            [
+                6,
+                3,
+                None,
+                None,
+                ["k54", "k56", "k58"],
+                [3, 8, 5, 4],
+                [2, 2, 2, 3],
+            ],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1"].decode()),
-            [7, 1, None, None, ["k5"], [2, 6]],
+            [7, 1, None, None, ["k5"], [2, 6], [5, 9]],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_8"].decode()),
@@ -685,7 +735,7 @@ class Tree_insert_branching_4(Tree_file1_field1):
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_2"].decode()),
-            [2, 3, None, None, ["k3"], [0, 1]],
+            [2, 3, None, None, ["k3"], [0, 1], [2, 3]],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_3"].decode()),
@@ -701,11 +751,11 @@ class Tree_insert_branching_4(Tree_file1_field1):
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_6"].decode()),
-            [6, 3, None, None, ["k54"], [3, 8]],
+            [6, 3, None, None, ["k54"], [3, 8], [2, 2]],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1"].decode()),
-            [7, 1, None, None, ["k5", "k56"], [2, 6, 10]],
+            [7, 1, None, None, ["k5", "k56"], [2, 6, 10], [5, 4, 6]],
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_8"].decode()),
@@ -717,7 +767,7 @@ class Tree_insert_branching_4(Tree_file1_field1):
         )
         self.assertEqual(
             literal_eval(self.database.dbenv["1_1_2_10"].decode()),
-            [10, 3, None, None, ["k58", "k83"], [5, 4, 9]],
+            [10, 3, None, None, ["k58", "k83"], [5, 4, 9], [2, 2, 2]],
         )
 
 
@@ -1467,6 +1517,119 @@ class Tree_search:
         self.assertEqual(n, None)
 
 
+class Tree_bulk_load:
+    def t01_bulk_load__arguments(self):
+        self.assertRaisesRegex(
+            TypeError,
+            "".join(
+                (
+                    r"bulk_load\(\) missing 1 required positional ",
+                    "argument: 'keys'$",
+                )
+            ),
+            self.tree.bulk_load,
+        )
+
+    def t02_bulk_load__tree_not_empty(self):
+        self.tree.insert("k1")
+        self.assertRaisesRegex(
+            tree.TreeError,
+            "Cannot bulk load a tree which is not empty$",
+            self.tree.bulk_load,
+            *(["k2"],),
+        )
+
+    def t03_bulk_load__keys_not_sorted(self):
+        self.assertRaisesRegex(
+            tree.TreeError,
+            "Keys for bulk load are not sorted and unique at 'k1'$",
+            self.tree.bulk_load,
+            *(["k2", "k1"],),
+        )
+        self.assertRaisesRegex(
+            tree.TreeError,
+            "Keys for bulk load are not sorted and unique at 'k2'$",
+            self.tree.bulk_load,
+            *(["k1", "k2", "k2"],),
+        )
+        self.assertEqual("1_1" in self.database.dbenv, False)
+
+    def t04_bulk_load__no_keys(self):
+        self.assertEqual(self.tree.bulk_load([]), None)
+        self.assertEqual("1_1" in self.database.dbenv, False)
+        self.assertEqual(self.tree.search("k1"), None)
+
+    def t05_bulk_load__solo_root(self):
+        self.assertEqual(self.tree.bulk_load(["k1", "k2", "k3"]), None)
+        self.assertEqual(
+            self.database.dbenv["1_1"],
+            b"[0, 2, None, None, ['k1', 'k2', 'k3'], None]",
+        )
+        self.assertEqual(self.database.dbenv["1_1__high_tree_node"], b"0")
+        self.check_nodes()
+
+    def t06_bulk_load__keys(self):
+        self.tree.branching_factor = 6
+        keys = sorted("k" + str(i) for i in range(100))
+        self.assertEqual(self.tree.bulk_load(keys), None)
+        self.check_nodes()
+        cursor = tree.Cursor(self.tree)
+        walk = [cursor.first()]
+        while walk[-1] is not None:
+            walk.append(cursor.next())
+        self.assertEqual(walk[:-1], keys)
+        cursor.close()
+        for key in keys:
+            self.assertEqual(key in self.tree.search(key)[-1].node[4], True)
+        for i in range(100, 150):
+            self.tree.insert("k" + str(i))
+            self.check_nodes()
+        for i in range(0, 150, 2):
+            self.tree.delete("k" + str(i))
+            self.check_nodes()
+
+
+class Tree_node_cache:
+    def t01_node_cache__write_back(self):
+        self.tree.start_write_back()
+        for i in range(20):
+            self.tree.insert("k" + str(i))
+        self.assertEqual("1_1" in self.database.dbenv, False)
+        self.assertEqual(len(self.tree._dirty_nodes) > 1, True)
+        self.assertEqual(self.tree.get_root()[1], tree._Node.ROOT)
+        cursor = tree.Cursor(self.tree)
+        self.assertEqual(cursor.first(), "k0")
+        self.assertEqual(cursor.last(), "k9")
+        cursor.close()
+        self.tree.write_back()
+        self.assertEqual(self.tree._dirty_nodes, {})
+        self.assertEqual(self.tree._write_back, True)
+        self.assertEqual("1_1" in self.database.dbenv, True)
+        self.check_nodes()
+        self.tree.delete("k0")
+        self.assertEqual(len(self.tree._dirty_nodes) > 0, True)
+        self.tree.stop_write_back()
+        self.assertEqual(self.tree._dirty_nodes, {})
+        self.assertEqual(self.tree._write_back, False)
+        self.check_nodes()
+
+    def t02_node_cache__size(self):
+        self.tree.node_cache_size = 3
+        for i in range(50):
+            self.tree.insert("k" + str(i))
+        self.assertEqual(len(self.tree._node_cache) <= 3, True)
+        self.tree.clear_node_cache()
+        self.assertEqual(len(self.tree._node_cache), 0)
+        self.tree.search("k20")
+        self.assertEqual(len(self.tree._node_cache) > 0, True)
+
+    def t03_node_cache__copy(self):
+        self.tree.insert("k1")
+        root = self.tree.get_root()
+        root[4].append("k2")
+        self.assertEqual(self.tree.get_root()[4], ["k1"])
+
+
 class Tree__splitters(Tree_file1_field1):
     def setUp(self):
         super().setUp()
@@ -1506,7 +1669,7 @@ class Tree__split_solo_root:
         self.tree._split_solo_root("k1", nodepath, 1)
         self.assertEqual(len(nodepath), 2)
         self.assertEqual(
-            nodepath[0].node, [32, 1, None, None, ["k4"], [1, 31]]
+            nodepath[0].node, [32, 1, None, None, ["k4"], [1, 31], [3, 2]]
         )
         self.assertEqual(
             nodepath[1].node, [1, 4, None, 31, ["k0", "k1", "k2"], None]
@@ -1519,7 +1682,7 @@ class Tree__split_solo_root:
         self.tree._split_solo_root("k5", nodepath, 3)
         self.assertEqual(len(nodepath), 2)
         self.assertEqual(
-            nodepath[0].node, [32, 1, None, None, ["k5"], [1, 31]]
+            nodepath[0].node, [32, 1, None, None, ["k5"], [1, 31], [3, 2]]
         )
         self.assertEqual(
             nodepath[1].node, [31, 4, 1, None, ["k5", "k6"], None]
@@ -1608,10 +1771,12 @@ class Tree__split_root:
         self.tree._split_root(nodepath, ("k1", 20))
         self.assertEqual(len(nodepath), 2)
         self.assertEqual(
-            nodepath[0].node, [32, 1, None, None, ["k2"], [1, 31]]
+            nodepath[0].node,
+            [32, 1, None, None, ["k2"], [1, 31], [None, None]],
         )
         self.assertEqual(
-            nodepath[1].node, [1, 3, None, None, ["k0", "k1"], [5, 6, 20]]
+            nodepath[1].node,
+            [1, 3, None, None, ["k0", "k1"], [5, 6, 20], [None, None, None]],
         )
 
     def t04__split_root__insert_high(self):
@@ -1623,10 +1788,12 @@ class Tree__split_root:
         self.tree._split_root(nodepath, ("k5", 20))
         self.assertEqual(len(nodepath), 2)
         self.assertEqual(
-            nodepath[0].node, [32, 1, None, None, ["k4"], [1, 31]]
+            nodepath[0].node,
+            [32, 1, None, None, ["k4"], [1, 31], [None, None]],
         )
         self.assertEqual(
-            nodepath[1].node, [31, 3, None, None, ["k5", "k6"], [8, 20, 9]]
+            nodepath[1].node,
+            [31, 3, None, None, ["k5", "k6"], [8, 20, 9], [None, None, None]],
         )
 
 
@@ -1665,7 +1832,8 @@ class Tree__split_branch:
         self.tree._split_branch(nodepath, ("k1", 20))
         self.assertEqual(len(nodepath), 1)
         self.assertEqual(
-            nodepath[0].node, [1, 3, None, None, ["k0", "k1"], [5, 6, 20]]
+            nodepath[0].node,
+            [1, 3, None, None, ["k0", "k1"], [5, 6, 20], [None, None, None]],
         )
 
     def t04__split_branch__insert_high(self):
@@ -1677,7 +1845,8 @@ class Tree__split_branch:
         self.tree._split_branch(nodepath, ("k5", 20))
         self.assertEqual(len(nodepath), 1)
         self.assertEqual(
-            nodepath[0].node, [31, 3, None, None, ["k5", "k6"], [8, 20, 9]]
+            nodepath[0].node,
+            [31, 3, None, None, ["k5", "k6"], [8, 20, 9], [None, None, None]],
         )
 
 
@@ -2328,6 +2497,9 @@ class Cursor_methods_empty_database:
         self.assertEqual(self.cursor.next(), None)
         self.assertEqual(self.cursor.prev(), None)
         self.assertEqual(self.cursor.setat(""), None)
+        self.assertEqual(self.cursor.get_position_of_key(""), 0)
+        self.assertEqual(self.cursor.get_key_at_position(0), None)
+        self.assertEqual(self.cursor.get_key_at_position(-1), None)
 
 
 class Cursor_methods_populated_database:
@@ -2594,6 +2766,84 @@ class Cursor_methods_populated_database:
         self.assertEqual(self.cursor.setat("12"), None)
         self.assertEqual(self.cursor.setat("11"), None)
 
+    def t09__get_position_of_key(self):
+        self.assertEqual(self.cursor.get_position_of_key(), 0)
+        self.assertEqual(self.cursor.get_position_of_key("10"), 0)
+        self.assertEqual(self.cursor.get_position_of_key("14"), 4)
+        self.assertEqual(self.cursor.get_position_of_key("145"), 5)
+        self.assertEqual(self.cursor.get_position_of_key("19"), 9)
+        self.assertEqual(self.cursor.get_position_of_key("20"), 10)
+        self.tree.delete(str(13))
+        self.tree.delete(str(10))
+        self.assertEqual(self.cursor.get_position_of_key("14"), 2)
+
+    def t10__get_key_at_position(self):
+        self.assertEqual(self.cursor.get_key_at_position(), None)
+        self.assertEqual(self.cursor.get_key_at_position(0), "10")
+        self.assertEqual(self.cursor.get_key_at_position(4), "14")
+        self.assertEqual(self.cursor.next(), "15")
+        self.assertEqual(self.cursor.get_key_at_position(9), "19")
+        self.assertEqual(self.cursor.get_key_at_position(10), None)
+        self.assertEqual(self.cursor.get_key_at_position(-1), "19")
+        self.assertEqual(self.cursor.get_key_at_position(-10), "10")
+        self.assertEqual(self.cursor.get_key_at_position(-11), None)
+        self.tree.delete(str(13))
+        self.tree.delete(str(10))
+        self.assertEqual(self.cursor.get_key_at_position(2), "14")
+
+
+class Tree_count_keys:
+    def setUp(self):
+        super().setUp()
+        self.tree.branching_factor = 4
+        self.keys = sorted("k" + str(i) for i in range(60))
+        for key in self.keys:
+            self.tree.insert(key)
+
+    def remove_counts(self):
+        db = self.database.dbenv
+        for key in ["1_1"] + ["1_1_2_" + str(n) for n in range(100)]:
+            if key in db:
+                node = literal_eval(db[key].decode())
+                db[key] = repr(node[:6])
+        self.tree.clear_node_cache()
+
+    def t01_count_keys(self):
+        self.assertEqual(self.tree.count_keys(), 60)
+        for key in self.keys[::3]:
+            self.tree.delete(key)
+        self.assertEqual(self.tree.count_keys(), 40)
+        self.check_nodes()
+
+    def t02_positions(self):
+        cursor = tree.Cursor(self.tree)
+        for position, key in enumerate(self.keys):
+            self.assertEqual(cursor.get_position_of_key(key), position)
+            self.assertEqual(cursor.get_key_at_position(position), key)
+        cursor.close()
+
+    def t03_upgrade_counts(self):
+        self.assertEqual(self.tree.upgrade_counts(), 0)
+        self.remove_counts()
+        self.assertEqual(len(self.tree.get_root()), 6)
+        self.assertEqual(self.tree.count_keys(), 60)
+        cursor = tree.Cursor(self.tree)
+        self.assertEqual(cursor.get_position_of_key("k30"), 24)
+        self.assertEqual(cursor.get_key_at_position(24), "k30")
+        self.assertEqual(len(self.tree.get_root()), 6)
+        self.assertEqual(self.tree.upgrade_counts() > 1, True)
+        self.assertEqual(len(self.tree.get_root()), 7)
+        self.check_nodes()
+        self.assertEqual(cursor.get_key_at_position(24), "k30")
+        cursor.close()
+
+    def t04_update_tree_without_counts(self):
+        self.remove_counts()
+        self.tree.insert("k305")
+        self.tree.delete("k31")
+        self.check_nodes()
+        self.assertEqual(self.tree.upgrade_counts(), 0)
+
 
 class _Node_class_constants(unittest.TestCase):
     def test_01_class_constants(self):
@@ -2601,6 +2851,7 @@ class _Node_class_constants(unittest.TestCase):
             sorted([c for c in dir(tree._Node) if c.isupper()]),
             [
                 "BRANCH",
+                "COUNTS",
                 "ENTRIES",
                 "KEYS",
                 "LEAF",
@@ -2626,6 +2877,7 @@ class _Node_class_constants(unittest.TestCase):
         self.assertEqual(tree._Node.RIGHT_SIBLING_NODE_NUMBER, 3)
         self.assertEqual(tree._Node.KEYS, 4)
         self.assertEqual(tree._Node.ENTRIES, 5)
+        self.assertEqual(tree._Node.COUNTS, 6)
 
 
 class _Node___init__(unittest.TestCase):
@@ -2634,12 +2886,12 @@ class _Node___init__(unittest.TestCase):
             TypeError,
             "".join(
                 (
-                    r"__init__\(\) takes from 3 to 7 positional arguments ",
-                    "but 8 were given$",
+                    r"__init__\(\) takes from 3 to 8 positional arguments ",
+                    "but 9 were given$",
                 )
             ),
             tree._Node,
-            *(None, None, None, None, None, None, None),
+            *(None, None, None, None, None, None, None, None),
         )
 
     def test_02___init___no_arguments(self):
@@ -2691,9 +2943,11 @@ class _Node_insert_into_branch_or_root(unittest.TestCase):
         )
 
     def test_02_insert_into_branch_or_root__single_path(self):
-        n = tree._Node(None, None, None, keys=[], entries=[])
+        n = tree._Node(None, None, None, keys=[], entries=[1])
         self.assertEqual(n.insert_into_branch_or_root("key", 2), 0)
-        self.assertEqual(n.node, [None, None, None, None, ["key"], [2]])
+        self.assertEqual(
+            n.node, [None, None, None, None, ["key"], [1, 2], [None, None]]
+        )
 
 
 if unqlite:
@@ -2805,6 +3059,33 @@ if unqlite:
         test_02 = Tree_search.t02_search__arguments
         test_03 = Tree_search.t02_search__empty_tree
 
+    class UnTree_bulk_load(UnTree_file1_field1):
+        test_01 = Tree_bulk_load.t01_bulk_load__arguments
+        test_02 = Tree_bulk_load.t02_bulk_load__tree_not_empty
+        test_03 = Tree_bulk_load.t03_bulk_load__keys_not_sorted
+        test_04 = Tree_bulk_load.t04_bulk_load__no_keys
+        test_05 = Tree_bulk_load.t05_bulk_load__solo_root
+        test_06 = Tree_bulk_load.t06_bulk_load__keys
+
+    class UnTree_node_cache(UnTree_file1_field1):
+        test_01 = Tree_node_cache.t01_node_cache__write_back
+        test_02 = Tree_node_cache.t02_node_cache__size
+        test_03 = Tree_node_cache.t03_node_cache__copy
+
+    class UnTree_count_keys(UnTree_file1_field1):
+        def setUp(self):
+            super().setUp()
+            self.tree.branching_factor = 4
+            self.keys = sorted("k" + str(i) for i in range(60))
+            for key in self.keys:
+                self.tree.insert(key)
+
+        remove_counts = Tree_count_keys.remove_counts
+        test_01 = Tree_count_keys.t01_count_keys
+        test_02 = Tree_count_keys.t02_positions
+        test_03 = Tree_count_keys.t03_upgrade_counts
+        test_04 = Tree_count_keys.t04_update_tree_without_counts
+
     class UnTree__splitters(UnTree_file1_field1):
         def setUp(self):
             super().setUp()
@@ -2958,6 +3239,12 @@ if unqlite:
         test_06 = Cursor_methods_populated_database.t06__prev
         test_07 = Cursor_methods_populated_database.t07__prev__force_search
         test_08 = Cursor_methods_populated_database.t08__setat
+        test_09 = (
+            Cursor_methods_populated_database.t09__get_position_of_key
+        )
+        test_10 = (
+            Cursor_methods_populated_database.t10__get_key_at_position
+        )
 
 
 if vedis:
@@ -3069,6 +3356,33 @@ if vedis:
         test_02 = Tree_search.t02_search__arguments
         test_03 = Tree_search.t02_search__empty_tree
 
+    class VeTree_bulk_load(VeTree_file1_field1):
+        test_01 = Tree_bulk_load.t01_bulk_load__arguments
+        test_02 = Tree_bulk_load.t02_bulk_load__tree_not_empty
+        test_03 = Tree_bulk_load.t03_bulk_load__keys_not_sorted
+        test_04 = Tree_bulk_load.t04_bulk_load__no_keys
+        test_05 = Tree_bulk_load.t05_bulk_load__solo_root
+        test_06 = Tree_bulk_load.t06_bulk_load__keys
+
+    class VeTree_node_cache(VeTree_file1_field1):
+        test_01 = Tree_node_cache.t01_node_cache__write_back
+        test_02 = Tree_node_cache.t02_node_cache__size
+        test_03 = Tree_node_cache.t03_node_cache__copy
+
+    class VeTree_count_keys(VeTree_file1_field1):
+        def setUp(self):
+            super().setUp()
+            self.tree.branching_factor = 4
+            self.keys = sorted("k" + str(i) for i in range(60))
+            for key in self.keys:
+                self.tree.insert(key)
+
+        remove_counts = Tree_count_keys.remove_counts
+        test_01 = Tree_count_keys.t01_count_keys
+        test_02 = Tree_count_keys.t02_positions
+        test_03 = Tree_count_keys.t03_upgrade_counts
+        test_04 = Tree_count_keys.t04_update_tree_without_counts
+
     class VeTree__splitters(VeTree_file1_field1):
         def setUp(self):
             super().setUp()
@@ -3222,6 +3536,12 @@ if vedis:
         test_06 = Cursor_methods_populated_database.t06__prev
         test_07 = Cursor_methods_populated_database.t07__prev__force_search
         test_08 = Cursor_methods_populated_database.t08__setat
+        test_09 = (
+            Cursor_methods_populated_database.t09__get_position_of_key
+        )
+        test_10 = (
+            Cursor_methods_populated_database.t10__get_key_at_position
+        )
 
 
 if __name__ == "__main__":
@@ -3241,6 +3561,9 @@ if __name__ == "__main__":
         runner().run(loader(UnTree_delete_branching_6))
         runner().run(loader(UnTree_locate))
         runner().run(loader(UnTree_search))
+        runner().run(loader(UnTree_bulk_load))
+        runner().run(loader(UnTree_node_cache))
+        runner().run(loader(UnTree_count_keys))
         runner().run(loader(UnTree__split_solo_root))
         runner().run(loader(UnTree__split_leaf))
         runner().run(loader(UnTree__split_root))
@@ -3269,6 +3592,9 @@ if __name__ == "__main__":
         runner().run(loader(VeTree_delete_branching_6))
         runner().run(loader(VeTree_locate))
         runner().run(loader(VeTree_search))
+        runner().run(loader(VeTree_bulk_load))
+        runner().run(loader(VeTree_node_cache))
+        runner().run(loader(VeTree_count_keys))
         runner().run(loader(VeTree__split_solo_root))
         runner().run(loader(VeTree__split_leaf))
         runner().run(loader(VeTree__split_root))
@@ -75,13 +75,15 @@ class WhereValues___init__TC(unittest.TestCase):
 
     def test___init__(self):
         w = wherevalues.WhereValues("")
-        self.assertEqual(len(w.__dict__), 6)
+        self.assertEqual(len(w.__dict__), 8)
         self.assertEqual(w.statement, "")
         self.assertEqual(w.tokens, None)
         self.assertEqual(w.node, None)
         self.assertEqual(w._error_token_offset, None)
         self.assertEqual(w._not, False)
         self.assertEqual(w._processors, None)
+        self.assertEqual(w.parsed, False)
+        self.assertEqual(w._valid_dbsets, set())
 
 
 class WhereValues_lexTC(unittest.TestCase):
@@ -747,6 +749,42 @@ class ValuesClause_apply_pattern_and_set_filters_to_valueTC(unittest.TestCase):
         )
 
 
+class ValuesClause_get_in_set_lookup_valuesTC(unittest.TestCase):
+    def setUp(self):
+        self.vc = wherevalues.ValuesClause()
+
+    def tearDown(self):
+        pass
+
+    def test_has_range(self):
+        vc = self.vc
+        self.assertEqual(vc.has_range(), False)
+        for attr in ("above_value", "below_value", "from_value", "to_value"):
+            vc = wherevalues.ValuesClause()
+            setattr(vc, attr, "a")
+            self.assertEqual(vc.has_range(), True)
+
+    def test_get_in_set_lookup_values_01(self):
+        vc = self.vc
+        self.assertEqual(vc.get_in_set_lookup_values(), None)
+        vc.in__set = {"c", "a", "b"}
+        self.assertEqual(vc.get_in_set_lookup_values(), ["a", "b", "c"])
+        vc.like_pattern = re.compile("a")
+        self.assertEqual(vc.get_in_set_lookup_values(), ["a", "b", "c"])
+
+    def test_get_in_set_lookup_values_02(self):
+        vc = self.vc
+        vc.in__set = {"c", "a", "b"}
+        vc.in_ = False
+        self.assertEqual(vc.get_in_set_lookup_values(), None)
+        vc.in_ = True
+        vc.from_value = "a"
+        self.assertEqual(vc.get_in_set_lookup_values(), None)
+        vc.from_value = None
+        vc.in__set = "abc"
+        self.assertEqual(vc.get_in_set_lookup_values(), None)
+
+
 # Emulate necessary parts of solentware_base.core.Database
 class Database:
     # Emulate ordered index values in index 'name' in file 'set' in _db.
@@ -1311,4 +1349,5 @@ if __name__ == "__main__":
     runner().run(loader(WhereValuesTC))
     runner().run(loader(ValuesClause___init__TC))
     runner().run(loader(ValuesClause_apply_pattern_and_set_filters_to_valueTC))
+    runner().run(loader(ValuesClause_get_in_set_lookup_valuesTC))
     runner().run(loader(ValuesClause_evaluate_node_resultTC))
@@ -9,7 +9,7 @@ import unittest
 from .. import _databasedu
 from ..segmentsize import SegmentSize
 from .. import record
-from .. import _bytebit
+from .. import _bytebit, bytebit
 
 
 class _Database_put_instance(unittest.TestCase):
@@ -153,11 +153,11 @@ class Database_defer_add_record_to_ebm(unittest.TestCase):
             self.database._defer_add_record_to_ebm("file1", 1, 20), None
         )
         v = self.database.existence_bit_maps["file1"]
-        self.assertIsInstance(v[1], _bytebit.Bitarray)
+        self.assertIsInstance(v[1], bytebit.Bitarray)
         self.assertEqual(
             self.database._defer_add_record_to_ebm("file1", 1, 20), None
         )
-        self.assertIsInstance(v[1], _bytebit.Bitarray)
+        self.assertIsInstance(v[1], bytebit.Bitarray)
 
 
 class Database_defer_add_record_to_field_value(unittest.TestCase):
@@ -215,14 +215,14 @@ class Database_defer_add_record_to_field_value(unittest.TestCase):
             ),
             None,
         )
-        self.assertIsInstance(v["v1"], _bytebit.Bitarray)
+        self.assertIsInstance(v["v1"], bytebit.Bitarray)
         self.assertEqual(
             self.database._defer_add_record_to_field_value(
                 "file1", "field1", "v1", 1, 4000
             ),
             None,
         )
-        self.assertIsInstance(v["v1"], _bytebit.Bitarray)
+        self.assertIsInstance(v["v1"], bytebit.Bitarray)
 
 
 class Database__prepare_segment_record_list(unittest.TestCase):
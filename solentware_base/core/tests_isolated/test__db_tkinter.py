@@ -1705,6 +1705,7 @@ class Database_make_recordset(_DBOpen):
 
         finally:
             db_tcl.tcl_tk_call((cursor, "close"))
+        self.database.index_record_count["file1", "field1"].create_counts()
 
     def tearDown(self):
         self.database.commit()
@@ -1761,12 +1762,12 @@ class Database_make_recordset(_DBOpen):
             TypeError,
             "".join(
                 (
-                    r"recordlist_key\(\) takes from 3 to 5 ",
-                    "positional arguments but 6 were given$",
+                    r"recordlist_key\(\) takes from 3 to 6 ",
+                    "positional arguments but 7 were given$",
                 )
             ),
             self.database.recordlist_key,
-            *(None, None, None, None, None),
+            *(None, None, None, None, None, None),
         )
         self.assertRaisesRegex(
             TypeError,
@@ -1783,12 +1784,12 @@ class Database_make_recordset(_DBOpen):
             TypeError,
             "".join(
                 (
-                    r"recordlist_key_range\(\) takes from 3 to 8 ",
-                    "positional arguments but 9 were given$",
+                    r"recordlist_key_range\(\) takes from 3 to 9 ",
+                    "positional arguments but 10 were given$",
                 )
             ),
             self.database.recordlist_key_range,
-            *(None, None, None, None, None, None, None, None),
+            *(None, None, None, None, None, None, None, None, None),
         )
         self.assertRaisesRegex(
             TypeError,
@@ -2708,6 +2709,121 @@ class RecordsetCursor(_DBOpen):
         self.assertEqual(rc._get_record(155), (155, "155Any value"))
 
 
+def _count_records(database, partial=None):
+    cursor = database.database_cursor("file1", "field1")
+    try:
+        if partial is not None:
+            cursor.set_partial_key(partial)
+        return cursor.count_records()
+    finally:
+        cursor.close()
+
+
+def _key_counts(database):
+    irc = database.index_record_count["file1", "field1"]
+    counts = []
+    command = [irc.key_count_table, "cursor"]
+    if database.dbtxn:
+        command.extend(["-txn", database.dbtxn])
+    cursor = db_tcl.tcl_tk_call(tuple(command))
+    try:
+        record = db_tcl.tcl_tk_call((cursor, "get", "-first"))
+        while record:
+            key, value = record[0]
+            counts.append((key, int.from_bytes(value, byteorder="big")))
+            record = db_tcl.tcl_tk_call((cursor, "get", "-next"))
+    finally:
+        db_tcl.tcl_tk_call((cursor, "close"))
+    return counts
+
+
+class IndexRecordCount(_DBOpen):
+    def test_01_counts_exist(self):
+        irc = self.database.index_record_count["file1", "field1"]
+        self.assertIsInstance(irc, _db_tkinter.IndexRecordCount)
+        self.assertEqual(irc.changes, None)
+        self.assertEqual(irc.counts_exist(), True)
+        self.assertEqual(_count_records(self.database), 0)
+        self.assertEqual(_key_counts(self.database), [])
+
+    def test_02_add_and_remove_record(self):
+        self.database.start_transaction()
+        for key, record_number in (
+            ("ab", 1),
+            ("ab", 2),
+            ("ab", 2),
+            ("ac", 3),
+            ("bc", 4),
+        ):
+            self.database.add_record_to_field_value(
+                "file1", "field1", key, 0, record_number
+            )
+        self.database.add_record_to_field_value("file1", "field1", "ab", 1, 5)
+        self.assertEqual(
+            self.database.index_record_count["file1", "field1"].changes,
+            {b"ab": 3, b"ac": 1, b"bc": 1},
+        )
+        self.assertEqual(_count_records(self.database), 5)
+        self.assertEqual(_count_records(self.database, partial="a"), 4)
+        self.database.remove_record_from_field_value(
+            "file1", "field1", "ac", 0, 3
+        )
+        self.database.remove_record_from_field_value(
+            "file1", "field1", "ab", 0, 1
+        )
+        self.database.remove_record_from_field_value(
+            "file1", "field1", "ab", 0, 1
+        )
+        self.database.commit()
+        self.assertEqual(
+            self.database.index_record_count["file1", "field1"].changes, None
+        )
+        self.assertEqual(_count_records(self.database), 3)
+        self.assertEqual(_count_records(self.database, partial="a"), 2)
+        self.assertEqual(
+            _key_counts(self.database), [(b"ab", 2), (b"bc", 1)]
+        )
+
+    def test_03_backout(self):
+        self.database.start_transaction()
+        self.database.add_record_to_field_value("file1", "field1", "ab", 0, 1)
+        self.database.commit()
+        self.database.start_transaction()
+        self.database.add_record_to_field_value("file1", "field1", "ab", 0, 2)
+        self.database.add_record_to_field_value("file1", "field1", "ac", 0, 3)
+        self.assertEqual(_count_records(self.database), 3)
+        self.database.add_record_to_field_value("file1", "field1", "ad", 0, 4)
+        self.database.backout()
+        self.assertEqual(_count_records(self.database), 1)
+        self.assertEqual(_key_counts(self.database), [(b"ab", 1)])
+
+    def test_04_create_counts(self):
+        self.database.start_transaction()
+        for key, record_number in (("ab", 1), ("ab", 2), ("ac", 3)):
+            self.database.add_record_to_field_value(
+                "file1", "field1", key, 0, record_number
+            )
+        irc = self.database.index_record_count["file1", "field1"]
+        irc.flush_cache()
+        db_tcl.tcl_tk_call(
+            (
+                self.database.table[CONTROL_FILE],
+                "del",
+                "-txn",
+                self.database.dbtxn,
+                b"Cfile1_field1",
+            )
+        )
+        self.assertEqual(irc.counts_exist(), False)
+        irc.create_counts()
+        self.assertEqual(irc.counts_exist(), True)
+        self.assertEqual(_count_records(self.database), 3)
+        self.assertEqual(
+            _key_counts(self.database), [(b"ab", 2), (b"ac", 1)]
+        )
+        self.database.commit()
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner
     loader = unittest.defaultTestLoader.loadTestsFromTestCase
@@ -2740,3 +2856,4 @@ if __name__ == "__main__":
         runner().run(loader(Database_freed_record_number))
         runner().run(loader(Database_empty_freed_record_number))
         runner().run(loader(RecordsetCursor))
+        runner().run(loader(IndexRecordCount))
@@ -1196,6 +1196,16 @@ class Database_delete_index(_DBOpen):
             self.database.delete_index("file1", "field1") is None, True
         )
 
+    def test_delete_index_02(self):
+        self.database.start_transaction()
+        self.database.add_record_to_field_value("file1", "field1", "a", 0, 1)
+        irc = self.database.index_record_count["file1", "field1"]
+        self.assertEqual(irc.count_records(), 1)
+        self.database.delete_index("file1", "field1")
+        self.assertEqual(irc.count_records(), 0)
+        self.assertEqual(irc.count_records(partial=b"a"), 0)
+        self.database.commit()
+
 
 class Database_find_value_segments(_DBOpen):
     def test_01(self):
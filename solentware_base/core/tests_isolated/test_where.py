@@ -6,6 +6,9 @@
 
 import unittest
 import re
+import os
+import sys
+import subprocess
 
 from .. import where
 from ..find import Find
@@ -187,13 +190,15 @@ class WhereTC(unittest.TestCase):
 
     def test___init__(self):
         w = where.Where("")
-        self.assertEqual(len(w.__dict__), 7)
+        self.assertEqual(len(w.__dict__), 9)
         self.assertEqual(w.statement, "")
         self.assertEqual(w.node, None)
         self.assertEqual(w.tokens, None)
         self.assertEqual(w._processors, None)
         self.assertEqual(w._f_or_v, None)
         self.assertEqual(w._not, None)
+        self.assertEqual(w.parsed, False)
+        self.assertEqual(w._valid_dbsets, set())
         self.assertIsInstance(w._error_information, where.WhereStatementError)
         self.assertEqual(w._error_information._statement, "")
         self.assertEqual(w._error_information._tokens, None)
@@ -801,6 +806,8 @@ class Where_errorTC(unittest.TestCase):
                     "tokens",
                     "_f_or_v",
                     "_not",
+                    "parsed",
+                    "_valid_dbsets",
                 )
             ),
         )
@@ -10082,9 +10089,24 @@ class ProcessorsTC(unittest.TestCase):
         # Find as helpers, within other methods, which are meaningless
         # in Processors.
         # Those other methods in Processors do not need the help.
+        # Processors does not provide the optional compiled evaluation of
+        # non-index conditions so Where evaluates them a record at a time.
+        # Processors does not provide the optional estimate of answer size
+        # so Where evaluates index conditions in query order.
         self.assertEqual(
             set(Find.__dict__) - set(Processors.__dict__),
-            {"dbset", "db"},
+            {
+                "dbset",
+                "db",
+                "estimate",
+                "compile_non_index_condition",
+                "evaluate_non_index_conditions",
+                "_compile_is_not",
+                "_compile_ne",
+                "_compile_present",
+                "_compile_like",
+                "_compile_starts",
+            },
             msg=msg,
         )
 
@@ -10167,6 +10189,33 @@ class ProcessorsTC(unittest.TestCase):
             self.assertEqual(v.__name__, f.boolean_operation[k].__name__)
 
 
+class Where_headlessTC(unittest.TestCase):
+    def test_import_without_tkinter(self):
+        script = "\n".join(
+            (
+                "import sys",
+                "sys.modules['tkinter'] = None",
+                "from solentware_base.core import _sqlite, where",
+                "w = where.Where('f eq ?a?')",
+                "w.lex()",
+                "w.parse()",
+                "w.fill_placeholders(replacements={'?a?': 'v'})",
+                "print(w.node.down.value)",
+                "print('solentware_base.core.wheredialog' in sys.modules)",
+            )
+        )
+        output = subprocess.run(
+            (sys.executable, "-c", script),
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(
+                os.path.dirname(os.path.dirname(where.__file__))
+            ),
+        ).stdout.split()
+        self.assertEqual(output, ["v", "False"])
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner
     loader = unittest.defaultTestLoader.loadTestsFromTestCase
@@ -10191,3 +10240,4 @@ if __name__ == "__main__":
 
     runner().run(loader(Where_evaluateTC))
     runner().run(loader(ProcessorsTC))
+    runner().run(loader(Where_headlessTC))
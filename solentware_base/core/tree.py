@@ -11,6 +11,7 @@ UnQLite and Vedis.
 
 from bisect import bisect_right, bisect_left
 from ast import literal_eval
+from collections import OrderedDict
 
 from .constants import (
     SUBFILE_DELIMITER,
@@ -41,8 +42,19 @@ class Tree:
 
     The tree provides ordered access to the values of a field.  It can, and
     should, be ignored when accessing data once the relevant key is known.
+
+    Decoded nodes are kept in a cache of up to node_cache_size nodes.  After
+    start_write_back() modified nodes are held in memory until write_back()
+    or stop_write_back() is called: the _nosql Database does these at the
+    start and end of transactions.
+
+    Root and branch nodes hold the number of keys in the subtree referenced
+    by each entry, so Cursor can find the key at a position, or the position
+    of a key, reading one node per level of the tree.
     """
 
+    node_cache_size = 256
+
     def __init__(self, file, field, database):
         """Note file, field, and database."""
         self.file = file
@@ -64,6 +76,9 @@ class Tree:
             if isinstance(v, dict)
         }[field.lower()]
         self._next_node = None
+        self._node_cache = OrderedDict()
+        self._dirty_nodes = {}
+        self._write_back = False
 
     @property
     def next_node(self):
@@ -85,6 +100,11 @@ class Tree:
         numbers of data records indexed by the key.
 
         """
+        if self._insert_key(key):
+            self._count_keys_on_path(key)
+
+    def _insert_key(self, key):
+        # Return True if key is inserted into tree.
         # Assume key is in tree if this record exists.
         # Cooperation with _nosql.Database.add_record_to_field_value() method.
         # if SUBFILE_DELIMITER.join((self.key_segment, key)
@@ -105,15 +125,15 @@ class Tree:
         assert node_type in (_Node.LEAF, _Node.SOLO_ROOT)
         insertion_point = bisect_left(keys, key)
         if insertion_point != len(keys) and keys[insertion_point] == key:
-            return
+            return False
         if node_type == _Node.LEAF:
             if len(node) < self.branching_factor - 1:
                 keys.insert(insertion_point, key)
                 self._write_node(node.node)
-                return
+                return True
             splitter = self._split_leaf(key, nodepath, insertion_point)
             if splitter is None:
-                return
+                return True
             tailpath = []
             while True:
                 tailpath.insert(0, nodepath.pop())
@@ -127,13 +147,13 @@ class Tree:
                     nodepath.extend(
                         tailpath
                     )  # Assume worth preserve nodepath.
-                    return
+                    return True
                 if node.node[_Node.NODE_TYPE] == _Node.ROOT:
                     self._split_root(nodepath, splitter)
                     nodepath.extend(
                         tailpath
                     )  # Assume worth preserve nodepath.
-                    return
+                    return True
                 splitter = self._split_branch(nodepath, splitter)
         if len(node) < self.branching_factor - 1:
             if len(node) == 0:
@@ -142,9 +162,9 @@ class Tree:
                 )
             keys.insert(insertion_point, key)
             self._write_root(node.node)
-            return
+            return True
         self._split_solo_root(key, nodepath, insertion_point)
-        return
+        return True
 
     def delete(self, key):
         """Delete key from the tree if no record references exist."""
@@ -159,20 +179,28 @@ class Tree:
                     ("Cannot delete '", key, "' because it refers to records")
                 )
             )
+        leaf = self._delete_key(key)
+        if leaf is not None and leaf.node[_Node.NODE_TYPE] == _Node.LEAF:
+            # The splitter for a leaf may no longer be the leaf's first key
+            # so locate the leaf by a key which is still in it.
+            self._count_keys_on_path(leaf.node[_Node.KEYS][0])
+
+    def _delete_key(self, key):
+        # Return the leaf node key was deleted from, or None.
         nodepath = self.search(key)
         try:
             node = nodepath[-1]
         except TypeError:
             if nodepath is None:
                 # Deleting from an empty tree.
-                return
+                return None
             raise
         node_type = node.node[_Node.NODE_TYPE]
         assert node_type in (_Node.LEAF, _Node.SOLO_ROOT)
         keys = node.node[_Node.KEYS]
         deletion_point = bisect_left(keys, key)
         if deletion_point == len(keys) or keys[deletion_point] != key:
-            return
+            return None
         if node_type == _Node.LEAF:
             # len(node) equals number of entries.
             if len(node) > self.branching_factor // 2:
@@ -182,9 +210,9 @@ class Tree:
                 del keys[deletion_point]
                 node.modified = True
                 self._write_modified_nodes(nodepath)
-                return
+                return node
             if self._merge_leaf(key, nodepath, deletion_point) is None:
-                return
+                return node
             # merge_leaf resolves all cases where there are no branch nodes.
             tailpath = []
             while True:
@@ -199,14 +227,198 @@ class Tree:
                 if self._merge_branch(nodepath) is None:
                     break
             nodepath.extend(tailpath)  # Assume worth preserve nodepath.
-            return
+            return node
         del keys[deletion_point]
         if len(keys):
             self._write_root(node.node)
         else:
             self._delete_root()
             del self.database.dbenv[self.high_node]
-        return
+        return node
+
+    def bulk_load(self, keys):
+        """Build the tree from keys, which must be sorted and unique.
+
+        The tree must be empty.  The nodes are built bottom up, each level
+        left to right, with keys spread evenly over the leaves so the tree
+        is the same shape as one built by insert() with fewer splits.
+
+        """
+        if self.get_root() is not None:
+            raise TreeError("Cannot bulk load a tree which is not empty")
+        for previous, key in zip(keys, keys[1:]):
+            if previous >= key:
+                raise TreeError(
+                    "".join(
+                        (
+                            "Keys for bulk load are not sorted and unique ",
+                            "at '",
+                            key,
+                            "'",
+                        )
+                    )
+                )
+        if not keys:
+            return
+        leaf_size = self.branching_factor - 1
+        if len(keys) <= leaf_size:
+            self.database.dbenv[self.high_node] = repr(0)
+            self._write_root(
+                _Node(0, _Node.SOLO_ROOT, keys=list(keys)).node
+            )
+            return
+        self._next_node = -1
+        level = []
+        for start, end in _even_groups(len(keys), leaf_size):
+            node_number = self.next_node
+            level.append(
+                _Node(
+                    node_number,
+                    _Node.LEAF,
+                    left=node_number - 1 if start else None,
+                    right=node_number + 1 if end < len(keys) else None,
+                    keys=keys[start:end],
+                )
+            )
+        minimum_keys = [node.node[_Node.KEYS][0] for node in level]
+        key_counts = [len(node.node[_Node.KEYS]) for node in level]
+        while len(level) > self.branching_factor:
+            for node in level:
+                self._write_node(node.node)
+            branches = []
+            branch_minimum_keys = []
+            for start, end in _even_groups(len(level), self.branching_factor):
+                branches.append(
+                    _Node(
+                        self.next_node,
+                        _Node.BRANCH,
+                        keys=minimum_keys[start + 1 : end],
+                        entries=[
+                            node.node[_Node.NODE_NUMBER]
+                            for node in level[start:end]
+                        ],
+                        counts=key_counts[start:end],
+                    )
+                )
+                branch_minimum_keys.append(minimum_keys[start])
+            level = branches
+            minimum_keys = branch_minimum_keys
+            key_counts = [node.count_keys() for node in level]
+        for node in level:
+            self._write_node(node.node)
+        root = _Node(
+            self.next_node,
+            _Node.ROOT,
+            keys=minimum_keys[1:],
+            entries=[node.node[_Node.NODE_NUMBER] for node in level],
+            counts=key_counts,
+        )
+        self.database.dbenv[self.high_node] = repr(self._next_node)
+        self._write_root(root.node)
+
+    def count_keys(self):
+        """Return number of keys in tree."""
+        root = self.get_root(copy=False)
+        if root is None:
+            return 0
+        node = _Node(*root)
+        count = node.count_keys()
+        if count is not None:
+            return count
+        return sum(
+            self._count_keys_in_subtree(entry, write=False)
+            if count is None
+            else count
+            for entry, count in zip(root[_Node.ENTRIES], node.get_counts())
+        )
+
+    def upgrade_counts(self):
+        """Recalculate the key counts in root and branch nodes.
+
+        Trees built before key counts were kept in root and branch nodes
+        are given counts, which makes Cursor positional methods quicker.
+
+        Return the number of nodes rewritten.
+
+        """
+        root = self.get_root()
+        if root is None or root[_Node.NODE_TYPE] in _Node.LEAF_NODES:
+            return 0
+        counts = []
+        rewritten = 0
+        for entry in root[_Node.ENTRIES]:
+            count, upgraded = self._recount_subtree(entry)
+            counts.append(count)
+            rewritten += upgraded
+        if root[_Node.COUNTS :] != [counts]:
+            del root[_Node.COUNTS :]
+            root.append(counts)
+            self._write_root(root)
+            rewritten += 1
+        return rewritten
+
+    def _recount_subtree(self, node_number):
+        # Return count of keys in subtree and number of nodes rewritten.
+        nodedata = self.get_node(node_number)
+        if nodedata[_Node.NODE_TYPE] in _Node.LEAF_NODES:
+            return len(nodedata[_Node.KEYS]), 0
+        counts = []
+        rewritten = 0
+        for entry in nodedata[_Node.ENTRIES]:
+            count, upgraded = self._recount_subtree(entry)
+            counts.append(count)
+            rewritten += upgraded
+        if nodedata[_Node.COUNTS :] != [counts]:
+            del nodedata[_Node.COUNTS :]
+            nodedata.append(counts)
+            self._write_node(nodedata)
+            rewritten += 1
+        return sum(counts), rewritten
+
+    def _count_keys_in_subtree(self, node_number, write=True):
+        # Return count of keys in subtree, calculating counts not known.
+        # The calculated counts are written to database if write is True.
+        node = _Node(*self.get_node(node_number, copy=write))
+        if node.node[_Node.NODE_TYPE] in _Node.LEAF_NODES:
+            return len(node.node[_Node.KEYS])
+        counts = node.get_counts()
+        if None not in counts:
+            return sum(counts)
+        if not write:
+            counts = counts.copy()
+        for index, entry in enumerate(node.node[_Node.ENTRIES]):
+            if counts[index] is None:
+                counts[index] = self._count_keys_in_subtree(entry, write=write)
+        if write:
+            self._write_node(node.node)
+        return sum(counts)
+
+    def _count_keys_on_path(self, key):
+        # Set the key counts in root and branch nodes on path to key.
+        # The count for the entry on the path is recalculated, and counts
+        # set None by splits and merges are calculated from the subtree.
+        nodepath = self.search(key)
+        if nodepath is None:
+            return
+        child_number = None
+        child_count = None
+        for node in reversed(nodepath):
+            nodedata = node.node
+            if nodedata[_Node.NODE_TYPE] not in _Node.LEAF_NODES:
+                counts = node.get_counts()
+                original = counts.copy()
+                for index, entry in enumerate(nodedata[_Node.ENTRIES]):
+                    if entry == child_number:
+                        counts[index] = child_count
+                    elif counts[index] is None:
+                        counts[index] = self._count_keys_in_subtree(entry)
+                if counts != original:
+                    if nodedata[_Node.NODE_TYPE] == _Node.ROOT:
+                        self._write_root(nodedata)
+                    else:
+                        self._write_node(nodedata)
+            child_number = nodedata[_Node.NODE_NUMBER]
+            child_count = node.count_keys()
 
     def locate(self, key):
         """Return key and location in the tree if present."""
@@ -222,8 +434,7 @@ class Tree:
         # bisect_right because if keys[n+1] > key >= keys[n] then the entry
         # where key will be found is entries[n+1] (all keys >= keys[-1] are
         # found in entries[-1] and all keys < keys[0] are found in entries[0]).
-        # root = literal_eval(self.database.dbenv[self.key_root].decode())
-        root = literal_eval(self.read_root().decode())
+        root = self.get_root()
         if root is None:
             return None
         nodepath = [_Node(*root)]
@@ -235,24 +446,20 @@ class Tree:
             if type_ == _Node.BRANCH:
                 nodepath.append(
                     _Node(
-                        *literal_eval(
-                            self.read_node(
-                                tip[_Node.ENTRIES][
-                                    bisect_right(tip[_Node.KEYS], key)
-                                ]
-                            ).decode()
+                        *self.get_node(
+                            tip[_Node.ENTRIES][
+                                bisect_right(tip[_Node.KEYS], key)
+                            ]
                         )
                     )
                 )
             elif type_ == _Node.ROOT:
                 nodepath.append(
                     _Node(
-                        *literal_eval(
-                            self.read_node(
-                                tip[_Node.ENTRIES][
-                                    bisect_right(tip[_Node.KEYS], key)
-                                ]
-                            ).decode()
+                        *self.get_node(
+                            tip[_Node.ENTRIES][
+                                bisect_right(tip[_Node.KEYS], key)
+                            ]
                         )
                     )
                 )
@@ -303,6 +510,7 @@ class Tree:
             _Node.ROOT,
             keys=[nkeys[-split]],
             entries=[lln.node[nnumber], rln.node[nnumber]],
+            counts=[len(nkeys) - split, split],
         )
         self.database.dbenv[self.high_node] = repr(self._next_node)
         self._write_root(root_node.node)
@@ -344,7 +552,7 @@ class Tree:
             keys=nkeys[:-split],
         )
         if nright is not None:
-            rsrln = literal_eval(self.read_node(nright).decode())
+            rsrln = self.get_node(nright)
             rsrln[_Node.LEFT_SIBLING_NODE_NUMBER] = right_node_number
             self._write_node(rsrln)
         self.database.dbenv[self.high_node] = repr(self._next_node)
@@ -364,6 +572,7 @@ class Tree:
         assert len(nkeys) == self.branching_factor - 1
         split = self.branching_factor // 2
         insertion_point = node.insert_into_branch_or_root(*splitter)
+        ncounts = node.node[_Node.COUNTS]
         self._next_node = literal_eval(
             self.database.dbenv[self.high_node].decode()
         )
@@ -373,12 +582,14 @@ class Tree:
             _Node.BRANCH,
             keys=nkeys[-split:],
             entries=node_node[_Node.ENTRIES][-split - 1 :],
+            counts=ncounts[-split - 1 :],
         )
         lbn = _Node(
             node_node[nnumber],
             _Node.BRANCH,
             keys=nkeys[: -split - 1],
             entries=node_node[_Node.ENTRIES][: -split - 1],
+            counts=ncounts[: -split - 1],
         )
         root_node_number = self.next_node
         root_node = _Node(
@@ -386,6 +597,7 @@ class Tree:
             _Node.ROOT,
             keys=[nkeys[-split - 1]],
             entries=[lbn.node[nnumber], rbn.node[nnumber]],
+            counts=[lbn.count_keys(), rbn.count_keys()],
         )
         self.database.dbenv[self.high_node] = repr(self._next_node)
         self._write_root(root_node.node)
@@ -407,6 +619,7 @@ class Tree:
         assert len(nkeys) == self.branching_factor - 1
         split = self.branching_factor // 2
         insertion_point = node.insert_into_branch_or_root(*splitter)
+        ncounts = node.node[_Node.COUNTS]
         self._next_node = literal_eval(
             self.database.dbenv[self.high_node].decode()
         )
@@ -416,12 +629,14 @@ class Tree:
             _Node.BRANCH,
             keys=nkeys[-split:],
             entries=node_node[_Node.ENTRIES][-split - 1 :],
+            counts=ncounts[-split - 1 :],
         )
         lbn = _Node(
             node_node[nnumber],
             _Node.BRANCH,
             keys=nkeys[: -split - 1],
             entries=node_node[_Node.ENTRIES][: -split - 1],
+            counts=ncounts[: -split - 1],
         )
         self.database.dbenv[self.high_node] = repr(self._next_node)
         self._write_node(rbn.node)
@@ -432,46 +647,133 @@ class Tree:
             nodepath[-1] = lbn  # Assume it is worth preserving nodepath.
         return nkeys[-split - 1], right_node_number
 
-    # Anticipate maintaining a cache of _Node.node objects.
     def read_root(self):
         """Return root node, or b"None" if root node does not exist."""
         try:
-            return self.database.dbenv[self.key_root]
+            return self._read_bytes(self.key_root)
         except KeyError:
             return b"None"
 
-    # Anticipate maintaining a cache of _Node.node objects.
+    def get_root(self, copy=True):
+        """Return decoded root node, or None if there is no root.
+
+        A copy is returned unless copy is False, when the node must not be
+        modified.
+
+        """
+        try:
+            return self._read_decoded(self.key_root, copy=copy)
+        except KeyError:
+            return None
+
     def _write_root(self, nodedata):
-        self.database.dbenv[self.key_root] = repr(nodedata)
+        self._write(self.key_root, nodedata)
 
-    # Anticipate maintaining a cache of _Node.node objects.
     def read_node(self, node_number):
         """Return node referenced by node_number."""
-        return self.database.dbenv[
+        return self._read_bytes(
             SUBFILE_DELIMITER.join((self.key_node, str(node_number)))
-        ]
+        )
+
+    def get_node(self, node_number, copy=True):
+        """Return decoded node referenced by node_number.
+
+        A copy is returned unless copy is False, when the node must not be
+        modified.
+
+        """
+        return self._read_decoded(
+            SUBFILE_DELIMITER.join((self.key_node, str(node_number))),
+            copy=copy,
+        )
 
-    # Anticipate maintaining a cache of _Node.node objects.
     def _write_node(self, nodedata):
-        self.database.dbenv[
+        self._write(
             SUBFILE_DELIMITER.join(
                 (self.key_node, str(nodedata[_Node.NODE_NUMBER]))
-            )
-        ] = repr(nodedata)
+            ),
+            nodedata,
+        )
 
-    # Anticipate maintaining a cache of _Node.node objects.
     def _delete_root(self):
-        try:
-            del self.database.dbenv[self.key_root]
-        except KeyError:
-            pass
+        self._delete(self.key_root)
 
-    # Anticipate maintaining a cache of _Node.node objects.
     def _delete_node(self, node_number):
+        self._delete(SUBFILE_DELIMITER.join((self.key_node, str(node_number))))
+
+    def start_write_back(self):
+        """Hold modified nodes in memory until write_back() is called."""
+        self._write_back = True
+
+    def stop_write_back(self):
+        """Write modified nodes to database and stop holding them."""
+        self.write_back()
+        self._write_back = False
+
+    def write_back(self):
+        """Write modified nodes held in memory to database."""
+        dbenv = self.database.dbenv
+        for key, nodedata in self._dirty_nodes.items():
+            if nodedata is None:
+                try:
+                    del dbenv[key]
+                except KeyError:
+                    pass
+            else:
+                dbenv[key] = repr(nodedata)
+        self._dirty_nodes.clear()
+
+    def clear_node_cache(self):
+        """Discard decoded nodes, after write_back() if nodes are modified."""
+        self._node_cache.clear()
+
+    def _read_bytes(self, key):
+        if key in self._dirty_nodes:
+            nodedata = self._dirty_nodes[key]
+            if nodedata is None:
+                raise KeyError(key)
+            return repr(nodedata).encode()
+        return self.database.dbenv[key]
+
+    def _read_decoded(self, key, copy=True):
+        # Callers which may modify the node get a copy so the cached node
+        # is changed only by _write() and _delete().
+        cache = self._node_cache
+        if key in self._dirty_nodes:
+            nodedata = self._dirty_nodes[key]
+            if nodedata is None:
+                raise KeyError(key)
+        elif key in cache:
+            nodedata = cache[key]
+            cache.move_to_end(key)
+        else:
+            nodedata = literal_eval(self.database.dbenv[key].decode())
+            cache[key] = nodedata
+            if len(cache) > self.node_cache_size:
+                cache.popitem(last=False)
+        if copy:
+            return _copy_node(nodedata)
+        return nodedata
+
+    def _write(self, key, nodedata):
+        nodedata = _copy_node(nodedata)
+        if self._write_back:
+            self._dirty_nodes[key] = nodedata
+        else:
+            self.database.dbenv[key] = repr(nodedata)
+        cache = self._node_cache
+        cache[key] = nodedata
+        cache.move_to_end(key)
+        if len(cache) > self.node_cache_size:
+            cache.popitem(last=False)
+
+    def _delete(self, key):
+        self._node_cache.pop(key, None)
+        if self._write_back:
+            self._dirty_nodes[key] = None
+            return
         try:
-            del self.database.dbenv[
-                SUBFILE_DELIMITER.join((self.key_node, str(node_number)))
-            ]
+            del self.database.dbenv[key]
         except KeyError:
             pass
 
@@ -526,7 +828,7 @@ class Tree:
         if offset < len(entries) - 1:
             # Take key from right sibling if possible.
             right_sibling = _Node(
-                *literal_eval(self.read_node(entries[offset + 1]).decode())
+                *self.get_node(entries[offset + 1])
             )
             if len(right_sibling) > self.branching_factor // 2:
                 keys = node.node[_Node.KEYS]
@@ -540,7 +842,9 @@ class Tree:
                 del keys[deletion_point]
                 keys.append(sibling_keys.pop(0))
                 splitter.node[_Node.KEYS][split_offset] = sibling_keys[0]
+                parent.get_counts()[offset + 1] = None
                 node.modified = True
+                parent.modified = True
                 splitter.modified = True
                 right_sibling.modified = True
                 self._write_modified_nodes(nodepath)
@@ -549,7 +853,7 @@ class Tree:
         if offset > 0:
             # Take key from left sibling if possible.
             left_sibling = _Node(
-                *literal_eval(self.read_node(entries[offset - 1]).decode())
+                *self.get_node(entries[offset - 1])
             )
             if len(left_sibling) > self.branching_factor // 2:
                 keys = node.node[_Node.KEYS]
@@ -562,7 +866,9 @@ class Tree:
                 del keys[deletion_point]
                 keys.insert(0, left_sibling.node[_Node.KEYS].pop())
                 splitter.node[_Node.KEYS][split_offset] = keys[0]
+                parent.get_counts()[offset - 1] = None
                 node.modified = True
+                parent.modified = True
                 splitter.modified = True
                 left_sibling.modified = True
                 self._write_modified_nodes(nodepath)
@@ -583,15 +889,14 @@ class Tree:
             rsrsnn = right_sibling.node[_Node.RIGHT_SIBLING_NODE_NUMBER]
             node.node[_Node.RIGHT_SIBLING_NODE_NUMBER] = rsrsnn
             if rsrsnn is not None:
-                rsrsnode = _Node(
-                    *literal_eval(self.read_node(rsrsnn).decode())
-                )
+                rsrsnode = _Node(*self.get_node(rsrsnn))
                 rsrsnode.node[_Node.LEFT_SIBLING_NODE_NUMBER] = node.node[
                     _Node.NODE_NUMBER
                 ]
                 rsrsnode.modified = True
                 self._write_modified_nodes([rsrsnode])
             del splitter.node[_Node.KEYS][split_offset]
+            del splitter.get_counts()[split_offset + 1]
             # In case parent is also the splitter, which is likely.
             db_offset = entries[offset + 1]
             del splitter.node[_Node.ENTRIES][split_offset + 1]
@@ -612,15 +917,14 @@ class Tree:
             lslsnn = left_sibling.node[_Node.LEFT_SIBLING_NODE_NUMBER]
             node.node[_Node.LEFT_SIBLING_NODE_NUMBER] = lslsnn
             if lslsnn is not None:
-                lslsnode = _Node(
-                    *literal_eval(self.read_node(lslsnn).decode())
-                )
+                lslsnode = _Node(*self.get_node(lslsnn))
                 lslsnode.node[_Node.RIGHT_SIBLING_NODE_NUMBER] = node.node[
                     _Node.NODE_NUMBER
                 ]
                 lslsnode.modified = True
                 self._write_modified_nodes([lslsnode])
             del splitter.node[_Node.KEYS][split_offset]
+            del splitter.get_counts()[split_offset]
             # In case parent is also the splitter, which is likely.
             db_offset = entries[offset - 1]
             del splitter.node[_Node.ENTRIES][split_offset]
@@ -647,16 +951,18 @@ class Tree:
         if offset < len(entries) - 1:
             # Take entry from right sibling if possible.
             right_sibling = _Node(
-                *literal_eval(self.read_node(entries[offset + 1]).decode())
+                *self.get_node(entries[offset + 1])
             )
             if len(right_sibling) + 1 > self.branching_factor // 2:
                 node.node[_Node.KEYS].append(parent.node[_Node.KEYS][offset])
                 parent.node[_Node.KEYS][offset] = right_sibling.node[
                     _Node.KEYS
                 ].pop(0)
+                node.get_counts().append(right_sibling.get_counts().pop(0))
                 node.node[_Node.ENTRIES].append(
                     right_sibling.node[_Node.ENTRIES].pop(0)
                 )
+                parent.get_counts()[offset + 1] = None
                 node.modified = True
                 parent.modified = True
                 right_sibling.modified = True
@@ -666,7 +972,7 @@ class Tree:
         if offset > 0:
             # Take entry from left sibling if possible.
             left_sibling = _Node(
-                *literal_eval(self.read_node(entries[offset - 1]).decode())
+                *self.get_node(entries[offset - 1])
             )
             if len(left_sibling) + 1 > self.branching_factor // 2:
                 node.node[_Node.KEYS].insert(
@@ -675,9 +981,11 @@ class Tree:
                 parent.node[_Node.KEYS][offset - 1] = left_sibling.node[
                     _Node.KEYS
                 ].pop()
+                node.get_counts().insert(0, left_sibling.get_counts().pop())
                 node.node[_Node.ENTRIES].insert(
                     0, left_sibling.node[_Node.ENTRIES].pop()
                 )
+                parent.get_counts()[offset - 1] = None
                 node.modified = True
                 parent.modified = True
                 left_sibling.modified = True
@@ -686,6 +994,8 @@ class Tree:
                 return None
         if offset < len(entries) - 1:
             # Merge right sibling into nodepath[-1].
+            node.get_counts().extend(right_sibling.get_counts())
+            del parent.get_counts()[offset + 1]
             node.node[_Node.KEYS].append(parent.node[_Node.KEYS].pop(offset))
             del entries[entries.index(right_sibling.node[_Node.NODE_NUMBER])]
             node.node[_Node.ENTRIES].extend(right_sibling.node[_Node.ENTRIES])
@@ -697,6 +1007,10 @@ class Tree:
             self._write_modified_nodes(nodepath)
         else:
             # Merge left sibling into nodepath[-1].
+            node.node[_Node.COUNTS] = (
+                left_sibling.get_counts() + node.get_counts()
+            )
+            del parent.get_counts()[offset - 1]
             node.node[_Node.KEYS].insert(
                 0, parent.node[_Node.KEYS].pop(offset - 1)
             )
@@ -757,34 +1071,79 @@ class Cursor:
 
     def first(self):
         """Move cursor to first record."""
-        node = literal_eval(self.tree.read_root().decode())
+        node = self.tree.get_root(copy=False)
         if node is None:
             return None
         while node[_Node.NODE_TYPE] not in _Node.LEAF_NODES:
-            node = literal_eval(
-                self.tree.read_node(node[_Node.ENTRIES][0]).decode()
-            )
+            node = self.tree.get_node(node[_Node.ENTRIES][0], copy=False)
         self.current_key_node_number = node[_Node.NODE_NUMBER]
         self.current_key = node[_Node.KEYS][0]
         return self.current_key
 
     def get_position_of_key(self, key=None):
-        """Not implemented."""
-        raise TreeError("Cursor.get_position_of_key() not implemented yet")
+        """Return number of keys in tree less than key, or 0 if key is None.
+
+        This is the position of key, counting from 0, if key is in the tree.
+
+        """
+        if key is None:
+            return 0
+        tree = self.tree
+        node = tree.get_root(copy=False)
+        if node is None:
+            return 0
+        position = 0
+        while node[_Node.NODE_TYPE] not in _Node.LEAF_NODES:
+            index = bisect_right(node[_Node.KEYS], key)
+            entries = node[_Node.ENTRIES]
+            counts = _Node(*node).get_counts()
+            for entry, count in zip(entries[:index], counts):
+                if count is None:
+                    count = tree._count_keys_in_subtree(entry, write=False)
+                position += count
+            node = tree.get_node(entries[index], copy=False)
+        return position + bisect_left(node[_Node.KEYS], key)
 
     def get_key_at_position(self, position=None):
-        """Not implemented."""
-        raise TreeError("Cursor.get_key_at_position() not implemented yet")
+        """Move cursor to key at position and return key, or None.
+
+        Positions count from 0 at the first key, and from -1 at the last key.
+
+        """
+        if position is None:
+            return None
+        tree = self.tree
+        node = tree.get_root(copy=False)
+        if node is None:
+            return None
+        if position < 0:
+            position += tree.count_keys()
+            if position < 0:
+                return None
+        while node[_Node.NODE_TYPE] not in _Node.LEAF_NODES:
+            counts = _Node(*node).get_counts()
+            for entry, count in zip(node[_Node.ENTRIES], counts):
+                if count is None:
+                    count = tree._count_keys_in_subtree(entry, write=False)
+                if position < count:
+                    break
+                position -= count
+            else:
+                return None
+            node = tree.get_node(entry, copy=False)
+        if position >= len(node[_Node.KEYS]):
+            return None
+        self.current_key_node_number = node[_Node.NODE_NUMBER]
+        self.current_key = node[_Node.KEYS][position]
+        return self.current_key
 
     def last(self):
         """Move cursor to last record."""
-        node = literal_eval(self.tree.read_root().decode())
+        node = self.tree.get_root(copy=False)
         if node is None:
             return None
         while node[_Node.NODE_TYPE] not in _Node.LEAF_NODES:
-            node = literal_eval(
-                self.tree.read_node(node[_Node.ENTRIES][-1]).decode()
-            )
+            node = self.tree.get_node(node[_Node.ENTRIES][-1], copy=False)
         self.current_key_node_number = node[_Node.NODE_NUMBER]
         self.current_key = node[_Node.KEYS][-1]
         return self.current_key
@@ -801,10 +1160,8 @@ class Cursor:
         if i == len(node[_Node.KEYS]):
             if node[_Node.RIGHT_SIBLING_NODE_NUMBER] is None:
                 return None
-            node = literal_eval(
-                self.tree.read_node(
-                    node[_Node.RIGHT_SIBLING_NODE_NUMBER]
-                ).decode()
+            node = self.tree.get_node(
+                node[_Node.RIGHT_SIBLING_NODE_NUMBER], copy=False
             )
             self.current_key_node_number = node[_Node.NODE_NUMBER]
             self.current_key = node[_Node.KEYS][0]
@@ -818,9 +1175,7 @@ class Cursor:
         if self.current_key is None:
             return self.first()
         try:
-            node = literal_eval(
-                self.tree.read_node(self.current_key_node_number).decode()
-            )
+            node = self.tree.get_node(self.current_key_node_number, copy=False)
         except KeyError:
             try:
                 node = self.tree.search(self.current_key)[-1].node
@@ -831,10 +1186,8 @@ class Cursor:
             if i == len(node[_Node.KEYS]) - 1:
                 if node[_Node.RIGHT_SIBLING_NODE_NUMBER] is None:
                     return None
-                node = literal_eval(
-                    self.tree.read_node(
-                        node[_Node.RIGHT_SIBLING_NODE_NUMBER]
-                    ).decode()
+                node = self.tree.get_node(
+                    node[_Node.RIGHT_SIBLING_NODE_NUMBER], copy=False
                 )
                 self.current_key_node_number = node[_Node.NODE_NUMBER]
                 self.current_key = node[_Node.KEYS][0]
@@ -851,9 +1204,7 @@ class Cursor:
         if self.current_key is None:
             return self.last()
         try:
-            node = literal_eval(
-                self.tree.read_node(self.current_key_node_number).decode()
-            )
+            node = self.tree.get_node(self.current_key_node_number, copy=False)
         except KeyError:
             try:
                 node = self.tree.search(self.current_key)[-1].node
@@ -863,10 +1214,8 @@ class Cursor:
         if i == 0:
             if node[_Node.LEFT_SIBLING_NODE_NUMBER] is None:
                 return None
-            node = literal_eval(
-                self.tree.read_node(
-                    node[_Node.LEFT_SIBLING_NODE_NUMBER]
-                ).decode()
+            node = self.tree.get_node(
+                node[_Node.LEFT_SIBLING_NODE_NUMBER], copy=False
             )
             self.current_key_node_number = node[_Node.NODE_NUMBER]
             self.current_key = node[_Node.KEYS][-1]
@@ -898,6 +1247,32 @@ class Cursor:
         return self.current_key
 
 
+def _copy_node(nodedata):
+    """Return copy of nodedata where node keys and entries are new lists."""
+    if not isinstance(nodedata, list):
+        return nodedata
+    return [
+        item.copy() if isinstance(item, list) else item for item in nodedata
+    ]
+
+
+def _even_groups(count, size):
+    """Return (start, end) tuples splitting count items into even groups.
+
+    No group has more than size items, and group sizes differ by at most 1.
+
+    """
+    groups = -(-count // size)
+    small, larger = divmod(count, groups)
+    bounds = []
+    start = 0
+    for group in range(groups):
+        end = start + small + (1 if group < larger else 0)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
 class _Node:
     # The valid values of node[NODE_TYPE]
     ROOT = 1
@@ -918,6 +1293,11 @@ class _Node:
     RIGHT_SIBLING_NODE_NUMBER = 3
     KEYS = 4
     ENTRIES = 5
+    COUNTS = 6
+
+    # ROOT and BRANCH nodes have a COUNTS item: the number of keys in the
+    # subtree referenced by each of their entries, or None if not known.
+    # Nodes written before counts were kept do not have the COUNTS item.
 
     # Often it is easier to access the list read from database using the index
     # constants defined in _Node class, without creating a _Node object.
@@ -927,9 +1307,18 @@ class _Node:
     __slots__ = "node", "modified"
 
     def __init__(
-        self, number, type_, left=None, right=None, keys=None, entries=None
+        self,
+        number,
+        type_,
+        left=None,
+        right=None,
+        keys=None,
+        entries=None,
+        counts=None,
     ):
         self.node = [number, type_, left, right, keys, entries]
+        if counts is not None:
+            self.node.append(counts)
         self.modified = False
 
     def __len__(self):
@@ -945,6 +1334,26 @@ class _Node:
         keys = self.node[_Node.KEYS]
         insertion_point = bisect_left(keys, key)
         assert insertion_point == len(keys) or key != keys[insertion_point]
+        counts = self.get_counts()
         keys.insert(insertion_point, key)
         self.node[_Node.ENTRIES].insert(insertion_point + 1, node_number)
+        counts[insertion_point] = None
+        counts.insert(insertion_point + 1, None)
         return insertion_point
+
+    def get_counts(self):
+        """Return counts of keys for entries, adding them if not present."""
+        node = self.node
+        if len(node) == _Node.COUNTS:
+            node.append([None] * len(node[_Node.ENTRIES]))
+        return node[_Node.COUNTS]
+
+    def count_keys(self):
+        """Return number of keys in subtree, or None if not known."""
+        node = self.node
+        if node[_Node.NODE_TYPE] in _Node.LEAF_NODES:
+            return len(node[_Node.KEYS])
+        counts = self.get_counts()
+        if None in counts:
+            return None
+        return sum(counts)
@@ -36,7 +36,6 @@ particularly the last of these.
 """
 
 import re
-from tkinter import simpledialog
 
 from .constants import SECONDARY
 
@@ -166,6 +165,14 @@ class Where:
         self._f_or_v = None
         self._not = None
 
+        # True if lex() and parse() have been done and should not be done
+        # again.  Set by querycache.QueryCache and clone().
+        self.parsed = False
+
+        # The dbset arguments for which validate() found statement valid,
+        # shared with clones.
+        self._valid_dbsets = set()
+
     @property
     def error_information(self):
         """Return WhereStatementError object for the Where object."""
@@ -173,6 +180,8 @@ class Where:
 
     def lex(self):
         """Split instance's statement into tokens."""
+        if self.parsed:
+            return
         tokens = []
         items = []
         strings = []
@@ -203,6 +212,8 @@ class Where:
 
     def parse(self):
         """Parse instance's tokens to create node structure to do query."""
+        if self.parsed:
+            return
         self.node = WhereClause()
         state = self._set_field_not_leftp_start
         for i, token in enumerate(self.tokens):
@@ -218,12 +229,46 @@ class Where:
             if self.node.up is not None:
                 self.node = self.node.up
 
+    def parse_failed(self):
+        """Return True if parse() found an error in statement."""
+        return bool(self._error_information.tokens)
+
+    def clone(self, replacements=None):
+        """Return parsed copy of self for evaluation with other values.
+
+        The node tree is copied without evaluation results and the tokens
+        are shared.  Placeholders are replaced in the copy if replacements
+        is given: see fill_placeholders().
+
+        """
+        where = Where(self.statement)
+        where.tokens = self.tokens
+        where.parsed = True
+        where._valid_dbsets = self._valid_dbsets
+        if self.node is not None:
+            copies = {}
+            clauses = self.node.get_clauses_from_root_in_walk_order()
+            for clause in clauses:
+                copies[clause] = clause.copy_phrase()
+            for clause in clauses:
+                copy = copies[clause]
+                copy.left = copies.get(clause.left)
+                copy.right = copies.get(clause.right)
+                copy.up = copies.get(clause.up)
+                copy.down = copies.get(clause.down)
+            where.node = copies[self.node]
+        if replacements is not None:
+            where.fill_placeholders(replacements=replacements)
+        return where
+
     def validate(self, db, dbset):
         """Return None if query is valid, or a WhereStatementError instance."""
         if self._error_information.tokens:
             return self._error_information
         if self.node is None:
             return None
+        if self.parsed and dbset in self._valid_dbsets:
+            return None
         clauses = self.node.get_root().get_clauses_from_root_in_walk_order()
 
         # Valid nodes, considering (field, condition, value), are like
@@ -242,13 +287,20 @@ class Where:
             self._error_information.fields = fields
             return self._error_information
 
+        if self.parsed:
+            self._valid_dbsets.add(dbset)
         return None
 
     # Probably a good thing to provide, but introduced to cope with inability
     # to put '(' or ')' directly in values because it is picked as a reserved
     # word.
     def fill_placeholders(self, replacements=None):
-        """Substitute replacement values or prompt for value if None."""
+        """Substitute replacement values or prompt for value if None.
+
+        The prompt needs tkinter: the wheredialog module is imported only
+        when a placeholder has no replacement value.
+
+        """
         if self.node is None:
             return
         if replacements is None:
@@ -260,10 +312,9 @@ class Where:
                     if value in replacements:
                         node.value = replacements.pop(value)
                     else:
-                        node.value = simpledialog.askstring(
-                            "Supply replacement value",
-                            "".join(("Placeholder is ", value)),
-                        )
+                        from .wheredialog import ask_placeholder_value
+
+                        node.value = ask_placeholder_value(value)
                         # raise WhereError(
                         #    ''.join(('Expected replacement value for ',
                         #             value,
@@ -281,7 +332,16 @@ class Where:
         self._processors = processors
         try:
             node = self.node.get_root()
-            node.evaluate_index_condition_node(self._index_rules_engine)
+            # Processors which cannot estimate the size of answers, by
+            # providing an estimate method, get the index conditions
+            # evaluated in query order.
+            if getattr(processors, "estimate", None) is not None:
+                plan = self._plan_index_conditions
+            else:
+                plan = None
+            node.evaluate_index_condition_node(
+                self._index_rules_engine, plan=plan
+            )
             if node.result is not None:
                 return
             non_index_nodes = []
@@ -331,12 +391,70 @@ class Where:
             else:
                 constraint.result.answer = processors.get_existence()
                 break
-        for record in processors.get_record(constraint.result.answer):
-            for node in non_index_nodes:
-                processors.non_index_condition(node, *record)
+        # Processors which cannot compile the conditions, by providing an
+        # evaluate_non_index_conditions method, get each record in turn.
+        evaluate_conditions = getattr(
+            processors, "evaluate_non_index_conditions", None
+        )
+        if evaluate_conditions is not None:
+            evaluate_conditions(non_index_nodes, constraint.result.answer)
+        else:
+            for record in processors.get_record(constraint.result.answer):
+                for node in non_index_nodes:
+                    processors.non_index_condition(node, *record)
         for node in non_index_nodes:
             processors.not_condition(node)
 
+    def _plan_index_conditions(self, node):
+        """Evaluate index conditions linked by 'and' in chain from node.
+
+        Return the set of nodes evaluated.
+
+        In each run of phrases linked by 'and' or 'nor' the conditions
+        whose answers are 'and'ed are evaluated in increasing order of
+        estimated answer size, followed by the other index conditions in
+        query order.  Each condition is given the answers so far 'and'ed
+        together as it's index_filter.  Once these answers have no records
+        in common the remaining index conditions are given an empty answer
+        without evaluation.
+
+        """
+        processors = self._processors
+        evaluated = set()
+        for chain in node.get_and_chains():
+            nodes = [n for n in chain if n.is_index_condition()]
+            if len(nodes) < 2:
+                continue
+            estimated = []
+            others = []
+            for item in nodes:
+                size = None
+                if item.operator != NOR and not (
+                    bool(item.not_condition) ^ bool(item.not_phrase)
+                ):
+                    size = processors.estimate(item)
+                if size is None:
+                    others.append(item)
+                else:
+                    estimated.append((size, len(estimated), item))
+            answer = None
+            for item in [e[-1] for e in sorted(estimated)] + others:
+                evaluated.add(item)
+                if answer is not None and not answer.count_records():
+                    item.result = WhereResult()
+                    processors.initialize_answer(item)
+                    continue
+                item.index_filter = answer
+                self._index_rules_engine(item.condition, item)
+                item.index_filter = None
+                if item.operator == NOR or item.result.answer is None:
+                    continue
+                if answer is None:
+                    answer = item.result.answer
+                else:
+                    answer = answer & item.result.answer
+        return evaluated
+
     def _index_rules_engine(self, operator, obj):
         """Evaluate the rule in each node where an index is available."""
         if operator in {
@@ -923,6 +1041,9 @@ class WhereClause:
     result - The answer generated by evaluating the node.
     constraint - Restrictions on result implied by results generated for other
                 nodes.
+    index_filter - Records which may be in the answer, or None.  Index
+                evaluation may omit records in segments which have no records
+                in index_filter.
 
     """
 
@@ -946,6 +1067,7 @@ class WhereClause:
         # Evaluation
         self.result = None
         self.constraint = None
+        self.index_filter = None
 
     def get_root(self):
         """Return root node of tree containing self."""
@@ -974,10 +1096,54 @@ class WhereClause:
         self.get_root().get_clauses_from_current_in_walk_order(clauses=clauses)
         return clauses
 
+    def copy_phrase(self):
+        """Return new node with self's operator and phrase attributes."""
+        node = WhereClause()
+        node.operator = self.operator
+        node.field = self.field
+        node.condition = self.condition
+        node.value = self.value
+        node.not_phrase = self.not_phrase
+        node.not_condition = self.not_condition
+        node.not_value = self.not_value
+        node.num = self.num
+        node.alpha = self.alpha
+        return node
+
     def get_condition(self):
         """Return identity of self."""
         return id(self)
 
+    def get_and_chains(self):
+        """Return lists of nodes from self rightwards linked by 'and' or 'nor'.
+
+        The 'or' operator, or no operator, starts a new list.
+
+        """
+        chains = []
+        node = self
+        while node is not None:
+            if chains and node.operator in {NOR, AND}:
+                chains[-1].append(node)
+            else:
+                chains.append([node])
+            node = node.right
+        return chains
+
+    def is_index_condition(self):
+        """Return True if node's condition is evaluated by index."""
+        if self.condition == IS:
+            return not self.not_value
+        # LIKE not in this test because in can be applied to index fields as
+        # well as non-index fields.  Add test to pass non-index LIKE on to
+        # get_non_index_condition_node() method.
+        # STARTS, meaning '<value>.*', will be added to reduce index scans.
+        return self.condition not in (
+            None,
+            PRESENT,
+            NE,
+        )
+
     def evaluate_node_result(self, rules):
         """Evaluate node result assuming non-index conditions are resolved.
 
@@ -1007,7 +1173,7 @@ class WhereClause:
                     node = node.right
             rules(None, self.down)
 
-    def evaluate_index_condition_node(self, rules):
+    def evaluate_index_condition_node(self, rules, plan=None, evaluated=()):
         """Evaluate node when index is available.
 
         Processing order is current node, right node, down node, to keep open
@@ -1018,19 +1184,16 @@ class WhereClause:
         more in the current chain.  The recursive calls for down nodes are
         done on reaching end of right chain.
 
+        plan, if given, is called with the first node of each chain and
+        returns the nodes in the chain it evaluated.  These nodes are not
+        evaluated again.
+
         """
-        if self.condition == IS:
-            if not self.not_value:
-                rules(self.condition, self)
-        # LIKE not in this test because in can be applied to index fields as
-        # well as non-index fields.  Add test to pass non-index LIKE on to
-        # get_non_index_condition_node() method.
-        # STARTS, meaning '<value>.*', will be added to reduce index scans.
-        elif self.condition not in (
-            None,
-            PRESENT,
-            NE,
-        ):
+        if plan is not None and self.left is None:
+            evaluated = plan(self)
+        if self in evaluated:
+            pass
+        elif self.is_index_condition():
             rules(self.condition, self)
         if self.operator in {NOR, AND}:
             self.constraint = self.left.constraint
@@ -1039,9 +1202,11 @@ class WhereClause:
         if self.result is None and self.condition:
             self.constraint.pending = True
         if self.right is not None:
-            self.right.evaluate_index_condition_node(rules)
+            self.right.evaluate_index_condition_node(
+                rules, plan=plan, evaluated=evaluated
+            )
         if self.down is not None:
-            self.down.evaluate_index_condition_node(rules)
+            self.down.evaluate_index_condition_node(rules, plan=plan)
             for operator in (
                 NOR,
                 AND,
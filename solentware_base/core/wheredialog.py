@@ -0,0 +1,22 @@
+# wheredialog.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""Prompt for values to replace placeholders in where statements.
+
+This module is imported by where.Where.fill_placeholders() only when a
+placeholder has no replacement value, so the where module, and the
+database modules which import it, can be used where tkinter is not
+available.
+
+"""
+
+from tkinter import simpledialog
+
+
+def ask_placeholder_value(placeholder):
+    """Return value for placeholder typed in a dialogue, or None."""
+    return simpledialog.askstring(
+        "Supply replacement value",
+        "".join(("Placeholder is ", placeholder)),
+    )
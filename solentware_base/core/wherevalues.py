@@ -80,8 +80,18 @@ class WhereValues:
         self._not = False
         self._processors = None
 
+        # True if lex() and parse() have been done and should not be done
+        # again.  Set by querycache.QueryCache and clone().
+        self.parsed = False
+
+        # The dbset arguments for which validate() found statement valid,
+        # shared with clones.
+        self._valid_dbsets = set()
+
     def lex(self):
         """Split instance's statement into tokens."""
+        if self.parsed:
+            return
         tokens = []
         strings = []
         for word in WHEREVALUES_RE.split(self.statement):
@@ -104,6 +114,8 @@ class WhereValues:
         object.
 
         """
+        if self.parsed:
+            return
         self.node = ValuesClause()
         state = self._set_fieldname
         for item, token in enumerate(self.tokens):
@@ -114,6 +126,24 @@ class WhereValues:
         else:
             self.node.valid_phrase = True
 
+    def parse_failed(self):
+        """Return True if parse() found an error in statement."""
+        return self._error_token_offset is not None
+
+    def clone(self):
+        """Return parsed copy of self without evaluation result.
+
+        The tokens are shared and the ValuesClause node is copied.
+
+        """
+        wherevalues = WhereValues(self.statement)
+        wherevalues.tokens = self.tokens
+        wherevalues.parsed = True
+        wherevalues._valid_dbsets = self._valid_dbsets
+        if self.node is not None:
+            wherevalues.node = self.node.copy_phrase()
+        return wherevalues
+
     def validate(self, db, dbset):
         """Verify self's statement has a valid search for db and dbset.
 
@@ -129,6 +159,8 @@ class WhereValues:
             return self.tokens[: self._error_token_offset]
         if self.node is None:
             return None
+        if self.parsed and dbset in self._valid_dbsets:
+            return True
         node = self.node
 
         # Valid values are None or a compiled regular expression.
@@ -147,6 +179,8 @@ class WhereValues:
             return False
         if node.below_value is not None and node.to_value is not None:
             return False
+        if self.parsed:
+            self._valid_dbsets.add(dbset)
         return True
 
     def evaluate(self, processors):
@@ -399,6 +433,21 @@ class ValuesClause:
         # Evaluation
         self.result = None
 
+    def copy_phrase(self):
+        """Return new node with self's phrase attributes."""
+        node = ValuesClause()
+        node.valid_phrase = self.valid_phrase
+        node.field = self.field
+        node.above_value = self.above_value
+        node.below_value = self.below_value
+        node.from_value = self.from_value
+        node.to_value = self.to_value
+        node.like = self.like
+        node.like_pattern = self.like_pattern
+        node.in_ = self.in_
+        node.in__set = self.in__set
+        return node
+
     def evaluate_node_result(self, processors):
         """Evaluate self's phrase with the processors FindValues object.
 
@@ -409,6 +458,30 @@ class ValuesClause:
         if self.valid_phrase:
             processors.find_values(self)
 
+    def has_range(self):
+        """Return True if any of the range attributes is not None."""
+        return (
+            self.above_value is not None
+            or self.below_value is not None
+            or self.from_value is not None
+            or self.to_value is not None
+        )
+
+    def get_in_set_lookup_values(self):
+        """Return sorted in__set values if they can be looked up, or None.
+
+        The values in in__set can be looked up in the index one at a time,
+        rather than testing every index value against in__set, if in_ is
+        True, no range is given, and in__set is a collection of values
+        rather than a str.
+
+        """
+        if not self.in_ or self.in__set is None or self.has_range():
+            return None
+        if isinstance(self.in__set, str):
+            return None
+        return sorted(self.in__set)
+
     def apply_pattern_and_set_filters_to_value(self, value):
         """Apply 'like' and 'value set' constraints to value.
 
@@ -27,6 +27,10 @@ Attempting to use any of these as alternatives to the ones always available
 may be pushing them beyond their intended uses, so they are imported only if
 requested.
 
+The installed modules are found when this module is imported, but each is
+imported only when first used.  Use available_database_modules() to choose
+a module without importing the others.
+
 The command line options are:
 
 'allow_all', '--a'
@@ -52,10 +56,9 @@ is configured in the installed db.
 
 import sys
 import os
+import importlib
+import importlib.util
 
-# Without the conditional imports below this import would have been placed
-# as the final import, except for the 'wrong-import-position' report by
-# pylint and the 'E402' report by pycodestyle.
 from .core.constants import (
     FILE,
     BERKELEYDB_MODULE,
@@ -84,70 +87,71 @@ def _allow(option):
     return option in argv1
 
 
-# An import name is bound to None if 'import <name>' gives an exception
-# or the import is not allowed.
-if _allow("allow_unqlite") or _allow("-u"):
-    try:
-        import unqlite
-    except ImportError:  # Not ModuleNotFoundError for Pythons earlier than 3.6
-        unqlite = None
-else:
-    unqlite = None
-if _allow("allow_vedis") or _allow("-v"):
-    try:
-        import vedis
-    except ImportError:  # Not ModuleNotFoundError for Pythons earlier than 3.6
-        vedis = None
-else:
-    vedis = None
-if _deny_sqlite3:
-    sqlite3 = None
-else:
-    try:
-        import sqlite3
-    except ImportError:  # Not ModuleNotFoundError for Pythons earlier than 3.6
-        sqlite3 = None
-try:
-    import apsw
-except ImportError:  # Not ModuleNotFoundError for Pythons earlier than 3.6
-    apsw = None
-try:
-    import berkeleydb
-except ImportError:  # Not ModuleNotFoundError for Pythons earlier than 3.6
-    berkeleydb = None
-try:
-    import bsddb3
-except ImportError:  # Not ModuleNotFoundError for Pythons earlier than 3.6
-    bsddb3 = None
-try:
-    import lmdb
-except ImportError:  # Not ModuleNotFoundError for Pythons earlier than 3.6
-    lmdb = None
-try:
-    from dpt_dbms import dptapi
-except ImportError:  # Not ModuleNotFoundError for Pythons earlier than 3.6
-    dptapi = None
-if _allow("allow_ndbm") or _allow("-n"):
-    try:
-        from dbm import ndbm
-    except ImportError:  # Not ModuleNotFoundError for Pythons earlier than 3.6
-        ndbm = None
-else:
-    ndbm = None
-if _allow("allow_gnu") or _allow("-g"):
-    try:
-        from dbm import gnu
-    except ImportError:  # Not ModuleNotFoundError for Pythons earlier than 3.6
-        gnu = None
-else:
-    gnu = None
-if _allow("allow_tcl") or _allow("allow_tkinter") or _allow("-t"):
+def _module_found(name):
+    """Return True if module name is installed, without importing it."""
     try:
-        from . import db_tcl
-    except ImportError:  # Not ModuleNotFoundError for Pythons earlier than 3.6
-        db_tcl = None
-else:
-    db_tcl = None
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# The attribute of this module bound to each database module, and the
+# name used to import it.  The attributes are bound when first used, see
+# __getattr__ below, so only the database modules used are imported.
+_MODULES = {
+    "unqlite": UNQLITE_MODULE,
+    "vedis": VEDIS_MODULE,
+    "sqlite3": SQLITE3_MODULE,
+    "apsw": APSW_MODULE,
+    "berkeleydb": BERKELEYDB_MODULE,
+    "bsddb3": BSDDB3_MODULE,
+    "lmdb": LMDB_MODULE,
+    "dptapi": DPT_MODULE,
+    "ndbm": NDBM_MODULE,
+    "gnu": GNU_MODULE,
+    "db_tcl": DB_TCL_MODULE,
+}
+
+# The names of the installed database modules which may be used.  The
+# db_tcl module is part of this package so the tkinter module it imports
+# decides if it is installed.
+_found = frozenset(
+    name
+    for name, allowed, spec_name in (
+        (
+            UNQLITE_MODULE,
+            _allow("allow_unqlite") or _allow("-u"),
+            "unqlite",
+        ),
+        (
+            VEDIS_MODULE,
+            _allow("allow_vedis") or _allow("-v"),
+            "vedis",
+        ),
+        (SQLITE3_MODULE, not _deny_sqlite3, "sqlite3"),
+        (APSW_MODULE, True, "apsw"),
+        (BERKELEYDB_MODULE, True, "berkeleydb"),
+        (BSDDB3_MODULE, True, "bsddb3"),
+        (LMDB_MODULE, True, "lmdb"),
+        (DPT_MODULE, True, "dpt_dbms.dptapi"),
+        (
+            NDBM_MODULE,
+            _allow("allow_ndbm") or _allow("-n"),
+            "dbm.ndbm",
+        ),
+        (
+            GNU_MODULE,
+            _allow("allow_gnu") or _allow("-g"),
+            "dbm.gnu",
+        ),
+        (
+            DB_TCL_MODULE,
+            _allow("allow_tcl") or _allow("allow_tkinter") or _allow("-t"),
+            "tkinter",
+        ),
+    )
+    if allowed and _module_found(spec_name)
+)
 
 if _deny_sqlite3:
     if sys.platform == "win32":
@@ -203,6 +207,61 @@ else:
 del sys
 del _allow
 del _deny_sqlite3
+del _module_found
+
+
+def __getattr__(name):
+    """Return database module for attribute name, importing it if needed.
+
+    The attribute is bound to None if the module is not installed, or not
+    allowed, or 'import <module>' gives an exception.
+
+    """
+    if name not in _MODULES:
+        raise AttributeError(
+            "".join(
+                (
+                    "module ",
+                    repr(__name__),
+                    " has no attribute ",
+                    repr(name),
+                )
+            )
+        )
+    module = None
+    if _MODULES[name] in _found:
+        try:
+            module = importlib.import_module(_MODULES[name])
+        except ImportError:  # Not ModuleNotFoundError for Python < 3.6
+            pass
+    globals()[name] = module
+    return module
+
+
+def _prefer_siblings(dbm):
+    """Set False in dbm for modules not used when a sibling is available."""
+    if dbm[BERKELEYDB_MODULE] and dbm[BSDDB3_MODULE]:
+        dbm[BSDDB3_MODULE] = False
+    if dbm[BERKELEYDB_MODULE] or dbm[BSDDB3_MODULE]:
+        dbm[DB_TCL_MODULE] = False
+    if dbm[APSW_MODULE] and dbm[SQLITE3_MODULE]:
+        dbm[SQLITE3_MODULE] = False
+
+
+def available_database_modules():
+    """Return tuple of names of preferred database modules installed.
+
+    The names are in DATABASE_MODULES_IN_DEFAULT_PREFERENCE_ORDER order,
+    excluding modules not used when a sibling is available, as in
+    installed_database_modules().  The modules are not imported, so a
+    module which gives an exception when imported may be included.
+
+    """
+    dbm = {
+        d: d in _found for d in DATABASE_MODULES_IN_DEFAULT_PREFERENCE_ORDER
+    }
+    _prefer_siblings(dbm)
+    return tuple(d for d, m in dbm.items() if m)
 
 
 def installed_database_modules():
@@ -212,29 +271,15 @@ def installed_database_modules():
     installed, or False if available but a sibling is used instead, or the
     module if available for use.
 
+    The installed database modules are imported if not done already.
+
     """
     dbm = {d: None for d in DATABASE_MODULES_IN_DEFAULT_PREFERENCE_ORDER}
-    for module in (
-        unqlite,
-        vedis,
-        sqlite3,
-        apsw,
-        lmdb,
-        berkeleydb,
-        bsddb3,
-        db_tcl,
-        dptapi,
-        ndbm,
-        gnu,
-    ):
+    for name in _MODULES:
+        module = globals()[name] if name in globals() else __getattr__(name)
         if module:
             dbm[module.__name__] = module
-    if dbm[BERKELEYDB_MODULE] and dbm[BSDDB3_MODULE]:
-        dbm[BSDDB3_MODULE] = False
-    if dbm[BERKELEYDB_MODULE] or dbm[BSDDB3_MODULE]:
-        dbm[DB_TCL_MODULE] = False
-    if dbm[APSW_MODULE] and dbm[SQLITE3_MODULE]:
-        dbm[SQLITE3_MODULE] = False
+    _prefer_siblings(dbm)
     return {d: m for d, m in dbm.items() if m}
 
 
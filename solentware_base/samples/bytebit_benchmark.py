@@ -0,0 +1,74 @@
+# bytebit_benchmark.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""Report cost of Bitarray operations for each available implementation.
+
+The implementations are the bitarray package, the _npbytebit module (needs
+numpy), and the _bytebit module.  Each operation is done on segment sized
+Bitarrays, 65536 bits, with about one bit in eight set.
+
+Output is lines like:
+
+_bytebit   count      1234.5 microseconds
+
+The number of repetitions can be given as the first command line argument.
+
+"""
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    from solentware_base.core import _bytebit
+
+    implementations = []
+    try:
+        from bitarray import bitarray
+
+        implementations.append(("bitarray", bitarray, bitarray("1")))
+    except ImportError:
+        pass
+    try:
+        from solentware_base.core import _npbytebit
+
+        implementations.append(("_npbytebit", _npbytebit.Bitarray, True))
+    except ImportError:
+        pass
+    implementations.append(("_bytebit", _bytebit.Bitarray, True))
+
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    generator = random.Random(1)
+    first = bytes(generator.getrandbits(8) & 0x11 for i in range(8192))
+    second = bytes(generator.getrandbits(8) & 0x11 for i in range(8192))
+    for name, bitarray_class, singlebit in implementations:
+
+        def new_bitarray(records):
+            """Return bitarray_class instance created from records."""
+            instance = bitarray_class()
+            instance.frombytes(records)
+            return instance
+
+        one = new_bitarray(first)
+        two = new_bitarray(second)
+        for operation, function in (
+            ("frombytes", lambda: new_bitarray(first)),
+            ("tobytes", one.tobytes),
+            ("count", one.count),
+            ("search", lambda: one.search(singlebit)),
+            ("and", lambda: one & two),
+            ("or", lambda: one | two),
+            ("index", lambda: one.index(True, 65000)),
+            ("getitem", lambda: [one[i] for i in range(0, 65536, 64)]),
+        ):
+            start = time.perf_counter()
+            for i in range(repeat):
+                function()
+            elapsed = time.perf_counter() - start
+            print(
+                name.ljust(10),
+                operation.ljust(10),
+                format(elapsed * 1000000 / repeat, ".1f").rjust(10),
+                "microseconds",
+            )
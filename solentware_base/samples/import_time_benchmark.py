@@ -0,0 +1,80 @@
+# import_time_benchmark.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""Report time to import modulequery, core._sqlite, and *_database modules.
+
+Each module is imported in a new Python interpreter so nothing imported
+earlier is reused.  The least time of several runs is reported because
+the others include unrelated activity on the computer.
+
+The modules are imported with tkinter blocked, as on a headless batch
+worker without Tk, and the time is followed by 'uses tkinter' if the
+module can be imported only when tkinter is available.
+
+Output is lines like:
+
+modulequery                      1.2 milliseconds
+core._sqlite                    14.5 milliseconds
+db_tkinter_database             31.0 milliseconds uses tkinter
+lmdb_database                   not importable: No module named 'lmdb'
+
+The number of runs for each module can be given as the first command line
+argument.
+
+"""
+
+if __name__ == "__main__":
+    import sys
+    import os
+    import subprocess
+
+    import solentware_base
+
+    script = "\n".join(
+        (
+            "import sys",
+            "import time",
+            "if {}:",
+            "    sys.modules['tkinter'] = None",
+            "start = time.perf_counter()",
+            "try:",
+            "    import solentware_base.{}",
+            "except Exception as exc:",
+            "    print('not importable:', exc)",
+            "else:",
+            "    print(time.perf_counter() - start)",
+        )
+    )
+
+    def import_time(module, runs, headless=True):
+        """Return least import time, or reason module is not importable."""
+        times = []
+        for run in range(runs):
+            output = subprocess.run(
+                (sys.executable, "-c", script.format(headless, module)),
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+            try:
+                times.append(float(output))
+            except ValueError:
+                if headless:
+                    report = import_time(module, runs, headless=False)
+                    if not report.startswith("not importable"):
+                        return report + " uses tkinter"
+                return output
+        return format(min(times) * 1000, "6.1f") + " milliseconds"
+
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    modules = ["modulequery", "core._sqlite"]
+    modules.extend(
+        sorted(
+            os.path.splitext(name)[0]
+            for name in os.listdir(os.path.dirname(solentware_base.__file__))
+            if name.endswith("_database.py")
+        )
+    )
+    for module in modules:
+        print(format(module, "28"), import_time(module, runs))
@@ -0,0 +1,90 @@
+# nosql_layout_benchmark.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""Report cost of storing _nosql index values by repr and binary layout.
+
+The values are a bitmap of a 4096 byte segment with every third record
+set, a list of 100 record numbers, and a segment table referring to 20
+segments, like those written for each index update by the _nosql module.
+
+Output is lines like:
+
+bitmap        repr   encode   22.40 decode   55.89 microseconds  8197 bytes
+bitmap        binary encode    0.29 decode    0.41 microseconds  4097 bytes
+list          repr   encode    1.43 decode   10.80 microseconds   595 bytes
+list          binary encode    0.15 decode    0.26 microseconds   201 bytes
+segment table repr   encode   13.61 decode  224.00 microseconds   310 bytes
+segment table binary encode    6.30 decode    5.34 microseconds   181 bytes
+
+The number of repetitions can be given as the first command line argument.
+
+"""
+
+if __name__ == "__main__":
+    import sys
+    import timeit
+    from ast import literal_eval
+
+    from solentware_base.core import nosqllayout
+    from solentware_base.core.bytebit import Bitarray
+
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    bitarray = Bitarray(4096 * 8)
+    bitarray.setall(False)
+    for record in range(0, 4096 * 8, 3):
+        bitarray[record] = True
+    values = (
+        (
+            "bitmap",
+            bitarray.tobytes(),
+            nosqllayout.encode_records,
+            nosqllayout.decode_records,
+        ),
+        (
+            "list",
+            b"".join(n.to_bytes(2, byteorder="big") for n in range(100)),
+            nosqllayout.encode_records,
+            nosqllayout.decode_records,
+        ),
+        (
+            "segment table",
+            {
+                segment: (("B", 2000) if segment % 2 else ("L", 50))
+                for segment in range(20)
+            },
+            nosqllayout.encode_segment_table,
+            nosqllayout.decode_segment_table,
+        ),
+    )
+
+    def report(name, layout, encode, decode, value):
+        """Print encode and decode times, and size, of value."""
+        stored = encode(value)
+        encode_time = min(
+            timeit.repeat(lambda: encode(value), number=number, repeat=5)
+        )
+        decode_time = min(
+            timeit.repeat(lambda: decode(stored), number=number, repeat=5)
+        )
+        print(
+            format(name, "13"),
+            format(layout, "6"),
+            "encode",
+            format(encode_time * 1000000 / number, "7.2f"),
+            "decode",
+            format(decode_time * 1000000 / number, "7.2f"),
+            "microseconds",
+            format(len(stored), "5"),
+            "bytes",
+        )
+
+    for name, value, encode, decode in values:
+        report(
+            name,
+            "repr",
+            lambda value: repr(value).encode(),
+            lambda stored: literal_eval(stored.decode()),
+            value,
+        )
+        report(name, "binary", encode, decode, value)
@@ -0,0 +1,79 @@
+# sqlite_put_instance_benchmark.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""Report per-record cost of put_instance and edit_instance with sqlite3.
+
+A memory-only database is used so the cost reported is the Python and SQL
+statement overhead rather than disk access.  Each index value refers to one
+record so the cost of segment bitmap manipulation is small.  The cost of the
+commit, which writes the index record counts, is included.
+
+Output is lines like:
+
+put_instance  20000 records  41.3 microseconds per record
+edit_instance 20000 records  57.9 microseconds per record
+
+The number of records can be given as the first command line argument.
+
+"""
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from solentware_base import sqlite3_database
+    from solentware_base.core import record
+
+    class Value(record.Value):
+        """Value with two indexed fields."""
+
+        def pack(self):
+            """Return packed value and index for fields a and b."""
+            value = super().pack()
+            value[1]["a"] = [self.a]
+            value[1]["b"] = [self.b]
+            return value
+
+    def new_instance(a, b):
+        """Return Record instance for values a and b."""
+        instance = record.Record(keyclass=record.KeyData, valueclass=Value)
+        instance.value.a = a
+        instance.value.b = b
+        return instance
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    database = sqlite3_database.Database({"file": {"a", "b"}})
+    database.open_database()
+    try:
+        database.start_transaction()
+        start = time.perf_counter()
+        for number in range(count):
+            database.put_instance(
+                "file", new_instance(str(number), "b" + str(number))
+            )
+        database.commit()
+        put_time = time.perf_counter() - start
+        database.start_transaction()
+        start = time.perf_counter()
+        for number in range(count):
+            instance = new_instance(str(number), "b" + str(number))
+            instance.key.load(number + 1)
+            instance.newrecord = new_instance(str(number), "c" + str(number))
+            instance.newrecord.key.load(number + 1)
+            database.edit_instance("file", instance)
+        database.commit()
+        edit_time = time.perf_counter() - start
+    finally:
+        database.close_database()
+    for name, elapsed in (
+        ("put_instance ", put_time),
+        ("edit_instance", edit_time),
+    ):
+        print(
+            name,
+            count,
+            "records ",
+            format(elapsed * 1000000 / count, ".1f"),
+            "microseconds per record",
+        )
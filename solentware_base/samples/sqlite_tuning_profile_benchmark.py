@@ -0,0 +1,91 @@
+# sqlite_tuning_profile_benchmark.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""Report load throughput of sqlite3 under each tuning profile.
+
+A file database in a new temporary directory is loaded for each profile,
+committing every 1000 records, so the cost of synchronizing the journal
+with the disk is included.  Each index value refers to one record.
+
+Output is lines like:
+
+default      20000 records   26259 records per second
+bulk_load    20000 records   24048 records per second
+interactive  20000 records   30841 records per second
+read_mostly  20000 records   24822 records per second
+
+The differences are small where synchronizing with the disk is cheap,
+because the cost of put_instance is then mostly Python.
+
+The number of records can be given as the first command line argument.
+
+"""
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import tempfile
+    import shutil
+
+    from solentware_base import sqlite3_database
+    from solentware_base.core import record
+    from solentware_base.core.constants import (
+        BULK_LOAD,
+        INTERACTIVE,
+        READ_MOSTLY,
+    )
+
+    class Value(record.Value):
+        """Value with two indexed fields."""
+
+        def pack(self):
+            """Return packed value and index for fields a and b."""
+            value = super().pack()
+            value[1]["a"] = [self.a]
+            value[1]["b"] = [self.b]
+            return value
+
+    def new_instance(a, b):
+        """Return Record instance for values a and b."""
+        instance = record.Record(keyclass=record.KeyData, valueclass=Value)
+        instance.value.a = a
+        instance.value.b = b
+        return instance
+
+    def load(profile, count):
+        """Return seconds taken to load count records using profile."""
+        directory = tempfile.mkdtemp()
+        try:
+            database = sqlite3_database.Database(
+                {"file": {"a", "b"}}, folder=directory
+            )
+            database.set_tuning_profile(profile)
+            database.open_database()
+            try:
+                start = time.perf_counter()
+                database.start_transaction()
+                for number in range(count):
+                    database.put_instance(
+                        "file", new_instance(str(number), "b" + str(number))
+                    )
+                    if number % 1000 == 999:
+                        database.commit()
+                        database.start_transaction()
+                database.commit()
+                return time.perf_counter() - start
+            finally:
+                database.close_database()
+        finally:
+            shutil.rmtree(directory)
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for profile in (None, BULK_LOAD, INTERACTIVE, READ_MOSTLY):
+        elapsed = load(profile, count)
+        print(
+            format(profile or "default", "12"),
+            count,
+            "records ",
+            format(int(count / elapsed), "6"),
+            "records per second",
+        )
@@ -0,0 +1,78 @@
+# tree_node_cache_benchmark.py
+# Copyright 2026 Roger Marsh
+# Licence: See LICENCE (BSD licence)
+
+"""Report cost of building and searching a tree.Tree with unqlite.
+
+A memory-only database is used so the cost reported is decoding and
+encoding tree nodes rather than disk access.  The tree is built by insert
+of keys in random order, by insert with tree nodes held in memory until
+the transaction is committed, and by bulk_load of the sorted keys.  Then
+every key is searched for with and without the node cache.
+
+Output is lines like:
+
+insert             20000 keys    85.4 microseconds per key
+insert, write back 20000 keys    32.7 microseconds per key
+bulk_load          20000 keys     0.5 microseconds per key
+search, no cache   20000 keys   568.3 microseconds per key
+search, cache      20000 keys    78.9 microseconds per key
+
+The number of keys can be given as the first command line argument.
+
+"""
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import random
+
+    from solentware_base import unqlite_database
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    keys = ["k" + str(number) for number in range(count)]
+    shuffled = keys.copy()
+    random.shuffle(shuffled)
+
+    def build(how):
+        """Return elapsed time to build tree and the open database."""
+        database = unqlite_database.Database({"file": {"a"}})
+        database.open_database()
+        fieldtree = database.trees["file_a"]
+        start = time.perf_counter()
+        if how == "bulk_load":
+            fieldtree.bulk_load(sorted(keys))
+        elif how == "write back":
+            database.start_transaction()
+            for key in shuffled:
+                fieldtree.insert(key)
+            database.commit()
+        else:
+            for key in shuffled:
+                fieldtree.insert(key)
+        return time.perf_counter() - start, database
+
+    def report(name, elapsed):
+        """Print elapsed time per key."""
+        print(
+            format(name, "18"),
+            count,
+            "keys ",
+            format(elapsed * 1000000 / count, "6.1f"),
+            "microseconds per key",
+        )
+
+    for how in ("insert", "insert, write back", "bulk_load"):
+        elapsed, database = build(how.rpartition(", ")[-1])
+        report(how, elapsed)
+        if how != "bulk_load":
+            database.close_database()
+    fieldtree = database.trees["file_a"]
+    for name, cache_size in (("search, no cache", 0), ("search, cache", 256)):
+        fieldtree.node_cache_size = cache_size
+        fieldtree.clear_node_cache()
+        start = time.perf_counter()
+        for key in shuffled:
+            fieldtree.search(key)
+        report(name, time.perf_counter() - start)
+    database.close_database()
@@ -7,6 +7,7 @@
 import unittest
 import sys
 import os
+import subprocess
 
 from .. import modulequery
 
@@ -158,6 +159,49 @@ class Modulequery(unittest.TestCase):
                 self.assertEqual("sqlite3" not in r, True)
                 self.assertEqual("apsw" in r, True)
 
+    def test_available_database_modules(self):
+        r = modulequery.available_database_modules()
+        order = modulequery.DATABASE_MODULES_IN_DEFAULT_PREFERENCE_ORDER
+        self.assertIsInstance(r, tuple)
+        self.assertEqual(r, tuple(n for n in order if n in r))
+        self.assertEqual(set(r), set(modulequery.installed_database_modules()))
+
+    def test_lazy_import(self):
+        # The database modules are not imported with modulequery.
+        output = subprocess.run(
+            (
+                sys.executable,
+                "-c",
+                "".join(
+                    (
+                        "import sys\n",
+                        "from solentware_base import modulequery\n",
+                        "print(sorted(set(sys.modules).intersection(",
+                        "modulequery.available_database_modules())))",
+                    )
+                ),
+            ),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        self.assertEqual(output, "[]\n")
+
+    def test___getattr__(self):
+        self.assertRaisesRegex(
+            AttributeError,
+            "".join(
+                (
+                    "module 'solentware_base.modulequery' has no attribute ",
+                    "'xxxxx'$",
+                )
+            ),
+            getattr,
+            *(modulequery, "xxxxx"),
+        )
+        if "sqlite3" in modulequery.available_database_modules():
+            self.assertIs(modulequery.sqlite3, sys.modules["sqlite3"])
+
     def test_modules_for_existing_databases(self):
         # r depends on what's installed, and the existence of a file structure
         # which could have been created by one of these modules.